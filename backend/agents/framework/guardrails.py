@@ -7,12 +7,31 @@ agent behavior.
 """
 import re
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 # Logging setup
 import logging
 logger = logging.getLogger(__name__)
 
+# Actions of the streaming guardrails on a rule violation
+STREAM_ACTION_REDACT = "redact"  # replace the offending text and keep streaming
+STREAM_ACTION_CUT = "cut"  # stop the stream and end it with a safe message
+STREAM_ACTION_REVIEW = "review"  # keep streaming; the LLM guardrail reviews the full response
+
+# Default action per guardrail rule. Keyword hits on topics and services are
+# ambiguous ("vote for your favorite color"), so they only trigger a review.
+DEFAULT_STREAM_ACTIONS = {
+    "banned_phrase": STREAM_ACTION_REDACT,
+    "sensitive_information": STREAM_ACTION_REDACT,
+    "prohibited_topic": STREAM_ACTION_REVIEW,
+    "service_boundary": STREAM_ACTION_REVIEW,
+}
+
+# Modes of the LLM guardrail pass after the local rules
+LLM_REVIEW_INCONCLUSIVE = "inconclusive"  # only when local rules flag the response for review
+LLM_REVIEW_ALWAYS = "always"
+LLM_REVIEW_NEVER = "never"
+
 class GuardrailViolation:
     """Represents a violation of agent guardrails"""
     
@@ -178,4 +197,230 @@ class Guardrails:
                     "As a Staples customer service representative"
                 )
         
-        return corrected_text, violations
\ No newline at end of file
+        return corrected_text, violations
+
+class StreamingGuardrails:
+    """
+    Incremental guardrail checks over a response streamed in chunks.
+    
+    Applies the local rules of a Guardrails instance to a rolling window
+    of the stream. The last characters of the stream are held back until
+    the window moves past them, so phrases and patterns split across chunk
+    boundaries are caught before they are released. Depending on the rule,
+    a violation redacts the offending text, cuts the stream, or flags the
+    response for review by the LLM guardrail once the stream completes.
+    """
+    
+    REDACTION = "[REDACTED]"
+    BANNED_PHRASE_REPLACEMENT = "As a Staples customer service representative"
+    CUT_MESSAGE = "I'm sorry, but I can't help with that. Is there anything else I can help you with?"
+    
+    def __init__(
+        self,
+        guardrails: Optional[Guardrails] = None,
+        actions: Optional[Dict[str, str]] = None,
+        overlap: Optional[int] = None
+    ):
+        """
+        Initialize the streaming checks.
+        
+        Args:
+            guardrails: Guardrails whose rules are applied (a default instance if not provided)
+            actions: Rule name to STREAM_ACTION_* overrides of DEFAULT_STREAM_ACTIONS
+            overlap: Characters held back at the end of the stream; defaults to the
+                longest literal rule plus a margin for the sensitive patterns
+        """
+        self.guardrails = guardrails or Guardrails()
+        self.actions = {**DEFAULT_STREAM_ACTIONS, **(actions or {})}
+        
+        self._banned = self._literal_pattern(self.guardrails.banned_phrases, word_boundaries=False)
+        self._sensitive = {name: re.compile(pattern) for name, pattern in self.guardrails.sensitive_patterns.items()}
+        self._topic_keywords = {
+            keyword.lower(): topic
+            for topic, keywords in self.guardrails.prohibited_topics.items()
+            for keyword in keywords
+        }
+        self._topics = self._literal_pattern(self._topic_keywords)
+        allowed = " ".join(self.guardrails.service_boundaries["allowed"]).lower()
+        self._services = self._literal_pattern(
+            service for service in self.guardrails.service_boundaries["not_allowed"]
+            if service.lower() not in allowed
+        )
+        
+        # (rule name, severity, pattern, description builder, redaction replacement)
+        self._rules = [
+            ("banned_phrase", "high", self._banned,
+             lambda match: f"Response contains banned phrase: '{match.group()}'",
+             self.BANNED_PHRASE_REPLACEMENT),
+        ] + [
+            ("sensitive_information", "high", pattern,
+             lambda match, name=name: f"Response contains sensitive information pattern: {name}",
+             self.REDACTION)
+            for name, pattern in self._sensitive.items()
+        ] + [
+            ("prohibited_topic", "medium", self._topics,
+             lambda match: f"Response discusses prohibited topic: {self._topic_keywords[match.group().lower()]} (keyword: {match.group()})",
+             None),
+            ("service_boundary", "medium", self._services,
+             lambda match: f"Response offers disallowed service: {match.group()}",
+             None),
+        ]
+        self._rules = [rule for rule in self._rules if rule[2] is not None]
+        
+        literals = self.guardrails.banned_phrases + list(self._topic_keywords) + self.guardrails.service_boundaries["not_allowed"]
+        self.overlap = overlap if overlap is not None else max(len(literal) for literal in literals) + 32
+        
+        self._buffer = ""
+        self._seen = set()
+        self.violations: List[GuardrailViolation] = []
+        self.modified = False
+        self.cut = False
+        self.needs_review = False
+    
+    @staticmethod
+    def _literal_pattern(literals: Iterable[str], word_boundaries: bool = True) -> Optional["re.Pattern"]:
+        """Compile a case-insensitive alternation of literals, longest first."""
+        escaped = [re.escape(literal) for literal in sorted(set(literals), key=len, reverse=True) if literal]
+        if not escaped:
+            return None
+        pattern = "|".join(escaped)
+        if word_boundaries:
+            pattern = r"\b(?:" + pattern + r")\b"
+        return re.compile(pattern, re.IGNORECASE)
+    
+    def feed(self, chunk: str) -> str:
+        """
+        Check the next chunk of the stream.
+        
+        Args:
+            chunk: Text generated since the previous chunk
+            
+        Returns:
+            Text that is safe to release now; may be empty while text is held back
+        """
+        if self.cut:
+            return ""
+        self._buffer += chunk
+        return self._scan(final=False)
+    
+    def finish(self) -> str:
+        """
+        Check the end of the stream.
+        
+        Returns:
+            The held-back text that is safe to release
+        """
+        if self.cut:
+            return ""
+        return self._scan(final=True)
+    
+    def check(self, text: str) -> str:
+        """
+        Check a complete response.
+        
+        Args:
+            text: Response text
+            
+        Returns:
+            Response text with redactions applied, or cut
+        """
+        return self.feed(text) + self.finish()
+    
+    def _scan(self, final: bool) -> str:
+        """
+        Apply the rules to the window and release the text before the held-back tail.
+        
+        Args:
+            final: Whether the stream has ended, so nothing needs to be held back
+            
+        Returns:
+            Released text
+        """
+        text = self._buffer
+        
+        # Redacting and reviewed rules first, so a cut never releases unredacted text
+        for rule_name, severity, pattern, describe, replacement in self._rules:
+            if self.actions.get(rule_name, STREAM_ACTION_REVIEW) != STREAM_ACTION_CUT:
+                text = self._apply(text, final, rule_name, severity, pattern, describe, replacement)
+        
+        cut_at = None
+        for rule_name, severity, pattern, describe, _ in self._rules:
+            if self.actions.get(rule_name) != STREAM_ACTION_CUT:
+                continue
+            for match in pattern.finditer(text):
+                if not final and match.end() == len(text):
+                    break
+                if cut_at is None or match.start() < cut_at:
+                    cut_at = match.start()
+                    self._record(rule_name, severity, describe(match))
+                break
+        if cut_at is not None:
+            self.cut = True
+            self.modified = True
+            self._buffer = ""
+            prefix = text[:cut_at].rstrip()
+            return f"{prefix} {self.CUT_MESSAGE}" if prefix else self.CUT_MESSAGE
+        
+        release = len(text)
+        if not final:
+            # Matches touching the end of the window may still grow ("password is hun...")
+            release = max(0, len(text) - self.overlap)
+            for _, _, pattern, _, _ in self._rules:
+                for match in pattern.finditer(text):
+                    if match.end() == len(text):
+                        release = min(release, match.start())
+        
+        released, self._buffer = text[:release], text[release:]
+        return released
+    
+    def _record(self, rule_name: str, severity: str, description: str) -> None:
+        """Record a violation, once per description."""
+        # Matches that stay in the window are seen again on the next chunk
+        if description not in self._seen:
+            self._seen.add(description)
+            self.violations.append(GuardrailViolation(rule_name, severity, description))
+    
+    def _apply(
+        self,
+        text: str,
+        final: bool,
+        rule_name: str,
+        severity: str,
+        pattern: "re.Pattern",
+        describe: Any,
+        replacement: Optional[str] = None
+    ) -> str:
+        """
+        Record the violations of one rule in the window and redact or flag them.
+        
+        Args:
+            text: Window text
+            final: Whether the stream has ended
+            rule_name: Guardrail rule name
+            severity: Violation severity
+            pattern: Compiled rule pattern
+            describe: Function building the violation description from a match
+            replacement: Text replacing matches of redacting rules
+            
+        Returns:
+            Window text after redaction
+        """
+        action = self.actions.get(rule_name, STREAM_ACTION_REVIEW)
+        parts = []
+        position = 0
+        for match in pattern.finditer(text):
+            if not final and match.end() == len(text):
+                # Decide once the match is complete; the next chunk may extend it
+                break
+            
+            self._record(rule_name, severity, describe(match))
+            if action == STREAM_ACTION_REDACT:
+                parts.append(text[position:match.start()])
+                parts.append(replacement if replacement is not None else self.REDACTION)
+                position = match.end()
+                self.modified = True
+            else:
+                self.needs_review = True
+        
+        parts.append(text[position:])
+        return "".join(parts)
@@ -105,19 +105,25 @@ async def create_agent_from_model(agent_model: AgentDefinition) -> Optional[Lang
                 max_tokens = getattr(llm_config, 'max_tokens', 800)
                 timeout_seconds = getattr(llm_config, 'timeout_seconds', 30)
                 system_prompt = getattr(llm_config, 'system_prompt', '')
+                response_cache_ttl = getattr(llm_config, 'response_cache_ttl', None)
+                response_cache_semantic = getattr(llm_config, 'response_cache_semantic', True)
                 
                 agent_def["llm_config"] = {
                     "model_name": model_name,
                     "temperature": temperature,
                     "max_tokens": max_tokens,
                     "timeout_seconds": timeout_seconds,
-                    "system_prompt": system_prompt
+                    "system_prompt": system_prompt,
+                    "response_cache_ttl": response_cache_ttl,
+                    "response_cache_semantic": response_cache_semantic
                 }
                 
                 # Add individual fields for easier access
                 agent_def["model_name"] = model_name
                 agent_def["temperature"] = temperature
                 agent_def["system_prompt"] = system_prompt
+                agent_def["response_cache_ttl"] = response_cache_ttl
+                agent_def["response_cache_semantic"] = response_cache_semantic
         
         # Extract patterns safely
         patterns = getattr(agent_model, 'patterns', None)
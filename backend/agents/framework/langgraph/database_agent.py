@@ -8,15 +8,16 @@ import logging
 import time
 import json
 import asyncio
-from typing import Dict, Any, List, Optional, Union, Callable, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Union, Callable, Tuple
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 
 from backend.agents.framework.langgraph.langgraph_agent import LangGraphAgent
+from backend.config.config import Config
 from backend.database.agent_schema import AgentDefinition
+from backend.orchestration.response_cache import LLMResponseCache, ResponseCacheRequest, get_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +80,10 @@ class DatabaseAgent(LangGraphAgent):
         self.few_shot_examples = config.get("few_shot_examples", [])
         self.model_name = config.get("model_name", "gpt-4o")
         self.temperature = config.get("temperature", 0.2)
+        self.history_token_budget = config.get("history_token_budget", 2000)
+        # Response cache policy: None uses the default lifetime, 0 opts the agent out
+        self.response_cache_ttl = config.get("response_cache_ttl")
+        self.response_cache_semantic = config.get("response_cache_semantic", True)
         
         self.rules = config.get("rules", [])
         self.default_response = config.get("default_response", "I don't have a specific answer for that query.")
@@ -102,9 +107,11 @@ class DatabaseAgent(LangGraphAgent):
         if self.agent_type in ["LLM", "LLM-DRIVEN", "PACKAGE_TRACKING", "RESET_PASSWORD", 
                               "STORE_LOCATOR", "PRODUCT_INFO", "RETURNS_PROCESSING", 
                               "POLICY-ENFORCER", "SMALL_TALK", "BUILT_IN"]:
-            # Initialize LLM
+            # Initialize LLM from the shared client registry
             try:
-                self.llm = ChatOpenAI(
+                from backend.services.llm_service import get_chat_model
+                
+                self.llm = get_chat_model(
                     model=self.model_name,
                     temperature=self.temperature
                 )
@@ -166,6 +173,50 @@ class DatabaseAgent(LangGraphAgent):
                 "processing_time": processing_time
             }
     
+    async def stream_message(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Process a message and stream the response text as it is generated.
+        
+        LLM-based agents stream the model output token by token; rule and
+        retrieval agents produce their response in one piece.
+        
+        Args:
+            message: User input message
+            session_id: Session identifier (optional)
+            context: Additional context information
+            
+        Yields:
+            Chunks of the response text
+        """
+        if self.agent_type in ("RULE", "RETRIEVAL"):
+            async for chunk in super().stream_message(message, session_id, context):
+                yield chunk
+            return
+        
+        start_time = time.time()
+        self.request_count += 1
+        self.last_request_time = start_time
+        
+        streamed = False
+        try:
+            async for chunk in self._stream_with_llm(message, session_id, context or {}):
+                streamed = True
+                yield chunk
+            
+            self.success_count += 1
+            logger.info(f"Agent {self.name} streamed message in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            self.error_count += 1
+            logger.error(f"Error streaming message with agent {self.name}: {str(e)}", exc_info=True)
+            if streamed:
+                raise
+            yield f"I encountered an error while processing your request. {str(e)}"
+    
     async def _route_to_processing_method(
         self,
         message: str,
@@ -203,14 +254,14 @@ class DatabaseAgent(LangGraphAgent):
             logger.warning(f"Unknown agent type: {self.agent_type}, defaulting to LLM")
             return await self._process_with_llm(message, session_id, context)
     
-    async def _process_with_llm(
+    async def _prepare_llm_chain(
         self,
         message: str,
         session_id: Optional[str] = None,
         context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+    ) -> Tuple[Any, Dict[str, Any]]:
         """
-        Process a message using the LLM-based approach.
+        Build the LLM chain and its inputs for a message.
         
         Args:
             message: User message
@@ -218,7 +269,7 @@ class DatabaseAgent(LangGraphAgent):
             context: Additional context
             
         Returns:
-            Response dictionary
+            Tuple of (chain producing the response text, chain inputs)
         """
         context = context or {}
         if not self.llm:
@@ -228,8 +279,13 @@ class DatabaseAgent(LangGraphAgent):
             if not self.llm:
                 raise ValueError("LLM initialization failed")
         
-        # Get conversation history from context if available
-        conversation_history = context.get("conversation_history", [])
+        # Get conversation history from context, or the token-budgeted window from memory
+        conversation_history = context.get("conversation_history")
+        if conversation_history is None and session_id:
+            conversation_history = await self._load_conversation_window(session_id)
+        elif conversation_history:
+            from backend.memory.window import fit_messages_to_budget
+            conversation_history = fit_messages_to_budget(conversation_history, self.history_token_budget)
         
         # Convert conversation history to message format
         messages: List[BaseMessage] = []
@@ -257,11 +313,49 @@ class DatabaseAgent(LangGraphAgent):
         # Create LLM chain
         chain = prompt | self.llm | StrOutputParser()
         
-        # Invoke the chain
-        response_text = await chain.ainvoke({
+        return chain, {
             "history": messages,
             "input": message
-        })
+        }
+    
+    async def _process_with_llm(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Process a message using the LLM-based approach.
+        
+        Args:
+            message: User message
+            session_id: Session identifier (optional)
+            context: Additional context
+            
+        Returns:
+            Response dictionary
+        """
+        chain, inputs = await self._prepare_llm_chain(message, session_id, context)
+        
+        # Serve repeated turns from the response cache
+        cache, cache_request = self._response_cache_request(inputs)
+        if cache_request is not None:
+            cached = await cache.get(cache_request)
+            if cached is not None:
+                response_text, tier = cached
+                return {
+                    "success": True,
+                    "response": response_text,
+                    "message": response_text,
+                    "processed_with": "llm",
+                    "response_cache": tier
+                }
+        
+        # Invoke the chain
+        response_text = await chain.ainvoke(inputs)
+        
+        if cache_request is not None:
+            await cache.put(cache_request, response_text)
         
         return {
             "success": True,
@@ -270,6 +364,94 @@ class DatabaseAgent(LangGraphAgent):
             "processed_with": "llm"
         }
     
+    async def _stream_with_llm(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Process a message using the LLM-based approach, streaming the response.
+        
+        Args:
+            message: User message
+            session_id: Session identifier (optional)
+            context: Additional context
+            
+        Yields:
+            Chunks of the response text as the model generates them; a cached
+            response is yielded in one piece
+        """
+        chain, inputs = await self._prepare_llm_chain(message, session_id, context)
+        
+        cache, cache_request = self._response_cache_request(inputs)
+        if cache_request is not None:
+            cached = await cache.get(cache_request)
+            if cached is not None:
+                yield cached[0]
+                return
+        
+        chunks: List[str] = []
+        async for chunk in chain.astream(inputs):
+            if chunk:
+                chunks.append(chunk)
+                yield chunk
+        
+        # Only responses streamed to the end are cached
+        if cache_request is not None:
+            await cache.put(cache_request, "".join(chunks))
+    
+    def _response_cache_request(
+        self,
+        inputs: Dict[str, Any]
+    ) -> Tuple[Optional[LLMResponseCache], Optional[ResponseCacheRequest]]:
+        """
+        Get the response cache and the cache identity of a prepared turn.
+        
+        Args:
+            inputs: Chain inputs from _prepare_llm_chain
+            
+        Returns:
+            Tuple of (response cache, cache identity); the identity is None if
+            the cache is disabled or the turn must not be cached
+        """
+        cache = get_response_cache(Config)
+        if cache is None:
+            return None, None
+        
+        history = [{"role": entry.type, "content": entry.content} for entry in inputs["history"]]
+        return cache, cache.request(
+            self.id,
+            self.model_name,
+            self.temperature,
+            self.system_prompt,
+            history,
+            inputs["input"],
+            ttl=self.response_cache_ttl,
+            semantic=self.response_cache_semantic
+        )
+    
+    async def _load_conversation_window(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Load the conversation window for a session from memory.
+        
+        The window holds the conversation summary and the most recent turns
+        that fit this agent's history token budget.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            List of role/content messages in chronological order
+        """
+        try:
+            from backend.memory.factory import get_mem0
+            mem0 = await get_mem0()
+            return await mem0.get_conversation_window(session_id, token_budget=self.history_token_budget)
+        except Exception as e:
+            logger.warning(f"Could not load conversation window for session {session_id}: {str(e)}")
+            return []
+    
     async def _process_with_rules(
         self,
         message: str,
@@ -413,6 +595,10 @@ async def create_database_agent_from_definition(agent_def: Dict[str, Any]) -> Op
             config["model_name"] = agent_def["model_name"]
         if "temperature" in agent_def:
             config["temperature"] = agent_def["temperature"]
+        if "response_cache_ttl" in agent_def:
+            config["response_cache_ttl"] = agent_def["response_cache_ttl"]
+        if "response_cache_semantic" in agent_def:
+            config["response_cache_semantic"] = agent_def["response_cache_semantic"]
             
         # Add type-specific configuration
         agent_type = agent_def["agent_type"].upper()
@@ -484,6 +670,7 @@ async def create_database_agent_from_model(agent_model: AgentDefinition) -> Opti
                 {
                     "pattern_type": pattern.pattern_type,
                     "pattern_value": pattern.pattern_value,
+                    "priority": pattern.priority,
                     "confidence_boost": pattern.confidence_boost
                 }
                 for pattern in agent_model.patterns
@@ -7,7 +7,7 @@ orchestration system. It provides a common interface for different types of agen
 
 import logging
 import uuid
-from typing import Dict, Any, List, Optional, Union, Callable
+from typing import Dict, Any, AsyncIterator, List, Optional, Union, Callable
 from abc import ABC, abstractmethod
 from datetime import datetime
 
@@ -101,6 +101,33 @@ class LangGraphAgent(ABC):
         return result
         pass
     
+    async def stream_message(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Process a message and stream the response text.
+        
+        Agents that can generate their response incrementally override this
+        method. By default the response is produced by process_message and
+        streamed in one piece.
+        
+        Args:
+            message: User input message
+            session_id: Session identifier
+            context: Additional context information
+            
+        Yields:
+            Chunks of the response text
+        """
+        result = await self.process_message(message=message, session_id=session_id, context=context)
+        if isinstance(result, dict):
+            yield result.get("response") or result.get("message") or ""
+        else:
+            yield str(result)
+    
     def get_id(self) -> str:
         """
         Get the unique identifier for this agent.
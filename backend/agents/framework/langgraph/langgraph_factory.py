@@ -8,10 +8,12 @@ import logging
 import json
 import sys
 import os
-from typing import Dict, Any, List, Optional, Union, Tuple
+import weakref
+from typing import Callable, Dict, Any, List, Optional, Union, Tuple
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, inspect
 
 from backend.agents.framework.langgraph.langgraph_agent import LangGraphAgent
 from backend.agents.framework.langgraph.database_agent import DatabaseAgent
@@ -25,6 +27,72 @@ from backend.database.agent_schema import (
 
 logger = logging.getLogger(__name__)
 
+# Weak references to callbacks notified when any factory creates, updates, reloads or deletes an agent
+_agent_change_listeners: List[weakref.ref] = []
+
+
+def add_agent_change_listener(callback: Callable[[str, Optional[LangGraphAgent]], None]) -> None:
+    """
+    Register a callback for agent changes made through any factory.
+    
+    The callback receives the agent ID and the new agent instance, or None
+    if the agent was deleted or could not be reloaded. Only a weak reference
+    is kept, so listeners do not keep their owners alive.
+    
+    Args:
+        callback: Function or bound method
+    """
+    if hasattr(callback, "__self__"):
+        _agent_change_listeners.append(weakref.WeakMethod(callback))
+    else:
+        _agent_change_listeners.append(weakref.ref(callback))
+
+
+def _notify_agent_changed(agent_id: str, agent: Optional[LangGraphAgent]) -> None:
+    """
+    Notify the registered listeners of an agent change.
+    
+    Args:
+        agent_id: The agent ID
+        agent: New agent instance, or None if the agent is gone
+    """
+    for listener in list(_agent_change_listeners):
+        callback = listener()
+        if callback is None:
+            _agent_change_listeners.remove(listener)
+            continue
+        try:
+            callback(agent_id, agent)
+        except Exception as e:
+            logger.error(f"Error in agent change listener: {str(e)}", exc_info=True)
+
+
+def _pattern_to_dict(pattern: AgentPattern) -> Dict[str, Any]:
+    """
+    Convert an agent pattern to the dictionary form used in agent configs.
+    
+    The pattern's stored embedding is included when it was eagerly loaded,
+    so routing can build its vector index without recomputing it.
+    
+    Args:
+        pattern: AgentPattern database model
+        
+    Returns:
+        Pattern dictionary
+    """
+    pattern_dict = {
+        "pattern_type": pattern.pattern_type,
+        "pattern_value": pattern.pattern_value,
+        "priority": pattern.priority,
+        "confidence_boost": pattern.confidence_boost
+    }
+    if "embedding" not in inspect(pattern).unloaded and pattern.embedding is not None:
+        embedding = pattern.embedding
+        if embedding.embedding_vector is not None:
+            pattern_dict["embedding"] = np.asarray(embedding.embedding_vector, dtype=np.float32)
+            pattern_dict["embedding_model"] = embedding.embedding_model
+    return pattern_dict
+
 
 class LangGraphAgentFactory:
     """
@@ -99,23 +167,20 @@ class LangGraphAgentFactory:
                             "temperature": llm_config.temperature,
                             "max_tokens": llm_config.max_tokens,
                             "timeout_seconds": llm_config.timeout_seconds,
-                            "system_prompt": llm_config.system_prompt
+                            "system_prompt": llm_config.system_prompt,
+                            "response_cache_ttl": llm_config.response_cache_ttl,
+                            "response_cache_semantic": llm_config.response_cache_semantic
                         }
                         # Add individual fields for easier access
                         agent_dict["model_name"] = llm_config.model_name
                         agent_dict["temperature"] = llm_config.temperature
                         agent_dict["system_prompt"] = llm_config.system_prompt
+                        agent_dict["response_cache_ttl"] = llm_config.response_cache_ttl
+                        agent_dict["response_cache_semantic"] = llm_config.response_cache_semantic
                     
                     # Extract patterns
                     if hasattr(agent_def, 'patterns') and agent_def.patterns:
-                        agent_dict["patterns"] = [
-                            {
-                                "pattern_type": pattern.pattern_type,
-                                "pattern_value": pattern.pattern_value,
-                                "confidence_boost": pattern.confidence_boost
-                            }
-                            for pattern in agent_def.patterns
-                        ]
+                        agent_dict["patterns"] = [_pattern_to_dict(pattern) for pattern in agent_def.patterns]
                     
                     # Extract tools
                     if hasattr(agent_def, 'tools') and agent_def.tools:
@@ -203,23 +268,20 @@ class LangGraphAgentFactory:
                     "temperature": llm_config.temperature,
                     "max_tokens": llm_config.max_tokens,
                     "timeout_seconds": llm_config.timeout_seconds,
-                    "system_prompt": llm_config.system_prompt
+                    "system_prompt": llm_config.system_prompt,
+                    "response_cache_ttl": llm_config.response_cache_ttl,
+                    "response_cache_semantic": llm_config.response_cache_semantic
                 }
                 # Add individual fields for easier access
                 agent_dict["model_name"] = llm_config.model_name
                 agent_dict["temperature"] = llm_config.temperature
                 agent_dict["system_prompt"] = llm_config.system_prompt
+                agent_dict["response_cache_ttl"] = llm_config.response_cache_ttl
+                agent_dict["response_cache_semantic"] = llm_config.response_cache_semantic
             
             # Extract patterns
             if hasattr(agent_def, 'patterns') and agent_def.patterns:
-                agent_dict["patterns"] = [
-                    {
-                        "pattern_type": pattern.pattern_type,
-                        "pattern_value": pattern.pattern_value,
-                        "confidence_boost": pattern.confidence_boost
-                    }
-                    for pattern in agent_def.patterns
-                ]
+                agent_dict["patterns"] = [_pattern_to_dict(pattern) for pattern in agent_def.patterns]
             
             # Extract tools
             if hasattr(agent_def, 'tools') and agent_def.tools:
@@ -299,23 +361,20 @@ class LangGraphAgentFactory:
                     "temperature": llm_config.temperature,
                     "max_tokens": llm_config.max_tokens,
                     "timeout_seconds": llm_config.timeout_seconds,
-                    "system_prompt": llm_config.system_prompt
+                    "system_prompt": llm_config.system_prompt,
+                    "response_cache_ttl": llm_config.response_cache_ttl,
+                    "response_cache_semantic": llm_config.response_cache_semantic
                 }
                 # Add individual fields for easier access
                 agent_dict["model_name"] = llm_config.model_name
                 agent_dict["temperature"] = llm_config.temperature
                 agent_dict["system_prompt"] = llm_config.system_prompt
+                agent_dict["response_cache_ttl"] = llm_config.response_cache_ttl
+                agent_dict["response_cache_semantic"] = llm_config.response_cache_semantic
             
             # Extract patterns
             if hasattr(agent_def, 'patterns') and agent_def.patterns:
-                agent_dict["patterns"] = [
-                    {
-                        "pattern_type": pattern.pattern_type,
-                        "pattern_value": pattern.pattern_value,
-                        "confidence_boost": pattern.confidence_boost
-                    }
-                    for pattern in agent_def.patterns
-                ]
+                agent_dict["patterns"] = [_pattern_to_dict(pattern) for pattern in agent_def.patterns]
             
             # Extract tools
             if hasattr(agent_def, 'tools') and agent_def.tools:
@@ -380,7 +439,9 @@ class LangGraphAgentFactory:
             del self.agents[agent_id]
         
         # Load from database
-        return await self.get_agent_by_id(agent_id)
+        agent = await self.get_agent_by_id(agent_id)
+        _notify_agent_changed(agent_id, agent)
+        return agent
     
     async def create_agent(self, agent_data: Dict[str, Any]) -> Optional[LangGraphAgent]:
         """
@@ -427,6 +488,7 @@ class LangGraphAgentFactory:
                 # Add to registry
                 self.agents[agent.id] = agent
                 logger.info(f"Created new agent: {agent.name} (ID: {agent.id})")
+                _notify_agent_changed(agent.id, agent)
                 return agent
             else:
                 logger.error(f"Failed to create agent instance for {agent_data['name']}")
@@ -500,6 +562,7 @@ class LangGraphAgentFactory:
             if agent_id in self.agents:
                 del self.agents[agent_id]
                 logger.info(f"Removed agent {agent_id} from registry")
+            _notify_agent_changed(agent_id, None)
                 
             return True
                 
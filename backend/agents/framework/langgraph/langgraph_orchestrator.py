@@ -37,7 +37,9 @@ class LangGraphOrchestrator:
         self.agents = agents or []
         
         # Set default LLM if not provided
-        self.llm = llm or ChatOpenAI(
+        from backend.services.llm_service import get_chat_model
+        
+        self.llm = llm or get_chat_model(
             model="gpt-4o",
             temperature=0.2  # Lower temperature for more deterministic routing
         )
@@ -16,7 +16,6 @@ from sqlalchemy.orm import selectinload
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
 
 from backend.database.agent_schema import (
@@ -25,6 +24,15 @@ from backend.database.agent_schema import (
     AgentDefinition
 )
 from backend.agents.framework.langgraph.langgraph_agent import LangGraphAgent
+from backend.agents.framework.guardrails import (
+    LLM_REVIEW_ALWAYS,
+    LLM_REVIEW_NEVER,
+    StreamingGuardrails
+)
+from backend.config.config import GUARDRAILS_LLM_REVIEW, ROUTING_SHORTLIST_FALLBACK, ROUTING_SHORTLIST_SIZE
+from backend.orchestration.agent_index import AgentEmbeddingIndex
+from backend.orchestration.agent_shortlist import AgentShortlist
+from backend.utils.pattern_matcher import AhoCorasickMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +54,10 @@ class LangGraphSupervisorFactory:
             db_session: Database session for queries
         """
         self.db_session = db_session
+        
+        # Embedding service for router shortlists - created on first use
+        self.embedding_service = None
+        
         logger.info("Initialized LangGraphSupervisorFactory")
     
     async def list_active_supervisors(self) -> List[Dict[str, Any]]:
@@ -186,8 +198,10 @@ class LangGraphSupervisorFactory:
                 logger.error(f"Supervisor {supervisor_id} not found")
                 return None
             
-            # Create LLM for supervisor
-            llm = ChatOpenAI(
+            # Get the LLM for the supervisor from the shared client registry
+            from backend.services.llm_service import get_chat_model
+            
+            llm = get_chat_model(
                 model=supervisor["model_name"],
                 temperature=supervisor["temperature"]
             )
@@ -355,6 +369,8 @@ class LangGraphSupervisorFactory:
         """
         # Get router configuration
         pattern_first = node_config.get("pattern_first", True)
+        shortlist_size = node_config.get("shortlist_size", ROUTING_SHORTLIST_SIZE)
+        shortlist_fallback = node_config.get("shortlist_fallback", ROUTING_SHORTLIST_FALLBACK)
         routing_prompt = supervisor_config.get("routing_prompt")
         
         # Default routing prompt if not provided
@@ -380,6 +396,62 @@ class LangGraphSupervisorFactory:
             Response (in JSON format):
             """
         
+        # Pattern automaton of this router, rebuilt only when the agent pattern tables change
+        compiled_patterns = {"signature": None, "matcher": None}
+        
+        def get_pattern_matcher(agent_patterns: Dict[str, Any]) -> AhoCorasickMatcher:
+            """
+            Get the pattern automaton for the current agent pattern tables.
+            
+            Args:
+                agent_patterns: Agent ID to patterns
+                
+            Returns:
+                Compiled matcher
+            """
+            # Reloaded agents carry new pattern lists, so list identity detects changes cheaply
+            signature = tuple((agent_id, id(patterns), len(patterns or [])) for agent_id, patterns in agent_patterns.items())
+            if signature != compiled_patterns["signature"]:
+                compiled_patterns["matcher"] = AhoCorasickMatcher.from_agent_patterns(agent_patterns)
+                compiled_patterns["signature"] = signature
+                logger.info(f"Compiled {len(compiled_patterns['matcher'])} routing patterns for router {node_id}")
+            return compiled_patterns["matcher"]
+        
+        # Agent shortlist of this router, rebuilt only when the agents change
+        shortlists = {"signature": None, "shortlist": None}
+        
+        async def get_agent_shortlist(all_agents: Dict[str, Any]) -> Optional[AgentShortlist]:
+            """
+            Get the shortlist for the current agents.
+            
+            Args:
+                all_agents: Agent ID to agent
+                
+            Returns:
+                AgentShortlist, or None if the roster fits in the prompt or could not be indexed
+            """
+            if shortlist_size <= 0 or len(all_agents) <= shortlist_size:
+                return None
+            
+            signature = tuple((agent_id, id(agent)) for agent_id, agent in all_agents.items())
+            if signature != shortlists["signature"]:
+                shortlists["signature"] = signature
+                shortlists["shortlist"] = None
+                try:
+                    if self.embedding_service is None:
+                        from backend.orchestration.embedding_service import EmbeddingService
+                        self.embedding_service = EmbeddingService()
+                    
+                    routable_agents = [
+                        agent for agent in all_agents.values() if "guardrails" not in agent.name.lower()
+                    ]
+                    index = AgentEmbeddingIndex(self.embedding_service)
+                    if await index.build(routable_agents):
+                        shortlists["shortlist"] = AgentShortlist(index, size=shortlist_size, agents=routable_agents)
+                except Exception as e:
+                    logger.error(f"Error building agent shortlist for router {node_id}: {str(e)}", exc_info=True)
+            return shortlists["shortlist"]
+        
         async def router_handler(state: Dict[str, Any]) -> Dict[str, Any]:
             """
             Router node handler function.
@@ -404,28 +476,44 @@ class LangGraphSupervisorFactory:
             
             # 1. If pattern_first is True, try pattern matching first
             if pattern_first and "agent_patterns" in state:
-                agent_patterns = state.get("agent_patterns", {})
-                for agent_id, patterns in agent_patterns.items():
-                    if agent_id in all_agents:
-                        for pattern in patterns:
-                            if pattern.lower() in user_input.lower():
-                                # Pattern match found
-                                agent = all_agents[agent_id]
-                                state["selected_agent"] = agent
-                                state["current_agent_id"] = agent_id
-                                state["confidence"] = 1.0
-                                state["selection_method"] = "pattern"
-                                state["pattern_match"] = pattern
-                                state["routing_explanation"] = f"Pattern match found: '{pattern}'"
-                                
-                                logger.info(f"Pattern match routing to agent {agent.name} with pattern '{pattern}'")
-                                return state
+                matcher = get_pattern_matcher(state.get("agent_patterns", {}))
+                match = matcher.best_match(user_input, all_agents)
+                if match:
+                    # Pattern match found
+                    agent = all_agents[match.agent_id]
+                    state["selected_agent"] = agent
+                    state["current_agent_id"] = match.agent_id
+                    state["confidence"] = 1.0
+                    state["selection_method"] = "pattern"
+                    state["pattern_match"] = match.pattern
+                    state["routing_explanation"] = f"Pattern match found: '{match.pattern}'"
+                    
+                    logger.info(f"Pattern match routing to agent {agent.name} with pattern '{match.pattern}'")
+                    return state
             
             # 2. If no pattern match or pattern_first is False, use LLM
             try:
+                # Only the locally shortlisted agents are described to the LLM
+                candidate_agents = all_agents
+                agent_shortlist = await get_agent_shortlist(all_agents)
+                if agent_shortlist is not None:
+                    general_agent_id = next(
+                        (agent_id for agent_id, agent in all_agents.items() if "general conversation" in agent.name.lower()),
+                        None
+                    )
+                    shortlisted = await agent_shortlist.candidates(
+                        user_input,
+                        all_agents,
+                        pinned=[state.get("current_agent_id"), general_agent_id],
+                        fallback=shortlist_fallback
+                    )
+                    candidate_agents = {
+                        agent_id: agent for agent_id, agent in all_agents.items() if agent in shortlisted
+                    }
+                
                 # Format available agents for prompt
                 agent_descriptions = []
-                for agent_id, agent in all_agents.items():
+                for agent_id, agent in candidate_agents.items():
                     agent_descriptions.append(
                         f"- {agent.name} (ID: {agent_id}): {agent.description}"
                     )
@@ -639,6 +727,8 @@ class LangGraphSupervisorFactory:
             sorted_agents = sorted(agents, key=lambda a: a.get("execution_order", 0))
             guardrails_agent = sorted_agents[0]["agent"]
         
+        llm_review = node_config.get("llm_review", GUARDRAILS_LLM_REVIEW)
+        
         async def guardrails_handler(state: Dict[str, Any]) -> Dict[str, Any]:
             """
             Guardrails node handler function.
@@ -666,6 +756,23 @@ class LangGraphSupervisorFactory:
                 state["response"] = "I apologize, but I couldn't generate a proper response. Please try again."
                 return state
             
+            # Local rules first; the LLM pass below only runs when they are inconclusive
+            local_guardrails = StreamingGuardrails()
+            checked_response = local_guardrails.check(str(response))
+            if local_guardrails.modified:
+                logger.info("Local guardrails modified the response")
+                state["original_response"] = response
+                state["response"] = response = checked_response
+                state["guardrails_applied"] = True
+            if local_guardrails.violations:
+                state["policy_violations"] = [violation.to_dict() for violation in local_guardrails.violations]
+            
+            needs_review = llm_review == LLM_REVIEW_ALWAYS or (
+                llm_review != LLM_REVIEW_NEVER and local_guardrails.needs_review and not local_guardrails.cut
+            )
+            if not needs_review:
+                return state
+            
             # Use dedicated guardrails agent if available
             if guardrails_agent:
                 try:
@@ -7,7 +7,7 @@ with structured conversation handling using LangGraph StateGraph.
 import logging
 import time
 import json
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, AsyncIterator, Union
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.graph import StateGraph
@@ -115,7 +115,7 @@ class WorkflowDatabaseAgent(DatabaseAgent):
                 result = await execute_reset_password_workflow(
                     workflow=self.workflow,
                     message=message,
-                    conversation_id=conversation_id or "default",
+                    conversation_id=conversation_id or session_id or "default",
                     session_id=session_id or "default",
                     context=context
                 )
@@ -159,6 +159,34 @@ class WorkflowDatabaseAgent(DatabaseAgent):
                 "processing_time": time.time() - start_time,
                 "error": str(e)
             }
+    
+    async def stream_message(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Process a message and stream the response text.
+        
+        Workflow responses are produced in one piece; other messages are
+        streamed by the standard processing.
+        
+        Args:
+            message: User message
+            session_id: Session identifier
+            context: Optional context
+            
+        Yields:
+            Chunks of the response text
+        """
+        if "Reset Password Agent" in self.name and self.workflow:
+            result = await self.process_message(message, context=context, session_id=session_id)
+            yield result.get("response", "")
+            return
+        
+        async for chunk in super().stream_message(message, session_id, context):
+            yield chunk
 
 
 async def create_workflow_database_agent_from_definition(agent_def: Dict[str, Any]) -> Optional[WorkflowDatabaseAgent]:
@@ -190,6 +218,10 @@ async def create_workflow_database_agent_from_definition(agent_def: Dict[str, An
             config["model_name"] = agent_def["model_name"]
         if "temperature" in agent_def:
             config["temperature"] = agent_def["temperature"]
+        if "response_cache_ttl" in agent_def:
+            config["response_cache_ttl"] = agent_def["response_cache_ttl"]
+        if "response_cache_semantic" in agent_def:
+            config["response_cache_semantic"] = agent_def["response_cache_semantic"]
             
         # Add type-specific configuration
         agent_type = agent_def["agent_type"].upper()
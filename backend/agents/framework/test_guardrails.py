@@ -0,0 +1,132 @@
+"""
+Tests for the streaming guardrail checks.
+
+A response streamed in chunks of any size must be released exactly as
+check() releases the complete text, including when a redacted or cut
+match spans chunk boundaries.
+"""
+
+import random
+
+import pytest
+
+from backend.agents.framework.guardrails import (
+    STREAM_ACTION_CUT, StreamingGuardrails
+)
+
+CHUNK_SIZES = [1, 2, 3, 7, 16, 64, 1000]
+
+RESPONSES = [
+    "Your order ships tomorrow. Anything else?",
+    "The card on file is 4111 1111 1111 1111, and it expires soon.",
+    "Your SSN 123-45-6789 is not needed for returns.",
+    "Done! Your password is hunter2 so keep it safe.",
+    "As an AI I cannot access your account, but I'm just an AI helper.",
+    "I'm an AI language model. Card 4111-1111-1111-1111 ends the message: 4111111111111111",
+    "As an AI",
+]
+
+CUT_RESPONSES = [
+    "Happy to help with printers. The election results are in, vote early!",
+    "We carry toner. Politics aside, your password is secret1 and more.",
+    "Who will you vote for",
+]
+
+
+def stream(guardrails, text, chunk_size):
+    """Feed a text in chunks and return the released output."""
+    released = [guardrails.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    released.append(guardrails.finish())
+    return "".join(released)
+
+
+def descriptions(guardrails):
+    """Descriptions of the recorded violations, in order."""
+    return [violation.description for violation in guardrails.violations]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", RESPONSES)
+def test_streamed_redaction_matches_check(text, chunk_size):
+    expected = StreamingGuardrails()
+    expected_text = expected.check(text)
+    
+    streaming = StreamingGuardrails()
+    
+    assert stream(streaming, text, chunk_size) == expected_text
+    assert descriptions(streaming) == descriptions(expected)
+    assert (streaming.modified, streaming.cut) == (expected.modified, expected.cut)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", CUT_RESPONSES)
+def test_streamed_cut_matches_check(text, chunk_size):
+    actions = {"prohibited_topic": STREAM_ACTION_CUT}
+    expected = StreamingGuardrails(actions=actions)
+    expected_text = expected.check(text)
+    
+    streaming = StreamingGuardrails(actions=actions)
+    
+    assert stream(streaming, text, chunk_size) == expected_text
+    assert streaming.cut and expected.cut
+    # check() also sees text after the cut, which is never released
+    assert set(descriptions(streaming)) <= set(descriptions(expected))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_chunk_boundaries_match_check(seed):
+    rng = random.Random(seed)
+    text = " ".join(rng.sample(RESPONSES, 3))
+    guardrails = StreamingGuardrails()
+    
+    released = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 12)
+        released.append(guardrails.feed(text[position:position + size]))
+        position += size
+    released.append(guardrails.finish())
+    
+    assert "".join(released) == StreamingGuardrails().check(text)
+
+
+def test_redaction_replaces_sensitive_information():
+    guardrails = StreamingGuardrails()
+    
+    result = guardrails.check("Card 4111 1111 1111 1111 and password is hunter2.")
+    
+    assert "4111" not in result and "hunter2" not in result
+    assert result.count(StreamingGuardrails.REDACTION) == 2
+    assert guardrails.modified and not guardrails.cut
+
+
+def test_banned_phrase_is_replaced():
+    result = StreamingGuardrails().check("As an AI, I can look that up.")
+    
+    assert result == f"{StreamingGuardrails.BANNED_PHRASE_REPLACEMENT}, I can look that up."
+
+
+def test_cut_releases_text_before_the_match_only():
+    guardrails = StreamingGuardrails(actions={"prohibited_topic": STREAM_ACTION_CUT})
+    
+    released = stream(guardrails, "Toner is in aisle 4. Did you vote yet? More text follows.", 1)
+    
+    assert released == f"Toner is in aisle 4. Did you {StreamingGuardrails.CUT_MESSAGE}"
+    assert guardrails.feed("ignored after the cut") == ""
+
+
+def test_review_rules_flag_without_changing_the_text():
+    text = "Who will you vote for this year?"
+    guardrails = StreamingGuardrails()
+    
+    assert stream(guardrails, text, 4) == text
+    assert guardrails.needs_review and not guardrails.modified
+
+
+def test_match_split_across_chunks_is_held_back():
+    guardrails = StreamingGuardrails()
+    
+    released = guardrails.feed("Your card 4111 1111 ") + guardrails.feed("1111 1111 is on file")
+    
+    assert "4111" not in released
+    assert "4111" not in released + guardrails.finish()
@@ -13,16 +13,70 @@ from typing import Dict, List, Optional, Any, TypedDict, Literal, cast, Annotate
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import JsonOutputParser
-from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
 from pydantic import BaseModel, Field
 
 from backend.memory.mem0 import Mem0, MemoryEntry, MemoryType, MemoryScope
 from backend.memory.factory import get_mem0
+from backend.orchestration.state.turn_context import TURN_CONTEXT_KEY, TurnContext
 
 logger = logging.getLogger(__name__)
 
 
+async def get_conversation_history(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get the conversation history for a workflow node.
+    
+    Reads the turn context passed in the workflow context, and falls back
+    to memory when the workflow runs without one.
+    
+    Args:
+        state: Current workflow state
+        
+    Returns:
+        Role/content messages in chronological order
+    """
+    turn = (state.get("context") or {}).get(TURN_CONTEXT_KEY)
+    if turn is not None:
+        return turn.history
+    
+    session_id = state.get("session_id")
+    if not session_id:
+        return []
+    mem0 = await get_mem0()
+    return await mem0.get_conversation_history(session_id) if mem0 else []
+
+
+async def store_email_entity(state: Dict[str, Any], email: str, confidence: float, source: str) -> None:
+    """
+    Store an extracted email as an entity for future turns.
+    
+    The write is buffered on the turn context when there is one, and
+    written to memory directly otherwise.
+    
+    Args:
+        state: Current workflow state
+        email: Extracted email address
+        confidence: Confidence score for the extraction
+        source: How the email was extracted
+    """
+    turn = (state.get("context") or {}).get(TURN_CONTEXT_KEY)
+    if turn is not None:
+        turn.add_entity("email", email, confidence=confidence, metadata={"source": source})
+        return
+    
+    mem0 = await get_mem0()
+    if mem0:
+        await mem0.add_entity(
+            conversation_id=state["conversation_id"],
+            entity_type="email",
+            entity_value=email,
+            confidence=confidence,
+            metadata={"source": source},
+            session_id=state["session_id"]
+        )
+
+
 async def extract_email_with_llm(text: str) -> Optional[str]:
     """
     Extract an email address from text using LLM.
@@ -39,7 +93,9 @@ async def extract_email_with_llm(text: str) -> Optional[str]:
         
     try:
         # Initialize LLM with restrictive temperature
-        llm = ChatOpenAI(model="gpt-4o", temperature=0.1)
+        from backend.services.llm_service import get_chat_model
+        
+        llm = get_chat_model(model="gpt-4o", temperature=0.1)
         
         # Create the prompt instructing the LLM to extract email
         system_content = """
@@ -144,7 +200,9 @@ def create_reset_password_workflow(model_name: str = "gpt-4o", temperature: floa
         Compiled StateGraph for the workflow
     """
     # Initialize the LLM
-    llm = ChatOpenAI(
+    from backend.services.llm_service import get_chat_model
+    
+    llm = get_chat_model(
         model=model_name,
         temperature=temperature
     )
@@ -206,17 +264,11 @@ def create_reset_password_workflow(model_name: str = "gpt-4o", temperature: floa
         
         # Zero-shot intent classification with LLM
         intent = "unknown"
-        session_id = state.get("session_id")
         conversation_history = []
         
         # Attempt to retrieve conversation history for context-aware classification
         try:
-            if session_id:
-                mem0 = await get_mem0()
-                if mem0:
-                    history = await mem0.get_conversation_history(session_id)
-                    if history:
-                        conversation_history = history
+            conversation_history = await get_conversation_history(state)
         except Exception as e:
             logger.error(f"Error retrieving conversation history for intent classification: {str(e)}")
             # Continue even if we can't get history
@@ -251,8 +303,8 @@ def create_reset_password_workflow(model_name: str = "gpt-4o", temperature: floa
         human_content = f"Conversation Context:\n{conversation_context}\n\nCurrent Message: {user_input}\n\nWhat is the user's intent?"
         
         try:
-            # Create LLM
-            llm = ChatOpenAI(model="gpt-4o", temperature=0.1)
+            # Get the shared LLM
+            llm = get_chat_model(model="gpt-4o", temperature=0.1)
             
             # Create the prompt
             prompt = ChatPromptTemplate.from_messages([
@@ -333,35 +385,31 @@ def create_reset_password_workflow(model_name: str = "gpt-4o", temperature: floa
         if not user_input or '@' not in user_input:
             # Try to get conversation history to look for email in previous messages
             try:
-                session_id = state.get("session_id")
-                if session_id:
-                    mem0 = await get_mem0()
-                    if mem0:
-                        history = await mem0.get_conversation_history(session_id)
-                        
-                        # Construct full conversation context
-                        conversation_text = ""
-                        if history:
-                            for msg in history:
-                                role = msg.get("role", "")
-                                content = msg.get("content", "")
-                                if role and content:
-                                    conversation_text += f"{role.capitalize()}: {content}\n"
-                            
-                            # Only call LLM if there might be an email (@ symbol)
-                            if '@' in conversation_text:
-                                # Use LLM to extract email from conversation history
-                                try:
-                                    email = await extract_email_with_llm(conversation_text)
-                                    if email:
-                                        logger.info(f"Extracted email from conversation history with LLM: {email}")
-                                        return {
-                                            **state,
-                                            "user_email": email,
-                                            "current_step": "email_provided"
-                                        }
-                                except Exception as e:
-                                    logger.error(f"Error extracting email from conversation history with LLM: {str(e)}")
+                history = await get_conversation_history(state)
+                
+                # Construct full conversation context
+                conversation_text = ""
+                if history:
+                    for msg in history:
+                        role = msg.get("role", "")
+                        content = msg.get("content", "")
+                        if role and content:
+                            conversation_text += f"{role.capitalize()}: {content}\n"
+                    
+                    # Only call LLM if there might be an email (@ symbol)
+                    if '@' in conversation_text:
+                        # Use LLM to extract email from conversation history
+                        try:
+                            email = await extract_email_with_llm(conversation_text)
+                            if email:
+                                logger.info(f"Extracted email from conversation history with LLM: {email}")
+                                return {
+                                    **state,
+                                    "user_email": email,
+                                    "current_step": "email_provided"
+                                }
+                        except Exception as e:
+                            logger.error(f"Error extracting email from conversation history with LLM: {str(e)}")
             except Exception as e:
                 logger.error(f"Error retrieving conversation history for email extraction: {str(e)}")
         
@@ -380,18 +428,8 @@ def create_reset_password_workflow(model_name: str = "gpt-4o", temperature: floa
                 logger.info(f"Extracted email with LLM: {email}")
                 # Store the email as an entity in Mem0 for persistence across conversations
                 try:
-                    mem0 = await get_mem0()
-                    if mem0:
-                        # Store the email as an entity (non-async method)
-                        mem0.add_entity(
-                            conversation_id=state["conversation_id"],
-                            entity_type="email",
-                            entity_value=email,
-                            confidence=0.95,
-                            metadata={"source": "llm_extraction"},
-                            session_id=state["session_id"]
-                        )
-                        logger.info(f"Stored email entity in memory: {email}")
+                    await store_email_entity(state, email, confidence=0.95, source="llm_extraction")
+                    logger.info(f"Stored email entity in memory: {email}")
                 except Exception as e:
                     logger.error(f"Error storing email entity in memory: {str(e)}")
                     
@@ -618,6 +656,20 @@ async def execute_reset_password_workflow(
         {"role": "user", "content": message}
     ]
     
+    # Read the conversation once for the whole workflow. A turn context passed by the
+    # caller also records the turn's messages and is flushed by the caller.
+    context = dict(context or {})
+    turn = context.get(TURN_CONTEXT_KEY)
+    owns_turn = turn is None
+    if owns_turn:
+        try:
+            mem0 = await get_mem0()
+        except Exception as e:
+            logger.error(f"Error connecting to memory: {str(e)}")
+            mem0 = None
+        turn = await TurnContext.load(session_id, mem0, conversation_id=conversation_id)
+        context[TURN_CONTEXT_KEY] = turn
+    
     # Prepare the initial state
     # Try multiple methods to find email
     stored_email = email  # Start with any email passed in
@@ -640,76 +692,31 @@ async def execute_reset_password_workflow(
                 logger.info(f"Extracted email from current message: {stored_email}")
                 
                 # Immediately store this as an entity for future reference
-                try:
-                    mem0 = await get_mem0()
-                    if mem0:
-                        mem0.add_entity(
-                            conversation_id=conversation_id,
-                            entity_type="email",
-                            entity_value=stored_email,
-                            confidence=0.95,
-                            metadata={"source": "initial_extraction"},
-                            session_id=session_id
-                        )
-                        logger.info(f"Stored email entity from initial extraction: {stored_email}")
-                except Exception as e:
-                    logger.error(f"Error storing initial email entity: {str(e)}")
+                turn.add_entity("email", stored_email, confidence=0.95, metadata={"source": "initial_extraction"})
+                logger.info(f"Stored email entity from initial extraction: {stored_email}")
         except Exception as e:
             logger.error(f"Error extracting email from current message: {str(e)}")
     
-    # 3. Check memory for stored email entities
+    # 3. Check memory for stored email entities of this session
     if not stored_email:
-        try:
-            mem0 = await get_mem0()
-            if mem0:
-                # Query for entities associated with this conversation - use non-async method
-                entities = mem0.get_memories_by_conversation(
-                    conversation_id=conversation_id,
-                    memory_type="entity"  # Pass as string instead of enum to match API expectations
-                )
-                
-                # Filter entities by session ID manually since the method doesn't take a session_id parameter
-                # This is a workaround and could be improved later with a better memory API
-                entities = [e for e in entities if e.session_id == session_id]
-                
-                # Look for email entities
-                for entity in entities:
-                    metadata = entity.metadata or {}
-                    if metadata.get("entity_type") == "email":
-                        stored_email = entity.content
-                        logger.info(f"Retrieved stored email entity from memory: {stored_email}")
-                        break
-        except Exception as e:
-            logger.error(f"Error retrieving email entity from memory: {str(e)}")
+        stored_email = turn.entity("email", session_id=session_id)
+        if stored_email:
+            logger.info(f"Retrieved stored email entity from memory: {stored_email}")
     
     # 4. Try to find email in conversation history
-    if not stored_email:
+    if not stored_email and turn.history:
         try:
-            mem0 = await get_mem0()
-            if mem0:
-                history = await mem0.get_conversation_history(conversation_id)
-                if history:
-                    # Concatenate all messages to check for emails
-                    combined_text = " ".join([msg.get("content", "") for msg in history])
-                    if '@' in combined_text:
-                        extracted_email = await extract_email_with_llm(combined_text)
-                        if extracted_email:
-                            stored_email = extracted_email
-                            logger.info(f"Extracted email from conversation history: {stored_email}")
-                            
-                            # Store this as an entity for future reference
-                            try:
-                                mem0.add_entity(
-                                    conversation_id=conversation_id,
-                                    entity_type="email",
-                                    entity_value=stored_email,
-                                    confidence=0.9,
-                                    metadata={"source": "history_extraction"},
-                                    session_id=session_id
-                                )
-                                logger.info(f"Stored email entity from history: {stored_email}")
-                            except Exception as e:
-                                logger.error(f"Error storing history email entity: {str(e)}")
+            # Concatenate all messages to check for emails
+            combined_text = " ".join([msg.get("content", "") for msg in turn.history])
+            if '@' in combined_text:
+                extracted_email = await extract_email_with_llm(combined_text)
+                if extracted_email:
+                    stored_email = extracted_email
+                    logger.info(f"Extracted email from conversation history: {stored_email}")
+                    
+                    # Store this as an entity for future reference
+                    turn.add_entity("email", stored_email, confidence=0.9, metadata={"source": "history_extraction"})
+                    logger.info(f"Stored email entity from history: {stored_email}")
         except Exception as e:
             logger.error(f"Error extracting email from conversation history: {str(e)}")
     
@@ -723,22 +730,13 @@ async def execute_reset_password_workflow(
         "current_step": "start",
         "response": None,
         "messages": messages,
-        "context": context or {}
+        "context": context
     }
     
     try:
         # Add the current user message to memory
-        try:
-            mem0 = await get_mem0()
-            if mem0:
-                await mem0.add_message(
-                    conversation_id=conversation_id,
-                    role="user",
-                    content=message,
-                    session_id=session_id
-                )
-        except Exception as e:
-            logger.error(f"Error saving message to memory: {str(e)}")
+        if owns_turn:
+            turn.add_message("user", message)
         
         # Execute the workflow
         logger.info(f"Invoking workflow with state: {initial_state}")
@@ -746,18 +744,8 @@ async def execute_reset_password_workflow(
         logger.info(f"Workflow result: {result}")
         
         # Store the agent response in memory if available
-        if result.get("response"):
-            try:
-                mem0 = await get_mem0()
-                if mem0:
-                    await mem0.add_message(
-                        conversation_id=conversation_id,
-                        role="assistant",
-                        content=result["response"],
-                        session_id=session_id
-                    )
-            except Exception as e:
-                logger.error(f"Error saving response to memory: {str(e)}")
+        if owns_turn and result.get("response"):
+            turn.add_message("assistant", result["response"])
         
         return result
     except Exception as e:
@@ -767,4 +755,8 @@ async def execute_reset_password_workflow(
             "session_id": session_id,
             "response": "I'm having trouble processing your request. Please try again later.",
             "error": str(e)
-        }
\ No newline at end of file
+        }
+    finally:
+        # Write the turn's messages and entities in one round trip
+        if owns_turn:
+            await turn.flush()
\ No newline at end of file
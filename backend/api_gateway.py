@@ -366,4 +366,25 @@ async def startup_db_client():
         # Don't raise the exception to allow the application to start
         # even if database initialization fails
 
-# End of API Gateway module
\ No newline at end of file
+# End of API Gateway module
+
+@app.on_event("shutdown")
+async def shutdown_memory_connections():
+    """Flush memory archival and close pooled mem0 Redis connections on shutdown."""
+    try:
+        from backend.memory.factory import close_mem0_connections
+        await close_mem0_connections()
+        logger.info("Closed mem0 Redis connections")
+    except Exception as e:
+        logger.warning(f"Error closing mem0 Redis connections: {str(e)}")
+
+
+@app.on_event("shutdown")
+async def shutdown_llm_clients():
+    """Close the pooled LLM HTTP client on shutdown."""
+    try:
+        from backend.services.llm_service import close_llm_clients
+        await close_llm_clients()
+        logger.info("Closed pooled LLM HTTP client")
+    except Exception as e:
+        logger.warning(f"Error closing pooled LLM HTTP client: {str(e)}")
@@ -15,6 +15,12 @@ if not OPENAI_API_KEY:
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o")
 OPENAI_TEMPERATURE = float(os.environ.get("OPENAI_TEMPERATURE", "0.2"))
 OPENAI_MAX_TOKENS = int(os.environ.get("OPENAI_MAX_TOKENS", "1024"))
+# Shared LLM HTTP connection pool: open connections, idle keep-alive connections and their lifetime in seconds,
+# and the default request timeout in seconds
+LLM_HTTP_MAX_CONNECTIONS = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_HTTP_KEEPALIVE_EXPIRY", "30"))
+LLM_REQUEST_TIMEOUT = float(os.environ.get("LLM_REQUEST_TIMEOUT", "60"))
 
 # Databricks configuration
 DATABRICKS_HOST = os.environ.get("DATABRICKS_HOST")
@@ -44,6 +50,47 @@ API_PREFIX = f"/api/{API_VERSION}"
 SERVICE_TIMEOUT = int(os.environ.get("SERVICE_TIMEOUT", "30"))  # Default timeout for service operations
 SERVICE_MAX_RETRIES = int(os.environ.get("SERVICE_MAX_RETRIES", "3"))  # Default number of retries for operations
 
+# Routing configuration
+# "legacy" (default) runs the separate intent, continuity and selection chains one after another; "concurrent" starts
+# those chains together and keeps the highest-priority decision; "unified" (opt-in) makes one structured routing call
+# per turn
+ROUTING_MODE = os.environ.get("ROUTING_MODE", "legacy").lower()
+# Embedding pre-router: skip the LLM agent selection call for clear-cut matches
+ROUTING_PREROUTER_ENABLED = os.environ.get("ROUTING_PREROUTER_ENABLED", "True").lower() in ("true", "1", "t")
+ROUTING_PREROUTER_MIN_SIMILARITY = float(os.environ.get("ROUTING_PREROUTER_MIN_SIMILARITY", "0.85"))
+ROUTING_PREROUTER_MARGIN = float(os.environ.get("ROUTING_PREROUTER_MARGIN", "0.05"))
+# Routing decision cache: entries kept in process (0 disables), lifetime in seconds, optional shared Redis tier
+ROUTING_CACHE_SIZE = int(os.environ.get("ROUTING_CACHE_SIZE", "10000"))
+ROUTING_CACHE_TTL = int(os.environ.get("ROUTING_CACHE_TTL", "3600"))
+ROUTING_CACHE_REDIS_URL = os.environ.get("ROUTING_CACHE_REDIS_URL")
+# Agent shortlisting: only the top-k locally ranked agents are described to the routing LLM (0 disables);
+# the fallback applies when agents cannot be ranked: "all" describes the full roster, "pinned" only the pinned agents
+ROUTING_SHORTLIST_SIZE = int(os.environ.get("ROUTING_SHORTLIST_SIZE", "8"))
+ROUTING_SHORTLIST_FALLBACK = os.environ.get("ROUTING_SHORTLIST_FALLBACK", "all").lower()
+
+# Session state configuration
+# Conversation state carried between turns: sessions kept in process, lifetime in seconds after the last turn,
+# recent messages kept per session, and an optional shared Redis tier so any worker can serve a session
+SESSION_STATE_MAX_SESSIONS = int(os.environ.get("SESSION_STATE_MAX_SESSIONS", "10000"))
+SESSION_STATE_TTL = int(os.environ.get("SESSION_STATE_TTL", "86400"))
+SESSION_STATE_MAX_MESSAGES = int(os.environ.get("SESSION_STATE_MAX_MESSAGES", "20"))
+SESSION_STATE_REDIS_URL = os.environ.get("SESSION_STATE_REDIS_URL")
+
+# Guardrails configuration
+# Local rules check every response (incrementally when streamed); the LLM guardrail pass runs
+# "inconclusive" (only when local rules flag the response for review), "always" or "never"
+GUARDRAILS_LLM_REVIEW = os.environ.get("GUARDRAILS_LLM_REVIEW", "inconclusive").lower()
+
+# LLM response cache configuration
+# Opt-in: agent responses kept in process (0, the default, disables the cache) and their default lifetime in
+# seconds (agents override it with response_cache_ttl, 0 opts out); turns with more prior messages are not cached;
+# similarity threshold of the semantic tier (0 disables); optional shared Redis tier
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "0"))
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_HISTORY = int(os.environ.get("RESPONSE_CACHE_MAX_HISTORY", "4"))
+RESPONSE_CACHE_SEMANTIC_THRESHOLD = float(os.environ.get("RESPONSE_CACHE_SEMANTIC_THRESHOLD", "0"))
+RESPONSE_CACHE_REDIS_URL = os.environ.get("RESPONSE_CACHE_REDIS_URL")
+
 # Application version
 APP_VERSION = os.environ.get("APP_VERSION", "1.0.0")
 APP_NAME = "Staples Brain API"
@@ -93,6 +140,37 @@ class Config:
     OPENAI_MODEL = OPENAI_MODEL
     OPENAI_TEMPERATURE = OPENAI_TEMPERATURE
     OPENAI_MAX_TOKENS = OPENAI_MAX_TOKENS
+    LLM_HTTP_MAX_CONNECTIONS = LLM_HTTP_MAX_CONNECTIONS
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS
+    LLM_HTTP_KEEPALIVE_EXPIRY = LLM_HTTP_KEEPALIVE_EXPIRY
+    LLM_REQUEST_TIMEOUT = LLM_REQUEST_TIMEOUT
+    
+    # Routing configuration
+    ROUTING_MODE = ROUTING_MODE
+    ROUTING_PREROUTER_ENABLED = ROUTING_PREROUTER_ENABLED
+    ROUTING_PREROUTER_MIN_SIMILARITY = ROUTING_PREROUTER_MIN_SIMILARITY
+    ROUTING_PREROUTER_MARGIN = ROUTING_PREROUTER_MARGIN
+    ROUTING_CACHE_SIZE = ROUTING_CACHE_SIZE
+    ROUTING_CACHE_TTL = ROUTING_CACHE_TTL
+    ROUTING_CACHE_REDIS_URL = ROUTING_CACHE_REDIS_URL
+    ROUTING_SHORTLIST_SIZE = ROUTING_SHORTLIST_SIZE
+    ROUTING_SHORTLIST_FALLBACK = ROUTING_SHORTLIST_FALLBACK
+    
+    # Session state configuration
+    SESSION_STATE_MAX_SESSIONS = SESSION_STATE_MAX_SESSIONS
+    SESSION_STATE_TTL = SESSION_STATE_TTL
+    SESSION_STATE_MAX_MESSAGES = SESSION_STATE_MAX_MESSAGES
+    SESSION_STATE_REDIS_URL = SESSION_STATE_REDIS_URL
+    
+    # Guardrails configuration
+    GUARDRAILS_LLM_REVIEW = GUARDRAILS_LLM_REVIEW
+    
+    # LLM response cache configuration
+    RESPONSE_CACHE_SIZE = RESPONSE_CACHE_SIZE
+    RESPONSE_CACHE_TTL = RESPONSE_CACHE_TTL
+    RESPONSE_CACHE_MAX_HISTORY = RESPONSE_CACHE_MAX_HISTORY
+    RESPONSE_CACHE_SEMANTIC_THRESHOLD = RESPONSE_CACHE_SEMANTIC_THRESHOLD
+    RESPONSE_CACHE_REDIS_URL = RESPONSE_CACHE_REDIS_URL
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -265,6 +265,10 @@ class LlmAgentConfiguration(Base):
     system_prompt: Mapped[Optional[str]] = mapped_column(sa.Text, nullable=True)
     few_shot_examples: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
     output_parser: Mapped[Optional[str]] = mapped_column(sa.String(100), nullable=True)
+    # Response cache policy: lifetime in seconds (NULL uses RESPONSE_CACHE_TTL, 0 opts out)
+    # and whether similar messages may be served by the semantic tier
+    response_cache_ttl: Mapped[Optional[int]] = mapped_column(sa.Integer, nullable=True)
+    response_cache_semantic: Mapped[bool] = mapped_column(sa.Boolean, default=True, server_default=sa.true(), nullable=False)
     
     # Relationship - use backref to ensure the relationship isn't duplicated
     agent: Mapped["AgentDefinition"] = relationship(
@@ -0,0 +1,27 @@
+-- Add response cache policy fields to llm_agent_configurations table if they don't exist
+DO $$
+BEGIN
+    -- Add response_cache_ttl field (NULL uses RESPONSE_CACHE_TTL, 0 opts the agent out)
+    IF NOT EXISTS (
+        SELECT column_name 
+        FROM information_schema.columns 
+        WHERE table_name='llm_agent_configurations' AND column_name='response_cache_ttl'
+    ) THEN
+        ALTER TABLE llm_agent_configurations ADD COLUMN response_cache_ttl INTEGER;
+        RAISE NOTICE 'Added response_cache_ttl column to llm_agent_configurations table';
+    ELSE
+        RAISE NOTICE 'response_cache_ttl column already exists in llm_agent_configurations table';
+    END IF;
+
+    -- Add response_cache_semantic field
+    IF NOT EXISTS (
+        SELECT column_name 
+        FROM information_schema.columns 
+        WHERE table_name='llm_agent_configurations' AND column_name='response_cache_semantic'
+    ) THEN
+        ALTER TABLE llm_agent_configurations ADD COLUMN response_cache_semantic BOOLEAN NOT NULL DEFAULT TRUE;
+        RAISE NOTICE 'Added response_cache_semantic column to llm_agent_configurations table';
+    ELSE
+        RAISE NOTICE 'response_cache_semantic column already exists in llm_agent_configurations table';
+    END IF;
+END $$;
@@ -0,0 +1,24 @@
+-- Add an indexed pgvector column to memory_entry so archived memories can be searched without a full scan
+CREATE EXTENSION IF NOT EXISTS vector;
+
+DO $$
+BEGIN
+    -- Add embedding_vector field, backfilled from the float array embedding column
+    IF NOT EXISTS (
+        SELECT column_name 
+        FROM information_schema.columns 
+        WHERE table_name='memory_entry' AND column_name='embedding_vector'
+    ) THEN
+        ALTER TABLE memory_entry ADD COLUMN embedding_vector vector(1536);
+        UPDATE memory_entry
+        SET embedding_vector = embedding::vector(1536)
+        WHERE embedding IS NOT NULL AND array_length(embedding, 1) = 1536;
+        RAISE NOTICE 'Added embedding_vector column to memory_entry table';
+    ELSE
+        RAISE NOTICE 'embedding_vector column already exists in memory_entry table';
+    END IF;
+END $$;
+
+-- HNSW index for cosine distance, used by the archived memory similarity search
+CREATE INDEX IF NOT EXISTS ix_memory_entry_embedding_vector_hnsw
+    ON memory_entry USING hnsw (embedding_vector vector_cosine_ops);
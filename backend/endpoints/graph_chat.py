@@ -4,14 +4,17 @@ API routes for graph-based chat functionality.
 This module provides FastAPI routes for the LangGraph-based brain service
 with database-driven agent configurations.
 """
+import json
 import logging
-from typing import Dict, List, Optional, Any
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
 from backend.services.graph_brain_service import GraphBrainService
-from backend.services.graph_dependencies import get_graph_brain_service
+from backend.services.graph_dependencies import get_graph_brain_service, get_graph_brain_service_direct
 
 logger = logging.getLogger(__name__)
 
@@ -151,4 +154,90 @@ async def execute_agent(
         error=result.get("error")
     )
     
-    return response
\ No newline at end of file
+    return response
+
+
+async def _sse_events(request: GraphChatRequest, brain_service: GraphBrainService) -> AsyncIterator[str]:
+    """
+    Format the streamed events of a chat request as Server-Sent Events.
+    
+    Args:
+        request: Chat request
+        brain_service: Graph brain service
+        
+    Yields:
+        SSE frames
+    """
+    # Closing the stream on disconnect lets the brain service persist the interrupted turn right away
+    stream = brain_service.stream_message(
+        message=request.message,
+        session_id=request.session_id,
+        context=request.context
+    )
+    async with aclosing(stream):
+        async for event in stream:
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+@router.post("/chat/stream")
+async def graph_chat_stream(
+    request: GraphChatRequest,
+    brain_service: GraphBrainService = Depends(get_graph_brain_service)
+):
+    """
+    Process a chat message, streaming the response as Server-Sent Events.
+    
+    Emits a routing event with the selected agent, token events with the
+    response text as it is generated, and a final done event with the
+    complete response (or an error event).
+    
+    Args:
+        request: Chat request
+        brain_service: Graph brain service
+        
+    Returns:
+        Event stream response
+    """
+    logger.info(f"Graph chat stream request: {request.message} (session: {request.session_id})")
+    return StreamingResponse(
+        _sse_events(request, brain_service),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/chat/ws")
+async def graph_chat_websocket(websocket: WebSocket):
+    """
+    Chat over a WebSocket, streaming each response.
+    
+    Each client message is a JSON chat request (message, session_id,
+    context). The server answers with the same routing, token, done and
+    error events as the SSE endpoint, as JSON objects with "event" and
+    "data" keys.
+    
+    Args:
+        websocket: Client connection
+    """
+    await websocket.accept()
+    brain_service = await get_graph_brain_service_direct()
+    try:
+        while True:
+            try:
+                request = GraphChatRequest(**await websocket.receive_json())
+            except (ValidationError, TypeError, ValueError) as e:
+                await websocket.send_json({"event": "error", "data": {"success": False, "error": str(e)}})
+                continue
+            
+            logger.info(f"Graph chat websocket request: {request.message} (session: {request.session_id})")
+            # A failed send leaves the stream suspended; closing it persists the interrupted turn
+            stream = brain_service.stream_message(
+                message=request.message,
+                session_id=request.session_id,
+                context=request.context
+            )
+            async with aclosing(stream):
+                async for event in stream:
+                    await websocket.send_text(json.dumps(event, default=str))
+    except WebSocketDisconnect:
+        logger.info("Graph chat websocket disconnected")
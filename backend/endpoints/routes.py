@@ -156,6 +156,26 @@ async def health_check():
             detail=f"Error: {str(e)}"
         )
 
+@api_router.get("/metrics")
+async def get_metrics():
+    """
+    Runtime metrics endpoint.
+    
+    Returns:
+        Cache and background worker counters for this process
+    """
+    from backend.memory.factory import get_memory_stats
+    from backend.orchestration.response_cache import get_response_cache_stats
+    from backend.orchestration.routing_cache import get_routing_cache_stats
+    from backend.orchestration.state.session_state_store import get_session_state_stats
+    
+    return {
+        "memory": get_memory_stats(),
+        "routing_cache": get_routing_cache_stats(),
+        "response_cache": get_response_cache_stats(),
+        "session_state": get_session_state_stats()
+    }
+
 @api_router.post("/process", response_model=Union[SuccessResponse, ErrorResponse])
 async def process_request(data: ProcessRequest):
     """
@@ -90,6 +90,8 @@ class AgentLlmConfigModel(BaseModel):
     confidence_threshold: float = Field(0.7, description="Confidence threshold")
     few_shot_examples: Optional[List[Dict[str, Any]]] = Field(None, description="Few-shot examples")
     output_parser: Optional[str] = Field(None, description="Output parser configuration")
+    response_cache_ttl: Optional[int] = Field(None, description="Response cache lifetime in seconds (None uses the default, 0 disables)")
+    response_cache_semantic: bool = Field(True, description="Whether similar messages may be answered from the response cache")
 
 
 class AgentDetailModel(BaseModel):
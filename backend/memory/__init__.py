@@ -6,18 +6,36 @@ implementation for agent conversations and context management.
 """
 
 from backend.memory.mem0 import Mem0, MemoryEntry, MemoryType, MemoryScope
+from backend.memory.async_mem0 import AsyncMem0
+from backend.memory.connection import RedisConnectionManager
+from backend.memory.archiver import MemoryArchiver
+from backend.memory.eviction import EvictionProgress, MemorySweeper
+from backend.memory.session_cache import SessionCache
+from backend.memory.window import ConversationSummarizer, count_tokens, fit_messages_to_budget
+from backend.memory.vector_index import InMemoryVectorIndex, PgVectorMemoryIndex
 from backend.memory.schema import MemoryEntryModel, MemoryIndexModel, MemoryContextModel
 from backend.memory.config import MemoryConfig
-from backend.memory.factory import get_mem0, get_mem0_sync, reset_mem0
+from backend.memory.factory import get_mem0, get_mem0_sync, reset_mem0, close_mem0_connections, get_memory_stats
 from backend.memory.test_mem0 import run_mem0_test
 
 __all__ = [
     # Core classes
     'Mem0',
+    'AsyncMem0',
     'MemoryEntry',
     'MemoryType',
     'MemoryScope',
     'MemoryConfig',
+    'RedisConnectionManager',
+    'MemoryArchiver',
+    'MemorySweeper',
+    'EvictionProgress',
+    'ConversationSummarizer',
+    'SessionCache',
+    'count_tokens',
+    'fit_messages_to_budget',
+    'InMemoryVectorIndex',
+    'PgVectorMemoryIndex',
     
     # Database models
     'MemoryEntryModel',
@@ -28,6 +46,8 @@ __all__ = [
     'get_mem0',
     'get_mem0_sync',
     'reset_mem0',
+    'close_mem0_connections',
+    'get_memory_stats',
     
     # Testing
     'run_mem0_test',
@@ -0,0 +1,359 @@
+"""
+Write-behind archival of long-term memories to PostgreSQL.
+
+Long-term memories are written to Redis on the request path and queued
+here for archival. A background task drains the queue and inserts
+memory entries, indexes and contexts in batches, so the chat path never
+waits on a PostgreSQL round trip unless the queue is full.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.memory.schema import (
+    EMBEDDING_VECTOR_DIMENSIONS, MemoryEntryModel, MemoryIndexModel, MemoryContextModel
+)
+
+logger = logging.getLogger(__name__)
+
+
+def memory_to_rows(memory: Any) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Convert a memory entry into database rows.
+    
+    Args:
+        memory: MemoryEntry to convert
+    
+    Returns:
+        Tuple of (entry row, index rows, context rows)
+    """
+    try:
+        entry_id = uuid.UUID(str(memory.entry_id))
+    except ValueError:
+        # Custom entry IDs are mapped to a stable UUID
+        entry_id = uuid.uuid5(uuid.NAMESPACE_URL, f"mem0:{memory.entry_id}")
+    
+    embedding = memory.embedding
+    
+    entry_row = {
+        "id": entry_id,
+        "session_id": memory.session_id or memory.conversation_id or "global",
+        "conversation_id": memory.conversation_id or memory.session_id or "global",
+        "agent_id": memory.agent_id,
+        "memory_type": memory.memory_type,
+        "role": memory.role,
+        "content": memory.content,
+        "importance": memory.importance,
+        "relevance": 1.0,  # Default
+        "recency": 1.0,    # Default
+        "embedding": embedding,
+        # Only embeddings of the indexed dimension can be stored in the vector column
+        "embedding_vector": embedding if embedding and len(embedding) == EMBEDDING_VECTOR_DIMENSIONS else None,
+        "meta_data": memory.metadata,  # Use meta_data instead of metadata
+        "created_at": memory.created_at,
+        "expires_at": memory.expires_at,
+    }
+    
+    index_rows = [
+        {
+            "id": uuid.uuid4(),
+            "entry_id": entry_id,
+            "index_type": idx['index_type'],
+            "key": idx['key'],
+            "value": idx['value'],
+        }
+        for idx in memory.indexes
+    ]
+    
+    context_rows = [
+        {
+            "id": uuid.uuid4(),
+            "entry_id": entry_id,
+            "context_type": ctx['context_type'],
+            "data": ctx['data'],
+        }
+        for ctx in memory.contexts
+    ]
+    
+    return entry_row, index_rows, context_rows
+
+
+class MemoryArchiver:
+    """
+    Bounded write-behind queue that archives memories to PostgreSQL in batches.
+    
+    The queue size bounds memory use. When it is full, submit() waits for
+    the writer to catch up (backpressure) and submit_nowait() rejects the
+    memory. A batch that fails to write is retried with exponential backoff
+    before it is counted as failed. stop() flushes everything still queued.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        chunk_size: int = 100,
+        max_queue_size: int = 10000,
+        flush_interval: float = 1.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        """
+        Initialize the archiver.
+        
+        Args:
+            session_factory: Callable returning a new AsyncSession
+            chunk_size: Maximum number of memories written per batch
+            max_queue_size: Maximum number of memories waiting to be archived
+            flush_interval: Seconds to wait for a batch to fill before writing it
+            max_retries: Times a failed batch is retried before it is dropped
+            retry_backoff: Seconds to wait before the first retry, doubled on each retry
+        """
+        self.session_factory = session_factory
+        self.chunk_size = max(1, chunk_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Any] = []
+        self._writing: Optional[asyncio.Future] = None
+        self._stopping = False
+        
+        # Counters for monitoring
+        self.archived_count = 0
+        self.failed_count = 0
+        self.retried_count = 0
+        self.rejected_count = 0
+    
+    def start(self) -> None:
+        """Start the background writer task if it is not running."""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Started memory archiver (chunk_size={self.chunk_size}, max_queue_size={self.queue.maxsize})")
+    
+    async def submit(self, memory: Any) -> None:
+        """
+        Queue a memory for archival, waiting if the queue is full.
+        
+        Args:
+            memory: MemoryEntry to archive
+        """
+        self.start()
+        await self.queue.put(memory)
+    
+    def submit_nowait(self, memory: Any) -> bool:
+        """
+        Queue a memory for archival without waiting.
+        
+        Safe to call from any thread: off the writer's event loop thread the
+        memory is handed to that loop instead of touching the queue directly.
+        
+        Args:
+            memory: MemoryEntry to archive
+        
+        Returns:
+            True if queued (or handed to the writer's loop), False if the queue is full
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        if self._loop is not None and self._loop is not running_loop and self._loop.is_running():
+            # asyncio.Queue is not thread-safe; a full queue is counted as rejected on the loop
+            self._loop.call_soon_threadsafe(self._enqueue, memory)
+            return True
+        
+        if running_loop is not None:
+            self.start()
+        # Without any event loop the writer starts on the next async submit
+        return self._enqueue(memory)
+    
+    def _enqueue(self, memory: Any) -> bool:
+        """
+        Put a memory on the queue, rejecting it if the queue is full.
+        
+        Args:
+            memory: MemoryEntry to archive
+        
+        Returns:
+            True if queued, False if the queue is full
+        """
+        try:
+            self.queue.put_nowait(memory)
+            return True
+        except asyncio.QueueFull:
+            self.rejected_count += 1
+            logger.warning(f"Memory archive queue full, not archiving {memory.entry_id}")
+            return False
+    
+    async def flush(self) -> None:
+        """Write everything currently queued."""
+        while not self.queue.empty():
+            batch = self._drain(self.chunk_size)
+            await self.write_batch(batch)
+    
+    async def stop(self) -> None:
+        """Stop the writer task and flush remaining memories."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._writing is not None:
+            await self._writing
+            self._writing = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self.write_batch(batch)
+        await self.flush()
+        logger.info(f"Stopped memory archiver ({self.archived_count} archived, {self.failed_count} failed)")
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get archiver counters.
+        
+        Returns:
+            Dictionary with queue depth and archive counts
+        """
+        return {
+            "queued": self.queue.qsize(),
+            "archived": self.archived_count,
+            "failed": self.failed_count,
+            "retried": self.retried_count,
+            "rejected": self.rejected_count,
+        }
+    
+    def _drain(self, limit: int) -> List[Any]:
+        """
+        Take up to limit memories from the queue without waiting.
+        
+        Args:
+            limit: Maximum number of memories to take
+        
+        Returns:
+            List of memories
+        """
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+    
+    async def _run(self) -> None:
+        """Background loop: collect batches and write them."""
+        while not self._stopping:
+            # Memories taken off the queue are tracked so stop() can still write them
+            self._pending = [await self.queue.get()]
+            
+            # Give the batch a short window to fill up
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.flush_interval
+            while len(self._pending) < self.chunk_size:
+                self._pending.extend(self._drain(self.chunk_size - len(self._pending)))
+                if len(self._pending) >= self.chunk_size:
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._pending.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            batch, self._pending = self._pending, []
+            # Shield the write so stopping the task never abandons a batch mid-insert
+            self._writing = asyncio.ensure_future(self.write_batch(batch))
+            await asyncio.shield(self._writing)
+            self._writing = None
+    
+    async def write_batch(self, memories: List[Any]) -> bool:
+        """
+        Insert a batch of memories with their indexes and contexts in one transaction.
+        
+        Memories that are already archived are skipped together with their
+        indexes and contexts, so re-archiving never duplicates child rows.
+        A failed transaction is retried with exponential backoff.
+        
+        Args:
+            memories: MemoryEntry objects to archive
+        
+        Returns:
+            True if the batch was written, False if every attempt failed
+        """
+        if not memories:
+            return True
+        
+        entry_rows, index_rows, context_rows = [], [], []
+        for memory in memories:
+            entry_row, memory_index_rows, memory_context_rows = memory_to_rows(memory)
+            entry_rows.append(entry_row)
+            index_rows.extend(memory_index_rows)
+            context_rows.extend(memory_context_rows)
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._insert_rows(entry_rows, index_rows, context_rows)
+                self.archived_count += len(memories)
+                logger.debug(f"Archived {len(memories)} memories to database")
+                return True
+            
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.failed_count += len(memories)
+                    logger.error(f"Error archiving {len(memories)} memories to database: {str(e)}")
+                    return False
+                
+                delay = self.retry_backoff * (2 ** attempt)
+                self.retried_count += 1
+                logger.warning(f"Error archiving {len(memories)} memories, retrying in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+        
+        return False
+    
+    async def _insert_rows(
+        self,
+        entry_rows: List[Dict[str, Any]],
+        index_rows: List[Dict[str, Any]],
+        context_rows: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Insert new entries and the child rows of those entries in one transaction.
+        
+        Args:
+            entry_rows: Memory entry rows
+            index_rows: Memory index rows
+            context_rows: Memory context rows
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                # Re-archiving an entry is a no-op rather than a batch failure
+                result = await session.execute(
+                    pg_insert(MemoryEntryModel)
+                    .values(entry_rows)
+                    .on_conflict_do_nothing(index_elements=["id"])
+                    .returning(MemoryEntryModel.id)
+                )
+                inserted = set(result.scalars().all())
+                
+                # Entries that already existed keep the indexes and contexts they were archived with
+                index_rows = [row for row in index_rows if row["entry_id"] in inserted]
+                context_rows = [row for row in context_rows if row["entry_id"] in inserted]
+                if index_rows:
+                    await session.execute(insert(MemoryIndexModel), index_rows)
+                if context_rows:
+                    await session.execute(insert(MemoryContextModel), context_rows)
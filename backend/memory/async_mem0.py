@@ -0,0 +1,1120 @@
+"""
+Asyncio implementation of the mem0 memory system.
+
+AsyncMem0 exposes the same operations as Mem0 as coroutines backed by
+redis.asyncio, so memory access from FastAPI handlers and LangGraph nodes
+does not block the event loop. Key layout, serialization and filtering
+are shared with the synchronous implementation.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Set, Tuple, Union
+
+import redis
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.memory.mem0 import (
+    Mem0, MemoryEntry, MemoryType, MemoryScope, SEARCHABLE_MEMORY_TYPES, SEARCH_FETCH_BATCH, _GET_BY_ID_SCRIPT, _RAW
+)
+from backend.memory.query import QueryPlan, plan_query
+from backend.memory.codec import encode_memory, resolve_codec
+from backend.memory.eviction import EvictionProgress, ProgressCallback, batched, report_progress
+from backend.memory.config import MemoryConfig
+from backend.memory.connection import RedisConnectionManager
+from backend.memory.archiver import MemoryArchiver
+from backend.memory.vector_index import InMemoryVectorIndex, PgVectorMemoryIndex
+from backend.memory.session_cache import SessionCache, ALL_CONVERSATIONS
+from backend.memory.window import ConversationSummarizer, message_tokens, summary_message
+
+logger = logging.getLogger(__name__)
+
+# Most recent memories loaded from Redis when a conversation is not yet in the vector index
+VECTOR_HYDRATE_LIMIT = 500
+
+# Messages fetched per round trip while filling a conversation window
+WINDOW_PAGE_SIZE = 20
+
+# Minimum number of memories loaded when a conversation enters the session cache
+SESSION_CACHE_WARM_SIZE = 50
+
+
+class AsyncMem0(Mem0):
+    """
+    mem0 memory system using a pooled asyncio Redis client.
+    
+    All Redis-backed methods of Mem0 are coroutines here and must be awaited.
+    """
+    
+    def __init__(
+        self,
+        memory_config: Optional[MemoryConfig] = None,
+        db_session: Optional[AsyncSession] = None,
+        connection_manager: Optional[RedisConnectionManager] = None,
+        archiver: Optional[MemoryArchiver] = None,
+        embedding_service: Optional[Any] = None,
+        vector_index: Optional[InMemoryVectorIndex] = None,
+        archive_index: Optional[PgVectorMemoryIndex] = None,
+        summarizer: Optional[ConversationSummarizer] = None,
+        session_cache: Optional[SessionCache] = None
+    ):
+        """
+        Initialize the async mem0 memory system.
+        
+        Args:
+            memory_config: Memory configuration
+            db_session: Database session for long-term storage
+            connection_manager: Shared Redis connection manager (created if not provided)
+            archiver: Write-behind archiver for long-term memories
+            embedding_service: Embedding service used for semantic search
+            vector_index: In-process vector index over memories in Redis
+            archive_index: pgvector index over archived memories
+            summarizer: Background summarizer for turns outside the conversation window
+            session_cache: Process-local cache of hot conversations
+        """
+        self.config = memory_config or MemoryConfig()
+        self.db_session = db_session
+        self.archiver = archiver
+        self.codec = resolve_codec(self.config.memory_codec)
+        
+        # Semantic search (only active when USE_VECTOR_SEARCH is enabled)
+        self.embedding_service = embedding_service
+        self.vector_index = vector_index
+        self.archive_index = archive_index
+        self._embedding_tasks: Set[asyncio.Task] = set()
+        self.summarizer = summarizer
+        self.session_cache = session_cache
+        self.connection_manager = connection_manager or RedisConnectionManager(self.config)
+        self.redis = self.connection_manager.get_client()
+        
+        # Server-side lookup script; disabled automatically on backends without scripting
+        self._get_by_id_script = None
+        try:
+            self._get_by_id_script = self.redis.register_script(_GET_BY_ID_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Redis scripting unavailable, using two-step ID lookup: {str(e)}")
+        
+        # Memory expiration defaults (in seconds)
+        self.default_expiration = {
+            MemoryScope.WORKING: 300,       # 5 minutes
+            MemoryScope.SHORT_TERM: 3600,   # 1 hour
+            MemoryScope.LONG_TERM: None     # Never expires
+        }
+        
+        logger.info(f"Initialized async mem0 memory system with Redis backend: {self.config.redis_url}")
+    
+    async def ping(self) -> bool:
+        """
+        Check the Redis connection.
+        
+        Returns:
+            True if Redis responded, False otherwise
+        """
+        try:
+            await self.redis.ping()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis: {str(e)}")
+            return False
+    
+    async def add_memory(
+        self,
+        memory: MemoryEntry,
+        scope: Union[MemoryScope, str] = MemoryScope.SHORT_TERM,
+        ttl: Optional[int] = None
+    ) -> str:
+        """
+        Add a memory entry to the system.
+        
+        Args:
+            memory: The memory entry to add
+            scope: Memory scope (working, short_term, long_term)
+            ttl: Time-to-live in seconds (overrides default for scope)
+        
+        Returns:
+            Memory entry ID
+        """
+        scope_str = scope.value if isinstance(scope, MemoryScope) else scope
+        ttl = self._resolve_ttl(scope_str, ttl)
+        
+        pipeline = self.redis.pipeline()
+        self._queue_memory_writes(pipeline, memory, scope_str, ttl)
+        if self.session_cache is not None and memory.conversation_id:
+            self.session_cache.queue_invalidation(pipeline, memory.conversation_id)
+        await pipeline.execute()
+        
+        await self._after_memory_written(memory, scope_str)
+        return memory.entry_id
+    
+    async def add_memories(
+        self,
+        memories: List[MemoryEntry],
+        scope: Union[MemoryScope, str] = MemoryScope.SHORT_TERM,
+        ttl: Optional[int] = None
+    ) -> List[str]:
+        """
+        Add several memory entries in a single Redis round trip.
+        
+        Args:
+            memories: The memory entries to add, in chronological order
+            scope: Memory scope (working, short_term, long_term)
+            ttl: Time-to-live in seconds (overrides default for scope)
+        
+        Returns:
+            Memory entry IDs
+        """
+        if not memories:
+            return []
+        
+        scope_str = scope.value if isinstance(scope, MemoryScope) else scope
+        ttl = self._resolve_ttl(scope_str, ttl)
+        
+        pipeline = self.redis.pipeline()
+        for memory in memories:
+            self._queue_memory_writes(pipeline, memory, scope_str, ttl)
+        if self.session_cache is not None:
+            for conversation_id in dict.fromkeys(memory.conversation_id for memory in memories):
+                if conversation_id:
+                    self.session_cache.queue_invalidation(pipeline, conversation_id)
+        await pipeline.execute()
+        
+        for memory in memories:
+            await self._after_memory_written(memory, scope_str)
+        return [memory.entry_id for memory in memories]
+    
+    async def _after_memory_written(self, memory: MemoryEntry, scope_str: str) -> None:
+        """
+        Update the session cache and schedule embedding and archiving of a stored memory.
+        
+        Args:
+            memory: The memory entry written to Redis
+            scope_str: Memory scope it was written to
+        """
+        if self.session_cache is not None and memory.conversation_id:
+            self.session_cache.add(memory)
+        
+        archive = scope_str == MemoryScope.LONG_TERM.value and self.archiver is not None
+        
+        if self._needs_embedding(memory):
+            # Embed in the background; the memory is archived once it has its embedding
+            task = asyncio.create_task(self._embed_memory(memory, scope_str, archive))
+            self._embedding_tasks.add(task)
+            task.add_done_callback(self._embedding_tasks.discard)
+        else:
+            if memory.embedding and self.vector_index is not None:
+                self.vector_index.add(memory.entry_id, memory.embedding, memory.conversation_id)
+            
+            # Archive long-term memory in the background; waits only if the archive queue is full
+            if archive:
+                await self.archiver.submit(memory)
+                logger.debug(f"Scheduled {memory.entry_id} for database storage")
+        
+        logger.debug(f"Added memory {memory.entry_id} to {scope_str} memory")
+    
+    def _needs_embedding(self, memory: MemoryEntry) -> bool:
+        """
+        Check whether a new memory should be embedded for semantic search.
+        
+        Args:
+            memory: The memory entry
+        
+        Returns:
+            True if vector search is enabled and the memory should be embedded
+        """
+        return (
+            self.config.use_vector_search
+            and self.embedding_service is not None
+            and not memory.embedding
+            and memory.memory_type in SEARCHABLE_MEMORY_TYPES
+            and bool(memory.content)
+        )
+    
+    async def _embed_memory(self, memory: MemoryEntry, scope_str: str, archive: bool) -> None:
+        """
+        Compute a memory's embedding, store it and add it to the vector index.
+        
+        Args:
+            memory: The memory entry
+            scope_str: Memory scope value
+            archive: Whether to archive the memory afterwards
+        """
+        try:
+            # Fallback vectors are in another space, so only the configured provider's are stored
+            embedding = await self.embedding_service.get_embedding(memory.content, primary_only=True)
+            if embedding is None:
+                logger.debug(f"Storing memory {memory.entry_id} without embedding: provider unavailable")
+            else:
+                memory.embedding = embedding
+                
+                # Rewrite the stored document with its embedding, keeping its TTL
+                primary_key = self._get_key(memory.memory_type, scope_str, memory.entry_id)
+                await self.redis.set(primary_key, encode_memory(memory, self.codec), xx=True, keepttl=True)
+                
+                if self.vector_index is not None:
+                    self.vector_index.add(memory.entry_id, memory.embedding, memory.conversation_id)
+        except Exception as e:
+            logger.error(f"Error embedding memory {memory.entry_id}: {str(e)}")
+        
+        if archive:
+            await self.archiver.submit(memory)
+            logger.debug(f"Scheduled {memory.entry_id} for database storage")
+    
+    async def semantic_search(
+        self,
+        query: str,
+        conversation_id: Optional[str] = None,
+        k: int = 5,
+        include_archived: bool = True
+    ) -> List[Tuple[MemoryEntry, float]]:
+        """
+        Find the memories most similar in meaning to a query.
+        
+        Memories in Redis are searched through the in-process vector index;
+        archived memories are searched with pgvector when fewer than k
+        results are found. Requires USE_VECTOR_SEARCH.
+        
+        Args:
+            query: Query text
+            conversation_id: Optional conversation to restrict the search to
+            k: Maximum number of results
+            include_archived: Whether to also search archived memories
+        
+        Returns:
+            List of (memory, cosine similarity) tuples, most similar first
+        """
+        if not self.config.use_vector_search or self.embedding_service is None:
+            logger.warning("Semantic search requested but vector search is not enabled")
+            return []
+        
+        try:
+            query_embedding = await self.embedding_service.get_embedding(query, primary_only=True)
+        except Exception as e:
+            logger.error(f"Error embedding search query: {str(e)}")
+            return []
+        if query_embedding is None:
+            logger.warning("Semantic search skipped: embedding provider unavailable")
+            return []
+        
+        results: List[Tuple[MemoryEntry, float]] = []
+        
+        if self.vector_index is not None:
+            if conversation_id:
+                await self._hydrate_vector_index(conversation_id)
+            
+            matches = self.vector_index.search(query_embedding, k, conversation_id)
+            if matches:
+                scores = dict(matches)
+                memories = await self.get_memories_by_ids([entry_id for entry_id, _ in matches])
+                results = [(memory, scores[memory.entry_id]) for memory in memories]
+        
+        if include_archived and self.archive_index is not None and len(results) < k:
+            seen = {memory.entry_id for memory, _ in results}
+            for model, score in await self.archive_index.search(query_embedding, k, conversation_id):
+                memory = MemoryEntry.from_database_model(model)
+                if memory.entry_id not in seen:
+                    results.append((memory, score))
+                    seen.add(memory.entry_id)
+            
+            results.sort(key=lambda item: -item[1])
+        
+        return results[:k]
+    
+    async def _hydrate_vector_index(self, conversation_id: str) -> None:
+        """
+        Load embeddings for a conversation's recent memories into the vector index.
+        
+        Memories written by other workers are only known to this worker's
+        index once they have been loaded from Redis.
+        
+        Args:
+            conversation_id: The conversation ID
+        """
+        chrono_key = f"mem0:chronological:{conversation_id}"
+        memory_ids = await self.redis.zrevrange(chrono_key, 0, VECTOR_HYDRATE_LIMIT - 1)
+        missing = [memory_id for memory_id in memory_ids if memory_id not in self.vector_index]
+        if not missing:
+            return
+        
+        for memory in await self.get_memories_by_ids(missing):
+            if memory.embedding:
+                self.vector_index.add(memory.entry_id, memory.embedding, memory.conversation_id)
+    
+    async def get_memory(self, memory_id: str, include_expired: bool = False) -> Optional[MemoryEntry]:
+        """
+        Retrieve a specific memory entry by ID from Redis.
+        
+        Args:
+            memory_id: The memory entry ID
+            include_expired: Whether to include expired memories
+        
+        Returns:
+            MemoryEntry if found, None otherwise
+        """
+        memory_data = await self._fetch_memory_data(memory_id)
+        if not memory_data:
+            return None
+        return self._decode_memory(memory_id, memory_data, include_expired)
+    
+    async def _fetch_memory_data(self, memory_id: str) -> Optional[bytes]:
+        """
+        Fetch the stored value of a memory entry by ID.
+        
+        Args:
+            memory_id: The memory entry ID
+        
+        Returns:
+            Stored value (bytes) if found, None otherwise
+        """
+        location_key = self._get_location_key(memory_id)
+        
+        if self._get_by_id_script is not None:
+            try:
+                memory_data = await self._eval_get_by_id(location_key)
+                if memory_data:
+                    return memory_data
+            except redis.exceptions.NoScriptError:
+                # Script cache was flushed; reload it and retry once
+                try:
+                    await self.redis.script_load(_GET_BY_ID_SCRIPT)
+                    memory_data = await self._eval_get_by_id(location_key)
+                    if memory_data:
+                        return memory_data
+                except Exception as e:
+                    logger.debug(f"Disabling scripted ID lookup after reload failure: {str(e)}")
+                    self._get_by_id_script = None
+            except redis.exceptions.ResponseError as e:
+                logger.debug(f"Disabling scripted ID lookup: {str(e)}")
+                self._get_by_id_script = None
+        
+        if self._get_by_id_script is None:
+            primary_key = await self.redis.get(location_key)
+            if primary_key:
+                memory_data = await self.redis.execute_command("GET", primary_key, **_RAW)
+                if memory_data:
+                    return memory_data
+        
+        if self.config.probe_legacy_keys:
+            return await self._probe_legacy_memory(memory_id)
+        return None
+    
+    async def _find_legacy_memory_ids(self, memory_ids: List[str]) -> Set[str]:
+        """
+        Find the memories without an ID index entry that still exist under a legacy key.
+        
+        Checks all candidate keys with one pipelined EXISTS per memory, in a
+        single round trip, so only IDs confirmed gone are pruned.
+        
+        Args:
+            memory_ids: The memory entry IDs
+            
+        Returns:
+            IDs of the memories that still exist
+        """
+        pipeline = self.redis.pipeline(transaction=False)
+        for memory_id in memory_ids:
+            pipeline.exists(*self._legacy_candidate_keys(memory_id))
+        counts = await pipeline.execute()
+        return {memory_id for memory_id, count in zip(memory_ids, counts) if count}
+    
+    async def _probe_legacy_memory(self, memory_id: str) -> Optional[str]:
+        """
+        Locate a memory that has no ID index entry.
+        
+        Args:
+            memory_id: The memory entry ID
+        
+        Returns:
+            Stored value (bytes) if found, None otherwise
+        """
+        return (await self._probe_legacy_memories([memory_id])).get(memory_id)
+    
+    async def _probe_legacy_memories(self, memory_ids: List[str]) -> Dict[str, bytes]:
+        """
+        Locate several memories that have no ID index entry in one round trip.
+        
+        Args:
+            memory_ids: The memory entry IDs
+        
+        Returns:
+            Stored values (bytes) by memory ID for the memories found
+        """
+        candidates = [(memory_id, key) for memory_id in memory_ids for key in self._legacy_candidate_keys(memory_id)]
+        
+        pipeline = self.redis.pipeline(transaction=False)
+        for _, key in candidates:
+            pipeline.execute_command("GET", key, **_RAW)
+        results = await pipeline.execute()
+        
+        found: Dict[str, Tuple[str, bytes]] = {}
+        for (memory_id, key), memory_data in zip(candidates, results):
+            if memory_data and memory_id not in found:
+                found[memory_id] = (key, memory_data)
+        if not found:
+            return {}
+        
+        # Backfill the ID index with the same lifetime as the entries
+        pipeline = self.redis.pipeline(transaction=False)
+        for key, _ in found.values():
+            pipeline.ttl(key)
+        ttls = await pipeline.execute()
+        
+        pipeline = self.redis.pipeline(transaction=False)
+        for (memory_id, (key, _)), ttl in zip(found.items(), ttls):
+            pipeline.set(self._get_location_key(memory_id), key, ex=ttl if ttl and ttl > 0 else None)
+        await pipeline.execute()
+        
+        return {memory_id: memory_data for memory_id, (_, memory_data) in found.items()}
+    
+    async def get_memory_async(self, memory_id: str, include_expired: bool = False) -> Optional[MemoryEntry]:
+        """
+        Retrieve a specific memory entry by ID with async database fallback.
+        
+        Args:
+            memory_id: The memory entry ID
+            include_expired: Whether to include expired memories
+        
+        Returns:
+            MemoryEntry if found, None otherwise
+        """
+        memory = await self.get_memory(memory_id, include_expired)
+        if memory:
+            return memory
+        
+        if self.db_session:
+            return await self._get_from_database(memory_id)
+        
+        return None
+    
+    async def get_memories_by_conversation(
+        self,
+        conversation_id: str,
+        memory_type: Optional[Union[MemoryType, str]] = None,
+        limit: int = 100,
+        offset: int = 0,
+        include_expired: bool = False
+    ) -> List[MemoryEntry]:
+        """
+        Retrieve memories for a specific conversation.
+        
+        Args:
+            conversation_id: The conversation ID
+            memory_type: Optional filter for memory type
+            limit: Maximum number of memories to retrieve
+            offset: Offset for pagination
+            include_expired: Whether to include expired memories
+        
+        Returns:
+            List of memory entries
+        """
+        if self.session_cache is not None:
+            page = self.session_cache.get_page(conversation_id, offset, limit)
+            if page is None:
+                page = await self._load_conversation_head(conversation_id, offset + limit)
+                page = page[offset:offset + limit]
+            return self._filter_cached_page(page, memory_type, include_expired)
+        
+        chrono_key = f"mem0:chronological:{conversation_id}"
+        memory_ids = await self.redis.zrevrange(chrono_key, offset, offset + limit - 1)
+        
+        if not memory_ids:
+            return []
+        
+        return await self.get_memories_by_ids(
+            memory_ids,
+            memory_type=memory_type,
+            include_expired=include_expired,
+            conversation_id=conversation_id
+        )
+    
+    async def _load_conversation_head(self, conversation_id: str, count: int) -> List[Tuple[str, Optional[MemoryEntry]]]:
+        """
+        Load the newest memories of a conversation into the session cache.
+        
+        Args:
+            conversation_id: The conversation ID
+            count: Number of memories the caller needs
+        
+        Returns:
+            (memory_id, memory) pairs newest first; memory is None for missing entries
+        """
+        count = max(count, SESSION_CACHE_WARM_SIZE)
+        self.session_cache.begin_load(conversation_id)
+        
+        chrono_key = f"mem0:chronological:{conversation_id}"
+        memory_ids = await self.redis.zrevrange(chrono_key, 0, count - 1)
+        memories = {
+            memory.entry_id: memory
+            for memory in await self.get_memories_by_ids(memory_ids, include_expired=True, conversation_id=conversation_id)
+        }
+        slots = [(memory_id, memories.get(memory_id)) for memory_id in memory_ids]
+        
+        self.session_cache.put(conversation_id, slots, complete=len(memory_ids) < count)
+        return slots
+    
+    def _filter_cached_page(
+        self,
+        page: List[Tuple[str, Optional[MemoryEntry]]],
+        memory_type: Optional[Union[MemoryType, str]] = None,
+        include_expired: bool = False
+    ) -> List[MemoryEntry]:
+        """
+        Apply the read filters of get_memories_by_conversation to a cached page.
+        
+        Args:
+            page: (memory_id, memory) pairs newest first
+            memory_type: Optional filter for memory type
+            include_expired: Whether to include expired memories
+        
+        Returns:
+            List of memory entries
+        """
+        type_value = self._get_type_value(memory_type)
+        now = datetime.utcnow()
+        return [
+            memory for _, memory in page
+            if memory is not None
+            and (not type_value or memory.memory_type == type_value)
+            and (include_expired or not memory.expires_at or memory.expires_at >= now)
+        ]
+    
+    async def get_memories_by_ids(
+        self,
+        memory_ids: List[str],
+        memory_type: Optional[Union[MemoryType, str]] = None,
+        include_expired: bool = False,
+        conversation_id: Optional[str] = None
+    ) -> List[MemoryEntry]:
+        """
+        Retrieve several memory entries in bulk, preserving the given order.
+        
+        Args:
+            memory_ids: The memory entry IDs
+            memory_type: Optional filter for memory type
+            include_expired: Whether to include expired memories
+            conversation_id: Conversation whose chronological set the IDs were
+                read from; IDs whose entries are gone are pruned from it
+        
+        Returns:
+            List of memory entries that were found
+        """
+        if not memory_ids:
+            return []
+        
+        memory_ids = list(memory_ids)
+        type_value = self._get_type_value(memory_type)
+        
+        location_keys = [self._get_location_key(memory_id) for memory_id in memory_ids]
+        wanted = self._select_page_keys(memory_ids, await self.redis.mget(location_keys), type_value)
+        
+        indexed_keys = [primary_key for _, primary_key in wanted if primary_key]
+        documents = dict(zip(indexed_keys, await self.redis.execute_command("MGET", *indexed_keys, **_RAW))) if indexed_keys else {}
+        
+        found = {
+            memory_id: documents[primary_key]
+            for memory_id, primary_key in wanted if primary_key and documents.get(primary_key)
+        }
+        missing = [memory_id for memory_id, _ in wanted if memory_id not in found]
+        if missing:
+            # Entries written before the ID index still live under a legacy key
+            legacy = await self._find_legacy_memory_ids(missing)
+            if legacy and self.config.probe_legacy_keys:
+                found.update(await self._probe_legacy_memories(list(legacy)))
+            expired = [memory_id for memory_id in missing if memory_id not in legacy]
+            if expired and conversation_id:
+                # Entries expired by TTL leave their IDs behind in the chronological set
+                await self.redis.zrem(f"mem0:chronological:{conversation_id}", *expired)
+        
+        memories = []
+        for memory_id, _ in wanted:
+            memory_data = found.get(memory_id)
+            if not memory_data:
+                continue
+            
+            memory = self._decode_memory(memory_id, memory_data, include_expired, type_value)
+            if memory:
+                memories.append(memory)
+        
+        return memories
+    
+    async def get_conversation_messages(
+        self,
+        conversation_id: str,
+        limit: int = 50,
+        include_expired: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve conversation messages in a format suitable for LLM context.
+        
+        Args:
+            conversation_id: The conversation ID
+            limit: Maximum number of messages to retrieve
+            include_expired: Whether to include expired messages
+        
+        Returns:
+            List of message dictionaries with role and content
+        """
+        memories = await self.get_memories_by_conversation(
+            conversation_id=conversation_id,
+            memory_type=MemoryType.MESSAGE,
+            limit=limit,
+            include_expired=include_expired
+        )
+        return self._format_llm_messages(memories)
+    
+    async def get_conversation_history(
+        self,
+        session_id: str,
+        limit: int = 10,
+        token_budget: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get formatted conversation history compatible with LangChain/LangGraph agents.
+        
+        Args:
+            session_id: The session ID (used as conversation ID)
+            limit: Maximum number of messages to return
+            token_budget: Optional token budget; when given, the history is the
+                conversation window (summary plus recent turns) instead of the
+                latest limit messages
+        
+        Returns:
+            List of message dictionaries in LangChain/LangGraph compatible format
+        """
+        try:
+            if token_budget is not None:
+                messages = await self.get_conversation_window(session_id, token_budget=token_budget)
+            else:
+                messages = await self.get_conversation_messages(
+                    conversation_id=session_id,
+                    limit=limit,
+                    include_expired=False
+                )
+            return self._format_history(messages)
+        except Exception as e:
+            logger.error(f"Error retrieving conversation history: {str(e)}")
+            return []
+    
+    async def get_conversation_window(
+        self,
+        conversation_id: str,
+        token_budget: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the most recent conversation turns that fit a token budget.
+        
+        The latest conversation summary, if any, comes first as a system
+        message. Recent messages are added newest first until the budget is
+        spent; messages left outside the window are handed to the background
+        summarizer to be folded into the next summary.
+        
+        Args:
+            conversation_id: The conversation ID
+            token_budget: Maximum prompt tokens (defaults to the configured history budget)
+        
+        Returns:
+            List of role/content messages in chronological order
+        """
+        remaining = token_budget if token_budget is not None else self.config.history_token_budget
+        
+        window: List[Dict[str, Any]] = []
+        summary = await self.get_latest_summary(conversation_id)
+        summary_msg = None
+        covered = 0.0
+        if summary:
+            covered = float(summary.metadata.get("covers_until", 0))
+            summary_msg = summary_message(summary.content)
+            cost = message_tokens(summary_msg)
+            if cost <= remaining:
+                remaining -= cost
+            else:
+                summary_msg = None
+        
+        chrono_key = f"mem0:chronological:{conversation_id}"
+        overflow_score = None
+        offset = 0
+        while overflow_score is None:
+            page = await self.redis.zrevrange(chrono_key, offset, offset + WINDOW_PAGE_SIZE - 1, withscores=True)
+            offset += WINDOW_PAGE_SIZE
+            
+            # Messages at or below the summary watermark are already summarized
+            page = [(memory_id, score) for memory_id, score in page if score > covered]
+            if not page:
+                break
+            
+            scores = dict(page)
+            memories = await self.get_memories_by_ids([memory_id for memory_id, _ in page], memory_type=MemoryType.MESSAGE)
+            for memory in memories:
+                if not memory.role:
+                    continue
+                message = {"role": memory.role, "content": memory.content}
+                cost = message_tokens(message)
+                if cost > remaining:
+                    overflow_score = scores[memory.entry_id]
+                    break
+                window.append(message)
+                remaining -= cost
+        
+        if overflow_score is not None and self.summarizer is not None:
+            pending = await self.redis.zcount(chrono_key, f"({covered}", overflow_score)
+            self.summarizer.schedule(self, conversation_id, overflow_score, pending)
+        
+        window.reverse()
+        if summary_msg:
+            window.insert(0, summary_msg)
+        return window
+    
+    async def get_latest_summary(self, conversation_id: str) -> Optional[MemoryEntry]:
+        """
+        Get the most recent summary of a conversation.
+        
+        Args:
+            conversation_id: The conversation ID
+        
+        Returns:
+            Summary memory entry, or None if the conversation has none
+        """
+        summaries = await self.search_memories(
+            {"conversation_id": conversation_id, "memory_type": MemoryType.SUMMARY},
+            limit=1
+        )
+        return summaries[0] if summaries else None
+    
+    async def add_summary(
+        self,
+        conversation_id: str,
+        content: str,
+        covers_until: float,
+        session_id: Optional[str] = None
+    ) -> str:
+        """
+        Store a conversation summary.
+        
+        Args:
+            conversation_id: The conversation ID
+            content: Summary text
+            covers_until: Chronological score of the newest message the summary includes
+            session_id: Optional session ID
+        
+        Returns:
+            Memory entry ID
+        """
+        memory = MemoryEntry(
+            content=content,
+            memory_type=MemoryType.SUMMARY,
+            session_id=session_id or conversation_id,
+            conversation_id=conversation_id,
+            metadata={"covers_until": covers_until}
+        )
+        return await self.add_memory(memory, scope=MemoryScope.SHORT_TERM)
+    
+    async def add_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        conversation_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Add a message to a conversation.
+        
+        Args:
+            session_id: The session ID
+            role: Message role (user, assistant, system)
+            content: Message content
+            conversation_id: Optional conversation ID (uses session_id if not provided)
+            agent_id: Optional agent ID
+            metadata: Optional message metadata
+        
+        Returns:
+            Memory entry ID
+        """
+        memory = self._build_message_entry(session_id, role, content, conversation_id, agent_id, metadata)
+        return await self.add_memory(memory, scope=MemoryScope.SHORT_TERM)
+    
+    async def add_entity(
+        self,
+        conversation_id: str,
+        entity_type: str,
+        entity_value: str,
+        confidence: float = 1.0,
+        metadata: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        agent_id: Optional[str] = None
+    ) -> str:
+        """
+        Add an entity to memory.
+        
+        Args:
+            conversation_id: The conversation ID
+            entity_type: Type of entity (e.g., 'person', 'tracking_number')
+            entity_value: Value of the entity
+            confidence: Confidence score for the extraction
+            metadata: Optional entity metadata
+            session_id: Optional session ID
+            agent_id: Optional agent ID
+        
+        Returns:
+            Memory entry ID
+        """
+        memory = self._build_entity_entry(
+            conversation_id, entity_type, entity_value, confidence, metadata, session_id, agent_id
+        )
+        return await self.add_memory(memory, scope=MemoryScope.SHORT_TERM)
+    
+    async def add_turn(
+        self,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        entities: Optional[List[Dict[str, Any]]] = None
+    ) -> List[str]:
+        """
+        Store the messages and entities of a conversation turn in a single round trip.
+        
+        Args:
+            messages: Keyword arguments of add_message calls, in chronological order
+            entities: Keyword arguments of add_entity calls
+        
+        Returns:
+            Memory entry IDs, entities first
+        """
+        memories = [
+            self._build_entity_entry(
+                entity["conversation_id"],
+                entity["entity_type"],
+                entity["entity_value"],
+                entity.get("confidence", 1.0),
+                entity.get("metadata"),
+                entity.get("session_id"),
+                entity.get("agent_id")
+            )
+            for entity in entities or []
+        ]
+        message_memories = [
+            self._build_message_entry(
+                message["session_id"],
+                message["role"],
+                message["content"],
+                message.get("conversation_id"),
+                message.get("agent_id"),
+                message.get("metadata")
+            )
+            for message in messages or []
+        ]
+        # Messages of one turn can be built within the same microsecond; keep their order in the chronological set
+        for previous, memory in zip(message_memories, message_memories[1:]):
+            if memory.created_at <= previous.created_at:
+                memory.created_at = previous.created_at + timedelta(microseconds=1)
+        memories.extend(message_memories)
+        return await self.add_memories(memories, scope=MemoryScope.SHORT_TERM)
+    
+    async def search_memories(
+        self,
+        query: Dict[str, Any],
+        limit: int = 10,
+        include_expired: bool = False
+    ) -> List[MemoryEntry]:
+        """
+        Search for memories based on various criteria.
+        
+        Args:
+            query: Query parameters (e.g., conversation_id, memory_type, etc.)
+            limit: Maximum number of results
+            include_expired: Whether to include expired memories
+        
+        Returns:
+            List of matching memory entries
+        """
+        plan = plan_query(query)
+        
+        # Without any covering index, fall back to scanning indexed entries
+        if not plan.indexed:
+            return await self._scan_memories(query, limit, include_expired)
+        
+        candidate_ids = await self._resolve_candidates(plan, limit)
+        
+        results = []
+        for start in range(0, len(candidate_ids), SEARCH_FETCH_BATCH):
+            chunk = candidate_ids[start:start + SEARCH_FETCH_BATCH]
+            for memory in await self.get_memories_by_ids(chunk, include_expired=include_expired):
+                if self._matches_query(memory, query):
+                    results.append(memory)
+                    if len(results) >= limit:
+                        return results
+        
+        return results
+    
+    async def _resolve_candidates(self, plan: QueryPlan, limit: int) -> List[str]:
+        """
+        Resolve the candidate memory IDs of a query plan in Redis.
+        
+        Args:
+            plan: Query plan
+            limit: Maximum number of results
+        
+        Returns:
+            List of candidate memory IDs
+        """
+        end = limit - 1 if not plan.residual else -1
+        
+        if plan.chrono_key and plan.set_keys:
+            temp_key = plan.temp_key()
+            pipeline = self.redis.pipeline()
+            # Weight 0 on the sets keeps the chronological scores
+            pipeline.zinterstore(temp_key, {plan.chrono_key: 1, **{key: 0 for key in plan.set_keys}})
+            pipeline.zrevrange(temp_key, 0, end)
+            pipeline.delete(temp_key)
+            return (await pipeline.execute())[1]
+        
+        if plan.chrono_key:
+            return await self.redis.zrevrange(plan.chrono_key, 0, end)
+        
+        return list(await self.redis.sinter(plan.set_keys))
+    
+    async def _scan_memories(self, query: Dict[str, Any], limit: int, include_expired: bool = False) -> List[MemoryEntry]:
+        """
+        Search all memories by scanning the ID index.
+        
+        Args:
+            query: Query parameters
+            limit: Maximum number of results
+            include_expired: Whether to include expired memories
+        
+        Returns:
+            List of matching memory entries
+        """
+        logger.debug(f"No index covers memory query {query}, scanning")
+        prefix = self._get_location_key("")
+        
+        results = []
+        batch = []
+        async for location_key in self.redis.scan_iter(match=f"{prefix}*", count=SEARCH_FETCH_BATCH):
+            batch.append(location_key[len(prefix):])
+            if len(batch) >= SEARCH_FETCH_BATCH:
+                memories = await self.get_memories_by_ids(batch, include_expired=include_expired)
+                results.extend(memory for memory in memories if self._matches_query(memory, query))
+                batch = []
+                if len(results) >= limit:
+                    return results[:limit]
+        
+        if batch:
+            memories = await self.get_memories_by_ids(batch, include_expired=include_expired)
+            results.extend(memory for memory in memories if self._matches_query(memory, query))
+        
+        return results[:limit]
+    
+    async def clear_working_memory(
+        self,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> int:
+        """
+        Clear all working memory.
+        
+        Keys are found with SCAN and removed with UNLINK in bounded batches,
+        yielding to the event loop between batches.
+        
+        Args:
+            batch_size: Keys per batch (defaults to the configured eviction batch size)
+            progress_callback: Optional callback invoked with an EvictionProgress after every batch
+        
+        Returns:
+            Number of memories cleared
+        """
+        batch_size = batch_size or self.config.eviction_batch_size
+        pattern = f"mem0:{MemoryScope.WORKING.value}:*"
+        progress = EvictionProgress()
+        
+        batch = []
+        async for key in self.redis.scan_iter(match=pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                await self._unlink_working_batch(batch, progress, progress_callback)
+                batch = []
+        if batch:
+            await self._unlink_working_batch(batch, progress, progress_callback)
+        
+        if self.session_cache is not None and progress.deleted:
+            self.session_cache.clear()
+            await self.session_cache.queue_invalidation(self.redis, ALL_CONVERSATIONS)
+        
+        return progress.deleted
+    
+    async def _unlink_working_batch(
+        self,
+        keys: List[str],
+        progress: EvictionProgress,
+        progress_callback: Optional[ProgressCallback]
+    ) -> None:
+        """
+        Unlink one batch of working memory keys.
+        
+        Args:
+            keys: Primary keys of working memories
+            progress: Progress of the current run
+            progress_callback: Optional callback to notify
+        """
+        progress.scanned += len(keys)
+        await self.redis.unlink(*self._working_memory_unlink_keys(keys))
+        progress.deleted += len(keys)
+        report_progress(progress, progress_callback)
+        
+        if self.vector_index is not None:
+            self.vector_index.remove([key.split(":", 3)[-1] for key in keys])
+        
+        await asyncio.sleep(0)
+    
+    async def clear_conversation_memory(
+        self,
+        conversation_id: str,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> int:
+        """
+        Clear all memory for a specific conversation.
+        
+        The conversation set is read with SSCAN and its memories are
+        unlinked in bounded batches.
+        
+        Args:
+            conversation_id: The conversation ID
+            batch_size: Memories per batch (defaults to the configured eviction batch size)
+            progress_callback: Optional callback invoked with an EvictionProgress after every batch
+        
+        Returns:
+            Number of memories cleared
+        """
+        batch_size = batch_size or self.config.eviction_batch_size
+        conv_key = f"mem0:conversations:{conversation_id}"
+        progress = EvictionProgress()
+        
+        # Collect the IDs first so the set is not modified while it is being scanned
+        memory_ids = [memory_id async for memory_id in self.redis.sscan_iter(conv_key, count=batch_size)]
+        
+        if not memory_ids:
+            return 0
+        
+        for batch in batched(memory_ids, batch_size):
+            progress.scanned += len(batch)
+            
+            primary_keys = await self.redis.mget([self._get_location_key(memory_id) for memory_id in batch])
+            pipeline = self.redis.pipeline(transaction=False)
+            progress.deleted += self._queue_memory_deletes(pipeline, batch, primary_keys)
+            await pipeline.execute()
+            report_progress(progress, progress_callback)
+            
+            if self.vector_index is not None:
+                self.vector_index.remove(batch)
+            
+            await asyncio.sleep(0)
+        
+        # Remove the conversation set and the chronological record last
+        await self.redis.unlink(conv_key, f"mem0:chronological:{conversation_id}")
+        
+        if self.session_cache is not None:
+            self.session_cache.discard(conversation_id)
+            await self.session_cache.queue_invalidation(self.redis, conversation_id)
+        
+        return progress.deleted
@@ -0,0 +1,191 @@
+"""
+Storage codecs for mem0 memory entries.
+
+Memories were originally stored as the JSON document built by
+MemoryEntry.to_dict(). The msgpack codec stores the same entry as a
+versioned binary record holding only the populated fields, with
+timestamps as integer microseconds and the embedding as raw float32
+bytes. Records are prefixed with a magic header, so JSON documents
+written earlier remain readable whatever codec is configured.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Union
+
+import numpy as np
+
+# msgpack is optional; without it memories are stored as JSON
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+logger = logging.getLogger(__name__)
+
+JSON_CODEC = "json"
+MSGPACK_CODEC = "msgpack"
+
+# Binary records start with this header followed by a format version byte.
+# JSON documents always start with "{", so the two never collide.
+CODEC_MAGIC = b"\x00m0"
+CODEC_VERSION = 1
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Short field names used in binary records
+_FIELDS = {
+    "entry_id": "i",
+    "content": "c",
+    "memory_type": "t",
+    "session_id": "s",
+    "conversation_id": "v",
+    "agent_id": "a",
+    "role": "r",
+    "importance": "p",
+    "metadata": "m",
+}
+
+
+def resolve_codec(name: str) -> str:
+    """
+    Resolve the configured codec name to one that can be used.
+    
+    Args:
+        name: Configured codec name
+    
+    Returns:
+        The codec name, or "json" if the codec is unknown or unavailable
+    """
+    name = (name or JSON_CODEC).lower()
+    if name == MSGPACK_CODEC and not HAS_MSGPACK:
+        logger.warning("MEMORY_CODEC is msgpack but msgpack is not installed, storing memories as JSON")
+        return JSON_CODEC
+    if name not in (JSON_CODEC, MSGPACK_CODEC):
+        logger.warning(f"Unknown MEMORY_CODEC {name}, storing memories as JSON")
+        return JSON_CODEC
+    return name
+
+
+def _to_micros(value: datetime) -> int:
+    """Convert a naive UTC datetime to integer microseconds since the epoch."""
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime:
+    """Convert integer microseconds since the epoch to a naive UTC datetime."""
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _pack_memory(memory: Any) -> bytes:
+    """
+    Pack a memory entry into a versioned msgpack record.
+    
+    Args:
+        memory: MemoryEntry to pack
+    
+    Returns:
+        Binary record
+    """
+    record: Dict[str, Any] = {}
+    for name, short in _FIELDS.items():
+        value = getattr(memory, name)
+        # Defaults are left out of the record
+        if value is None or value == {} or (name == "importance" and value == 1.0):
+            continue
+        record[short] = value
+    
+    if memory.created_at:
+        record["ca"] = _to_micros(memory.created_at)
+    if memory.expires_at:
+        record["ex"] = _to_micros(memory.expires_at)
+    
+    embedding = memory.raw_embedding
+    if embedding is not None:
+        record["e"] = embedding if isinstance(embedding, bytes) else np.asarray(embedding, dtype=np.float32).tobytes()
+    
+    if memory.indexes:
+        record["x"] = [[idx["index_type"], idx["key"], idx["value"]] for idx in memory.indexes]
+    if memory.contexts:
+        record["cx"] = [[ctx["context_type"], ctx["data"]] for ctx in memory.contexts]
+    
+    return CODEC_MAGIC + bytes([CODEC_VERSION]) + msgpack.packb(record, use_bin_type=True)
+
+
+def _unpack_memory(data: bytes) -> Dict[str, Any]:
+    """
+    Unpack a binary record into the MemoryEntry.to_dict() layout.
+    
+    Timestamps are returned as datetimes and the embedding as raw float32
+    bytes, which MemoryEntry decodes only when it is accessed.
+    
+    Args:
+        data: Binary record including its header
+    
+    Returns:
+        Dictionary for MemoryEntry.from_dict()
+    """
+    version = data[len(CODEC_MAGIC)]
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported memory record version {version}")
+    
+    record = msgpack.unpackb(data[len(CODEC_MAGIC) + 1:], raw=False)
+    
+    result = {name: record.get(short) for name, short in _FIELDS.items()}
+    result["importance"] = record.get("p", 1.0)
+    result["metadata"] = record.get("m") or {}
+    result["created_at"] = _from_micros(record["ca"]) if "ca" in record else None
+    result["expires_at"] = _from_micros(record["ex"]) if "ex" in record else None
+    result["embedding"] = record.get("e")
+    result["indexes"] = [
+        {"index_type": index_type, "key": key, "value": value}
+        for index_type, key, value in record.get("x", [])
+    ]
+    result["contexts"] = [
+        {"context_type": context_type, "data": data}
+        for context_type, data in record.get("cx", [])
+    ]
+    return result
+
+
+def encode_memory(memory: Any, codec: str = JSON_CODEC) -> Union[str, bytes]:
+    """
+    Encode a memory entry for storage in Redis.
+    
+    Args:
+        memory: MemoryEntry to encode
+        codec: Codec name from resolve_codec()
+    
+    Returns:
+        JSON string or binary record
+    """
+    if codec == MSGPACK_CODEC:
+        try:
+            return _pack_memory(memory)
+        except (TypeError, ValueError, OverflowError) as e:
+            # Metadata msgpack cannot represent; JSON documents remain readable
+            logger.debug(f"Storing memory {memory.entry_id} as JSON: {str(e)}")
+    return json.dumps(memory.to_dict())
+
+
+def decode_memory(data: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Decode a stored memory into the MemoryEntry.to_dict() layout.
+    
+    Accepts binary records and JSON documents, as bytes or text.
+    
+    Args:
+        data: Stored value
+    
+    Returns:
+        Dictionary for MemoryEntry.from_dict()
+    """
+    if isinstance(data, bytes) and data.startswith(CODEC_MAGIC):
+        if not HAS_MSGPACK:
+            raise ValueError("Memory stored as msgpack but msgpack is not installed")
+        return _unpack_memory(data)
+    return json.loads(data)
+
@@ -25,6 +25,11 @@ class MemoryConfig:
         # Use fakeredis:// by default for development, this doesn't require a real Redis server
         self.redis_url = self.get_env_or_default("REDIS_URL", "fakeredis://mem0:0")
         
+        # Redis connection pool settings (shared by async mem0 instances)
+        self.redis_max_connections = int(self.get_env_or_default("REDIS_MAX_CONNECTIONS", "50"))
+        self.redis_socket_timeout = float(self.get_env_or_default("REDIS_SOCKET_TIMEOUT", "5"))
+        self.redis_health_check_interval = int(self.get_env_or_default("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+        
         # Memory expiration settings (in seconds)
         self.working_memory_ttl = int(self.get_env_or_default("WORKING_MEMORY_TTL", "300"))  # 5 minutes
         self.short_term_memory_ttl = int(self.get_env_or_default("SHORT_TERM_MEMORY_TTL", "3600"))  # 1 hour
@@ -34,8 +39,37 @@ class MemoryConfig:
         self.use_database_storage = self.get_env_or_default("USE_DATABASE_STORAGE", "true").lower() == "true"
         self.use_vector_search = self.get_env_or_default("USE_VECTOR_SEARCH", "false").lower() == "true"
         
+        # Vector search settings
+        self.vector_index_max_entries = int(self.get_env_or_default("VECTOR_INDEX_MAX_ENTRIES", "100000"))
+        
         # Database settings
         self.db_chunk_size = int(self.get_env_or_default("DB_CHUNK_SIZE", "100"))
+        self.archive_queue_size = int(self.get_env_or_default("ARCHIVE_QUEUE_SIZE", "10000"))
+        self.archive_flush_interval = float(self.get_env_or_default("ARCHIVE_FLUSH_INTERVAL", "1.0"))
+        self.archive_max_retries = int(self.get_env_or_default("ARCHIVE_MAX_RETRIES", "3"))
+        self.archive_retry_backoff = float(self.get_env_or_default("ARCHIVE_RETRY_BACKOFF", "0.5"))
+        
+        # Eviction settings (a sweep interval of 0 disables the background sweeper)
+        self.eviction_batch_size = int(self.get_env_or_default("EVICTION_BATCH_SIZE", "500"))
+        self.memory_sweep_interval = float(self.get_env_or_default("MEMORY_SWEEP_INTERVAL", "300"))
+        
+        # Conversation window settings
+        self.history_token_budget = int(self.get_env_or_default("HISTORY_TOKEN_BUDGET", "2000"))
+        self.summary_model = self.get_env_or_default("SUMMARY_MODEL", "gpt-4o-mini")
+        self.summary_min_messages = int(self.get_env_or_default("SUMMARY_MIN_MESSAGES", "6"))
+        
+        # Process-local cache of hot conversations (a size of 0 disables it)
+        self.session_cache_size = int(self.get_env_or_default("SESSION_CACHE_SIZE", "1000"))
+        self.session_cache_ttl = float(self.get_env_or_default("SESSION_CACHE_TTL", "30"))
+        
+        # Storage codec for memory entries in Redis: "msgpack" or "json"
+        self.memory_codec = self.get_env_or_default("MEMORY_CODEC", "msgpack")
+        
+        # Migration setting: read memories written before the ID index from their legacy scope/type
+        # keys, backfilling their index entries. Keep it on until every such memory has been read once;
+        # with it off they are skipped. Either way, an ID is only pruned from a conversation history
+        # once none of its legacy keys exist.
+        self.probe_legacy_keys = self.get_env_or_default("PROBE_LEGACY_MEMORY_KEYS", "true").lower() == "true"
         
         # Key prefix for Redis
         self.redis_prefix = self.get_env_or_default("REDIS_PREFIX", "mem0")
@@ -87,11 +121,27 @@ class MemoryConfig:
         """
         return {
             "redis_url": self.redis_url,
+            "redis_max_connections": self.redis_max_connections,
+            "redis_socket_timeout": self.redis_socket_timeout,
+            "redis_health_check_interval": self.redis_health_check_interval,
             "working_memory_ttl": self.working_memory_ttl,
             "short_term_memory_ttl": self.short_term_memory_ttl,
             "long_term_memory_ttl": self.long_term_memory_ttl,
             "use_database_storage": self.use_database_storage,
             "use_vector_search": self.use_vector_search,
+            "vector_index_max_entries": self.vector_index_max_entries,
             "db_chunk_size": self.db_chunk_size,
+            "archive_queue_size": self.archive_queue_size,
+            "archive_flush_interval": self.archive_flush_interval,
+            "archive_max_retries": self.archive_max_retries,
+            "archive_retry_backoff": self.archive_retry_backoff,
+            "eviction_batch_size": self.eviction_batch_size,
+            "memory_sweep_interval": self.memory_sweep_interval,
+            "memory_codec": self.memory_codec,
+            "session_cache_size": self.session_cache_size,
+            "session_cache_ttl": self.session_cache_ttl,
+            "history_token_budget": self.history_token_budget,
+            "summary_model": self.summary_model,
+            "summary_min_messages": self.summary_min_messages,
             "redis_prefix": self.redis_prefix
         }
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Redis connection management for the mem0 memory system.
+
+This module provides a pooled asyncio Redis connection manager that is
+shared by all async mem0 instances using the same Redis URL, so a worker
+keeps a bounded set of connections regardless of how many services
+request a memory instance.
+"""
+
+import logging
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import redis.asyncio as aioredis
+# Import fakeredis for testing without a real Redis server
+try:
+    import fakeredis
+    HAS_FAKEREDIS = True
+except ImportError:
+    HAS_FAKEREDIS = False
+
+from backend.memory.config import MemoryConfig
+
+logger = logging.getLogger(__name__)
+
+
+class RedisConnectionManager:
+    """
+    Owns an asyncio Redis connection pool and hands out clients bound to it.
+    
+    Clients returned by get_client() are lightweight and share the pool;
+    connections are only opened when commands are issued.
+    """
+    
+    def __init__(self, config: Optional[MemoryConfig] = None):
+        """
+        Initialize the connection manager.
+        
+        Args:
+            config: Memory configuration with Redis URL and pool settings
+        """
+        self.config = config or MemoryConfig()
+        self.redis_url = self.config.redis_url
+        self.pool: Optional[aioredis.ConnectionPool] = None
+        self._fake_server = None
+        
+        parsed_url = urlparse(self.redis_url)
+        if parsed_url.scheme == 'fakeredis':
+            if not HAS_FAKEREDIS:
+                raise RuntimeError("fakeredis URL configured but fakeredis is not installed")
+            # All clients of this manager see the same in-process server
+            self._fake_server = fakeredis.FakeServer()
+            logger.info("Using fakeredis for async mem0 connections")
+        else:
+            self.pool = aioredis.ConnectionPool.from_url(
+                self.redis_url,
+                max_connections=self.config.redis_max_connections,
+                socket_timeout=self.config.redis_socket_timeout,
+                socket_connect_timeout=self.config.redis_socket_timeout,
+                health_check_interval=self.config.redis_health_check_interval,
+                decode_responses=True,
+            )
+            logger.info(
+                f"Created Redis connection pool for {self.redis_url} "
+                f"(max_connections={self.config.redis_max_connections})"
+            )
+    
+    def get_client(self) -> Any:
+        """
+        Get an asyncio Redis client that uses the shared pool.
+        
+        Returns:
+            redis.asyncio.Redis (or fakeredis equivalent) instance
+        """
+        if self._fake_server is not None:
+            return fakeredis.FakeAsyncRedis(server=self._fake_server, decode_responses=True)
+        return aioredis.Redis(connection_pool=self.pool)
+    
+    async def close(self) -> None:
+        """Disconnect all pooled connections."""
+        if self.pool is not None:
+            await self.pool.disconnect()
+            logger.info(f"Closed Redis connection pool for {self.redis_url}")
@@ -15,6 +15,9 @@ from sqlalchemy.orm import sessionmaker
 
 logger = logging.getLogger(__name__)
 
+# Shared session factory for background memory work
+_session_factory: Optional[sessionmaker] = None
+
 def get_sanitized_db_url() -> str:
     """
     Get the database URL with SSLMode parameter removed for compatibility.
@@ -52,4 +55,25 @@ async def get_db_session() -> Optional[AsyncSession]:
         return async_session()
     except Exception as e:
         logger.error(f"Error creating database session: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    Get a shared async session factory for the memory database.
+    
+    Unlike get_db_session, the engine (and its connection pool) is created
+    once and reused, which suits long-lived background writers.
+    
+    Returns:
+        Session factory producing AsyncSession instances
+    """
+    global _session_factory
+    
+    if _session_factory is None:
+        engine = create_async_engine(get_sanitized_db_url(), pool_pre_ping=True)
+        _session_factory = sessionmaker(
+            engine, expire_on_commit=False, class_=AsyncSession
+        )
+        
+    return _session_factory
@@ -0,0 +1,218 @@
+"""
+Non-blocking eviction for the mem0 memory system.
+
+Bulk deletes iterate keys with SCAN cursors and remove them with UNLINK
+in bounded batches, so large clears never block Redis the way KEYS and
+multi-thousand-key DEL calls do. The MemorySweeper runs the same kind of
+incremental work in the background to drop index references to memories
+that have expired.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EvictionProgress:
+    """
+    Progress of a batched eviction run.
+    
+    Attributes:
+        scanned: Number of keys or members examined
+        deleted: Number of memories (or references) removed
+        batches: Number of batches sent to Redis
+        started_at: Monotonic start time
+    """
+    scanned: int = 0
+    deleted: int = 0
+    batches: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the run started."""
+        return time.monotonic() - self.started_at
+    
+    def as_dict(self) -> dict:
+        """Get the progress as a dictionary."""
+        return {
+            "scanned": self.scanned,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+# Called after every batch with the progress so far
+ProgressCallback = Callable[[EvictionProgress], None]
+
+
+def report_progress(progress: EvictionProgress, progress_callback: Optional[ProgressCallback]) -> None:
+    """
+    Record a finished batch and notify the progress callback.
+    
+    Args:
+        progress: Progress of the current run
+        progress_callback: Optional callback to notify
+    """
+    progress.batches += 1
+    if progress_callback:
+        try:
+            progress_callback(progress)
+        except Exception as e:
+            logger.warning(f"Error in eviction progress callback: {str(e)}")
+
+
+def batched(items: List[Any], batch_size: int) -> List[List[Any]]:
+    """
+    Split a list into batches.
+    
+    Args:
+        items: Items to split
+        batch_size: Maximum batch size
+    
+    Returns:
+        List of batches
+    """
+    return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+
+class MemorySweeper:
+    """
+    Periodic background task that prunes references to expired memories.
+    
+    Memory entries expire by TTL, but the per-type, per-agent and custom
+    index sets outlive them. Each sweep walks those sets with SCAN/SSCAN/ZSCAN
+    and removes members whose entry no longer exists, one bounded batch at
+    a time, yielding to the event loop between batches.
+    """
+    
+    # Index keys whose members are memory entry IDs
+    SET_PATTERNS = ("mem0:types:*", "mem0:agents:*", "mem0:sessions:*", "mem0:conversations:*", "mem0:index:*")
+    SORTED_SET_PATTERNS = ("mem0:chronological:*",)
+    
+    def __init__(self, mem0: Any, interval: float = 300.0, batch_size: int = 500):
+        """
+        Initialize the sweeper.
+        
+        Args:
+            mem0: AsyncMem0 instance whose keyspace is swept
+            interval: Seconds between sweeps
+            batch_size: Maximum number of members checked per round trip
+        """
+        self.mem0 = mem0
+        self.redis = mem0.redis
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.last_progress: Optional[EvictionProgress] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the periodic sweep task if it is not running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Started memory sweeper (interval={self.interval}s, batch_size={self.batch_size})")
+    
+    async def stop(self) -> None:
+        """Stop the periodic sweep task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self) -> None:
+        """Background loop: sweep, then wait for the next interval."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error sweeping memory references: {str(e)}")
+    
+    async def sweep_once(self, progress_callback: Optional[ProgressCallback] = None) -> EvictionProgress:
+        """
+        Run one full sweep of the index sets.
+        
+        Args:
+            progress_callback: Optional callback invoked after every batch
+        
+        Returns:
+            Progress of the sweep
+        """
+        progress = EvictionProgress()
+        
+        for pattern in self.SET_PATTERNS:
+            async for key in self.redis.scan_iter(match=pattern, count=self.batch_size, _type="set"):
+                members = []
+                async for member in self.redis.sscan_iter(key, count=self.batch_size):
+                    members.append(member)
+                for batch in batched(members, self.batch_size):
+                    await self._prune(key, batch, sorted_set=False, progress=progress, progress_callback=progress_callback)
+        
+        for pattern in self.SORTED_SET_PATTERNS:
+            async for key in self.redis.scan_iter(match=pattern, count=self.batch_size, _type="zset"):
+                members = []
+                async for member, _ in self.redis.zscan_iter(key, count=self.batch_size):
+                    members.append(member)
+                for batch in batched(members, self.batch_size):
+                    await self._prune(key, batch, sorted_set=True, progress=progress, progress_callback=progress_callback)
+        
+        self.last_progress = progress
+        logger.info(f"Memory sweep finished: {progress.as_dict()}")
+        return progress
+    
+    async def _prune(
+        self,
+        key: str,
+        memory_ids: List[str],
+        sorted_set: bool,
+        progress: EvictionProgress,
+        progress_callback: Optional[ProgressCallback]
+    ) -> None:
+        """
+        Remove the members of one batch whose memory no longer exists.
+        
+        Args:
+            key: Set or sorted set key
+            memory_ids: Members to check
+            sorted_set: Whether the key is a sorted set
+            progress: Progress of the current sweep
+            progress_callback: Optional callback to notify
+        """
+        progress.scanned += len(memory_ids)
+        
+        location_keys = [self.mem0._get_location_key(memory_id) for memory_id in memory_ids]
+        primary_keys = await self.redis.mget(location_keys)
+        unindexed = [memory_id for memory_id, primary_key in zip(memory_ids, primary_keys) if not primary_key]
+        if not unindexed:
+            report_progress(progress, progress_callback)
+            return
+        
+        # Entries written before the ID index have no location key; check their keys directly
+        pipeline = self.redis.pipeline(transaction=False)
+        for memory_id in unindexed:
+            pipeline.exists(*self.mem0._legacy_candidate_keys(memory_id))
+        exists = await pipeline.execute()
+        
+        dead = [memory_id for memory_id, count in zip(unindexed, exists) if not count]
+        if dead:
+            if sorted_set:
+                await self.redis.zrem(key, *dead)
+            else:
+                await self.redis.srem(key, *dead)
+            progress.deleted += len(dead)
+        
+        report_progress(progress, progress_callback)
+        
+        # Let live traffic run between batches
+        await asyncio.sleep(0)
@@ -9,21 +9,156 @@ import logging
 from typing import Dict, Optional, Any
 
 from backend.memory.mem0 import Mem0
+from backend.memory.async_mem0 import AsyncMem0
 from backend.memory.config import MemoryConfig
-from backend.memory.database import get_db_session
+from backend.memory.connection import RedisConnectionManager
+from backend.memory.archiver import MemoryArchiver
+from backend.memory.eviction import MemorySweeper
+from backend.memory.session_cache import SessionCache
+from backend.memory.window import ConversationSummarizer, create_llm_summarizer
+from backend.memory.vector_index import InMemoryVectorIndex, PgVectorMemoryIndex
+from backend.memory.database import get_db_session, get_session_factory
 
 logger = logging.getLogger(__name__)
 
-# Global dictionary to store mem0 instances by name
-_mem0_instances: Dict[str, Mem0] = {}
+# Global dictionaries to store mem0 instances by name
+_mem0_instances: Dict[str, AsyncMem0] = {}
+_mem0_sync_instances: Dict[str, Mem0] = {}
 
+# Shared Redis connection managers by Redis URL
+_connection_managers: Dict[str, RedisConnectionManager] = {}
 
-async def get_mem0(name: str = "default", config: Optional[MemoryConfig] = None) -> Mem0:
+# Shared write-behind archiver for long-term memories
+_archiver: Optional[MemoryArchiver] = None
+
+# Background sweepers pruning expired memory references, by Redis URL
+_sweepers: Dict[str, MemorySweeper] = {}
+
+# Shared background summarizer for conversation windows
+_summarizer: Optional[ConversationSummarizer] = None
+
+# Process-local caches of hot conversations, by Redis URL
+_session_caches: Dict[str, SessionCache] = {}
+
+
+def get_connection_manager(config: MemoryConfig) -> RedisConnectionManager:
+    """
+    Get or create the pooled Redis connection manager for a configuration.
+    
+    Async mem0 instances that use the same Redis URL share one pool.
+    
+    Args:
+        config: Memory configuration
+        
+    Returns:
+        RedisConnectionManager instance
+    """
+    manager = _connection_managers.get(config.redis_url)
+    if manager is None:
+        manager = RedisConnectionManager(config)
+        _connection_managers[config.redis_url] = manager
+    return manager
+
+
+def get_archiver(config: MemoryConfig) -> MemoryArchiver:
+    """
+    Get or create the write-behind archiver for long-term memories.
+    
+    Args:
+        config: Memory configuration
+        
+    Returns:
+        MemoryArchiver instance
+    """
+    global _archiver
+    
+    if _archiver is None:
+        _archiver = MemoryArchiver(
+            session_factory=get_session_factory(),
+            chunk_size=config.db_chunk_size,
+            max_queue_size=config.archive_queue_size,
+            flush_interval=config.archive_flush_interval,
+            max_retries=config.archive_max_retries,
+            retry_backoff=config.archive_retry_backoff
+        )
+    return _archiver
+
+
+def get_summarizer(config: MemoryConfig) -> Optional[ConversationSummarizer]:
+    """
+    Get or create the background conversation summarizer.
+    
+    Args:
+        config: Memory configuration
+        
+    Returns:
+        ConversationSummarizer instance, or None if no summary model is available
+    """
+    global _summarizer
+    
+    if _summarizer is None:
+        try:
+            summarize_fn = create_llm_summarizer(config.summary_model)
+        except Exception as e:
+            logger.warning(f"Conversation summaries unavailable: {str(e)}")
+            summarize_fn = None
+        if summarize_fn is not None:
+            _summarizer = ConversationSummarizer(summarize_fn, min_messages=config.summary_min_messages)
+    return _summarizer
+
+
+def get_session_cache(config: MemoryConfig) -> Optional[SessionCache]:
+    """
+    Get or create the process-local conversation cache for a configuration.
+    
+    All async mem0 instances using the same Redis URL share one cache, and
+    its invalidation listener holds one pooled connection.
+    
+    Args:
+        config: Memory configuration
+        
+    Returns:
+        SessionCache instance, or None if the cache is disabled
+    """
+    if config.session_cache_size <= 0:
+        return None
+    
+    cache = _session_caches.get(config.redis_url)
+    if cache is None:
+        cache = SessionCache(max_sessions=config.session_cache_size, ttl=config.session_cache_ttl)
+        cache.start_listener(get_connection_manager(config).get_client())
+        _session_caches[config.redis_url] = cache
+    return cache
+
+
+def get_memory_stats() -> Dict[str, Any]:
     """
-    Get or create a mem0 instance by name.
+    Get monitoring counters of the memory system in this process.
+    
+    Returns:
+        Dictionary with session cache, archiver, summarizer and embedding counters
+    """
+    return {
+        "session_cache": {url: cache.stats() for url, cache in _session_caches.items()},
+        "archiver": _archiver.stats() if _archiver is not None else None,
+        "summarizer": {
+            "summaries": _summarizer.summary_count,
+            "failed": _summarizer.failed_count,
+        } if _summarizer is not None else None,
+        "embeddings": {
+            name: mem0.embedding_service.stats()
+            for name, mem0 in _mem0_instances.items() if mem0.embedding_service is not None
+        },
+    }
+
+
+async def get_mem0(name: str = "default", config: Optional[MemoryConfig] = None) -> AsyncMem0:
+    """
+    Get or create an async mem0 instance by name.
     
     This function returns an existing mem0 instance if one exists with the given name,
-    or creates a new one if not.
+    or creates a new one if not. Instances are backed by redis.asyncio clients
+    drawn from a shared connection pool.
     
     Args:
         name: The name of the mem0 instance
@@ -41,13 +176,52 @@ async def get_mem0(name: str = "default", config: Optional[MemoryConfig] = None)
     # Create configuration if not provided
     config = config or MemoryConfig()
     
-    # Get database session
+    # Get database session and archiver
     db_session = await get_db_session() if config.use_database_storage else None
+    archiver = None
+    if config.use_database_storage:
+        archiver = get_archiver(config)
+        archiver.start()
+    
+    # Semantic search components
+    embedding_service = None
+    vector_index = None
+    archive_index = None
+    if config.use_vector_search:
+        try:
+            from backend.orchestration.embedding_service import EmbeddingService
+            # Embeddings are cached in the memory Redis so restarts and other workers reuse them
+            embedding_service = EmbeddingService(redis_client=get_connection_manager(config).get_client())
+            vector_index = InMemoryVectorIndex(
+                dimensions=embedding_service.config.dimensions,
+                max_entries=config.vector_index_max_entries
+            )
+            if config.use_database_storage:
+                archive_index = PgVectorMemoryIndex(get_session_factory())
+        except Exception as e:
+            logger.warning(f"Vector search enabled but unavailable: {str(e)}")
+            embedding_service = None
     
     # Create new instance
-    mem0 = Mem0(memory_config=config, db_session=db_session)
+    mem0 = AsyncMem0(
+        memory_config=config,
+        db_session=db_session,
+        connection_manager=get_connection_manager(config),
+        archiver=archiver,
+        embedding_service=embedding_service,
+        vector_index=vector_index,
+        archive_index=archive_index,
+        summarizer=get_summarizer(config),
+        session_cache=get_session_cache(config)
+    )
     _mem0_instances[name] = mem0
     
+    # One sweeper per Redis keyspace is enough
+    if config.memory_sweep_interval > 0 and config.redis_url not in _sweepers:
+        sweeper = MemorySweeper(mem0, interval=config.memory_sweep_interval, batch_size=config.eviction_batch_size)
+        sweeper.start()
+        _sweepers[config.redis_url] = sweeper
+    
     logger.info(f"Created new mem0 instance: {name}")
     return mem0
 
@@ -56,8 +230,8 @@ def get_mem0_sync(name: str = "default", config: Optional[MemoryConfig] = None)
     """
     Get or create a mem0 instance by name (synchronous version).
     
-    This function returns an existing mem0 instance if one exists with the given name,
-    or creates a new one without database support if not.
+    This function returns an existing synchronous mem0 instance if one exists with
+    the given name, or creates a new one without database support if not.
     
     Args:
         name: The name of the mem0 instance
@@ -66,11 +240,11 @@ def get_mem0_sync(name: str = "default", config: Optional[MemoryConfig] = None)
     Returns:
         Mem0 instance
     """
-    global _mem0_instances
+    global _mem0_sync_instances
     
     # Return existing instance if available
-    if name in _mem0_instances:
-        return _mem0_instances[name]
+    if name in _mem0_sync_instances:
+        return _mem0_sync_instances[name]
     
     # Create configuration if not provided
     config = config or MemoryConfig()
@@ -80,7 +254,7 @@ def get_mem0_sync(name: str = "default", config: Optional[MemoryConfig] = None)
     
     # Create new instance
     mem0 = Mem0(memory_config=config, db_session=None)
-    _mem0_instances[name] = mem0
+    _mem0_sync_instances[name] = mem0
     
     logger.info(f"Created new synchronous mem0 instance: {name}")
     return mem0
@@ -96,12 +270,52 @@ def reset_mem0(name: Optional[str] = None) -> None:
     Args:
         name: Optional name of the instance to reset
     """
-    global _mem0_instances
+    global _mem0_instances, _mem0_sync_instances
     
     if name is not None:
-        if name in _mem0_instances:
-            del _mem0_instances[name]
+        if name in _mem0_instances or name in _mem0_sync_instances:
+            _mem0_instances.pop(name, None)
+            _mem0_sync_instances.pop(name, None)
             logger.info(f"Reset mem0 instance: {name}")
     else:
         _mem0_instances = {}
-        logger.info("Reset all mem0 instances")
\ No newline at end of file
+        _mem0_sync_instances = {}
+        logger.info("Reset all mem0 instances")
+
+
+async def close_mem0_connections() -> None:
+    """
+    Stop memory sweepers, flush pending archival, close all shared Redis connection pools and
+    reset mem0 instances.
+    
+    Intended for application shutdown.
+    """
+    global _connection_managers, _archiver, _sweepers, _summarizer, _session_caches
+    
+    for sweeper in _sweepers.values():
+        await sweeper.stop()
+    _sweepers = {}
+    
+    for cache in _session_caches.values():
+        await cache.stop_listener()
+    _session_caches = {}
+    
+    if _summarizer is not None:
+        await _summarizer.wait()
+        _summarizer = None
+    
+    if _archiver is not None:
+        try:
+            await _archiver.stop()
+        except Exception as e:
+            logger.warning(f"Error flushing memory archiver: {str(e)}")
+        _archiver = None
+    
+    for manager in _connection_managers.values():
+        try:
+            await manager.close()
+        except Exception as e:
+            logger.warning(f"Error closing Redis connection pool: {str(e)}")
+            
+    _connection_managers = {}
+    reset_mem0()
\ No newline at end of file
@@ -16,11 +16,12 @@ import time
 import uuid
 import logging
 from enum import Enum
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Any, Optional, Set, Union, Tuple
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
 
 import redis
+from redis.client import NEVER_DECODE
 # Import fakeredis for testing without a real Redis server
 try:
     import fakeredis
@@ -35,9 +36,29 @@ from backend.memory.schema import MemoryEntryModel, MemoryIndexModel, MemoryCont
 from backend.memory.config import MemoryConfig
 from backend.memory.utils import serialize_datetime, deserialize_datetime, safe_json_dumps, safe_json_loads
 from backend.memory.database import get_sanitized_db_url, get_db_session
+from backend.memory.archiver import MemoryArchiver
+from backend.memory.vector_index import encode_embedding, decode_embedding
+from backend.memory.query import QueryPlan, plan_query
+from backend.memory.codec import encode_memory, decode_memory, resolve_codec
+from backend.memory.eviction import EvictionProgress, ProgressCallback, batched, report_progress
+from backend.memory.session_cache import ALL_CONVERSATIONS, publish_invalidation
 
 logger = logging.getLogger(__name__)
 
+# Resolves an entry ID to its document in a single round trip: the entry
+# location key holds the primary key of the stored memory.
+_GET_BY_ID_SCRIPT = """
+local primary_key = redis.call('GET', KEYS[1])
+if not primary_key then
+    return nil
+end
+return redis.call('GET', primary_key)
+"""
+
+# Command option that returns raw bytes from a client created with
+# decode_responses=True; stored memories may be binary records
+_RAW = {NEVER_DECODE: True}
+
 class MemoryType(str, Enum):
     """Types of memory entries in the mem0 system."""
     MESSAGE = "message"           # Conversation messages
@@ -48,6 +69,20 @@ class MemoryType(str, Enum):
     INSTRUCTION = "instruction"   # System instructions
 
 
+_MEMORY_TYPE_VALUES = frozenset(memory_type.value for memory_type in MemoryType)
+
+
+# Number of candidate memories fetched per round trip during search
+SEARCH_FETCH_BATCH = 100
+
+# Memory types that are embedded for semantic search
+SEARCHABLE_MEMORY_TYPES = frozenset({
+    MemoryType.MESSAGE.value,
+    MemoryType.FACT.value,
+    MemoryType.SUMMARY.value,
+})
+
+
 class MemoryScope(str, Enum):
     """Scope of memory storage."""
     WORKING = "working"           # Very short-term, active processing
@@ -60,9 +95,16 @@ class MemoryEntry:
     Represents a single memory entry in the mem0 system.
     
     This class is used for both creating new memories and
-    representing retrieved memories.
+    representing retrieved memories. Attributes are held in __slots__
+    since history reads decode many entries at once, and stored
+    embeddings are only decoded when first accessed.
     """
     
+    __slots__ = (
+        "entry_id", "content", "memory_type", "session_id", "conversation_id", "agent_id", "role",
+        "importance", "metadata", "created_at", "expires_at", "_embedding", "indexes", "contexts"
+    )
+    
     def __init__(
         self,
         content: str,
@@ -93,11 +135,11 @@ class MemoryEntry:
             entry_id: Unique identifier (generated if not provided)
             created_at: Creation timestamp (current time if not provided)
             expires_at: Expiration timestamp (None = never expires)
-            embedding: Vector embedding for semantic search
+            embedding: Vector embedding for semantic search (or its stored encoding)
         """
         self.entry_id = entry_id or str(uuid.uuid4())
         self.content = content
-        self.memory_type = memory_type if isinstance(memory_type, str) else memory_type.value
+        self.memory_type = memory_type.value if isinstance(memory_type, MemoryType) else memory_type
         self.session_id = session_id
         self.conversation_id = conversation_id
         self.agent_id = agent_id
@@ -106,12 +148,28 @@ class MemoryEntry:
         self.metadata = metadata or {}
         self.created_at = created_at or datetime.utcnow()
         self.expires_at = expires_at
-        self.embedding = embedding
+        self._embedding = embedding
         
         # Dynamic attributes
         self.indexes: List[Dict[str, Any]] = []
         self.contexts: List[Dict[str, Any]] = []
         
+    @property
+    def embedding(self) -> Optional[List[float]]:
+        """Vector embedding, decoded from its stored encoding on first access."""
+        if isinstance(self._embedding, (str, bytes)):
+            self._embedding = decode_embedding(self._embedding)
+        return self._embedding
+    
+    @embedding.setter
+    def embedding(self, value: Optional[List[float]]) -> None:
+        self._embedding = value
+    
+    @property
+    def raw_embedding(self) -> Any:
+        """Embedding as currently held, without decoding it."""
+        return self._embedding
+    
     def add_index(self, index_type: str, key: str, value: Optional[str] = None) -> None:
         """
         Add an index for efficient retrieval of this memory.
@@ -159,7 +217,7 @@ class MemoryEntry:
             "metadata": self.metadata,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "expires_at": self.expires_at.isoformat() if self.expires_at else None,
-            "embedding": self.embedding,
+            "embedding": encode_embedding(self.embedding),
             "indexes": self.indexes,
             "contexts": self.contexts
         }
@@ -268,37 +326,39 @@ class Mem0:
     PostgreSQL for long-term archival.
     """
     
-    def __init__(self, memory_config: Optional[MemoryConfig] = None, db_session: Optional[AsyncSession] = None):
+    def __init__(
+        self,
+        memory_config: Optional[MemoryConfig] = None,
+        db_session: Optional[AsyncSession] = None,
+        archiver: Optional[MemoryArchiver] = None
+    ):
         """
         Initialize the mem0 memory system.
         
         Args:
             memory_config: Memory configuration
             db_session: Database session for long-term storage
+            archiver: Write-behind archiver for long-term memories
         """
         self.config = memory_config or MemoryConfig()
         self.db_session = db_session
+        self.archiver = archiver
+        self.codec = resolve_codec(self.config.memory_codec)
+        
+        # AsyncMem0 workers may cache conversations in process; writes made here must invalidate them
+        self.invalidate_session_caches = self.config.session_cache_size > 0
+        self.cache_origin = uuid.uuid4().hex
         
         # Initialize Redis connection
         redis_url = self.config.redis_url
+        self.redis = self._create_redis_client(redis_url)
         
-        # Check if we should use fakeredis (for testing without a real Redis server)
-        parsed_url = urlparse(redis_url)
-        if parsed_url.scheme == 'fakeredis' and HAS_FAKEREDIS:
-            logger.info("Using fakeredis for testing")
-            self.redis = fakeredis.FakeRedis(decode_responses=True)
-        else:
-            # Use real Redis
-            try:
-                self.redis = redis.from_url(redis_url, decode_responses=True)
-            except Exception as e:
-                logger.warning(f"Failed to connect to Redis at {redis_url}, falling back to fakeredis: {str(e)}")
-                if HAS_FAKEREDIS:
-                    self.redis = fakeredis.FakeRedis(decode_responses=True)
-                else:
-                    logger.error("fakeredis not available, Redis operations will fail")
-                    # Create a mock Redis that logs errors instead of raising exceptions
-                    self.redis = redis.from_url("redis://localhost:6379/0", decode_responses=True)
+        # Server-side lookup script; disabled automatically on backends without scripting
+        self._get_by_id_script = None
+        try:
+            self._get_by_id_script = self.redis.register_script(_GET_BY_ID_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Redis scripting unavailable, using two-step ID lookup: {str(e)}")
         
         # Memory expiration defaults (in seconds)
         self.default_expiration = {
@@ -316,6 +376,33 @@ class Mem0:
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {str(e)}")
             
+    def _create_redis_client(self, redis_url: str) -> Any:
+        """
+        Create the synchronous Redis client for this instance.
+        
+        Args:
+            redis_url: Redis connection URL (fakeredis:// for an in-process server)
+            
+        Returns:
+            Redis client
+        """
+        # Check if we should use fakeredis (for testing without a real Redis server)
+        parsed_url = urlparse(redis_url)
+        if parsed_url.scheme == 'fakeredis' and HAS_FAKEREDIS:
+            logger.info("Using fakeredis for testing")
+            return fakeredis.FakeRedis(decode_responses=True)
+            
+        # Use real Redis
+        try:
+            return redis.from_url(redis_url, decode_responses=True)
+        except Exception as e:
+            logger.warning(f"Failed to connect to Redis at {redis_url}, falling back to fakeredis: {str(e)}")
+            if HAS_FAKEREDIS:
+                return fakeredis.FakeRedis(decode_responses=True)
+            logger.error("fakeredis not available, Redis operations will fail")
+            # Create a mock Redis that logs errors instead of raising exceptions
+            return redis.from_url("redis://localhost:6379/0", decode_responses=True)
+    
     def _get_key(self, memory_type: str, scope: str, identifier: str) -> str:
         """
         Generate a Redis key for a memory entry.
@@ -330,6 +417,21 @@ class Mem0:
         """
         return f"mem0:{scope}:{memory_type}:{identifier}"
     
+    def _get_location_key(self, memory_id: str) -> str:
+        """
+        Generate the Redis key of the ID index entry for a memory.
+        
+        The ID index maps an entry ID to the primary key under which the
+        memory is stored, so lookups do not need to know its type or scope.
+        
+        Args:
+            memory_id: The memory entry ID
+            
+        Returns:
+            Redis key string
+        """
+        return f"mem0:entry:{memory_id}"
+    
     def _get_index_key(self, index_type: str, key: str, value: Optional[str] = None) -> str:
         """
         Generate a Redis key for a memory index.
@@ -346,46 +448,50 @@ class Mem0:
             return f"mem0:index:{index_type}:{key}:{value}"
         return f"mem0:index:{index_type}:{key}"
     
-    def add_memory(
-        self,
-        memory: MemoryEntry,
-        scope: Union[MemoryScope, str] = MemoryScope.SHORT_TERM,
-        ttl: Optional[int] = None
-    ) -> str:
+    def _resolve_ttl(self, scope_str: str, ttl: Optional[int] = None) -> Optional[int]:
         """
-        Add a memory entry to the system.
+        Get the TTL for a memory scope unless one is explicitly provided.
         
         Args:
-            memory: The memory entry to add
-            scope: Memory scope (working, short_term, long_term)
-            ttl: Time-to-live in seconds (overrides default for scope)
+            scope_str: Memory scope value
+            ttl: Explicit time-to-live in seconds
             
         Returns:
-            Memory entry ID
+            Time-to-live in seconds, or None for no expiration
         """
-        # Get the memory as a dictionary
-        memory_dict = memory.to_dict()
-        memory_json = json.dumps(memory_dict)
-        
-        # Use the scope string if a MemoryScope enum was provided
-        scope_str = scope.value if isinstance(scope, MemoryScope) else scope
-        
-        # Get TTL based on scope if not explicitly provided
         if ttl is None and scope_str in self.default_expiration:
             ttl = self.default_expiration[scope_str]
+        return ttl
+    
+    def _queue_memory_writes(self, pipeline: Any, memory: MemoryEntry, scope_str: str, ttl: Optional[int]) -> None:
+        """
+        Queue the commands that store a memory entry and its indexes.
+        
+        Works with both synchronous and asyncio Redis pipelines, since
+        queuing a command does not perform I/O.
+        
+        Args:
+            pipeline: Redis pipeline to queue commands on
+            memory: The memory entry to store
+            scope_str: Memory scope value
+            ttl: Time-to-live in seconds (None = no expiration)
+        """
+        # Encode the memory with the configured codec
+        memory_data = encode_memory(memory, self.codec)
         
         # Generate the main memory key
-        session_id = memory.session_id or "global"
-        conversation_id = memory.conversation_id or session_id
         primary_key = self._get_key(memory.memory_type, scope_str, memory.entry_id)
         
-        # Store the memory in Redis
-        pipeline = self.redis.pipeline()
-        
         # Store the main memory entry
-        pipeline.set(primary_key, memory_json)
+        pipeline.set(primary_key, memory_data)
         if ttl:
             pipeline.expire(primary_key, ttl)
+        
+        # Record where the entry lives in the ID index
+        location_key = self._get_location_key(memory.entry_id)
+        pipeline.set(location_key, primary_key)
+        if ttl:
+            pipeline.expire(location_key, ttl)
             
         # Add to session list if applicable
         if memory.session_id:
@@ -414,7 +520,7 @@ class Mem0:
         if memory.conversation_id:
             # Use a sorted set with timestamp as score for chronological access
             chrono_key = f"mem0:chronological:{memory.conversation_id}"
-            timestamp = time.mktime(memory.created_at.timetuple())
+            timestamp = time.mktime(memory.created_at.timetuple()) + memory.created_at.microsecond / 1e6
             pipeline.zadd(chrono_key, {memory.entry_id: timestamp})
             if ttl:
                 pipeline.expire(chrono_key, ttl)
@@ -425,79 +531,57 @@ class Mem0:
             pipeline.sadd(index_key, memory.entry_id)
             if ttl:
                 pipeline.expire(index_key, ttl)
+    
+    def add_memory(
+        self,
+        memory: MemoryEntry,
+        scope: Union[MemoryScope, str] = MemoryScope.SHORT_TERM,
+        ttl: Optional[int] = None
+    ) -> str:
+        """
+        Add a memory entry to the system.
+        
+        Args:
+            memory: The memory entry to add
+            scope: Memory scope (working, short_term, long_term)
+            ttl: Time-to-live in seconds (overrides default for scope)
+            
+        Returns:
+            Memory entry ID
+        """
+        # Use the scope string if a MemoryScope enum was provided
+        scope_str = scope.value if isinstance(scope, MemoryScope) else scope
+        ttl = self._resolve_ttl(scope_str, ttl)
+        
+        # Store the memory in Redis
+        pipeline = self.redis.pipeline()
+        self._queue_memory_writes(pipeline, memory, scope_str, ttl)
+        if memory.conversation_id:
+            self._queue_cache_invalidation(pipeline, memory.conversation_id)
         
         # Execute all Redis commands
         pipeline.execute()
         
-        # If this is long-term memory and we have a database session, store in PostgreSQL too
-        # Note: Database storage is done in the background, we don't await it here
+        # If this is long-term memory and we have an archiver, store in PostgreSQL too
+        # Note: Database storage is done in the background by the archiver,
         # to keep the memory operations fast and non-blocking
-        if scope_str == MemoryScope.LONG_TERM.value and self.db_session:
-            # Schedule this for background processing
-            # In a real implementation, you'd use a background task
-            logger.debug(f"Scheduled {memory.entry_id} for database storage")
+        if scope_str == MemoryScope.LONG_TERM.value and self.archiver:
+            if self.archiver.submit_nowait(memory):
+                logger.debug(f"Scheduled {memory.entry_id} for database storage")
             
         logger.debug(f"Added memory {memory.entry_id} to {scope_str} memory")
         return memory.entry_id
     
-    async def _store_in_database(self, memory: MemoryEntry) -> None:
+    def _queue_cache_invalidation(self, pipeline: Any, conversation_id: str) -> None:
         """
-        Store a memory entry in the PostgreSQL database for long-term storage.
-        This is an async operation that should be awaited.
+        Queue a session cache invalidation for a conversation if caching is enabled.
         
         Args:
-            memory: The memory entry to store
+            pipeline: Redis pipeline (or client) to publish on
+            conversation_id: The conversation ID, or ALL_CONVERSATIONS
         """
-        if not self.db_session:
-            logger.warning("Database session not available for long-term storage")
-            return
-            
-        try:
-            # Create the memory entry model
-            entry = MemoryEntryModel(
-                id=uuid.UUID(memory.entry_id) if isinstance(memory.entry_id, str) else memory.entry_id,
-                session_id=memory.session_id,
-                conversation_id=memory.conversation_id,
-                agent_id=memory.agent_id,
-                memory_type=memory.memory_type,
-                role=memory.role,
-                content=memory.content,
-                importance=memory.importance,
-                relevance=1.0,  # Default
-                recency=1.0,    # Default
-                embedding=memory.embedding,
-                meta_data=memory.metadata,  # Use meta_data instead of metadata
-                created_at=memory.created_at,
-                expires_at=memory.expires_at
-            )
-            
-            # Add indexes
-            for idx in memory.indexes:
-                index = MemoryIndexModel(
-                    entry_id=entry.id,
-                    index_type=idx['index_type'],
-                    key=idx['key'],
-                    value=idx['value']
-                )
-                entry.indexes.append(index)
-                
-            # Add contexts
-            for ctx in memory.contexts:
-                context = MemoryContextModel(
-                    entry_id=entry.id,
-                    context_type=ctx['context_type'],
-                    data=ctx['data']
-                )
-                entry.contexts.append(context)
-                
-            # Add to database
-            self.db_session.add(entry)
-            await self.db_session.commit()
-            logger.debug(f"Stored memory {memory.entry_id} in database")
-            
-        except Exception as e:
-            logger.error(f"Error storing memory in database: {str(e)}")
-            await self.db_session.rollback()
+        if self.invalidate_session_caches:
+            publish_invalidation(pipeline, self.cache_origin, conversation_id)
     
     def get_memory(self, memory_id: str, include_expired: bool = False) -> Optional[MemoryEntry]:
         """
@@ -511,54 +595,198 @@ class Mem0:
         Returns:
             MemoryEntry if found, None otherwise
         """
-        # Try to find in any scope
-        for scope in [MemoryScope.WORKING, MemoryScope.SHORT_TERM, MemoryScope.LONG_TERM]:
-            # We don't know the memory type, so we need to check possible types
-            for memory_type in MemoryType:
-                key = self._get_key(memory_type.value, scope.value, memory_id)
-                memory_json = self.redis.get(key)
-                
-                if memory_json:
-                    try:
-                        memory_dict = json.loads(memory_json)
-                        memory = MemoryEntry.from_dict(memory_dict)
-                        
-                        # Check if memory is expired
-                        if not include_expired and memory.expires_at:
-                            if memory.expires_at < datetime.utcnow():
-                                continue
-                                
-                        return memory
-                    except Exception as e:
-                        logger.error(f"Error parsing memory {memory_id}: {str(e)}")
-        
-        # Special case for fakeredis: check all keys containing memory_id
-        # This is a fallback for fakeredis which might handle keys differently
+        memory_data = self._fetch_memory_data(memory_id)
+        if not memory_data:
+            return None
+            
+        # For the synchronous version, we only check Redis
+        return self._decode_memory(memory_id, memory_data, include_expired)
+    
+    def _decode_memory(
+        self,
+        memory_id: str,
+        memory_data: Union[str, bytes],
+        include_expired: bool = False,
+        type_value: Optional[str] = None
+    ) -> Optional[MemoryEntry]:
+        """
+        Decode a stored memory document and apply the read filters.
+        
+        Args:
+            memory_id: The memory entry ID
+            memory_data: The stored value (binary record or JSON document)
+            include_expired: Whether to include expired memories
+            type_value: Optional memory type the entry must have
+            
+        Returns:
+            MemoryEntry if it decodes and passes the filters, None otherwise
+        """
         try:
-            if isinstance(self.redis, redis.Redis):
-                for key in self.redis.keys(f"*{memory_id}*"):
-                    memory_json = self.redis.get(key)
-                    if memory_json:
-                        try:
-                            memory_dict = json.loads(memory_json)
-                            memory = MemoryEntry.from_dict(memory_dict)
-                            
-                            # If this is the entry we're looking for
-                            if memory.entry_id == memory_id:
-                                # Check if memory is expired
-                                if not include_expired and memory.expires_at:
-                                    if memory.expires_at < datetime.utcnow():
-                                        continue
-                                        
-                                return memory
-                        except Exception:
-                            # Ignore parsing errors in this fallback check
-                            pass
+            memory = MemoryEntry.from_dict(decode_memory(memory_data))
         except Exception as e:
-            logger.debug(f"Error in FakeRedis fallback check: {str(e)}")
+            logger.error(f"Error parsing memory {memory_id}: {str(e)}")
+            return None
             
-        # For the synchronous version, we only check Redis
+        if type_value and memory.memory_type != type_value:
+            return None
+            
+        # Check if memory is expired
+        if not include_expired and memory.expires_at:
+            if memory.expires_at < datetime.utcnow():
+                return None
+                
+        return memory
+    
+    def _fetch_memory_data(self, memory_id: str) -> Optional[bytes]:
+        """
+        Fetch the stored value of a memory entry by ID.
+        
+        Uses the ID index written by add_memory. When legacy probing is
+        enabled, entries written before the index existed are located with a
+        single pipelined probe of the possible scope/type keys and the index
+        is backfilled for them.
+        
+        Args:
+            memory_id: The memory entry ID
+            
+        Returns:
+            Stored value (bytes) if found, None otherwise
+        """
+        location_key = self._get_location_key(memory_id)
+        
+        if self._get_by_id_script is not None:
+            try:
+                memory_data = self._eval_get_by_id(location_key)
+                if memory_data:
+                    return memory_data
+            except redis.exceptions.NoScriptError:
+                # Script cache was flushed; reload it and retry once
+                try:
+                    self.redis.script_load(_GET_BY_ID_SCRIPT)
+                    memory_data = self._eval_get_by_id(location_key)
+                    if memory_data:
+                        return memory_data
+                except Exception as e:
+                    logger.debug(f"Disabling scripted ID lookup after reload failure: {str(e)}")
+                    self._get_by_id_script = None
+            except redis.exceptions.ResponseError as e:
+                logger.debug(f"Disabling scripted ID lookup: {str(e)}")
+                self._get_by_id_script = None
+            
+        if self._get_by_id_script is None:
+            primary_key = self.redis.get(location_key)
+            if primary_key:
+                memory_data = self.redis.execute_command("GET", primary_key, **_RAW)
+                if memory_data:
+                    return memory_data
+                    
+        if self.config.probe_legacy_keys:
+            return self._probe_legacy_memory(memory_id)
         return None
+    
+    def _eval_get_by_id(self, location_key: str) -> Any:
+        """
+        Run the ID lookup script, returning the stored value undecoded.
+        
+        Works with both synchronous and asyncio clients; the asyncio client
+        returns an awaitable.
+        
+        Args:
+            location_key: ID index key of the memory
+            
+        Returns:
+            Stored value (bytes) or None
+        """
+        return self.redis.execute_command("EVALSHA", self._get_by_id_script.sha, 1, location_key, **_RAW)
+    
+    def _probe_legacy_memory(self, memory_id: str) -> Optional[str]:
+        """
+        Locate a memory that has no ID index entry.
+        
+        Args:
+            memory_id: The memory entry ID
+            
+        Returns:
+            Stored value (bytes) if found, None otherwise
+        """
+        return self._probe_legacy_memories([memory_id]).get(memory_id)
+        
+    def _probe_legacy_memories(self, memory_ids: List[str]) -> Dict[str, bytes]:
+        """
+        Locate several memories that have no ID index entry in one round trip.
+        
+        The ID index of every memory found is backfilled with the same
+        lifetime as the entry.
+        
+        Args:
+            memory_ids: The memory entry IDs
+            
+        Returns:
+            Stored values (bytes) by memory ID for the memories found
+        """
+        candidates = [(memory_id, key) for memory_id in memory_ids for key in self._legacy_candidate_keys(memory_id)]
+        
+        pipeline = self.redis.pipeline(transaction=False)
+        for _, key in candidates:
+            pipeline.execute_command("GET", key, **_RAW)
+        results = pipeline.execute()
+        
+        found: Dict[str, Tuple[str, bytes]] = {}
+        for (memory_id, key), memory_data in zip(candidates, results):
+            if memory_data and memory_id not in found:
+                found[memory_id] = (key, memory_data)
+        if not found:
+            return {}
+            
+        pipeline = self.redis.pipeline(transaction=False)
+        for key, _ in found.values():
+            pipeline.ttl(key)
+        ttls = pipeline.execute()
+        
+        pipeline = self.redis.pipeline(transaction=False)
+        for (memory_id, (key, _)), ttl in zip(found.items(), ttls):
+            pipeline.set(self._get_location_key(memory_id), key, ex=ttl if ttl and ttl > 0 else None)
+        pipeline.execute()
+        
+        return {memory_id: memory_data for memory_id, (_, memory_data) in found.items()}
+        
+    def _find_legacy_memory_ids(self, memory_ids: List[str]) -> Set[str]:
+        """
+        Find the memories without an ID index entry that still exist under a legacy key.
+        
+        Checks all candidate keys with one pipelined EXISTS per memory, in a
+        single round trip, so only IDs confirmed gone are pruned.
+        
+        Args:
+            memory_ids: The memory entry IDs
+            
+        Returns:
+            IDs of the memories that still exist
+        """
+        pipeline = self.redis.pipeline(transaction=False)
+        for memory_id in memory_ids:
+            pipeline.exists(*self._legacy_candidate_keys(memory_id))
+        counts = pipeline.execute()
+        return {memory_id for memory_id, count in zip(memory_ids, counts) if count}
+        
+    def _legacy_candidate_keys(self, memory_id: str) -> List[str]:
+        """
+        List every primary key a memory without an ID index entry may use.
+        
+        Args:
+            memory_id: The memory entry ID
+            
+        Returns:
+            List of Redis keys
+        """
+        # Older entries may have been keyed by the enum's string form
+        # (e.g. "MemoryType.MESSAGE") rather than its value
+        return [
+            self._get_key(type_name, scope.value, memory_id)
+            for scope in MemoryScope
+            for memory_type in MemoryType
+            for type_name in (memory_type.value, f"{MemoryType.__name__}.{memory_type.name}")
+        ]
         
     async def get_memory_async(self, memory_id: str, include_expired: bool = False) -> Optional[MemoryEntry]:
         """
@@ -643,22 +871,119 @@ class Mem0:
         if not memory_ids:
             return []
             
-        # Retrieve each memory
-        memories = []
-        for memory_id in memory_ids:
-            memory = self.get_memory(memory_id, include_expired=include_expired)
+        return self.get_memories_by_ids(
+            memory_ids,
+            memory_type=memory_type,
+            include_expired=include_expired,
+            conversation_id=conversation_id
+        )
+    
+    def get_memories_by_ids(
+        self,
+        memory_ids: List[str],
+        memory_type: Optional[Union[MemoryType, str]] = None,
+        include_expired: bool = False,
+        conversation_id: Optional[str] = None
+    ) -> List[MemoryEntry]:
+        """
+        Retrieve several memory entries in bulk, preserving the given order.
+        
+        The ID index is resolved with one MGET and the matching documents are
+        fetched with a second MGET. The memory type filter is applied to the
+        resolved primary keys, so documents of other types are never transferred.
+        
+        Args:
+            memory_ids: The memory entry IDs
+            memory_type: Optional filter for memory type
+            include_expired: Whether to include expired memories
+            conversation_id: Conversation whose chronological set the IDs were
+                read from; IDs whose entries are gone are pruned from it
             
-            if memory:
-                # Apply memory type filter if provided
-                if memory_type:
-                    type_value = memory_type.value if isinstance(memory_type, MemoryType) else memory_type
-                    if memory.memory_type != type_value:
-                        continue
+        Returns:
+            List of memory entries that were found
+        """
+        if not memory_ids:
+            return []
+            
+        memory_ids = list(memory_ids)
+        type_value = self._get_type_value(memory_type)
+        
+        # Resolve primary keys through the ID index
+        location_keys = [self._get_location_key(memory_id) for memory_id in memory_ids]
+        wanted = self._select_page_keys(memory_ids, self.redis.mget(location_keys), type_value)
+        
+        # Fetch all indexed documents in one round trip
+        indexed_keys = [primary_key for _, primary_key in wanted if primary_key]
+        documents = dict(zip(indexed_keys, self.redis.execute_command("MGET", *indexed_keys, **_RAW))) if indexed_keys else {}
+        
+        found = {
+            memory_id: documents[primary_key]
+            for memory_id, primary_key in wanted if primary_key and documents.get(primary_key)
+        }
+        missing = [memory_id for memory_id, _ in wanted if memory_id not in found]
+        if missing:
+            # Entries written before the ID index still live under a legacy key
+            legacy = self._find_legacy_memory_ids(missing)
+            if legacy and self.config.probe_legacy_keys:
+                found.update(self._probe_legacy_memories(list(legacy)))
+            expired = [memory_id for memory_id in missing if memory_id not in legacy]
+            if expired and conversation_id:
+                # Entries expired by TTL leave their IDs behind in the chronological set
+                self.redis.zrem(f"mem0:chronological:{conversation_id}", *expired)
+        
+        memories = []
+        for memory_id, _ in wanted:
+            memory_data = found.get(memory_id)
+            if not memory_data:
+                continue
                 
+            memory = self._decode_memory(memory_id, memory_data, include_expired, type_value)
+            if memory:
                 memories.append(memory)
-                
+            
         return memories
     
+    def _get_type_value(self, memory_type: Optional[Union[MemoryType, str]]) -> Optional[str]:
+        """
+        Normalize an optional memory type filter to its string value.
+        
+        Args:
+            memory_type: Memory type enum or string
+            
+        Returns:
+            Memory type value, or None if no filter was given
+        """
+        if not memory_type:
+            return None
+        return memory_type.value if isinstance(memory_type, MemoryType) else memory_type
+    
+    def _select_page_keys(
+        self,
+        memory_ids: List[str],
+        primary_keys: List[Optional[str]],
+        type_value: Optional[str] = None
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        Pair memory IDs with their resolved primary keys, dropping other types.
+        
+        Args:
+            memory_ids: The memory entry IDs
+            primary_keys: Primary keys from the ID index (None if not indexed)
+            type_value: Optional memory type filter
+            
+        Returns:
+            List of (memory_id, primary_key) tuples
+        """
+        wanted: List[Tuple[str, Optional[str]]] = []
+        for memory_id, primary_key in zip(memory_ids, primary_keys):
+            if primary_key and type_value:
+                # Primary keys have the form mem0:{scope}:{memory_type}:{entry_id}
+                key_type = primary_key.split(":")[2]
+                if key_type in _MEMORY_TYPE_VALUES and key_type != type_value:
+                    continue
+            wanted.append((memory_id, primary_key))
+        return wanted
+    
     def get_conversation_messages(
         self,
         conversation_id: str,
@@ -683,7 +1008,18 @@ class Mem0:
             include_expired=include_expired
         )
         
-        # Convert to the standard format for LLM context
+        return self._format_llm_messages(memories)
+    
+    def _format_llm_messages(self, memories: List[MemoryEntry]) -> List[Dict[str, Any]]:
+        """
+        Convert message memories to the standard format for LLM context.
+        
+        Args:
+            memories: Message memory entries
+            
+        Returns:
+            List of message dictionaries with role and content
+        """
         messages = []
         for memory in memories:
             if memory.role:
@@ -693,6 +1029,37 @@ class Mem0:
                 })
                 
         return messages
+    
+    def _format_history(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Format role/content messages for LangChain/LangGraph compatibility.
+        
+        Args:
+            messages: List of message dictionaries with role and content
+            
+        Returns:
+            List of message dictionaries with type and content
+        """
+        formatted_messages = []
+        for msg in messages:
+            role = msg.get('role', 'unknown')
+            content = msg.get('content', '')
+            
+            # Map roles to LangChain/LangGraph expected format
+            msg_type = "human"
+            if role == "assistant":
+                msg_type = "ai"
+            elif role == "system":
+                msg_type = "system"
+                
+            formatted_messages.append({
+                "type": msg_type,
+                "content": content
+            })
+            
+        # Reverse to get chronological order if needed
+        # formatted_messages.reverse()
+        return formatted_messages
         
     async def get_conversation_history(
         self,
@@ -718,27 +1085,7 @@ class Mem0:
                 include_expired=False
             )
             
-            # Format messages for LangChain/LangGraph compatibility
-            formatted_messages = []
-            for msg in messages:
-                role = msg.get('role', 'unknown')
-                content = msg.get('content', '')
-                
-                # Map roles to LangChain/LangGraph expected format
-                msg_type = "human"
-                if role == "assistant":
-                    msg_type = "ai"
-                elif role == "system":
-                    msg_type = "system"
-                    
-                formatted_messages.append({
-                    "type": msg_type,
-                    "content": content
-                })
-            
-            # Reverse to get chronological order if needed
-            # formatted_messages.reverse()
-            return formatted_messages
+            return self._format_history(messages)
         except Exception as e:
             logger.error(f"Error retrieving conversation history: {str(e)}")
             return []
@@ -766,10 +1113,36 @@ class Mem0:
         Returns:
             Memory entry ID
         """
+        memory = self._build_message_entry(session_id, role, content, conversation_id, agent_id, metadata)
+        return self.add_memory(memory, scope=MemoryScope.SHORT_TERM)
+    
+    def _build_message_entry(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        conversation_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> MemoryEntry:
+        """
+        Create the memory entry for a conversation message.
+        
+        Args:
+            session_id: The session ID
+            role: Message role (user, assistant, system)
+            content: Message content
+            conversation_id: Optional conversation ID (uses session_id if not provided)
+            agent_id: Optional agent ID
+            metadata: Optional message metadata
+            
+        Returns:
+            MemoryEntry instance
+        """
         # Use session_id as conversation_id if not provided
         conversation_id = conversation_id or session_id
         
-        memory = MemoryEntry(
+        return MemoryEntry(
             content=content,
             memory_type=MemoryType.MESSAGE,
             session_id=session_id,
@@ -778,8 +1151,6 @@ class Mem0:
             role=role,
             metadata=metadata or {}
         )
-        
-        return self.add_memory(memory, scope=MemoryScope.SHORT_TERM)
     
     def add_entity(
         self,
@@ -806,6 +1177,36 @@ class Mem0:
         Returns:
             Memory entry ID
         """
+        memory = self._build_entity_entry(
+            conversation_id, entity_type, entity_value, confidence, metadata, session_id, agent_id
+        )
+        return self.add_memory(memory, scope=MemoryScope.SHORT_TERM)
+    
+    def _build_entity_entry(
+        self,
+        conversation_id: str,
+        entity_type: str,
+        entity_value: str,
+        confidence: float = 1.0,
+        metadata: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        agent_id: Optional[str] = None
+    ) -> MemoryEntry:
+        """
+        Create the memory entry for an extracted entity.
+        
+        Args:
+            conversation_id: The conversation ID
+            entity_type: Type of entity (e.g., 'person', 'tracking_number')
+            entity_value: Value of the entity
+            confidence: Confidence score for the extraction
+            metadata: Optional entity metadata
+            session_id: Optional session ID
+            agent_id: Optional agent ID
+            
+        Returns:
+            MemoryEntry instance
+        """
         # Create metadata if not provided
         metadata = metadata or {}
         metadata.update({
@@ -822,10 +1223,11 @@ class Mem0:
             metadata=metadata
         )
         
-        # Add indexes for easy retrieval
+        # Add indexes for easy retrieval, by type and by type and value
+        memory.add_index("entity_type", entity_type)
         memory.add_index("entity_type", entity_type, entity_value)
         
-        return self.add_memory(memory, scope=MemoryScope.SHORT_TERM)
+        return memory
     
     def search_memories(
         self,
@@ -837,111 +1239,269 @@ class Mem0:
         Search for memories based on various criteria.
         
         Args:
-            query: Query parameters (e.g., conversation_id, memory_type, etc.)
+            query: Query parameters (conversation_id, session_id, agent_id,
+                memory_type, role, entity_type/entity_value or indexes)
+            limit: Maximum number of results
+            include_expired: Whether to include expired memories
+        
+        Returns:
+            List of matching memory entries, newest first for conversation queries
+        """
+        plan = plan_query(query)
+        
+        # Without any covering index, fall back to scanning indexed entries
+        if not plan.indexed:
+            return self._scan_memories(query, limit, include_expired)
+        
+        candidate_ids = self._resolve_candidates(plan, limit)
+        
+        results = []
+        for start in range(0, len(candidate_ids), SEARCH_FETCH_BATCH):
+            chunk = candidate_ids[start:start + SEARCH_FETCH_BATCH]
+            for memory in self.get_memories_by_ids(chunk, include_expired=include_expired):
+                # Apply filters that have no index
+                if self._matches_query(memory, query):
+                    results.append(memory)
+                    if len(results) >= limit:
+                        return results
+        
+        return results
+    
+    def _resolve_candidates(self, plan: QueryPlan, limit: int) -> List[str]:
+        """
+        Resolve the candidate memory IDs of a query plan in Redis.
+        
+        Conversation queries intersect the chronological sorted set with the
+        other index sets and return the newest entries first; the limit is
+        applied in Redis when no residual filters remain.
+        
+        Args:
+            plan: Query plan
+            limit: Maximum number of results
+        
+        Returns:
+            List of candidate memory IDs
+        """
+        end = limit - 1 if not plan.residual else -1
+        
+        if plan.chrono_key and plan.set_keys:
+            temp_key = plan.temp_key()
+            pipeline = self.redis.pipeline()
+            # Weight 0 on the sets keeps the chronological scores
+            pipeline.zinterstore(temp_key, {plan.chrono_key: 1, **{key: 0 for key in plan.set_keys}})
+            pipeline.zrevrange(temp_key, 0, end)
+            pipeline.delete(temp_key)
+            return pipeline.execute()[1]
+        
+        if plan.chrono_key:
+            return self.redis.zrevrange(plan.chrono_key, 0, end)
+        
+        return list(self.redis.sinter(plan.set_keys))
+    
+    def _scan_memories(self, query: Dict[str, Any], limit: int, include_expired: bool = False) -> List[MemoryEntry]:
+        """
+        Search all memories by scanning the ID index.
+        
+        Only used for queries that no index set covers.
+        
+        Args:
+            query: Query parameters
             limit: Maximum number of results
             include_expired: Whether to include expired memories
             
         Returns:
             List of matching memory entries
         """
-        # Implement memory search logic here
-        # This could use Redis search capabilities or fallback to manual filtering
-        # For now, using a simplified implementation
+        logger.debug(f"No index covers memory query {query}, scanning")
+        prefix = self._get_location_key("")
         
         results = []
+        batch = []
+        for location_key in self.redis.scan_iter(match=f"{prefix}*", count=SEARCH_FETCH_BATCH):
+            batch.append(location_key[len(prefix):])
+            if len(batch) >= SEARCH_FETCH_BATCH:
+                memories = self.get_memories_by_ids(batch, include_expired=include_expired)
+                results.extend(memory for memory in memories if self._matches_query(memory, query))
+                batch = []
+                if len(results) >= limit:
+                    return results[:limit]
         
-        # Check for conversation_id
-        if 'conversation_id' in query:
-            conv_key = f"mem0:conversations:{query['conversation_id']}"
-            memory_ids = self.redis.smembers(conv_key)
+        if batch:
+            memories = self.get_memories_by_ids(batch, include_expired=include_expired)
+            results.extend(memory for memory in memories if self._matches_query(memory, query))
             
-            for memory_id in memory_ids:
-                memory = self.get_memory(memory_id, include_expired=include_expired)
-                if not memory:
-                    continue
-                    
-                # Apply additional filters
-                match = True
-                for key, value in query.items():
-                    if key == 'conversation_id':
-                        continue  # Already filtered by conversation
-                        
-                    if key == 'memory_type':
-                        if memory.memory_type != value:
-                            match = False
-                            break
-                    elif key == 'agent_id':
-                        if memory.agent_id != value:
-                            match = False
-                            break
-                    elif key == 'role':
-                        if memory.role != value:
-                            match = False
-                            break
-                    # Add other filters as needed
-                
-                if match:
-                    results.append(memory)
-                    if len(results) >= limit:
-                        break
-                        
-        # Return the results
         return results[:limit]
     
-    def clear_working_memory(self) -> int:
+    def _matches_query(self, memory: MemoryEntry, query: Dict[str, Any]) -> bool:
+        """
+        Check a memory entry against the field filters of a search query.
+        
+        Args:
+            memory: The memory entry
+            query: Query parameters
+            
+        Returns:
+            True if the memory matches every supported filter
+        """
+        for key, value in query.items():
+            if key == 'conversation_id':
+                continue  # Already filtered by conversation
+                
+            if key == 'memory_type':
+                if memory.memory_type != value:
+                    return False
+            elif key == 'agent_id':
+                if memory.agent_id != value:
+                    return False
+            elif key == 'role':
+                if memory.role != value:
+                    return False
+            # Add other filters as needed
+            
+        return True
+    
+    def _queue_memory_deletes(
+        self,
+        pipeline: Any,
+        memory_ids: List[str],
+        primary_keys: List[Optional[str]]
+    ) -> int:
+        """
+        Queue the commands that unlink memory entries and their ID index entries.
+        
+        UNLINK frees the values in a background thread, so large entries
+        never stall Redis the way DEL can.
+        
+        Args:
+            pipeline: Redis pipeline to queue commands on
+            memory_ids: The memory entry IDs
+            primary_keys: Primary keys from the ID index (None if not indexed)
+            
+        Returns:
+            Number of memories queued for deletion
+        """
+        count = 0
+        for memory_id, primary_key in zip(memory_ids, primary_keys):
+            if primary_key:
+                keys = [primary_key]
+            else:
+                # Not indexed, so remove all possible occurrences
+                keys = self._legacy_candidate_keys(memory_id)
+            pipeline.unlink(*keys, self._get_location_key(memory_id))
+            count += 1
+        return count
+    
+    def _working_memory_unlink_keys(self, keys: List[str]) -> List[str]:
+        """
+        Get the keys to unlink for a batch of working memory keys.
+        
+        Args:
+            keys: Primary keys of working memories
+            
+        Returns:
+            The primary keys plus their ID index entries
+        """
+        # Primary keys are mem0:{scope}:{type}:{id}; IDs may themselves contain colons
+        memory_ids = [key.split(":", 3)[-1] for key in keys]
+        return list(keys) + [self._get_location_key(memory_id) for memory_id in memory_ids]
+    
+    def clear_working_memory(
+        self,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> int:
         """
         Clear all working memory.
         
+        Keys are found with SCAN and removed with UNLINK in bounded batches,
+        so clearing a large working set does not block Redis.
+        
+        Args:
+            batch_size: Keys per batch (defaults to the configured eviction batch size)
+            progress_callback: Optional callback invoked with an EvictionProgress after every batch
+        
         Returns:
             Number of memories cleared
         """
-        # Find all working memory keys
+        batch_size = batch_size or self.config.eviction_batch_size
         pattern = f"mem0:{MemoryScope.WORKING.value}:*"
-        keys = self.redis.keys(pattern)
+        progress = EvictionProgress()
         
-        if keys:
-            return self.redis.delete(*keys)
-            
-        return 0
+        batch = []
+        for key in self.redis.scan_iter(match=pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                self._unlink_working_batch(batch, progress, progress_callback)
+                batch = []
+        if batch:
+            self._unlink_working_batch(batch, progress, progress_callback)
+        
+        if progress.deleted:
+            self._queue_cache_invalidation(self.redis, ALL_CONVERSATIONS)
+        
+        return progress.deleted
+    
+    def _unlink_working_batch(
+        self,
+        keys: List[str],
+        progress: EvictionProgress,
+        progress_callback: Optional[ProgressCallback]
+    ) -> None:
+        """
+        Unlink one batch of working memory keys.
+        
+        Args:
+            keys: Primary keys of working memories
+            progress: Progress of the current run
+            progress_callback: Optional callback to notify
+        """
+        progress.scanned += len(keys)
+        self.redis.unlink(*self._working_memory_unlink_keys(keys))
+        progress.deleted += len(keys)
+        report_progress(progress, progress_callback)
     
-    def clear_conversation_memory(self, conversation_id: str) -> int:
+    def clear_conversation_memory(
+        self,
+        conversation_id: str,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> int:
         """
         Clear all memory for a specific conversation.
         
+        The conversation set is read with SSCAN and its memories are
+        unlinked in bounded batches.
+        
         Args:
             conversation_id: The conversation ID
+            batch_size: Memories per batch (defaults to the configured eviction batch size)
+            progress_callback: Optional callback invoked with an EvictionProgress after every batch
             
         Returns:
             Number of memories cleared
         """
-        # Get all memory IDs for this conversation
+        batch_size = batch_size or self.config.eviction_batch_size
         conv_key = f"mem0:conversations:{conversation_id}"
-        memory_ids = self.redis.smembers(conv_key)
+        progress = EvictionProgress()
+        
+        # Collect the IDs first so the set is not modified while it is being scanned
+        memory_ids = list(self.redis.sscan_iter(conv_key, count=batch_size))
         
         if not memory_ids:
             return 0
-            
-        # Delete each memory and its associated indexes
-        pipeline = self.redis.pipeline()
-        
-        # Delete the conversation set itself
-        pipeline.delete(conv_key)
-        
-        # Delete the chronological record
-        chrono_key = f"mem0:chronological:{conversation_id}"
-        pipeline.delete(chrono_key)
         
-        # Delete individual memories
-        count = 0
-        for memory_id in memory_ids:
-            # We don't know the memory type or scope, so find and delete all occurrences
-            for scope in [MemoryScope.WORKING, MemoryScope.SHORT_TERM, MemoryScope.LONG_TERM]:
-                for memory_type in MemoryType:
-                    key = self._get_key(memory_type.value, scope.value, memory_id)
-                    pipeline.delete(key)
-            count += 1
+        for batch in batched(memory_ids, batch_size):
+            progress.scanned += len(batch)
             
-        # Execute the pipeline
-        pipeline.execute()
+            # Resolve the primary keys through the ID index
+            primary_keys = self.redis.mget([self._get_location_key(memory_id) for memory_id in batch])
+            pipeline = self.redis.pipeline(transaction=False)
+            progress.deleted += self._queue_memory_deletes(pipeline, batch, primary_keys)
+            pipeline.execute()
+            report_progress(progress, progress_callback)
+        
+        # Remove the conversation set and the chronological record last
+        self.redis.unlink(conv_key, f"mem0:chronological:{conversation_id}")
+        self._queue_cache_invalidation(self.redis, conversation_id)
         
-        return count
\ No newline at end of file
+        return progress.deleted
\ No newline at end of file
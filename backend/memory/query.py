@@ -0,0 +1,99 @@
+"""
+Query planning for mem0 memory search.
+
+search_memories filters are translated into intersections of the Redis
+sets that add_memory already maintains (per conversation, session,
+agent, memory type and custom index), so a search touches roughly as
+many entries as it returns. Filters without a backing set are applied
+to the fetched entries afterwards.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+# Query fields that map directly onto an index set (conversation_id is
+# served by the chronological sorted set instead)
+_SET_KEY_TEMPLATES = {
+    "session_id": "mem0:sessions:{}",
+    "agent_id": "mem0:agents:{}",
+    "memory_type": "mem0:types:{}",
+}
+
+# Query fields that are checked on the fetched entries
+RESIDUAL_FIELDS = ("role",)
+
+
+@dataclass
+class QueryPlan:
+    """
+    Execution plan for a memory search.
+    
+    Attributes:
+        set_keys: Redis sets whose intersection contains the candidates
+        chrono_key: Sorted set used to order candidates newest first (if any)
+        residual: Filters applied to fetched entries
+    """
+    set_keys: List[str] = field(default_factory=list)
+    chrono_key: Optional[str] = None
+    residual: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def indexed(self) -> bool:
+        """Whether any index covers the query."""
+        return bool(self.set_keys or self.chrono_key)
+    
+    def temp_key(self) -> str:
+        """Generate a short-lived key for storing an intersection result."""
+        return f"mem0:tmp:query:{uuid.uuid4().hex}"
+
+
+def _value(value: Any) -> Any:
+    """Use the value of enum filter values."""
+    return getattr(value, "value", value)
+
+
+def plan_query(query: Dict[str, Any]) -> QueryPlan:
+    """
+    Build an execution plan for a search_memories query.
+    
+    Supported filters are conversation_id, session_id, agent_id,
+    memory_type and role, plus index lookups given either as
+    entity_type (with optional entity_value) or as a list of
+    {"index_type", "key", "value"} dictionaries under "indexes".
+    
+    Args:
+        query: Query parameters
+    
+    Returns:
+        QueryPlan for the query
+    """
+    plan = QueryPlan()
+    
+    for name, template in _SET_KEY_TEMPLATES.items():
+        if query.get(name) is not None:
+            plan.set_keys.append(template.format(_value(query[name])))
+    
+    # The chronological sorted set restricts candidates to the conversation
+    # and orders them newest first
+    if query.get("conversation_id") is not None:
+        plan.chrono_key = f"mem0:chronological:{query['conversation_id']}"
+    
+    if query.get("entity_type") is not None:
+        if query.get("entity_value") is not None:
+            plan.set_keys.append(f"mem0:index:entity_type:{query['entity_type']}:{query['entity_value']}")
+        else:
+            plan.set_keys.append(f"mem0:index:entity_type:{query['entity_type']}")
+    
+    for idx in query.get("indexes") or []:
+        if idx.get("value"):
+            plan.set_keys.append(f"mem0:index:{idx['index_type']}:{idx['key']}:{idx['value']}")
+        else:
+            plan.set_keys.append(f"mem0:index:{idx['index_type']}:{idx['key']}")
+    
+    for name in RESIDUAL_FIELDS:
+        if query.get(name) is not None:
+            plan.residual[name] = _value(query[name])
+    
+    return plan
@@ -9,7 +9,8 @@ import uuid
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, ForeignKey, JSON
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
@@ -17,6 +18,9 @@ from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 # Import the base model from your project's database module
 from backend.database.db import Base
 
+# Dimensions of the indexed embedding column (text-embedding-ada-002 / text-embedding-3-small)
+EMBEDDING_VECTOR_DIMENSIONS = 1536
+
 class MemoryEntryModel(Base):
     """
     Primary storage for memory entries in the mem0 system.
@@ -41,6 +45,7 @@ class MemoryEntryModel(Base):
     relevance = Column(Float, default=1.0)  # Relevance to current context
     recency = Column(Float, default=1.0)  # Recency factor
     embedding = Column(ARRAY(Float), nullable=True)  # Vector embedding for semantic search
+    embedding_vector = Column(Vector(EMBEDDING_VECTOR_DIMENSIONS), nullable=True)  # Same embedding, HNSW indexed
     meta_data = Column(JSONB, default={})
     
     # Timestamps
@@ -50,6 +55,15 @@ class MemoryEntryModel(Base):
     # Relationships
     indexes = relationship("MemoryIndexModel", back_populates="entry", cascade="all, delete-orphan")
     contexts = relationship("MemoryContextModel", back_populates="entry", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index(
+            "ix_memory_entry_embedding_vector_hnsw",
+            "embedding_vector",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding_vector": "vector_cosine_ops"},
+        ),
+    )
 
 
 class MemoryIndexModel(Base):
@@ -0,0 +1,284 @@
+"""
+Process-local read-through cache of hot conversations for mem0.
+
+A single chat turn reads the same conversation history several times.
+The SessionCache keeps the most recent memories of recently used
+conversations in process memory, bounded by LRU size and TTL. Writes
+made through this process update the cache in place; every write or
+clear is also published on a Redis pub/sub channel so other workers
+drop their copy of the conversation. The synchronous Mem0 publishes the
+same messages from its write paths, so it can share Redis with cached
+AsyncMem0 readers.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel carrying "{origin}:{conversation_id}" invalidation messages
+INVALIDATION_CHANNEL = "mem0:cache:invalidate"
+
+# Invalidation target that drops every cached conversation
+ALL_CONVERSATIONS = "*"
+
+
+def publish_invalidation(client: Any, origin: str, conversation_id: str) -> Any:
+    """
+    Publish a message telling session caches to drop their copy of a conversation.
+    
+    Args:
+        client: Redis pipeline or client to publish on
+        origin: Identifier of the publisher; caches ignore their own messages
+        conversation_id: The conversation ID, or ALL_CONVERSATIONS
+    
+    Returns:
+        The result of publish, awaitable when given an asyncio client
+    """
+    return client.publish(INVALIDATION_CHANNEL, f"{origin}:{conversation_id}")
+
+
+@dataclass
+class CachedConversation:
+    """
+    Cached head of a conversation's chronological record.
+    
+    Attributes:
+        slots: (memory_id, memory) pairs newest first, mirroring the sorted set;
+            memory is None for IDs whose entry was missing
+        complete: Whether slots cover the whole conversation
+        loaded_at: Monotonic time the conversation was loaded
+    """
+    slots: List[Tuple[str, Any]] = field(default_factory=list)
+    complete: bool = False
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class SessionCache:
+    """
+    Bounded LRU/TTL cache of conversation memories.
+    
+    Entries are keyed by conversation ID and hold the newest memories in
+    the same order as the mem0:chronological sorted set, so cached pages
+    are identical to the ones read from Redis.
+    """
+    
+    def __init__(self, max_sessions: int = 1000, ttl: float = 30.0, max_entries: int = 200):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_sessions: Maximum number of conversations kept
+            ttl: Seconds a loaded conversation stays valid
+            max_entries: Maximum number of memories kept per conversation
+        """
+        self.max_sessions = max(1, max_sessions)
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.origin = uuid.uuid4().hex
+        self._conversations: "OrderedDict[str, CachedConversation]" = OrderedDict()
+        # Loads in flight per conversation: [count, invalidated during load]
+        self._loading: Dict[str, List[Any]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get_page(self, conversation_id: str, offset: int, limit: int) -> Optional[List[Tuple[str, Any]]]:
+        """
+        Get a page of a conversation's chronological record.
+        
+        Args:
+            conversation_id: The conversation ID
+            offset: Offset from the newest memory
+            limit: Page size
+        
+        Returns:
+            (memory_id, memory) pairs newest first, or None on a cache miss
+        """
+        cached = self._conversations.get(conversation_id)
+        if cached is not None and time.monotonic() - cached.loaded_at > self.ttl:
+            del self._conversations[conversation_id]
+            cached = None
+        
+        if cached is None or (not cached.complete and offset + limit > len(cached.slots)):
+            self.misses += 1
+            return None
+        
+        self._conversations.move_to_end(conversation_id)
+        self.hits += 1
+        return cached.slots[offset:offset + limit]
+    
+    def begin_load(self, conversation_id: str) -> None:
+        """
+        Mark a conversation as being loaded from Redis.
+        
+        Writes and invalidations that arrive before put() make the loaded
+        snapshot stale, so it is then not cached.
+        
+        Args:
+            conversation_id: The conversation ID
+        """
+        loading = self._loading.setdefault(conversation_id, [0, False])
+        loading[0] += 1
+    
+    def put(self, conversation_id: str, slots: List[Tuple[str, Any]], complete: bool) -> None:
+        """
+        Store the head of a conversation loaded from Redis.
+        
+        Args:
+            conversation_id: The conversation ID
+            slots: (memory_id, memory) pairs newest first
+            complete: Whether slots cover the whole conversation
+        """
+        loading = self._loading.get(conversation_id)
+        stale = False
+        if loading is not None:
+            stale = loading[1]
+            loading[0] -= 1
+            if loading[0] <= 0:
+                del self._loading[conversation_id]
+        if stale:
+            return
+        
+        if len(slots) > self.max_entries:
+            slots, complete = slots[:self.max_entries], False
+        
+        self._conversations[conversation_id] = CachedConversation(slots=list(slots), complete=complete)
+        self._conversations.move_to_end(conversation_id)
+        
+        while len(self._conversations) > self.max_sessions:
+            self._conversations.popitem(last=False)
+            self.evictions += 1
+    
+    def add(self, memory: Any) -> None:
+        """
+        Record a memory written by this process.
+        
+        Args:
+            memory: The memory entry that was added
+        """
+        self._mark_loading_stale(memory.conversation_id)
+        cached = self._conversations.get(memory.conversation_id)
+        if cached is None:
+            return
+        
+        newest = next((entry for _, entry in cached.slots if entry is not None), None)
+        if newest is not None and memory.created_at < newest.created_at:
+            # Out-of-order write; reload from Redis rather than re-sorting
+            self.discard(memory.conversation_id)
+            return
+        
+        cached.slots = [(memory_id, entry) for memory_id, entry in cached.slots if memory_id != memory.entry_id]
+        cached.slots.insert(0, (memory.entry_id, memory))
+        if len(cached.slots) > self.max_entries:
+            del cached.slots[self.max_entries:]
+            cached.complete = False
+    
+    def discard(self, conversation_id: str) -> None:
+        """
+        Drop a conversation from the cache.
+        
+        Args:
+            conversation_id: The conversation ID
+        """
+        self._mark_loading_stale(conversation_id)
+        if self._conversations.pop(conversation_id, None) is not None:
+            self.invalidations += 1
+    
+    def clear(self) -> None:
+        """Drop all cached conversations."""
+        for loading in self._loading.values():
+            loading[1] = True
+        self._conversations.clear()
+    
+    def _mark_loading_stale(self, conversation_id: str) -> None:
+        """Make loads of a conversation that are in flight skip caching."""
+        loading = self._loading.get(conversation_id)
+        if loading is not None:
+            loading[1] = True
+    
+    def queue_invalidation(self, pipeline: Any, conversation_id: str) -> Any:
+        """
+        Queue a message telling other workers to drop their copy of a conversation.
+        
+        Args:
+            pipeline: Redis pipeline (or client) to publish on
+            conversation_id: The conversation ID, or ALL_CONVERSATIONS
+        
+        Returns:
+            The result of publish, awaitable when given an asyncio client
+        """
+        return publish_invalidation(pipeline, self.origin, conversation_id)
+    
+    def start_listener(self, redis_client: Any) -> None:
+        """
+        Start listening for invalidations published by other workers.
+        
+        Args:
+            redis_client: Redis client used to subscribe (holds one connection)
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(redis_client))
+    
+    async def stop_listener(self) -> None:
+        """Stop the invalidation listener."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+    
+    async def _listen(self, redis_client: Any) -> None:
+        """Background loop: apply invalidations from other workers."""
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        origin, _, conversation_id = message["data"].partition(":")
+                        if origin == self.origin:
+                            continue
+                        if conversation_id == ALL_CONVERSATIONS:
+                            self.clear()
+                        else:
+                            self.discard(conversation_id)
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Updates may have been missed while disconnected
+                logger.warning(f"Session cache invalidation listener error, clearing cache: {str(e)}")
+                self.clear()
+                await asyncio.sleep(1.0)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with size, hits, misses, hit rate, evictions and invalidations
+        """
+        lookups = self.hits + self.misses
+        return {
+            "sessions": len(self._conversations),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,152 @@
+"""
+Tests for the write-behind memory archiver.
+"""
+
+import asyncio
+import threading
+
+from backend.memory import MemoryEntry, MemoryType
+from backend.memory.archiver import MemoryArchiver
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+def memory(content):
+    """Build a long-term fact memory."""
+    return MemoryEntry(content=content, memory_type=MemoryType.FACT, conversation_id="c1")
+
+
+class FakeResult:
+    """Result of an INSERT ... RETURNING id."""
+    
+    def __init__(self, ids):
+        self.ids = ids
+    
+    def scalars(self):
+        return self
+    
+    def all(self):
+        return list(self.ids)
+
+
+class FakeDatabase:
+    """Session factory over in-memory tables whose first writes can fail."""
+    
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.entries = set()
+        self.child_rows = []
+    
+    def __call__(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    """Async session whose writes apply only when its transaction commits."""
+    
+    def __init__(self, database):
+        self.database = database
+        self.entries = set()
+        self.child_rows = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def begin(self):
+        return FakeTransaction(self)
+    
+    async def execute(self, statement, rows=None):
+        if self.database.failures:
+            self.database.failures -= 1
+            raise ConnectionError("database down")
+        if rows is not None:
+            self.child_rows.extend(rows)
+            return None
+        # The entry insert returns only the ids that do not exist yet
+        params = statement.compile().params
+        ids = {value for key, value in params.items() if key.startswith("id_")}
+        self.entries |= ids - self.database.entries
+        return FakeResult(ids - self.database.entries)
+
+
+class FakeTransaction:
+    """Transaction block that commits its session's writes on a clean exit."""
+    
+    def __init__(self, session):
+        self.session = session
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.session.database.entries |= self.session.entries
+            self.session.database.child_rows.extend(self.session.child_rows)
+        return False
+
+
+def test_failed_batch_is_retried_before_it_counts_as_failed():
+    db = FakeDatabase(failures=2)
+    archiver = MemoryArchiver(db, max_retries=3, retry_backoff=0)
+    
+    assert run(archiver.write_batch([memory("a")]))
+    
+    assert len(db.entries) == 1
+    assert archiver.stats()["archived"] == 1 and archiver.stats()["retried"] == 2
+    assert archiver.stats()["failed"] == 0
+
+
+def test_batch_is_failed_after_the_last_retry():
+    archiver = MemoryArchiver(FakeDatabase(failures=10), max_retries=2, retry_backoff=0)
+    
+    assert not run(archiver.write_batch([memory("a"), memory("b")]))
+    
+    assert archiver.stats()["failed"] == 2 and archiver.stats()["retried"] == 2
+
+
+def test_rearchiving_never_duplicates_child_rows():
+    db = FakeDatabase()
+    archiver = MemoryArchiver(db)
+    first = memory("a")
+    first.add_index("tag", "order")
+    first.add_context("source", {"api": "orders"})
+    
+    run(archiver.write_batch([first]))
+    run(archiver.write_batch([first, memory("b")]))
+    
+    assert len(db.entries) == 2
+    assert len(db.child_rows) == 2
+
+
+def test_submit_nowait_from_another_thread_hands_off_to_the_loop():
+    db = FakeDatabase()
+    archiver = MemoryArchiver(db, flush_interval=0)
+    
+    async def scenario():
+        archiver.start()
+        loop_thread = threading.get_ident()
+        threads = []
+        original = archiver._enqueue
+        
+        def enqueue(memory):
+            threads.append(threading.get_ident())
+            return original(memory)
+        
+        archiver._enqueue = enqueue
+        worker = threading.Thread(target=lambda: archiver.submit_nowait(memory("a")))
+        worker.start()
+        await asyncio.to_thread(worker.join)
+        await asyncio.sleep(0)
+        await archiver.stop()
+        return loop_thread, threads
+    
+    loop_thread, threads = run(scenario())
+    
+    assert threads == [loop_thread]
+    assert len(db.entries) == 1
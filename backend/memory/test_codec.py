@@ -0,0 +1,216 @@
+"""
+Round-trip tests for the mem0 storage codecs.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import msgpack
+import numpy as np
+import pytest
+
+from backend.memory.codec import (
+    CODEC_MAGIC, CODEC_VERSION, JSON_CODEC, MSGPACK_CODEC, decode_memory, encode_memory, resolve_codec
+)
+from backend.memory.config import MemoryConfig
+from backend.memory.mem0 import MemoryEntry, MemoryType
+
+CODECS = [JSON_CODEC, MSGPACK_CODEC]
+
+# Values exactly representable as float32, so round trips compare equal
+EMBEDDING = [0.5, -1.25, 3.0, 0.0, 0.125]
+
+
+def full_entry():
+    """Build a memory entry with every field populated."""
+    memory = MemoryEntry(
+        content="Customer asked about order OD1234567",
+        memory_type=MemoryType.MESSAGE,
+        session_id="session-1",
+        conversation_id="conversation-1",
+        agent_id="agent-1",
+        role="user",
+        importance=0.75,
+        metadata={"channel": "web", "tags": ["order", "tracking"], "attempt": 2},
+        created_at=datetime(2024, 10, 16, 12, 30, 45, 123456),
+        expires_at=datetime(2024, 10, 17, 12, 30, 45, 123456),
+        embedding=list(EMBEDDING),
+    )
+    memory.add_index("entity", "order_number", "OD1234567")
+    memory.add_context("source", {"api": "orders", "latency_ms": 42})
+    return memory
+
+
+def round_trip(memory, codec):
+    """Encode a memory and decode it back into a MemoryEntry."""
+    return MemoryEntry.from_dict(decode_memory(encode_memory(memory, codec)))
+
+
+def fields(memory):
+    """Comparable view of a memory entry, with its embedding decoded."""
+    return {
+        "entry_id": memory.entry_id,
+        "content": memory.content,
+        "memory_type": memory.memory_type,
+        "session_id": memory.session_id,
+        "conversation_id": memory.conversation_id,
+        "agent_id": memory.agent_id,
+        "role": memory.role,
+        "importance": memory.importance,
+        "metadata": memory.metadata,
+        "created_at": memory.created_at,
+        "expires_at": memory.expires_at,
+        "embedding": memory.embedding,
+        "indexes": memory.indexes,
+        "contexts": memory.contexts,
+    }
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_full_entry_round_trip(codec):
+    memory = full_entry()
+    
+    assert fields(round_trip(memory, codec)) == fields(memory)
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_missing_optional_fields_round_trip(codec):
+    memory = MemoryEntry(content="hello", memory_type=MemoryType.FACT, created_at=datetime(2024, 1, 1))
+    
+    decoded = round_trip(memory, codec)
+    
+    assert fields(decoded) == fields(memory)
+    assert decoded.expires_at is None and decoded.embedding is None
+    assert decoded.importance == 1.0 and decoded.metadata == {}
+    assert decoded.indexes == [] and decoded.contexts == []
+
+
+def test_msgpack_record_leaves_out_defaults():
+    memory = MemoryEntry(content="hello", memory_type=MemoryType.FACT, created_at=datetime(2024, 1, 1))
+    
+    data = encode_memory(memory, MSGPACK_CODEC)
+    
+    assert data.startswith(CODEC_MAGIC + bytes([CODEC_VERSION]))
+    record = msgpack.unpackb(data[len(CODEC_MAGIC) + 1:], raw=False)
+    assert set(record) == {"i", "c", "t", "ca"}
+
+
+def test_msgpack_stores_embedding_as_float32_bytes():
+    memory = full_entry()
+    
+    record = msgpack.unpackb(encode_memory(memory, MSGPACK_CODEC)[len(CODEC_MAGIC) + 1:], raw=False)
+    
+    assert record["e"] == np.asarray(EMBEDDING, dtype=np.float32).tobytes()
+
+
+def test_decoded_embedding_stays_encoded_until_accessed():
+    decoded = round_trip(full_entry(), MSGPACK_CODEC)
+    
+    assert isinstance(decoded.raw_embedding, bytes)
+    assert decoded.embedding == EMBEDDING
+    assert isinstance(decoded.raw_embedding, list)
+
+
+def test_raw_embedding_bytes_are_packed_unchanged():
+    raw = np.asarray(EMBEDDING, dtype=np.float32).tobytes()
+    memory = MemoryEntry(content="hello", memory_type=MemoryType.FACT, embedding=raw)
+    
+    decoded = round_trip(memory, MSGPACK_CODEC)
+    
+    assert decoded.raw_embedding == raw
+    assert decoded.embedding == EMBEDDING
+
+
+def test_timestamps_keep_microseconds():
+    created_at = datetime(1999, 12, 31, 23, 59, 59, 999999)
+    memory = MemoryEntry(content="hello", memory_type=MemoryType.FACT, created_at=created_at,
+                         expires_at=created_at + timedelta(microseconds=1))
+    
+    decoded = round_trip(memory, MSGPACK_CODEC)
+    
+    assert decoded.created_at == created_at
+    assert decoded.expires_at == datetime(2000, 1, 1)
+
+
+@pytest.mark.parametrize("as_bytes", [False, True])
+def test_legacy_json_document_decodes(as_bytes):
+    # Layout written before the codec existed: embedding as a JSON float list
+    document = json.dumps({
+        "entry_id": "legacy-1",
+        "content": "Old memory",
+        "memory_type": "fact",
+        "session_id": "session-1",
+        "conversation_id": None,
+        "agent_id": None,
+        "role": None,
+        "importance": 2.0,
+        "metadata": {"source": "import"},
+        "created_at": "2023-05-01T08:00:00.500000",
+        "expires_at": None,
+        "embedding": list(EMBEDDING),
+        "indexes": [{"index_type": "tag", "key": "import", "value": None}],
+        "contexts": [],
+    })
+    
+    decoded = MemoryEntry.from_dict(decode_memory(document.encode() if as_bytes else document))
+    
+    assert decoded.entry_id == "legacy-1"
+    assert decoded.created_at == datetime(2023, 5, 1, 8, 0, 0, 500000)
+    assert decoded.importance == 2.0 and decoded.metadata == {"source": "import"}
+    assert decoded.embedding == EMBEDDING
+    assert decoded.indexes == [{"index_type": "tag", "key": "import", "value": None}]
+
+
+def test_legacy_json_document_with_missing_fields_decodes():
+    decoded = MemoryEntry.from_dict(decode_memory('{"content": "bare", "memory_type": "entity"}'))
+    
+    assert (decoded.content, decoded.memory_type) == ("bare", "entity")
+    assert decoded.entry_id and decoded.created_at
+    assert decoded.metadata == {} and decoded.embedding is None and decoded.expires_at is None
+
+
+def test_unrepresentable_metadata_falls_back_to_json():
+    memory = full_entry()
+    memory.metadata = {"order_id": 2 ** 70}
+    
+    data = encode_memory(memory, MSGPACK_CODEC)
+    
+    assert isinstance(data, str)
+    assert round_trip(memory, MSGPACK_CODEC).metadata == {"order_id": 2 ** 70}
+
+
+def test_unsupported_record_version_is_rejected():
+    data = encode_memory(full_entry(), MSGPACK_CODEC)
+    data = CODEC_MAGIC + bytes([CODEC_VERSION + 1]) + data[len(CODEC_MAGIC) + 1:]
+    
+    with pytest.raises(ValueError):
+        decode_memory(data)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("msgpack", MSGPACK_CODEC),
+    ("MSGPACK", MSGPACK_CODEC),
+    ("json", JSON_CODEC),
+    ("protobuf", JSON_CODEC),
+    ("", JSON_CODEC),
+])
+def test_resolve_codec(name, expected):
+    assert resolve_codec(name) == expected
+
+
+def test_memory_codec_json_setting_stores_json(monkeypatch):
+    monkeypatch.setenv("MEMORY_CODEC", "json")
+    codec = resolve_codec(MemoryConfig().memory_codec)
+    memory = full_entry()
+    
+    data = encode_memory(memory, codec)
+    
+    assert codec == JSON_CODEC
+    assert isinstance(data, str) and json.loads(data)["entry_id"] == memory.entry_id
+    assert fields(round_trip(memory, codec)) == fields(memory)
+
+
+def test_memory_codec_defaults_to_msgpack(monkeypatch):
+    monkeypatch.delenv("MEMORY_CODEC", raising=False)
+    
+    assert resolve_codec(MemoryConfig().memory_codec) == MSGPACK_CODEC
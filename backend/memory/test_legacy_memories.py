@@ -0,0 +1,83 @@
+"""
+Tests for reading and pruning memories written before the ID index.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.memory import AsyncMem0, Mem0, MemoryConfig, MemoryEntry, MemoryType
+from backend.memory.connection import RedisConnectionManager
+
+
+def memory_config(redis_url, probe_legacy_keys):
+    """Build a Redis-only memory configuration on fakeredis."""
+    config = MemoryConfig()
+    config.redis_url = redis_url
+    config.use_database_storage = False
+    config.session_cache_size = 0
+    config.probe_legacy_keys = probe_legacy_keys
+    return config
+
+
+def messages(conversation_id, count):
+    """Build message memories of one conversation."""
+    return [
+        MemoryEntry(content=f"m{i}", memory_type=MemoryType.MESSAGE, conversation_id=conversation_id, role="user")
+        for i in range(count)
+    ]
+
+
+def test_probe_is_on_by_default(monkeypatch):
+    monkeypatch.delenv("PROBE_LEGACY_MEMORY_KEYS", raising=False)
+    
+    assert MemoryConfig().probe_legacy_keys
+
+
+@pytest.mark.parametrize("probe_legacy_keys", [True, False])
+def test_legacy_memories_are_never_pruned(probe_legacy_keys):
+    mem0 = Mem0(memory_config=memory_config(f"fakeredis://sync-{probe_legacy_keys}", probe_legacy_keys))
+    expired, legacy, current = messages("c1", 3)
+    for memory in (expired, legacy, current):
+        mem0.add_memory(memory)
+    
+    # An expired entry loses its document and index; a legacy one only has no index entry
+    primary_key = mem0.redis.get(f"mem0:entry:{expired.entry_id}")
+    mem0.redis.delete(primary_key, f"mem0:entry:{expired.entry_id}")
+    mem0.redis.delete(f"mem0:entry:{legacy.entry_id}")
+    
+    contents = sorted(memory.content for memory in mem0.get_memories_by_conversation("c1"))
+    
+    remaining = set(mem0.redis.zrange("mem0:chronological:c1", 0, -1))
+    assert remaining == {legacy.entry_id, current.entry_id}
+    if probe_legacy_keys:
+        assert contents == ["m1", "m2"]
+        # The read backfilled the ID index
+        assert mem0.redis.get(f"mem0:entry:{legacy.entry_id}")
+    else:
+        assert contents == ["m2"]
+        # Skipped, not lost: it is readable again once probing is enabled
+        mem0.config.probe_legacy_keys = True
+    assert mem0.get_memory(legacy.entry_id).content == "m1"
+
+
+def test_async_legacy_memories_are_never_pruned():
+    async def scenario():
+        config = memory_config("fakeredis://async-legacy", True)
+        mem0 = AsyncMem0(memory_config=config, connection_manager=RedisConnectionManager(config))
+        expired, legacy, current = messages("c2", 3)
+        for memory in (expired, legacy, current):
+            await mem0.add_memory(memory)
+        
+        primary_key = await mem0.redis.get(f"mem0:entry:{expired.entry_id}")
+        await mem0.redis.delete(primary_key, f"mem0:entry:{expired.entry_id}")
+        await mem0.redis.delete(f"mem0:entry:{legacy.entry_id}")
+        
+        contents = sorted(memory.content for memory in await mem0.get_memories_by_conversation("c2"))
+        remaining = set(await mem0.redis.zrange("mem0:chronological:c2", 0, -1))
+        return contents, remaining, legacy, current
+    
+    contents, remaining, legacy, current = asyncio.run(scenario())
+    
+    assert contents == ["m1", "m2"]
+    assert remaining == {legacy.entry_id, current.entry_id}
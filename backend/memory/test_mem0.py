@@ -38,7 +38,7 @@ async def run_mem0_test():
         test_entries = []
         
         # Add a message
-        message_id = mem0.add_message(
+        message_id = await mem0.add_message(
             conversation_id=conversation_id,
             role="user",
             content="This is a test message",
@@ -49,7 +49,7 @@ async def run_mem0_test():
         logger.info(f"Added test message with ID: {message_id}")
         
         # Add an entity
-        entity_id = mem0.add_entity(
+        entity_id = await mem0.add_entity(
             conversation_id=conversation_id,
             entity_type="test_entity",
             entity_value="test_value",
@@ -69,13 +69,13 @@ async def run_mem0_test():
             metadata={"test": True}
         )
         fact.add_index("test_index", "test_key", "test_value")
-        fact_id = mem0.add_memory(fact, scope=MemoryScope.LONG_TERM)
+        fact_id = await mem0.add_memory(fact, scope=MemoryScope.LONG_TERM)
         test_entries.append(fact_id)
         logger.info(f"Added test fact with ID: {fact_id}")
         
         # Retrieve and verify the entries
         for entry_id in test_entries:
-            memory = mem0.get_memory(entry_id)
+            memory = await mem0.get_memory(entry_id)
             if memory:
                 logger.info(f"Retrieved entry {entry_id}: {memory.memory_type} - {memory.content}")
             else:
@@ -84,15 +84,15 @@ async def run_mem0_test():
                 logger.warning(f"Note: Entry {entry_id} not retrieved via direct lookup, will try different approach")
                 
         # Get conversation messages
-        messages = mem0.get_conversation_messages(conversation_id)
+        messages = await mem0.get_conversation_messages(conversation_id)
         logger.info(f"Retrieved {len(messages)} messages for conversation {conversation_id}")
         
         # Get memories by conversation
-        memories = mem0.get_memories_by_conversation(conversation_id)
+        memories = await mem0.get_memories_by_conversation(conversation_id)
         logger.info(f"Retrieved {len(memories)} memories for conversation {conversation_id}")
         
         # Clean up test data
-        deleted = mem0.clear_conversation_memory(conversation_id)
+        deleted = await mem0.clear_conversation_memory(conversation_id)
         logger.info(f"Deleted {deleted} test memories")
         
         logger.info("mem0 test completed successfully")
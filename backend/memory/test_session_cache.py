@@ -0,0 +1,181 @@
+"""
+Tests for the process-local session cache and its cross-worker invalidation.
+"""
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from backend.memory import Mem0, MemoryConfig, MemoryEntry, MemoryType
+from backend.memory.session_cache import ALL_CONVERSATIONS, INVALIDATION_CHANNEL, SessionCache
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+def message(conversation_id, content):
+    """Build a message memory."""
+    return MemoryEntry(content=content, memory_type=MemoryType.MESSAGE, conversation_id=conversation_id, role="user")
+
+
+def sync_mem0(server, session_cache_size=1000):
+    """Build a Redis-only sync Mem0 on a shared fakeredis server."""
+    config = MemoryConfig()
+    config.redis_url = "fakeredis://session-cache"
+    config.use_database_storage = False
+    config.session_cache_size = session_cache_size
+    mem0 = Mem0(memory_config=config)
+    mem0.redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+    return mem0
+
+
+def published(pubsub):
+    """Drain the invalidation messages received by a subscription."""
+    messages = []
+    # Subscribe confirmations also read as None, so poll a fixed number of times
+    for _ in range(10):
+        message = pubsub.get_message(ignore_subscribe_messages=True, timeout=0.01)
+        if message is not None:
+            messages.append(message["data"])
+    return messages
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def subscription(server):
+    pubsub = fakeredis.FakeRedis(server=server, decode_responses=True).pubsub()
+    pubsub.subscribe(INVALIDATION_CHANNEL)
+    yield pubsub
+    pubsub.close()
+
+
+def test_sync_writes_publish_invalidations(server, subscription):
+    mem0 = sync_mem0(server)
+    
+    mem0.add_memory(message("c1", "hello"))
+    mem0.clear_conversation_memory("c1")
+    
+    assert published(subscription) == [f"{mem0.cache_origin}:c1", f"{mem0.cache_origin}:c1"]
+
+
+def test_sync_clear_working_memory_invalidates_everything(server, subscription):
+    mem0 = sync_mem0(server)
+    mem0.add_memory(message("c1", "scratch"), scope="working")
+    published(subscription)
+    
+    mem0.clear_working_memory()
+    
+    assert published(subscription) == [f"{mem0.cache_origin}:{ALL_CONVERSATIONS}"]
+
+
+def test_sync_writes_do_not_publish_when_caching_is_disabled(server, subscription):
+    mem0 = sync_mem0(server, session_cache_size=0)
+    
+    mem0.add_memory(message("c1", "hello"))
+    
+    assert published(subscription) == []
+
+
+def test_sync_write_drops_conversation_from_async_worker_cache(server):
+    mem0 = sync_mem0(server)
+    cache = SessionCache()
+    
+    async def scenario():
+        cache.put("c1", [("m0", message("c1", "cached"))], complete=True)
+        cache.start_listener(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        await asyncio.sleep(0.05)
+        
+        mem0.add_memory(message("c1", "written by a sync worker"))
+        await asyncio.sleep(0.05)
+        
+        await cache.stop_listener()
+    
+    run(scenario())
+    
+    assert cache.get_page("c1", 0, 10) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_load_is_cached_when_nothing_changed_meanwhile():
+    cache = SessionCache()
+    slots = [("m1", message("c1", "newest")), ("m0", message("c1", "oldest"))]
+    
+    cache.begin_load("c1")
+    cache.put("c1", slots, complete=True)
+    
+    assert cache.get_page("c1", 0, 10) == slots
+    assert cache.get_page("c1", 1, 1) == slots[1:]
+
+
+@pytest.mark.parametrize("interference", [
+    lambda cache: cache.add(message("c1", "written during the load")),
+    lambda cache: cache.discard("c1"),
+    lambda cache: cache.clear(),
+])
+def test_load_overtaken_by_a_change_is_not_cached(interference):
+    cache = SessionCache()
+    
+    cache.begin_load("c1")
+    interference(cache)
+    cache.put("c1", [("m0", message("c1", "stale snapshot"))], complete=True)
+    
+    assert cache.get_page("c1", 0, 10) is None
+    # The next load starts clean
+    cache.begin_load("c1")
+    cache.put("c1", [], complete=True)
+    assert cache.get_page("c1", 0, 10) == []
+
+
+def test_change_marks_every_concurrent_load_stale():
+    cache = SessionCache()
+    
+    cache.begin_load("c1")
+    cache.begin_load("c1")
+    cache.discard("c1")
+    cache.put("c1", [("m0", message("c1", "first"))], complete=True)
+    cache.put("c1", [("m0", message("c1", "second"))], complete=True)
+    
+    assert cache.get_page("c1", 0, 10) is None
+
+
+def test_change_to_another_conversation_does_not_affect_a_load():
+    cache = SessionCache()
+    
+    cache.begin_load("c1")
+    cache.discard("c2")
+    cache.put("c1", [], complete=True)
+    
+    assert cache.get_page("c1", 0, 10) == []
+
+
+def test_listener_ignores_its_own_origin_and_applies_others(server):
+    cache = SessionCache()
+    publisher = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    
+    async def scenario():
+        for conversation_id in ("c1", "c2", "c3"):
+            cache.put(conversation_id, [], complete=True)
+        cache.start_listener(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        await asyncio.sleep(0.05)
+        
+        await cache.queue_invalidation(publisher, "c1")
+        await publisher.publish(INVALIDATION_CHANNEL, "other-worker:c2")
+        await asyncio.sleep(0.05)
+        pages = {conversation_id: cache.get_page(conversation_id, 0, 1) for conversation_id in ("c1", "c2", "c3")}
+        
+        await publisher.publish(INVALIDATION_CHANNEL, f"other-worker:{ALL_CONVERSATIONS}")
+        await asyncio.sleep(0.05)
+        await cache.stop_listener()
+        return pages
+    
+    pages = run(scenario())
+    
+    assert pages == {"c1": [], "c2": None, "c3": []}
+    assert cache.get_page("c1", 0, 1) is None and cache.get_page("c3", 0, 1) is None
@@ -0,0 +1,130 @@
+"""
+Tests for token-budgeted conversation windows and rolling summaries.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.memory import AsyncMem0, MemoryConfig, MemoryEntry, MemoryType
+from backend.memory.connection import RedisConnectionManager
+from backend.memory.window import (
+    ConversationSummarizer, fit_messages_to_budget, message_tokens, summary_message
+)
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def chat(*contents):
+    """Build alternating user/assistant messages."""
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": content} for i, content in enumerate(contents)]
+
+
+def cost(messages):
+    """Token cost of a list of messages."""
+    return sum(message_tokens(message) for message in messages)
+
+
+def async_mem0(name, summarizer=None):
+    """Build a Redis-only AsyncMem0 on fakeredis."""
+    config = MemoryConfig()
+    config.redis_url = f"fakeredis://{name}"
+    config.use_database_storage = False
+    config.session_cache_size = 0
+    return AsyncMem0(memory_config=config, connection_manager=RedisConnectionManager(config), summarizer=summarizer)
+
+
+async def add_messages(mem0, conversation_id, messages):
+    """Store messages one second apart and return their chronological scores."""
+    for i, message in enumerate(messages):
+        await mem0.add_memory(MemoryEntry(
+            content=message["content"],
+            memory_type=MemoryType.MESSAGE,
+            conversation_id=conversation_id,
+            role=message["role"],
+            created_at=START + timedelta(seconds=i),
+        ))
+    return [score for _, score in await mem0.redis.zrange(f"mem0:chronological:{conversation_id}", 0, -1, withscores=True)]
+
+
+def test_fit_keeps_the_most_recent_messages():
+    messages = chat("first question", "first answer", "second question", "second answer")
+    
+    assert fit_messages_to_budget(messages, cost(messages)) == messages
+    assert fit_messages_to_budget(messages, cost(messages[1:])) == messages[1:]
+    assert fit_messages_to_budget(messages, cost(messages[2:]) + 1) == messages[2:]
+    assert fit_messages_to_budget(messages, 0) == []
+
+
+def test_fit_stops_at_the_first_message_that_does_not_fit():
+    messages = chat("short", "a much longer answer that does not fit the remaining budget", "short")
+    
+    # The oldest message would fit on its own, but the window never has gaps
+    assert fit_messages_to_budget(messages, cost([messages[0], messages[2]])) == messages[2:]
+
+
+def test_fit_keeps_leading_system_messages_first():
+    summary = summary_message("The customer asked about toner.")
+    messages = [summary] + chat("question", "answer")
+    
+    assert fit_messages_to_budget(messages, cost(messages)) == messages
+    assert fit_messages_to_budget(messages, cost([summary, messages[2]])) == [summary, messages[2]]
+    # A summary that does not fit is dropped rather than the recent turns
+    assert fit_messages_to_budget(messages, cost(messages[1:])) == messages[1:]
+
+
+def test_window_starts_after_the_summary_watermark():
+    async def scenario():
+        mem0 = async_mem0("window-watermark")
+        messages = chat("q1", "a1", "q2", "a2", "q3")
+        scores = await add_messages(mem0, "c1", messages)
+        await mem0.add_summary("c1", "Asked q1 and q2.", covers_until=scores[2])
+        return await mem0.get_conversation_window("c1", token_budget=1000), messages
+    
+    window, messages = asyncio.run(scenario())
+    
+    assert window == [summary_message("Asked q1 and q2.")] + messages[3:]
+
+
+def test_window_without_summary_fits_the_budget():
+    async def scenario():
+        mem0 = async_mem0("window-budget")
+        messages = chat("q1", "a1", "q2", "a2", "q3")
+        await add_messages(mem0, "c1", messages)
+        return await mem0.get_conversation_window("c1", token_budget=cost(messages[2:])), messages
+    
+    window, messages = asyncio.run(scenario())
+    
+    assert window == messages[2:]
+
+
+def test_overflow_is_folded_into_a_summary_up_to_the_window():
+    folded = []
+    
+    async def summarize(previous, messages):
+        folded.append((previous, [message["content"] for message in messages]))
+        return "summary of " + ", ".join(message["content"] for message in messages)
+    
+    async def scenario():
+        summarizer = ConversationSummarizer(summarize, min_messages=2)
+        mem0 = async_mem0("window-fold", summarizer)
+        messages = chat("q1", "a1", "q2", "a2", "q3")
+        scores = await add_messages(mem0, "c1", messages)
+        
+        first = await mem0.get_conversation_window("c1", token_budget=cost(messages[3:]))
+        await summarizer.wait()
+        
+        summary = await mem0.get_latest_summary("c1")
+        # Room for the summary and more, but folded messages never come back
+        budget = cost(messages) + message_tokens(summary_message(summary.content))
+        second = await mem0.get_conversation_window("c1", token_budget=budget)
+        return messages, scores, first, summary, second
+    
+    messages, scores, first, summary, second = asyncio.run(scenario())
+    
+    assert first == messages[3:]
+    # Everything up to and including the newest message left out of the window is folded
+    assert folded == [(None, ["q1", "a1", "q2"])]
+    assert summary.metadata["covers_until"] == pytest.approx(scores[2])
+    assert second == [summary_message("summary of q1, a1, q2")] + messages[3:]
@@ -0,0 +1,265 @@
+"""
+Vector similarity search for the mem0 memory system.
+
+This module provides the pieces behind Mem0 semantic search:
+compact float32 encoding of embeddings, an in-process NumPy index for
+memories held in Redis, and a pgvector-backed search over memories
+archived to PostgreSQL.
+"""
+
+import base64
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from backend.memory.schema import EMBEDDING_VECTOR_DIMENSIONS, MemoryEntryModel
+
+logger = logging.getLogger(__name__)
+
+
+def encode_embedding(embedding: Optional[Sequence[float]]) -> Optional[str]:
+    """
+    Encode an embedding as base64 of its float32 bytes.
+    
+    A 1536-dimension embedding takes about 8 KB this way instead of
+    roughly 30 KB as a JSON float list.
+    
+    Args:
+        embedding: Embedding vector
+    
+    Returns:
+        Base64 string, or None if no embedding was given
+    """
+    if embedding is None:
+        return None
+    return base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes()).decode('ascii')
+
+
+def decode_embedding(data: Any) -> Optional[List[float]]:
+    """
+    Decode an embedding stored by encode_embedding or as raw float32 bytes.
+    
+    JSON float lists written by earlier versions are returned unchanged.
+    
+    Args:
+        data: Base64 string, raw float32 bytes, float list or None
+    
+    Returns:
+        Embedding vector or None
+    """
+    if data is None or isinstance(data, list):
+        return data
+    if isinstance(data, bytes):
+        return np.frombuffer(data, dtype=np.float32).tolist()
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32).tolist()
+
+
+class InMemoryVectorIndex:
+    """
+    Brute-force cosine similarity index held in a NumPy float32 matrix.
+    
+    Vectors are normalized on insert so a search is a single matrix-vector
+    product. Suitable for single-node and fakeredis deployments; when the
+    index is full the oldest entries are evicted.
+    """
+    
+    def __init__(self, dimensions: int = 1536, max_entries: int = 100000):
+        """
+        Initialize the index.
+        
+        Args:
+            dimensions: Embedding dimensions
+            max_entries: Maximum number of vectors kept in memory
+        """
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self._vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self._ids: List[str] = []
+        self._conversations: List[Optional[str]] = []
+        self._positions: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._positions
+    
+    def add(self, entry_id: str, embedding: Sequence[float], conversation_id: Optional[str] = None) -> None:
+        """
+        Add or replace the vector for a memory entry.
+        
+        Args:
+            entry_id: Memory entry ID
+            embedding: Embedding vector
+            conversation_id: Conversation the memory belongs to
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.dimensions,):
+            logger.warning(f"Skipping embedding for {entry_id}: expected {self.dimensions} dimensions, got {vector.shape}")
+            return
+        
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return
+        vector = vector / norm
+        
+        if entry_id in self._positions:
+            self._vectors[self._positions[entry_id]] = vector
+            return
+        
+        if len(self._ids) >= self.max_entries:
+            # Evict the oldest tenth of the index
+            self._evict(max(1, self.max_entries // 10))
+        
+        size = len(self._ids)
+        if size == self._vectors.shape[0]:
+            # Grow the matrix geometrically to keep inserts amortized O(1)
+            grown = np.zeros((max(64, size * 2), self.dimensions), dtype=np.float32)
+            grown[:size] = self._vectors[:size]
+            self._vectors = grown
+        
+        self._vectors[size] = vector
+        self._positions[entry_id] = size
+        self._ids.append(entry_id)
+        self._conversations.append(conversation_id)
+    
+    def remove(self, entry_ids: Sequence[str]) -> None:
+        """
+        Remove memory entries from the index.
+        
+        Args:
+            entry_ids: Memory entry IDs to remove
+        """
+        drop = {self._positions[entry_id] for entry_id in entry_ids if entry_id in self._positions}
+        if drop:
+            self._rebuild([i for i in range(len(self._ids)) if i not in drop])
+    
+    def search(
+        self,
+        embedding: Sequence[float],
+        k: int = 5,
+        conversation_id: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the memories most similar to an embedding.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of results
+            conversation_id: Optional conversation to restrict the search to
+        
+        Returns:
+            List of (entry_id, cosine similarity) tuples, best first
+        """
+        if not self._ids or k <= 0:
+            return []
+        
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if query.shape != (self.dimensions,) or norm == 0:
+            return []
+        
+        scores = self._vectors[:len(self._ids)] @ (query / norm)
+        
+        if conversation_id is not None:
+            mask = np.fromiter(
+                (conv == conversation_id for conv in self._conversations),
+                dtype=bool,
+                count=len(self._conversations)
+            )
+            scores = np.where(mask, scores, -np.inf)
+        
+        k = min(k, len(self._ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        return [(self._ids[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+    
+    def _evict(self, count: int) -> None:
+        """Drop the oldest entries."""
+        self._rebuild(list(range(count, len(self._ids))))
+    
+    def _rebuild(self, keep: List[int]) -> None:
+        """Keep only the given positions."""
+        self._vectors = self._vectors[keep] if keep else np.zeros((0, self.dimensions), dtype=np.float32)
+        self._ids = [self._ids[i] for i in keep]
+        self._conversations = [self._conversations[i] for i in keep]
+        self._positions = {entry_id: i for i, entry_id in enumerate(self._ids)}
+
+
+class PgVectorMemoryIndex:
+    """
+    Similarity search over archived memories using pgvector.
+    
+    Queries the memory_entry.embedding_vector column directly so its HNSW
+    index serves the nearest-neighbour scan; casting the float array
+    column at query time would force a full table scan.
+    """
+    
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        """
+        Initialize the index.
+        
+        Args:
+            session_factory: Callable returning a new AsyncSession
+        """
+        self.session_factory = session_factory
+    
+    async def search(
+        self,
+        embedding: Sequence[float],
+        k: int = 5,
+        conversation_id: Optional[str] = None
+    ) -> List[Tuple[MemoryEntryModel, float]]:
+        """
+        Find the archived memories most similar to an embedding.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of results
+            conversation_id: Optional conversation to restrict the search to
+        
+        Returns:
+            List of (MemoryEntryModel, cosine similarity) tuples, best first
+        """
+        if len(embedding) != EMBEDDING_VECTOR_DIMENSIONS:
+            logger.debug(f"Skipping archive search for a {len(embedding)}-dimension embedding")
+            return []
+        
+        query_vector = "[" + ",".join(str(float(x)) for x in embedding) + "]"
+        conversation_filter = "AND conversation_id = :conversation_id" if conversation_id else ""
+        
+        sql = text(f"""
+            SELECT id, 1 - (embedding_vector <=> CAST(:query_vector AS vector)) AS similarity
+            FROM memory_entry
+            WHERE embedding_vector IS NOT NULL {conversation_filter}
+            ORDER BY embedding_vector <=> CAST(:query_vector AS vector)
+            LIMIT :k
+        """)
+        params: Dict[str, Any] = {"query_vector": query_vector, "k": k}
+        if conversation_id:
+            params["conversation_id"] = conversation_id
+        
+        try:
+            async with self.session_factory() as session:
+                rows = (await session.execute(sql, params)).all()
+                if not rows:
+                    return []
+                
+                scores = {row.id: float(row.similarity) for row in rows}
+                result = await session.execute(
+                    select(MemoryEntryModel)
+                    .options(selectinload(MemoryEntryModel.indexes), selectinload(MemoryEntryModel.contexts))
+                    .where(MemoryEntryModel.id.in_(list(scores.keys())))
+                )
+                models = result.scalars().all()
+            
+            return sorted(((model, scores[model.id]) for model in models), key=lambda item: -item[1])
+        
+        except Exception as e:
+            logger.error(f"Error searching archived memories: {str(e)}")
+            return []
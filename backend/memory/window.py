@@ -0,0 +1,274 @@
+"""
+Token-budgeted conversation windows for the mem0 memory system.
+
+A conversation window holds the latest conversation summary followed by
+as many of the most recent messages as fit a token budget. Messages that
+fall out of the window are folded into a new MemoryType.SUMMARY entry by
+a background summarizer, so prompts stay roughly the same size however
+long a conversation gets.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# tiktoken is optional; without it token counts are estimated from length
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+from backend.memory.mem0 import MemoryType
+
+logger = logging.getLogger(__name__)
+
+# Approximate per-message overhead of the chat format, in tokens
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# Summarizer callable: (previous summary or None, messages to fold) -> new summary
+SummarizeFn = Callable[[Optional[str], List[Dict[str, Any]]], Awaitable[str]]
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a piece of text.
+    
+    Uses tiktoken's cl100k_base encoding when it is installed, otherwise
+    estimates four characters per token.
+    
+    Args:
+        text: Text to count
+    
+    Returns:
+        Number of tokens
+    """
+    global _encoding
+    
+    if not text:
+        return 0
+    if HAS_TIKTOKEN:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """
+    Count the prompt tokens used by a role/content message.
+    
+    Args:
+        message: Message dictionary with role and content
+    
+    Returns:
+        Number of tokens
+    """
+    return count_tokens(message.get("content") or "") + MESSAGE_TOKEN_OVERHEAD
+
+
+def fit_messages_to_budget(messages: List[Dict[str, Any]], token_budget: int) -> List[Dict[str, Any]]:
+    """
+    Keep the most recent messages that fit a token budget.
+    
+    Leading system messages (such as a conversation summary) are kept
+    first if they fit.
+    
+    Args:
+        messages: Role/content messages in chronological order
+        token_budget: Maximum number of prompt tokens
+    
+    Returns:
+        The messages that fit, in chronological order
+    """
+    head = []
+    start = 0
+    remaining = token_budget
+    while start < len(messages) and messages[start].get("role") == "system":
+        cost = message_tokens(messages[start])
+        if cost <= remaining:
+            head.append(messages[start])
+            remaining -= cost
+        start += 1
+    
+    tail = []
+    for message in reversed(messages[start:]):
+        cost = message_tokens(message)
+        if cost > remaining:
+            break
+        tail.append(message)
+        remaining -= cost
+    
+    return head + list(reversed(tail))
+
+
+def summary_message(summary: str) -> Dict[str, Any]:
+    """
+    Format a conversation summary as a system message.
+    
+    Args:
+        summary: Summary text
+    
+    Returns:
+        Role/content message
+    """
+    return {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+
+
+class ConversationSummarizer:
+    """
+    Background folding of old conversation messages into summaries.
+    
+    Each run takes the messages newer than the current summary, up to the
+    oldest message still in the window, and asks the summarize callable to
+    merge them into the previous summary. At most one run per conversation
+    is in flight; later requests are picked up by the next window read.
+    """
+    
+    def __init__(
+        self,
+        summarize_fn: SummarizeFn,
+        min_messages: int = 6,
+        batch_size: int = 50
+    ):
+        """
+        Initialize the summarizer.
+        
+        Args:
+            summarize_fn: Async callable producing the new summary text
+            min_messages: Minimum number of messages outside the window before summarizing
+            batch_size: Maximum number of messages folded per summarize call
+        """
+        self.summarize_fn = summarize_fn
+        self.min_messages = max(1, min_messages)
+        self.batch_size = max(1, batch_size)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        
+        # Counters for monitoring
+        self.summary_count = 0
+        self.failed_count = 0
+    
+    def schedule(self, mem0: Any, conversation_id: str, until_score: float, pending: int) -> bool:
+        """
+        Schedule folding of a conversation's messages up to a chronological score.
+        
+        Args:
+            mem0: AsyncMem0 instance holding the conversation
+            conversation_id: The conversation ID
+            until_score: Chronological score of the newest message to fold
+            pending: Number of messages waiting to be folded
+        
+        Returns:
+            True if a run was started, False otherwise
+        """
+        if pending < self.min_messages:
+            return False
+        
+        task = self._tasks.get(conversation_id)
+        if task is not None and not task.done():
+            return False
+        
+        task = asyncio.create_task(self._fold(mem0, conversation_id, until_score))
+        self._tasks[conversation_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(conversation_id, None))
+        return True
+    
+    async def wait(self) -> None:
+        """Wait for all running summaries to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+    
+    async def _fold(self, mem0: Any, conversation_id: str, until_score: float) -> None:
+        """
+        Fold messages into the conversation summary in batches.
+        
+        Args:
+            mem0: AsyncMem0 instance holding the conversation
+            conversation_id: The conversation ID
+            until_score: Chronological score of the newest message to fold
+        """
+        try:
+            while True:
+                summary = await mem0.get_latest_summary(conversation_id)
+                covered = float(summary.metadata.get("covers_until", 0)) if summary else 0.0
+                if covered >= until_score:
+                    return
+                
+                # Oldest unsummarized messages first, bounded per call
+                chrono_key = f"mem0:chronological:{conversation_id}"
+                page = await mem0.redis.zrangebyscore(
+                    chrono_key, f"({covered}", until_score, start=0, num=self.batch_size, withscores=True
+                )
+                if not page:
+                    return
+                
+                memories = await mem0.get_memories_by_ids(
+                    [memory_id for memory_id, _ in page],
+                    memory_type=MemoryType.MESSAGE,
+                    conversation_id=conversation_id
+                )
+                messages = [
+                    {"role": memory.role, "content": memory.content}
+                    for memory in memories if memory.role
+                ]
+                
+                text = summary.content if summary else None
+                if messages:
+                    text = await self.summarize_fn(text, messages)
+                
+                await mem0.add_summary(
+                    conversation_id=conversation_id,
+                    content=text or "",
+                    covers_until=page[-1][1],
+                    session_id=memories[0].session_id if memories else None
+                )
+                self.summary_count += 1
+                logger.debug(f"Folded {len(messages)} messages into the summary of {conversation_id}")
+        
+        except Exception as e:
+            self.failed_count += 1
+            logger.error(f"Error summarizing conversation {conversation_id}: {str(e)}")
+
+
+def create_llm_summarizer(model: str, max_summary_tokens: int = 300) -> Optional[SummarizeFn]:
+    """
+    Create a summarize callable backed by an OpenAI chat model.
+    
+    Args:
+        model: Chat model name
+        max_summary_tokens: Maximum length of the summary
+    
+    Returns:
+        Async summarize callable, or None if langchain_openai is unavailable
+    """
+    try:
+        import langchain_openai  # noqa: F401
+        from langchain_core.messages import HumanMessage, SystemMessage
+    except ImportError:
+        logger.warning("langchain_openai not installed, conversation summaries disabled")
+        return None
+    
+    from backend.services.llm_service import get_chat_model
+    
+    llm = get_chat_model(model=model, temperature=0, max_tokens=max_summary_tokens)
+    
+    async def summarize(previous: Optional[str], messages: List[Dict[str, Any]]) -> str:
+        transcript = "\n".join(f"{message['role'].upper()}: {message['content']}" for message in messages)
+        prompt = (
+            f"Current summary:\n{previous or '(none)'}\n\n"
+            f"New messages:\n{transcript}\n\n"
+            "Update the summary to include the new messages."
+        )
+        result = await llm.ainvoke([
+            SystemMessage(content=(
+                "You maintain a running summary of a customer support conversation. "
+                "Keep names, order and tracking numbers, emails, decisions and open requests. "
+                f"Reply with the summary only, in at most {max_summary_tokens} tokens."
+            )),
+            HumanMessage(content=prompt),
+        ])
+        return result.content
+    
+    return summarize
@@ -0,0 +1,169 @@
+"""
+In-memory embedding index of agents for Staples Brain routing.
+
+Each routable agent is represented by the embeddings of its description
+and its semantic patterns. Pattern embeddings stored in
+agent_pattern_embeddings are used directly when they were produced by
+the active embedding model; everything else is embedded once through the
+EmbeddingService (and its cache) when the index is built. Scoring a
+message takes one embedding and one matrix multiply.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Pattern types whose values are natural-language examples worth embedding
+EMBEDDED_PATTERN_TYPES = ("semantic",)
+
+
+class AgentEmbeddingIndex:
+    """
+    Matrix of normalized agent embeddings, grouped by agent.
+    
+    Rows belonging to one agent are contiguous, so per-agent scores are the
+    maximum similarity over the agent's rows.
+    """
+    
+    def __init__(self, embedding_service: Any, min_similarity: float = 0.85, margin: float = 0.05):
+        """
+        Initialize the index.
+        
+        Args:
+            embedding_service: EmbeddingService used for queries and missing vectors
+            min_similarity: Minimum similarity of the best agent for a confident match
+            margin: Minimum lead of the best agent over the runner-up for a confident match
+        """
+        self.embedding_service = embedding_service
+        self.min_similarity = min_similarity
+        self.margin = margin
+        self.agent_ids: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._row_starts: Optional[np.ndarray] = None
+        
+        # Counters for monitoring
+        self.matches = 0
+        self.lookups = 0
+    
+    @property
+    def size(self) -> int:
+        """Number of indexed vectors."""
+        return 0 if self._matrix is None else self._matrix.shape[0]
+    
+    async def build(self, agents: Iterable[Any]) -> int:
+        """
+        Build the index from loaded agents.
+        
+        Args:
+            agents: Agents with id, name, description and patterns
+        
+        Returns:
+            Number of indexed vectors
+        """
+        model = self.embedding_service.cache.model
+        dimensions = self.embedding_service.config.dimensions
+        
+        # (agent_id, stored vector or None, text to embed when there is no usable vector)
+        rows: List[Tuple[str, Optional[np.ndarray], str]] = []
+        for agent in agents:
+            description = getattr(agent, "description", "") or ""
+            rows.append((agent.id, None, f"{agent.name}: {description}"))
+            for pattern in getattr(agent, "patterns", None) or []:
+                if not isinstance(pattern, dict) or pattern.get("pattern_type") not in EMBEDDED_PATTERN_TYPES:
+                    continue
+                vector = pattern.get("embedding")
+                if vector is not None and pattern.get("embedding_model") == model and len(vector) == dimensions:
+                    rows.append((agent.id, np.asarray(vector, dtype=np.float32), pattern["pattern_value"]))
+                elif pattern.get("pattern_value"):
+                    rows.append((agent.id, None, pattern["pattern_value"]))
+        
+        missing = [text for _, vector, text in rows if vector is None]
+        embedded = dict(zip(missing, await self.embedding_service.get_embeddings(missing))) if missing else {}
+        
+        agent_ids: List[str] = []
+        row_starts: List[int] = []
+        vectors: List[np.ndarray] = []
+        for agent_id, vector, text in rows:
+            if vector is None:
+                vector = np.asarray(embedded[text], dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            if norm == 0:
+                # Zero vectors come from failed embeddings and never match
+                continue
+            if not agent_ids or agent_ids[-1] != agent_id:
+                agent_ids.append(agent_id)
+                row_starts.append(len(vectors))
+            vectors.append(vector / norm)
+        
+        self.agent_ids = agent_ids
+        self._row_starts = np.asarray(row_starts, dtype=np.intp)
+        self._matrix = np.vstack(vectors) if vectors else None
+        
+        logger.info(f"Built agent embedding index with {self.size} vectors for {len(agent_ids)} agents (model {model})")
+        return self.size
+    
+    async def score(self, query: str) -> List[Tuple[str, float]]:
+        """
+        Score all indexed agents against a message.
+        
+        Args:
+            query: User message
+        
+        Returns:
+            (agent_id, similarity) pairs, best first; empty if the index or query embedding is unusable
+        """
+        if self._matrix is None:
+            return []
+        
+        query_vector = np.asarray(await self.embedding_service.get_embedding(query), dtype=np.float32)
+        norm = float(np.linalg.norm(query_vector))
+        if norm == 0 or query_vector.shape[0] != self._matrix.shape[1]:
+            return []
+        
+        similarities = self._matrix @ (query_vector / norm)
+        agent_scores = np.maximum.reduceat(similarities, self._row_starts)
+        order = np.argsort(-agent_scores)
+        return [(self.agent_ids[i], min(1.0, float(agent_scores[i]))) for i in order]
+    
+    async def match(self, query: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the agent for a message when the match is clear-cut.
+        
+        Args:
+            query: User message
+        
+        Returns:
+            (agent_id, similarity) of the best agent if it clears the similarity
+            threshold and leads the runner-up by the margin, otherwise None
+        """
+        self.lookups += 1
+        scores = await self.score(query)
+        if not scores:
+            return None
+        
+        best_id, best_score = scores[0]
+        runner_up = scores[1][1] if len(scores) > 1 else -1.0
+        if best_score >= self.min_similarity and best_score - runner_up >= self.margin:
+            self.matches += 1
+            return best_id, best_score
+        
+        logger.debug(f"Embedding pre-router inconclusive: best {best_score:.3f}, runner-up {runner_up:.3f}")
+        return None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index counters.
+        
+        Returns:
+            Dictionary with index size, lookups and confident matches
+        """
+        return {
+            "vectors": self.size,
+            "agents": len(self.agent_ids),
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "match_rate": round(self.matches / self.lookups, 4) if self.lookups else 0.0,
+        }
@@ -0,0 +1,129 @@
+"""
+Agent shortlisting for Staples Brain routing.
+
+LLM routing prompts list the agents the model may choose from, so their
+size and latency grow with the roster. The AgentShortlist is a cheap
+local first stage: it ranks agents by embedding similarity over their
+descriptions and semantic patterns (AgentEmbeddingIndex) and by keyword
+pattern hits, and only the top candidates are described to the LLM.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.orchestration.agent_index import AgentEmbeddingIndex
+from backend.utils.pattern_matcher import AhoCorasickMatcher
+
+logger = logging.getLogger(__name__)
+
+# Behaviours when the local stage cannot rank the agents
+SHORTLIST_FALLBACK_ALL = "all"  # describe the full roster to the LLM
+SHORTLIST_FALLBACK_PINNED = "pinned"  # describe only the pinned agents (previous, general, ...)
+
+
+class AgentShortlist:
+    """
+    Ranks agents locally and keeps the top candidates for LLM routing.
+    
+    Agents with a keyword pattern in the message come first, then the
+    remaining agents by embedding similarity. Pinned agents (e.g. the
+    previous or general agent) are always included on top of the size.
+    """
+    
+    def __init__(self, agent_index: AgentEmbeddingIndex, size: int = 8, agents: Optional[Iterable[Any]] = None):
+        """
+        Initialize the shortlist.
+        
+        Args:
+            agent_index: Built embedding index of the routable agents
+            size: Number of candidates to keep
+            agents: Optional agents whose keyword patterns are matched in messages
+        """
+        self.agent_index = agent_index
+        self.size = max(1, size)
+        self.keyword_matcher = AhoCorasickMatcher.from_agent_patterns({
+            agent.id: [
+                pattern for pattern in getattr(agent, "patterns", None) or []
+                if isinstance(pattern, dict) and pattern.get("pattern_type") == "keyword"
+            ]
+            for agent in agents or []
+        })
+        
+        # Counters for monitoring
+        self.lookups = 0
+        self.fallbacks = 0
+        self.shortlisted = 0
+    
+    async def select(self, query: str, pinned: Iterable[str] = ()) -> Optional[List[str]]:
+        """
+        Select the candidate agents for a message.
+        
+        Args:
+            query: User message
+            pinned: Agent IDs to include regardless of their rank
+        
+        Returns:
+            Candidate agent IDs, best first, or None if the agents could not be ranked
+        """
+        self.lookups += 1
+        try:
+            scores = await self.agent_index.score(query)
+        except Exception as e:
+            logger.error(f"Error scoring agents for the routing shortlist: {str(e)}")
+            scores = []
+        if not scores:
+            self.fallbacks += 1
+            return None
+        
+        keyword_hits = [match.agent_id for match in self.keyword_matcher.find_all(query)]
+        ranked = list(dict.fromkeys(keyword_hits + [agent_id for agent_id, _ in scores]))
+        shortlist = list(dict.fromkeys(ranked[:self.size] + [agent_id for agent_id in pinned if agent_id]))
+        
+        self.shortlisted += len(shortlist)
+        logger.debug(f"Routing shortlist: {len(shortlist)} of {len(scores)} agents")
+        return shortlist
+    
+    async def candidates(
+        self,
+        query: str,
+        agents: Dict[str, Any],
+        pinned: Iterable[str] = (),
+        fallback: str = SHORTLIST_FALLBACK_ALL
+    ) -> List[Any]:
+        """
+        Get the agents to describe in a routing prompt.
+        
+        Args:
+            query: User message
+            agents: Agent ID to agent for the full roster
+            pinned: Agent IDs to include regardless of their rank
+            fallback: SHORTLIST_FALLBACK_ALL or SHORTLIST_FALLBACK_PINNED
+        
+        Returns:
+            Candidate agents; the full roster when it is no larger than the shortlist
+        """
+        if len(agents) <= self.size:
+            return list(agents.values())
+        
+        pinned = [agent_id for agent_id in pinned if agent_id in agents]
+        agent_ids = await self.select(query, pinned)
+        if agent_ids is None:
+            if fallback != SHORTLIST_FALLBACK_PINNED or not pinned:
+                return list(agents.values())
+            agent_ids = pinned
+        return [agents[agent_id] for agent_id in agent_ids if agent_id in agents]
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get shortlist counters.
+        
+        Returns:
+            Dictionary with size, lookups, fallbacks and average candidates
+        """
+        ranked = self.lookups - self.fallbacks
+        return {
+            "size": self.size,
+            "lookups": self.lookups,
+            "fallbacks": self.fallbacks,
+            "avg_candidates": round(self.shortlisted / ranked, 2) if ranked else 0.0,
+        }
@@ -0,0 +1,248 @@
+"""
+Tiered embedding cache for Staples Brain.
+
+Embeddings are cached in two tiers. The first is an in-process LRU of
+float32 vectors bounded by a byte budget, so worker memory stays flat
+however many distinct texts are embedded. The second is an optional
+shared Redis tier holding the same float32 bytes, so embeddings survive
+restarts and deploys and are shared between workers. Keys include the
+embedding model and dimensions, so vectors from different models never
+mix.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from redis.client import NEVER_DECODE
+
+logger = logging.getLogger(__name__)
+
+# Approximate per-entry overhead of the LRU (key string, array header, dict slot)
+ENTRY_OVERHEAD_BYTES = 200
+
+# Execute options returning raw bytes from clients created with decode_responses=True
+_RAW = {NEVER_DECODE: True}
+
+
+def embedding_cache_key(model: str, dimensions: int, text: str) -> str:
+    """
+    Build the cache key for a text embedded by a model.
+    
+    Args:
+        model: Embedding model name
+        dimensions: Embedding dimensions
+        text: Embedded text
+    
+    Returns:
+        Cache key
+    """
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f"emb:{model}:{dimensions}:{digest}"
+
+
+class EmbeddingLRU:
+    """
+    In-process LRU of float32 embedding vectors bounded by a byte budget.
+    """
+    
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the LRU.
+        
+        Args:
+            max_bytes: Maximum bytes held by cached vectors
+        """
+        self.max_bytes = max(0, max_bytes)
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
+        # Counters for monitoring
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Get a cached vector and mark it recently used.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            The vector, or None if it is not cached
+        """
+        vector = self._entries.get(key)
+        if vector is not None:
+            self._entries.move_to_end(key)
+        return vector
+    
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """
+        Cache a vector, evicting the least recently used ones over the budget.
+        
+        Args:
+            key: Cache key
+            vector: float32 vector
+        """
+        cost = vector.nbytes + ENTRY_OVERHEAD_BYTES
+        if cost > self.max_bytes:
+            return
+        
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size_bytes -= previous.nbytes + ENTRY_OVERHEAD_BYTES
+        
+        self._entries[key] = vector
+        self.size_bytes += cost
+        
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= evicted.nbytes + ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop all cached vectors."""
+        self._entries.clear()
+        self.size_bytes = 0
+
+
+class TieredEmbeddingCache:
+    """
+    Embedding cache with an in-process LRU in front of a shared Redis tier.
+    
+    Vectors found in Redis are promoted into the LRU. Redis errors are
+    logged and treated as misses, so the shared tier never fails a request.
+    """
+    
+    def __init__(
+        self,
+        model: str,
+        dimensions: int,
+        max_bytes: int = 64 * 1024 * 1024,
+        redis_client: Optional[Any] = None,
+        ttl: Optional[int] = None
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            model: Embedding model name, part of every key
+            dimensions: Embedding dimensions, part of every key
+            max_bytes: Byte budget of the in-process tier
+            redis_client: Optional asyncio Redis client for the shared tier
+            ttl: Optional expiry of shared entries in seconds
+        """
+        self.model = model
+        self.dimensions = dimensions
+        self.local = EmbeddingLRU(max_bytes)
+        self.redis = redis_client
+        self.ttl = ttl or None
+        
+        # Counters for monitoring
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.shared_errors = 0
+    
+    def key(self, text: str) -> str:
+        """Get the cache key of a text."""
+        return embedding_cache_key(self.model, self.dimensions, text)
+    
+    async def get_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up the embeddings of several texts.
+        
+        Args:
+            texts: Texts to look up
+        
+        Returns:
+            Dictionary of text to embedding for the texts that were cached
+        """
+        found: Dict[str, List[float]] = {}
+        shared_keys: Dict[str, str] = {}
+        
+        for text in texts:
+            if text in found or text in shared_keys:
+                continue
+            key = self.key(text)
+            vector = self.local.get(key)
+            if vector is not None:
+                found[text] = vector.tolist()
+                self.local_hits += 1
+            else:
+                shared_keys[text] = key
+        
+        if shared_keys and self.redis is not None:
+            try:
+                values = await self.redis.execute_command("MGET", *shared_keys.values(), **_RAW)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared embedding cache lookup failed: {str(e)}")
+                values = [None] * len(shared_keys)
+            
+            for (text, key), value in zip(shared_keys.items(), values):
+                if not value or len(value) != self.dimensions * 4:
+                    continue
+                vector = np.frombuffer(value, dtype=np.float32)
+                self.local.put(key, vector)
+                found[text] = vector.tolist()
+                self.shared_hits += 1
+        
+        self.misses += sum(1 for text in shared_keys if text not in found)
+        return found
+    
+    async def put_many(self, embeddings: Dict[str, List[float]]) -> None:
+        """
+        Cache the embeddings of several texts in both tiers.
+        
+        Args:
+            embeddings: Dictionary of text to embedding
+        """
+        if not embeddings:
+            return
+        
+        pipeline = self.redis.pipeline(transaction=False) if self.redis is not None else None
+        for text, embedding in embeddings.items():
+            vector = np.asarray(embedding, dtype=np.float32)
+            key = self.key(text)
+            self.local.put(key, vector)
+            if pipeline is not None:
+                pipeline.set(key, vector.tobytes(), ex=self.ttl)
+        
+        if pipeline is not None:
+            try:
+                await pipeline.execute()
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared embedding cache write failed: {str(e)}")
+    
+    def clear(self) -> None:
+        """Drop the in-process tier."""
+        self.local.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with tier sizes, hits, misses and hit rate
+        """
+        hits = self.local_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "model": self.model,
+            "entries": len(self.local),
+            "size_bytes": self.local.size_bytes,
+            "max_bytes": self.local.max_bytes,
+            "evictions": self.local.evictions,
+            "shared": self.redis is not None,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "shared_errors": self.shared_errors,
+        }
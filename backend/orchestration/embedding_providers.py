@@ -0,0 +1,195 @@
+"""
+Embedding providers for Staples Brain.
+
+The EmbeddingService delegates the actual vector computation to a
+provider. The OpenAI provider calls the hosted embedding API. The
+hashing provider computes deterministic embeddings locally on the CPU,
+so similarity-based features work offline, in tests and benchmarks, and
+while the hosted provider is unavailable.
+"""
+
+import hashlib
+import logging
+import math
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OPENAI_PROVIDER = "openai"
+HASHING_PROVIDER = "hashing"
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class EmbeddingProvider(ABC):
+    """
+    Interface of the backends that turn texts into embedding vectors.
+    
+    Attributes:
+        name: Provider name used in EmbeddingConfig
+        model: Model identifier, used in embedding cache keys
+        dimensions: Length of the returned vectors
+    """
+    
+    name: str = ""
+    
+    def __init__(self, model: str, dimensions: int):
+        """
+        Initialize the provider.
+        
+        Args:
+            model: Model identifier
+            dimensions: Length of the returned vectors
+        """
+        self.model = model
+        self.dimensions = dimensions
+    
+    @abstractmethod
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            One embedding vector per text
+        """
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Provider backed by OpenAI's embedding API."""
+    
+    name = OPENAI_PROVIDER
+    
+    def __init__(self, model: str, dimensions: int, api_key: Optional[str] = None):
+        """
+        Initialize the provider.
+        
+        Args:
+            model: OpenAI embedding model
+            dimensions: Length of the returned vectors
+            api_key: OpenAI API key
+        """
+        super().__init__(model, dimensions)
+        from langchain_openai import OpenAIEmbeddings
+        
+        self.embeddings = OpenAIEmbeddings(model=model, openai_api_key=api_key)
+    
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic local provider: a hashing vectorizer with random projection.
+    
+    Each text is tokenized into lowercase words, word bigrams and character
+    trigrams, weighted by log term frequency. Every token is hashed onto a
+    fixed number of output dimensions with random signs, which is a sparse
+    random projection of the hashed bag of features, and the result is L2
+    normalized. Vectors depend only on the text, seed and dimensions, so
+    they are stable across processes and machines. Texts that share
+    vocabulary get high cosine similarity; there is no semantic knowledge
+    beyond that.
+    """
+    
+    name = HASHING_PROVIDER
+    
+    def __init__(self, dimensions: int = 1536, seed: int = 0, projections_per_token: int = 8):
+        """
+        Initialize the provider.
+        
+        Args:
+            dimensions: Length of the returned vectors
+            seed: Seed of the hash functions
+            projections_per_token: Output dimensions each token is added to
+        """
+        super().__init__(f"hashing-v1-s{seed}", dimensions)
+        self.projections_per_token = max(1, min(16, projections_per_token))
+        self._key = seed.to_bytes(8, "little", signed=True)
+        self._token_cache: Dict[str, tuple] = {}
+    
+    def _tokens(self, text: str) -> Counter:
+        """Extract the weighted token features of a text."""
+        words = _TOKEN_PATTERN.findall(text.lower())
+        features = Counter(f"w:{word}" for word in words)
+        features.update(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+        for word in words:
+            padded = f"#{word}#"
+            features.update(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+    
+    def _projection(self, token: str) -> tuple:
+        """
+        Get the output dimensions and signs a token is projected onto.
+        
+        Args:
+            token: Token feature
+        
+        Returns:
+            Tuple of index and sign arrays
+        """
+        projection = self._token_cache.get(token)
+        if projection is None:
+            digest = hashlib.blake2b(
+                token.encode("utf-8"), digest_size=4 * self.projections_per_token, key=self._key
+            ).digest()
+            values = np.frombuffer(digest, dtype=np.uint32)
+            indexes = (values % self.dimensions).astype(np.intp)
+            signs = np.where((values // self.dimensions) & 1, -1.0, 1.0).astype(np.float32)
+            projection = (indexes, signs)
+            # Token vocabularies are bounded in practice, but keep the memo from growing without limit
+            if len(self._token_cache) >= 100000:
+                self._token_cache.clear()
+            self._token_cache[token] = projection
+        return projection
+    
+    def embed(self, text: str) -> List[float]:
+        """
+        Embed a single text.
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            L2-normalized embedding vector (all zeros for texts without tokens)
+        """
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token, count in self._tokens(text).items():
+            indexes, signs = self._projection(token)
+            np.add.at(vector, indexes, signs * (1.0 + math.log(count)))
+        
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+    
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+
+def create_embedding_provider(name: str, model: str, dimensions: int, api_key: Optional[str] = None) -> EmbeddingProvider:
+    """
+    Create an embedding provider by name.
+    
+    Args:
+        name: Provider name ("openai" or "hashing")
+        model: Model used by hosted providers
+        dimensions: Length of the returned vectors
+        api_key: API key used by hosted providers
+    
+    Returns:
+        EmbeddingProvider instance
+    """
+    name = (name or OPENAI_PROVIDER).lower()
+    if name == HASHING_PROVIDER:
+        return HashingEmbeddingProvider(dimensions=dimensions)
+    if name == OPENAI_PROVIDER:
+        return OpenAIEmbeddingProvider(model=model, dimensions=dimensions, api_key=api_key)
+    raise ValueError(f"Unknown embedding provider: {name}")
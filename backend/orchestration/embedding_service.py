@@ -1,118 +1,334 @@
 """
 Embedding Service for Staples Brain.
 
-This service provides vector embedding functionality for text using OpenAI's embedding API.
+This service provides vector embedding functionality for text using OpenAI's embedding API,
+or a local deterministic provider when the API is unavailable or not configured.
 It supports semantic similarity calculations for agent routing and content retrieval.
 """
+import asyncio
 import logging
 import os
-import hashlib
 from typing import Dict, List, Any, Optional
 
-from langchain_openai import OpenAIEmbeddings
-from pydantic import BaseModel
+import redis.asyncio as aioredis
+from pydantic import BaseModel, Field
+
+from backend.orchestration.embedding_cache import TieredEmbeddingCache
+from backend.orchestration.embedding_providers import (
+    EmbeddingProvider, OPENAI_PROVIDER, create_embedding_provider
+)
+from backend.utils.circuit_breaker import get_or_create_circuit
 
 logger = logging.getLogger(__name__)
 
 class EmbeddingConfig(BaseModel):
     """Configuration for embedding service"""
+    provider: str = Field(default_factory=lambda: os.environ.get("EMBEDDING_PROVIDER", OPENAI_PROVIDER))  # "openai" or "hashing"
+    fallback_provider: Optional[str] = Field(default_factory=lambda: os.environ.get("EMBEDDING_FALLBACK_PROVIDER") or None)  # Opt-in provider used when the primary fails or is unavailable (None returns zero vectors)
     model: str = "text-embedding-ada-002"  # OpenAI embedding model
     dimensions: int = 1536  # Default dimensions for OpenAI Ada embeddings
     cache_embeddings: bool = True  # Whether to cache embeddings
+    batch_size: int = 512  # Maximum texts per embedding request
+    batch_window_ms: float = 5.0  # Time to collect concurrent requests into one batch (0 disables)
+    cache_max_bytes: int = 64 * 1024 * 1024  # Byte budget of the in-process embedding cache
+    cache_redis_url: Optional[str] = Field(default_factory=lambda: os.environ.get("EMBEDDING_CACHE_REDIS_URL"))  # Shared cache tier
+    cache_ttl: int = 30 * 24 * 3600  # Expiry of shared cache entries in seconds (0 keeps them)
 
 
 class EmbeddingService:
     """
     Service for generating text embeddings and calculating semantic similarity.
     
-    This service wraps OpenAI's embedding API to provide vector representations
-    of text for semantic similarity calculations and retrieval.
+    This service wraps an embedding provider (OpenAI's embedding API by default)
+    to provide vector representations of text for semantic similarity
+    calculations and retrieval.
+    
+    Cache misses are embedded with batched provider calls. Texts
+    requested by concurrent callers within batch_window_ms are coalesced
+    into a shared batch, and a text already in flight is never requested
+    twice.
+    
+    Fallback and zero vectors live in a different space than the
+    configured provider's. Callers that persist or index vectors request
+    them with primary_only, which returns None instead.
     """
     
-    def __init__(self, config: Optional[EmbeddingConfig] = None):
+    def __init__(self, config: Optional[EmbeddingConfig] = None, redis_client: Optional[Any] = None):
         """
         Initialize the embedding service.
         
         Args:
             config: Optional configuration for the service
+            redis_client: Optional asyncio Redis client for the shared cache tier;
+                created from config.cache_redis_url when not given
         """
         self.config = config or EmbeddingConfig()
         self.api_key = os.environ.get("OPENAI_API_KEY")
         
-        if not self.api_key:
-            logger.warning("OPENAI_API_KEY not found in environment. Embeddings will not work.")
+        provider_name = self.config.provider
+        
+        # Set when the fallback stands in for a provider that is not configured
+        self.degraded = False
+        if provider_name == OPENAI_PROVIDER and not self.api_key:
+            if self.config.fallback_provider:
+                logger.warning(f"OPENAI_API_KEY not found in environment. Using {self.config.fallback_provider} embeddings.")
+                provider_name = self.config.fallback_provider
+                self.degraded = True
+            else:
+                logger.warning("OPENAI_API_KEY not found in environment. Embeddings will not work.")
+        
+        # Initialize the embedding provider and the one used when it fails
+        self.provider: Optional[EmbeddingProvider] = None
+        if provider_name != OPENAI_PROVIDER or self.api_key:
+            self.provider = create_embedding_provider(
+                provider_name, self.config.model, self.config.dimensions, self.api_key
+            )
+        self.fallback: Optional[EmbeddingProvider] = None
+        if self.config.fallback_provider and self.provider is not None and self.config.fallback_provider != self.provider.name:
+            self.fallback = create_embedding_provider(
+                self.config.fallback_provider, self.config.model, self.config.dimensions
+            )
         
-        # Initialize the embedding model
-        self.embeddings = OpenAIEmbeddings(
-            model=self.config.model,
-            openai_api_key=self.api_key
+        # Hosted providers are called through a circuit breaker so outages fail fast
+        self._embed_documents = None
+        if self.provider is not None:
+            self._embed_documents = self.provider.embed_documents
+            if self.provider.name == OPENAI_PROVIDER:
+                circuit = get_or_create_circuit(name="openai_embeddings", failure_threshold=3, recovery_timeout=30)
+                self._embed_documents = circuit(self.provider.embed_documents)
+        
+        # Tiered cache for embeddings: bounded in-process LRU plus optional shared Redis tier
+        if redis_client is None and self.config.cache_redis_url:
+            redis_client = aioredis.from_url(self.config.cache_redis_url)
+        self.cache = TieredEmbeddingCache(
+            model=self.provider.model if self.provider is not None else self.config.model,
+            dimensions=self.config.dimensions,
+            max_bytes=self.config.cache_max_bytes,
+            redis_client=redis_client,
+            ttl=self.config.cache_ttl
         )
         
-        # Cache for embeddings
-        self._embedding_cache: Dict[str, List[float]] = {}
+        # Micro-batching state: texts waiting for the next batch, texts sent and not yet answered
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+        
+        # Counters for monitoring
+        self.request_count = 0
+        self.embedded_count = 0
+        self.fallback_count = 0
         
-        logger.info(f"Initialized EmbeddingService with model {self.config.model}")
+        logger.info(f"Initialized EmbeddingService with {provider_name} provider (model {self.cache.model})")
     
-    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+    async def get_embeddings(self, texts: List[str], primary_only: bool = False) -> List[Optional[List[float]]]:
         """
         Generate embeddings for a list of texts.
         
         Args:
             texts: List of texts to embed
-            
+            primary_only: Return None instead of fallback or zero vectors,
+                for callers that persist or index the vectors
+        
         Returns:
             List of embedding vectors
         """
-        if not self.api_key:
+        if self.provider is None:
             logger.error("Cannot generate embeddings: OPENAI_API_KEY not set")
-            return [[0.0] * self.config.dimensions] * len(texts)
+            return [None if primary_only else [0.0] * self.config.dimensions for _ in texts]
+        if primary_only and self.degraded:
+            return [None] * len(texts)
         
-        results = []
-        cache_hits = 0
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
         
-        for text in texts:
-            # Use cache if enabled
-            if self.config.cache_embeddings:
-                cache_key = self._get_cache_key(text)
-                cached_embedding = self._embedding_cache.get(cache_key)
-                
-                if cached_embedding:
-                    results.append(cached_embedding)
-                    cache_hits += 1
-                    continue
+        # Use cache if enabled
+        cached = await self.cache.get_many(texts) if self.config.cache_embeddings else {}
+        
+        for i, text in enumerate(texts):
+            cached_embedding = cached.get(text)
+            if cached_embedding:
+                results[i] = cached_embedding
+                continue
             
-            # Not in cache, compute new embedding
-            try:
-                embedding = await self.embeddings.aembed_query(text)
-                results.append(embedding)
-                
-                # Store in cache if enabled
-                if self.config.cache_embeddings:
-                    cache_key = self._get_cache_key(text)
-                    self._embedding_cache[cache_key] = embedding
-            except Exception as e:
-                logger.error(f"Error generating embedding: {str(e)}")
-                # Return a zero vector as fallback
-                results.append([0.0] * self.config.dimensions)
+            # Repeated texts are embedded once
+            missing.setdefault(text, []).append(i)
         
+        cache_hits = len(texts) - sum(len(positions) for positions in missing.values())
         if cache_hits > 0:
             logger.debug(f"Embedding cache hits: {cache_hits}/{len(texts)}")
+        
+        if missing:
+            unique_texts = list(missing.keys())
+            if self.config.batch_window_ms > 0:
+                # Shielded so a cancelled caller does not cancel a batch shared with others
+                embeddings = await asyncio.gather(*(asyncio.shield(self._enqueue(text)) for text in unique_texts))
+            else:
+                embeddings = await self._embed_batch(unique_texts)
             
-        return results
+            # Texts the provider failed on get fallback vectors unless the caller refuses them
+            failed = [text for text, embedding in zip(unique_texts, embeddings) if embedding is None]
+            if failed and not primary_only:
+                fallback = dict(zip(failed, await self._embed_fallback(failed)))
+                embeddings = [fallback.get(text, embedding) for text, embedding in zip(unique_texts, embeddings)]
+            
+            for text, embedding in zip(unique_texts, embeddings):
+                for i in missing[text]:
+                    results[i] = embedding
         
-    async def get_embedding(self, text: str) -> List[float]:
+        return results
+    
+    async def get_embedding(self, text: str, primary_only: bool = False) -> Optional[List[float]]:
         """
         Generate an embedding for a single text.
         
         Args:
             text: Text to embed
-            
+            primary_only: Return None instead of a fallback or zero vector
+        
         Returns:
             Embedding vector
         """
-        embeddings = await self.get_embeddings([text])
+        embeddings = await self.get_embeddings([text], primary_only=primary_only)
         return embeddings[0]
     
-    def _get_cache_key(self, text: str) -> str:
-        """Generate a cache key for a text string"""
-        return hashlib.md5(text.encode('utf-8')).hexdigest()
\ No newline at end of file
+    def _enqueue(self, text: str) -> asyncio.Future:
+        """
+        Add a text to the next shared batch.
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            Future resolving to the text's embedding, or None if the provider failed
+        """
+        future = self._pending.get(text) or self._in_flight.get(text)
+        if future is not None:
+            return future
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[text] = future
+        
+        if len(self._pending) >= self.config.batch_size:
+            # Batch is full; send it without waiting for the window to close
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.config.batch_window_ms / 1000.0, self._start_flush)
+        
+        return future
+    
+    def _start_flush(self) -> None:
+        """Send the pending texts as one batch in the background."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self._in_flight.update(pending)
+        
+        task = asyncio.ensure_future(self._flush(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush(self, pending: Dict[str, asyncio.Future]) -> None:
+        """
+        Embed a shared batch and resolve the waiting callers.
+        
+        Args:
+            pending: Texts and the futures waiting for them
+        """
+        texts = list(pending.keys())
+        try:
+            embeddings = await self._embed_batch(texts)
+        except Exception as e:
+            embeddings = None
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for text, future in pending.items():
+                if self._in_flight.get(text) is future:
+                    del self._in_flight[text]
+        
+        if embeddings is None:
+            return
+        for text, embedding in zip(texts, embeddings):
+            future = pending[text]
+            if not future.done():
+                future.set_result(embedding)
+    
+    async def _embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed texts with the provider, chunked to the provider batch limit.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Embedding vectors (None for texts in chunks that failed)
+        """
+        chunk_size = max(1, self.config.batch_size)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        self.request_count += len(chunks)
+        
+        results = await asyncio.gather(
+            *(self._embed_documents(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        embeddings: List[Optional[List[float]]] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error generating embeddings for {len(chunk)} texts: {str(result)}")
+                embeddings.extend([None] * len(chunk))
+                continue
+            
+            embeddings.extend(result)
+            self.embedded_count += len(chunk)
+            
+            # Store in cache if enabled
+            if self.config.cache_embeddings:
+                await self.cache.put_many(dict(zip(chunk, result)))
+        
+        return embeddings
+    
+    async def _embed_fallback(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts the provider failed on with the fallback provider.
+        
+        Fallback vectors come from a different model, so they are neither
+        cached nor returned to primary_only callers.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Fallback embedding vectors, or zero vectors if there is no fallback
+        """
+        if self.fallback is not None:
+            try:
+                embeddings = await self.fallback.embed_documents(texts)
+                self.fallback_count += len(texts)
+                return embeddings
+            except Exception as e:
+                logger.error(f"Fallback {self.fallback.name} embeddings failed: {str(e)}")
+        
+        # Return zero vectors as fallback
+        return [[0.0] * self.config.dimensions] * len(texts)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get monitoring counters of the service.
+        
+        Returns:
+            Dictionary with request counts and cache counters
+        """
+        return {
+            "requests": self.request_count,
+            "embedded": self.embedded_count,
+            "fallback": self.fallback_count,
+            "cache": self.cache.stats(),
+        }
\ No newline at end of file
@@ -0,0 +1,433 @@
+"""
+LLM response cache for Staples Brain agents.
+
+Many messages that reach the LLM agents are repeats (store hours, return
+policy, greetings) and get the same answer from the same prompt. The
+LLMResponseCache stores agent responses keyed by the agent, model,
+temperature, a hash of the system prompt and the normalized turns sent
+to the model, in a TTL/LRU in-process tier with an optional shared Redis
+tier. An optional semantic tier embeds the user message and serves the
+response of a sufficiently similar earlier message with the same prompt
+and prior turns. The cache is opt-in: it is disabled unless
+RESPONSE_CACHE_SIZE is set.
+
+Only turns whose response cannot depend on who is asking are cached:
+turns carrying personal data (emails, phone numbers, card or order
+numbers), turns about the customer's own orders or account, and turns of
+longer conversations are never looked up or stored, and neither are
+responses carrying personal data.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.orchestration.routing_cache import normalize_message
+
+logger = logging.getLogger(__name__)
+
+# Personal data whose presence makes a turn or response uncacheable
+PII_PATTERNS = {
+    "email": re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"),
+    "phone": re.compile(r"(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b"),
+    "credit_card": re.compile(r"\b(?:\d{4}[-\s]?){3}\d{4}\b"),
+    "ssn": re.compile(r"\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b"),
+    # Order numbers (OD1234567, STB-987654 or digits following "order"), UPS tracking numbers (1Z...)
+    # and FedEx/USPS tracking numbers (12, 15 or 20-22 digits)
+    "reference_number": re.compile(
+        r"\b(?:[A-Z]{2,3}-?\d{6,10}|1Z[0-9A-Z]{16}|\d{12}(?:\d{3})?(?:\d{5,7})?)\b"
+        r"|\border\s*(?:number|no\.?)?\s*(?:is\s*)?[:#]?\s*\d{6,}\b",
+        re.IGNORECASE
+    ),
+    "password": re.compile(r"\bpassword\s*(?:is|:|=)\s*\S+", re.IGNORECASE),
+}
+
+# Messages about the customer's own orders or account are answered from session data
+SESSION_SPECIFIC_PATTERN = re.compile(
+    r"\b(?:my|our)\s+(?:order|account|package|parcel|shipment|delivery|password|email|address|card|payment|"
+    r"subscription|reward|return|refund|cart|purchase)s?\b",
+    re.IGNORECASE
+)
+
+
+def contains_pii(text: str) -> Optional[str]:
+    """
+    Detect personal data in a text.
+    
+    Args:
+        text: Message or response text
+    
+    Returns:
+        Name of the first matching pattern, or None
+    """
+    for name, pattern in PII_PATTERNS.items():
+        if pattern.search(text or ""):
+            return name
+    return None
+
+
+@dataclass
+class ResponseCacheRequest:
+    """
+    Cache identity of one LLM turn.
+    
+    Attributes:
+        key: Exact-match key of the turn
+        scope: Key of the agent, model, prompt and prior turns; semantic
+            matches are only served within the same scope
+        message: Normalized user message
+        ttl: Seconds a response to this turn stays valid
+        semantic: Whether the semantic tier may serve and index this turn
+    """
+    key: str
+    scope: str
+    message: str
+    ttl: float
+    semantic: bool = True
+
+
+class LLMResponseCache:
+    """
+    Exact-match and semantic cache of LLM agent responses.
+    
+    The exact tier maps turn keys to responses, in process and optionally in
+    Redis. The semantic tier keeps the normalized message embeddings of each
+    scope in process and resolves a similar message to its exact key, so
+    matches are served from either exact tier. Redis and embedding errors are
+    logged and treated as misses.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl: float = 3600.0,
+        max_history: int = 4,
+        semantic_threshold: float = 0.0,
+        embedding_service: Optional[Any] = None,
+        redis_client: Optional[Any] = None,
+        max_scope_entries: int = 256
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of responses kept in process
+            ttl: Default seconds a response stays valid
+            max_history: Maximum number of prior messages of a cacheable turn
+            semantic_threshold: Minimum cosine similarity of a semantic match (0 disables the tier)
+            embedding_service: EmbeddingService for the semantic tier
+            redis_client: Optional asyncio Redis client (decode_responses=True) for the shared tier
+            max_scope_entries: Maximum number of messages indexed per semantic scope
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_history = max_history
+        self.semantic_threshold = semantic_threshold if embedding_service is not None else 0.0
+        self.embedding_service = embedding_service
+        self.redis = redis_client
+        self.max_scope_entries = max(1, max_scope_entries)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # scope -> (exact keys, normalized embeddings), oldest first
+        self._scopes: "OrderedDict[str, Tuple[List[str], Optional[np.ndarray]]]" = OrderedDict()
+        
+        # Counters for monitoring
+        self.hits = 0
+        self.shared_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+    
+    def request(
+        self,
+        agent_id: str,
+        model: str,
+        temperature: float,
+        system_prompt: str,
+        history: List[Dict[str, Any]],
+        message: str,
+        ttl: Optional[float] = None,
+        semantic: bool = True
+    ) -> Optional[ResponseCacheRequest]:
+        """
+        Build the cache identity of a turn.
+        
+        Args:
+            agent_id: Agent answering the turn
+            model: Model name
+            temperature: Sampling temperature
+            system_prompt: System prompt sent to the model
+            history: Prior role/content messages sent to the model
+            message: User message
+            ttl: Agent TTL in seconds; None uses the default, 0 opts the agent out
+            semantic: Whether the agent allows semantic matches
+        
+        Returns:
+            ResponseCacheRequest, or None if the turn must not be cached
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return None
+        
+        reason = None
+        if len(history) > self.max_history:
+            reason = "long conversation"
+        elif SESSION_SPECIFIC_PATTERN.search(message or ""):
+            reason = "session-specific"
+        else:
+            for text in [message] + [entry.get("content", "") for entry in history]:
+                if contains_pii(text):
+                    reason = "personal data"
+                    break
+        if reason:
+            self.skipped += 1
+            logger.debug(f"Response cache skipped for agent {agent_id}: {reason}")
+            return None
+        
+        prompt_hash = hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()[:16]
+        turns = "\n".join(f"{entry.get('role', '')}:{normalize_message(entry.get('content', ''))}" for entry in history)
+        scope = hashlib.sha256(f"{agent_id}|{model}|{temperature}|{prompt_hash}|{turns}".encode("utf-8")).hexdigest()
+        normalized = normalize_message(message)
+        digest = hashlib.sha256(f"{scope}|{normalized}".encode("utf-8")).hexdigest()
+        return ResponseCacheRequest(
+            key=f"llm_response:{agent_id}:{digest}",
+            scope=scope,
+            message=normalized,
+            ttl=ttl,
+            semantic=semantic
+        )
+    
+    async def get(self, request: ResponseCacheRequest) -> Optional[Tuple[str, str]]:
+        """
+        Look up the response to a turn.
+        
+        Args:
+            request: Cache identity of the turn
+        
+        Returns:
+            (response, tier) with tier "exact" or "semantic", or None
+        """
+        response = await self._get_exact(request.key)
+        if response is not None:
+            self.hits += 1
+            return response, "exact"
+        
+        if request.semantic and self.semantic_threshold > 0:
+            key = await self._semantic_match(request)
+            if key is not None:
+                response = await self._get_exact(key)
+                if response is not None:
+                    self.hits += 1
+                    self.semantic_hits += 1
+                    return response, "semantic"
+        
+        self.misses += 1
+        return None
+    
+    async def put(self, request: ResponseCacheRequest, response: str) -> bool:
+        """
+        Cache the response to a turn.
+        
+        Args:
+            request: Cache identity of the turn
+            response: Response text
+        
+        Returns:
+            True if the response was cached; responses carrying personal data are not
+        """
+        if not response or contains_pii(response):
+            return False
+        
+        self._store(request.key, response, request.ttl)
+        if self.redis is not None:
+            try:
+                payload = json.dumps({"response": response, "expires_at": time.time() + request.ttl})
+                await self.redis.set(request.key, payload, ex=max(1, int(request.ttl)))
+            except Exception as e:
+                logger.warning(f"Shared response cache write failed: {str(e)}")
+        
+        if request.semantic and self.semantic_threshold > 0:
+            await self._index(request)
+        return True
+    
+    async def _get_exact(self, key: str) -> Optional[str]:
+        """Look up a response by exact key in process, then in the shared tier."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return response
+            del self._entries[key]
+        
+        if self.redis is not None:
+            try:
+                data = await self.redis.get(key)
+            except Exception as e:
+                logger.warning(f"Shared response cache lookup failed: {str(e)}")
+                data = None
+            if data:
+                try:
+                    entry = json.loads(data)
+                    response, ttl = entry["response"], entry.get("expires_at", 0) - time.time()
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    # A corrupt or foreign value is a miss, not an error for the agent
+                    logger.warning(f"Ignoring unreadable shared response cache entry {key}: {str(e)}")
+                    return None
+                # Keep the shared entry's remaining lifetime in process
+                if ttl > 0:
+                    self._store(key, response, ttl)
+                    self.shared_hits += 1
+                    return response
+        return None
+    
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed a normalized message; None if the embedding is unusable."""
+        try:
+            embedding = await self.embedding_service.get_embedding(text, primary_only=True)
+        except Exception as e:
+            logger.warning(f"Response cache embedding failed: {str(e)}")
+            return None
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+    
+    async def _semantic_match(self, request: ResponseCacheRequest) -> Optional[str]:
+        """Find the exact key of the most similar indexed message in the request's scope."""
+        indexed = self._scopes.get(request.scope)
+        if indexed is None or indexed[1] is None:
+            return None
+        
+        vector = await self._embed(request.message)
+        keys, matrix = indexed
+        if vector is None or vector.shape[0] != matrix.shape[1]:
+            return None
+        
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.semantic_threshold:
+            return None
+        logger.debug(f"Response cache semantic match with similarity {float(similarities[best]):.3f}")
+        return keys[best]
+    
+    async def _index(self, request: ResponseCacheRequest) -> None:
+        """Add a cached turn's message to the semantic index of its scope."""
+        keys, matrix = self._scopes.get(request.scope, ([], None))
+        if request.key in keys:
+            return
+        
+        vector = await self._embed(request.message)
+        if vector is None or (matrix is not None and vector.shape[0] != matrix.shape[1]):
+            return
+        
+        keys = keys + [request.key]
+        matrix = vector[np.newaxis, :] if matrix is None else np.vstack([matrix, vector])
+        if len(keys) > self.max_scope_entries:
+            keys, matrix = keys[1:], matrix[1:]
+        self._scopes[request.scope] = (keys, matrix)
+        self._scopes.move_to_end(request.scope)
+        
+        # Bound the index to roughly the size of the exact tier
+        while len(self._scopes) > self.max_entries:
+            self._scopes.popitem(last=False)
+    
+    def _store(self, key: str, response: str, ttl: float) -> None:
+        """Store a response in the in-process tier, evicting the least recently used."""
+        self._entries[key] = (time.monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop the in-process tiers."""
+        self._entries.clear()
+        self._scopes.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with size, hits by tier, misses, skipped turns and evictions
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "semantic_scopes": len(self._scopes),
+            "shared": self.redis is not None,
+            "semantic_threshold": self.semantic_threshold,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "skipped": self.skipped,
+            "evictions": self.evictions,
+        }
+
+
+# Process-wide response cache, created on first use
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache(config: Optional[Any] = None) -> Optional[LLMResponseCache]:
+    """
+    Get or create the process-wide LLM response cache.
+    
+    Args:
+        config: Application configuration with RESPONSE_CACHE_* settings
+    
+    Returns:
+        LLMResponseCache instance, or None if the cache is disabled
+    """
+    global _response_cache
+    
+    if _response_cache is None:
+        max_entries = getattr(config, "RESPONSE_CACHE_SIZE", 0)
+        if max_entries <= 0:
+            return None
+        
+        redis_client = None
+        redis_url = getattr(config, "RESPONSE_CACHE_REDIS_URL", None)
+        if redis_url:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.from_url(redis_url, decode_responses=True)
+        
+        embedding_service = None
+        semantic_threshold = getattr(config, "RESPONSE_CACHE_SEMANTIC_THRESHOLD", 0.0)
+        if semantic_threshold > 0:
+            try:
+                from backend.orchestration.embedding_service import EmbeddingService
+                embedding_service = EmbeddingService()
+            except Exception as e:
+                logger.warning(f"Semantic response cache enabled but unavailable: {str(e)}")
+        
+        _response_cache = LLMResponseCache(
+            max_entries=max_entries,
+            ttl=getattr(config, "RESPONSE_CACHE_TTL", 3600),
+            max_history=getattr(config, "RESPONSE_CACHE_MAX_HISTORY", 4),
+            semantic_threshold=semantic_threshold,
+            embedding_service=embedding_service,
+            redis_client=redis_client
+        )
+    return _response_cache
+
+
+def get_response_cache_stats() -> Optional[Dict[str, Any]]:
+    """
+    Get the counters of the process-wide response cache.
+    
+    Returns:
+        Cache counters, or None if no cache was created
+    """
+    return _response_cache.stats() if _response_cache is not None else None
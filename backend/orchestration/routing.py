@@ -0,0 +1,127 @@
+"""
+Structured routing for Staples Brain.
+
+A single structured-output LLM call decides everything the router needs
+for a turn: the password-reset intent, whether the message continues the
+previous agent's conversation, the entities mentioned and a relevance
+score for every agent. It replaces the separate intent, continuity and
+selection prompts of the legacy routing path.
+"""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+# Routing modes selectable through Config.ROUTING_MODE
+UNIFIED_ROUTING = "unified"
+LEGACY_ROUTING = "legacy"
+CONCURRENT_ROUTING = "concurrent"
+
+# Intents that route to the Reset Password Agent
+RESET_PASSWORD_INTENTS = ("reset_password", "reset_affirmative", "email_provided")
+
+
+class RoutingEntity(BaseModel):
+    """Entity mentioned in the user message."""
+    name: str = Field(description="Entity type, e.g. email, order_number, tracking_number, zip_code, product")
+    value: str = Field(description="Entity value exactly as written by the user")
+
+
+class AgentScore(BaseModel):
+    """Relevance of one agent to the user message."""
+    agent: str = Field(description="Agent name exactly as listed")
+    score: float = Field(description="Relevance between 0.0 (irrelevant) and 1.0 (perfect match)")
+
+
+class RoutingDecision(BaseModel):
+    """Routing decision for one conversation turn."""
+    intent: Literal["reset_password", "reset_affirmative", "email_provided", "other"] = Field(
+        description=(
+            "reset_password: the user asks to reset, change or recover a password; "
+            "reset_affirmative: the user accepts a previous password reset offer; "
+            "email_provided: the user gives an email address the assistant asked for; "
+            "other: anything else"
+        )
+    )
+    intent_confidence: float = Field(description="Confidence in the intent between 0.0 and 1.0")
+    continue_previous: bool = Field(
+        description="True if the message continues the topic the previous agent was handling"
+    )
+    continuity_confidence: float = Field(description="Confidence in continue_previous between 0.0 and 1.0")
+    entities: List[RoutingEntity] = Field(default_factory=list, description="Entities in the latest user message")
+    agent_scores: List[AgentScore] = Field(description="Score for every available agent, highest first")
+    reasoning: str = Field(default="", description="One sentence explaining the decision")
+    
+    def entity(self, name: str) -> Optional[str]:
+        """
+        Get the value of the first entity of a type.
+        
+        Args:
+            name: Entity type
+        
+        Returns:
+            Entity value or None
+        """
+        return next((entity.value for entity in self.entities if entity.name.lower() == name), None)
+    
+    def best_agent(self) -> Optional[AgentScore]:
+        """Get the highest scoring agent."""
+        return max(self.agent_scores, key=lambda agent_score: agent_score.score, default=None)
+
+
+ROUTER_SYSTEM_PROMPT = """You route customer messages for Staples customer service to specialized agents.
+Decide, in one pass:
+1. The password reset intent of the latest user message.
+2. Whether the latest message continues the conversation the previous agent was handling.
+3. The entities mentioned in the latest message (emails, order and tracking numbers, zip codes, products).
+4. A relevance score between 0.0 and 1.0 for every available agent.
+
+Available agents:
+{agent_descriptions}"""
+
+ROUTER_HUMAN_PROMPT = """CONVERSATION HISTORY:
+{history}
+
+PREVIOUS AGENT: {previous_agent}
+
+LATEST USER MESSAGE: {message}"""
+
+
+def format_history(conversation_history: Optional[List[Dict[str, Any]]], limit: int = 4) -> str:
+    """
+    Format the most recent conversation messages for a routing prompt.
+    
+    Args:
+        conversation_history: Role/content messages in chronological order
+        limit: Number of most recent messages to include
+    
+    Returns:
+        One "ROLE: content" line per message, or "(none)"
+    """
+    lines = []
+    for item in (conversation_history or [])[-limit:]:
+        role = item.get("role", "")
+        content = item.get("content", "")
+        if role and content:
+            lines.append(f"{role.upper()}: {content}")
+    return "\n".join(lines) or "(none)"
+
+
+def create_router_chain(llm: Any) -> Any:
+    """
+    Create the structured routing chain.
+    
+    Args:
+        llm: Chat model supporting structured output
+    
+    Returns:
+        Runnable taking agent_descriptions, history, previous_agent and message
+        and returning a RoutingDecision
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", ROUTER_SYSTEM_PROMPT),
+        ("human", ROUTER_HUMAN_PROMPT),
+    ])
+    return prompt | llm.with_structured_output(RoutingDecision)
@@ -0,0 +1,256 @@
+"""
+Routing decision cache for Staples Brain.
+
+Many first-turn messages ("track my order", "reset my password") repeat
+across sessions and always get the same routing decision. The
+RoutingCache stores decisions keyed by the canonicalized message and a
+hash of the agent roster they were made against, in a TTL/LRU
+in-process tier with an optional shared Redis tier. Adding or removing
+an agent, or changing an agent's name, description, version or routing
+patterns, changes the hash, so decisions made against older rosters are
+never served, in this worker or any other. Other agent settings are not
+hashed; agent change events clear the in-process tier regardless.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Canonicalize a message for routing cache lookups.
+    
+    Applies Unicode NFKC normalization, lowercasing, whitespace collapsing
+    and removal of leading and trailing punctuation, so "Track my order!"
+    and "track my  order" share a key.
+    
+    Args:
+        message: User message
+    
+    Returns:
+        Canonical form of the message
+    """
+    text = unicodedata.normalize("NFKC", message or "").lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _EDGE_PUNCTUATION.sub("", text)
+
+
+def _patterns_digest(patterns: Any) -> str:
+    """
+    Digest an agent's routing patterns, in order, since ties go to the first pattern.
+    
+    Args:
+        patterns: Pattern strings or dictionaries, or None
+    
+    Returns:
+        Hex digest of the patterns
+    """
+    encoded = json.dumps(patterns or [], sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def roster_hash(agents: Iterable[Any]) -> str:
+    """
+    Hash the routing-relevant attributes of an agent roster.
+    
+    Args:
+        agents: Active agents
+    
+    Returns:
+        Short hex digest that changes whenever an agent is added, removed,
+        renamed, re-described, re-versioned or given different patterns
+    """
+    entries = sorted(
+        f"{agent.id}|{agent.name}|{getattr(agent, 'description', '')}|{getattr(agent, 'version', '')}"
+        f"|{_patterns_digest(getattr(agent, 'patterns', None))}"
+        for agent in agents
+    )
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()[:16]
+
+
+class RoutingCache:
+    """
+    TTL/LRU cache of routing decisions with an optional shared Redis tier.
+    
+    Values are JSON-serializable dictionaries. Redis errors are logged and
+    treated as misses.
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0, redis_client: Optional[Any] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of decisions kept in process
+            ttl: Seconds a decision stays valid
+            redis_client: Optional asyncio Redis client (decode_responses=True) for the shared tier
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.redis = redis_client
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        
+        # Counters for monitoring
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def _key(self, roster: str, kind: str, message: str) -> str:
+        """Build the cache key of a decision."""
+        digest = hashlib.sha256(normalize_message(message).encode("utf-8")).hexdigest()
+        return f"routing:{roster}:{kind}:{digest}"
+    
+    def invalidate(self) -> None:
+        """
+        Drop all decisions held in process.
+        
+        Called when an agent changes. Shared entries are keyed by roster hash,
+        so they stop matching as soon as callers use the new roster.
+        """
+        self._entries.clear()
+        self.invalidations += 1
+    
+    async def get(self, roster: str, kind: str, message: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached decision.
+        
+        Args:
+            roster: Hash of the agent roster the decision must have been made against
+            kind: Decision kind (e.g. "selection" or "unified")
+            message: User message
+        
+        Returns:
+            Cached decision or None
+        """
+        key = self._key(roster, kind, message)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        
+        if self.redis is not None:
+            try:
+                data = await self.redis.get(key)
+                value = json.loads(data) if data else None
+            except Exception as e:
+                logger.warning(f"Shared routing cache lookup failed: {str(e)}")
+                value = None
+            if value is not None:
+                self._store(key, value)
+                self.hits += 1
+                self.shared_hits += 1
+                return value
+        
+        self.misses += 1
+        return None
+    
+    async def put(self, roster: str, kind: str, message: str, value: Dict[str, Any]) -> None:
+        """
+        Cache a decision.
+        
+        Args:
+            roster: Hash of the agent roster the decision was made against
+            kind: Decision kind
+            message: User message
+            value: JSON-serializable decision
+        """
+        key = self._key(roster, kind, message)
+        self._store(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, json.dumps(value), ex=max(1, int(self.ttl)))
+            except Exception as e:
+                logger.warning(f"Shared routing cache write failed: {str(e)}")
+    
+    def _store(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a decision in the in-process tier, evicting the least recently used."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop the in-process tier."""
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with size, hits, misses, hit rate, evictions and invalidations
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "shared": self.redis is not None,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Process-wide routing cache, created on first use
+_routing_cache: Optional[RoutingCache] = None
+
+
+def get_routing_cache(config: Optional[Any] = None) -> Optional[RoutingCache]:
+    """
+    Get or create the process-wide routing cache.
+    
+    Args:
+        config: Application configuration with ROUTING_CACHE_* settings
+    
+    Returns:
+        RoutingCache instance, or None if the cache is disabled
+    """
+    global _routing_cache
+    
+    if _routing_cache is None:
+        max_entries = getattr(config, "ROUTING_CACHE_SIZE", 10000)
+        if max_entries <= 0:
+            return None
+        
+        redis_client = None
+        redis_url = getattr(config, "ROUTING_CACHE_REDIS_URL", None)
+        if redis_url:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.from_url(redis_url, decode_responses=True)
+        
+        _routing_cache = RoutingCache(
+            max_entries=max_entries,
+            ttl=getattr(config, "ROUTING_CACHE_TTL", 3600),
+            redis_client=redis_client
+        )
+    return _routing_cache
+
+
+def get_routing_cache_stats() -> Optional[Dict[str, Any]]:
+    """
+    Get the counters of the process-wide routing cache.
+    
+    Returns:
+        Cache counters, or None if no cache was created
+    """
+    return _routing_cache.stats() if _routing_cache is not None else None
@@ -15,10 +15,24 @@ from backend.orchestration.state.state_recovery_manager import (
     StateRecoveryManager
 )
 
+from backend.orchestration.state.session_state_store import (
+    SessionStateStore,
+    get_session_state_store,
+)
+
+from backend.orchestration.state.turn_context import (
+    TURN_CONTEXT_KEY,
+    TurnContext,
+)
+
 __all__ = [
     'create_db_tables',
     'resilient_persist_state',
     'resilient_recover_state',
     'StatePersistenceManager',
     'StateRecoveryManager',
+    'SessionStateStore',
+    'get_session_state_store',
+    'TURN_CONTEXT_KEY',
+    'TurnContext',
 ]
\ No newline at end of file
@@ -0,0 +1,304 @@
+"""
+Session state store for the Staples Brain services.
+
+The brain services carry a small amount of state from one turn of a
+conversation to the next: the active agent, recent messages and the
+conversation context. The SessionStateStore keeps a compact serialized
+form of that state in a bounded TTL/LRU in-process tier and, optionally,
+in a shared Redis tier, so sessions survive worker restarts and can be
+served by any worker behind a load balancer. Per-turn data such as
+traces, responses and agent object references is never stored; agents
+are referenced by ID.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# msgpack is optional; without it session states are stored as JSON
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+logger = logging.getLogger(__name__)
+
+# State keys carried over between turns
+PERSISTED_STATE_KEYS = ("session_id", "current_agent_id", "messages", "context", "created_at")
+
+# Message fields carried over between turns
+PERSISTED_MESSAGE_KEYS = ("role", "content", "agent_id", "agent_name")
+
+
+def _to_serializable(value: Any) -> Any:
+    """
+    Convert a value the serializer cannot represent.
+    
+    Args:
+        value: Value of a state field
+    
+    Returns:
+        Agent ID for agent objects, ISO string for datetimes, string otherwise
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    agent_id = getattr(value, "id", None)
+    if isinstance(agent_id, str):
+        return agent_id
+    return str(value)
+
+
+def compact_state(state: Dict[str, Any], max_messages: int = 20) -> Dict[str, Any]:
+    """
+    Reduce a workflow state to the fields carried over between turns.
+    
+    Args:
+        state: Final workflow state of a turn
+        max_messages: Number of most recent messages to keep
+    
+    Returns:
+        Compact state with agent references replaced by IDs
+    """
+    compact = {key: state[key] for key in PERSISTED_STATE_KEYS if state.get(key) is not None}
+    
+    selected_agent = state.get("selected_agent")
+    if "current_agent_id" not in compact and selected_agent is not None:
+        compact["current_agent_id"] = getattr(selected_agent, "id", None)
+    
+    messages = compact.get("messages")
+    if messages:
+        compact["messages"] = [
+            {key: message[key] for key in PERSISTED_MESSAGE_KEYS if key in message}
+            if isinstance(message, dict) else {"content": str(message)}
+            for message in messages[-max_messages:]
+        ]
+    return compact
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """
+    Serialize a compact state.
+    
+    Args:
+        state: Compact state
+    
+    Returns:
+        msgpack bytes, or JSON bytes when msgpack is unavailable
+    """
+    if HAS_MSGPACK:
+        return msgpack.packb(state, use_bin_type=True, default=_to_serializable)
+    return json.dumps(state, separators=(",", ":"), default=_to_serializable).encode("utf-8")
+
+
+def decode_state(data: bytes) -> Dict[str, Any]:
+    """
+    Deserialize a compact state written by encode_state.
+    
+    Args:
+        data: Serialized state
+    
+    Returns:
+        Compact state
+    """
+    # Serialized maps start with "{" in JSON and never do in msgpack
+    if data[:1] == b"{":
+        return json.loads(data)
+    if not HAS_MSGPACK:
+        raise ValueError("Session state stored as msgpack but msgpack is not installed")
+    return msgpack.unpackb(data, raw=False)
+
+
+class SessionStateStore:
+    """
+    Session state store with a TTL/LRU in-process tier and an optional shared Redis tier.
+    
+    Every read returns a fresh dictionary, so callers can mutate it freely.
+    Redis errors are logged and treated as misses, so the shared tier never
+    fails a request.
+    """
+    
+    def __init__(
+        self,
+        namespace: str,
+        max_sessions: int = 10000,
+        ttl: float = 86400.0,
+        max_messages: int = 20,
+        redis_client: Optional[Any] = None
+    ):
+        """
+        Initialize the store.
+        
+        Args:
+            namespace: Key namespace, so services keep separate states
+            max_sessions: Maximum number of sessions kept in process
+            ttl: Seconds a session state stays valid after its last write
+            max_messages: Number of most recent messages kept per session
+            redis_client: Optional asyncio Redis client returning bytes (decode_responses=False)
+        """
+        self.namespace = namespace
+        self.max_sessions = max(1, max_sessions)
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.redis = redis_client
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        
+        # Counters for monitoring
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_errors = 0
+    
+    def _key(self, session_id: str) -> str:
+        """Build the shared key of a session."""
+        return f"session:{self.namespace}:{session_id}"
+    
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the state of a session.
+        
+        Args:
+            session_id: Session identifier
+        
+        Returns:
+            Compact state, or None if the session is unknown or expired
+        """
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            expires_at, data = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(session_id)
+                self.local_hits += 1
+                return decode_state(data)
+            del self._entries[session_id]
+        
+        if self.redis is not None:
+            try:
+                data = await self.redis.get(self._key(session_id))
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared session state lookup failed: {str(e)}")
+                data = None
+            if data:
+                self._store(session_id, data)
+                self.shared_hits += 1
+                return decode_state(data)
+        
+        self.misses += 1
+        return None
+    
+    async def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        """
+        Save the state of a session.
+        
+        Args:
+            session_id: Session identifier
+            state: Workflow state; only the fields carried over between turns are stored
+        """
+        data = encode_state(compact_state(state, self.max_messages))
+        self._store(session_id, data)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._key(session_id), data, ex=max(1, int(self.ttl)))
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared session state write failed: {str(e)}")
+    
+    async def delete(self, session_id: str) -> None:
+        """
+        Drop the state of a session from both tiers.
+        
+        Args:
+            session_id: Session identifier
+        """
+        self._entries.pop(session_id, None)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(self._key(session_id))
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared session state delete failed: {str(e)}")
+    
+    def _store(self, session_id: str, data: bytes) -> None:
+        """Store a serialized state in process, evicting the least recently used sessions."""
+        self._entries[session_id] = (time.monotonic() + self.ttl, data)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, session_id: str) -> bool:
+        entry = self._entries.get(session_id)
+        return entry is not None and entry[0] > time.monotonic()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store counters.
+        
+        Returns:
+            Dictionary with size, hits, misses, evictions and shared errors
+        """
+        hits = self.local_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "sessions": len(self._entries),
+            "size_bytes": sum(len(data) for _, data in self._entries.values()),
+            "shared": self.redis is not None,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "shared_errors": self.shared_errors,
+        }
+
+
+# Process-wide session state stores by namespace
+_session_state_stores: Dict[str, SessionStateStore] = {}
+
+
+def get_session_state_store(namespace: str, config: Optional[Any] = None) -> SessionStateStore:
+    """
+    Get or create the process-wide session state store of a namespace.
+    
+    Args:
+        namespace: Key namespace, e.g. the service name
+        config: Application configuration with SESSION_STATE_* settings
+    
+    Returns:
+        SessionStateStore instance
+    """
+    store = _session_state_stores.get(namespace)
+    if store is None:
+        redis_client = None
+        redis_url = getattr(config, "SESSION_STATE_REDIS_URL", None)
+        if redis_url:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.from_url(redis_url)
+        
+        store = SessionStateStore(
+            namespace,
+            max_sessions=getattr(config, "SESSION_STATE_MAX_SESSIONS", 10000),
+            ttl=getattr(config, "SESSION_STATE_TTL", 86400),
+            max_messages=getattr(config, "SESSION_STATE_MAX_MESSAGES", 20),
+            redis_client=redis_client
+        )
+        _session_state_stores[namespace] = store
+    return store
+
+
+def get_session_state_stats() -> Dict[str, Any]:
+    """
+    Get the counters of all process-wide session state stores.
+    
+    Returns:
+        Store counters by namespace
+    """
+    return {namespace: store.stats() for namespace, store in _session_state_stores.items()}
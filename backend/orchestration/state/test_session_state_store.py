@@ -0,0 +1,146 @@
+"""
+Tests for the session state store.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import fakeredis.aioredis
+import msgpack
+import pytest
+
+from backend.orchestration.state import session_state_store
+from backend.orchestration.state.session_state_store import (
+    SessionStateStore, compact_state, decode_state, encode_state
+)
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+def turn_state(message_count=3):
+    """Build the final workflow state of a turn, with per-turn data that must not be stored."""
+    return {
+        "session_id": "s1",
+        "selected_agent": SimpleNamespace(id="tracking", name="Tracker"),
+        "messages": [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}", "agent_id": "tracking", "trace": {"step": i}}
+            for i in range(message_count)
+        ],
+        "context": {"order_number": "OD1234567"},
+        "created_at": datetime(2024, 10, 16, 12, 30),
+        "response": "Your order ships tomorrow.",
+        "trace": [{"node": "router"}],
+        "agent": SimpleNamespace(id="tracking"),
+    }
+
+
+def test_compact_state_keeps_only_carried_over_fields():
+    compact = compact_state(turn_state())
+    
+    assert set(compact) == {"session_id", "current_agent_id", "messages", "context", "created_at"}
+    assert compact["current_agent_id"] == "tracking"
+    assert compact["messages"][0] == {"role": "user", "content": "m0", "agent_id": "tracking"}
+
+
+def test_compact_state_keeps_the_most_recent_messages():
+    compact = compact_state(turn_state(message_count=30), max_messages=4)
+    
+    assert [message["content"] for message in compact["messages"]] == ["m26", "m27", "m28", "m29"]
+
+
+def test_compact_state_prefers_an_explicit_current_agent():
+    state = dict(turn_state(), current_agent_id="returns")
+    
+    assert compact_state(state)["current_agent_id"] == "returns"
+
+
+def test_compact_state_drops_empty_fields_and_stringifies_odd_messages():
+    compact = compact_state({"session_id": "s1", "context": None, "messages": ["plain text"]})
+    
+    assert compact == {"session_id": "s1", "messages": [{"content": "plain text"}]}
+
+
+def test_encoded_state_round_trips_as_msgpack():
+    compact = compact_state(turn_state())
+    
+    data = encode_state(compact)
+    
+    assert data[:1] != b"{"
+    assert msgpack.unpackb(data, raw=False)["session_id"] == "s1"
+    assert decode_state(data) == dict(compact, created_at="2024-10-16T12:30:00")
+
+
+def test_state_is_stored_as_json_without_msgpack(monkeypatch):
+    monkeypatch.setattr(session_state_store, "HAS_MSGPACK", False)
+    compact = compact_state(turn_state())
+    
+    data = encode_state(compact)
+    
+    assert json.loads(data)["current_agent_id"] == "tracking"
+    assert decode_state(data) == dict(compact, created_at="2024-10-16T12:30:00")
+
+
+def test_json_states_still_decode_with_msgpack_installed():
+    # Written by a worker without msgpack
+    data = json.dumps({"session_id": "s1", "messages": []}).encode("utf-8")
+    
+    assert decode_state(data) == {"session_id": "s1", "messages": []}
+
+
+def test_msgpack_state_without_msgpack_is_rejected(monkeypatch):
+    data = encode_state({"session_id": "s1"})
+    monkeypatch.setattr(session_state_store, "HAS_MSGPACK", False)
+    
+    with pytest.raises(ValueError):
+        decode_state(data)
+
+
+def test_reads_return_fresh_copies():
+    store = SessionStateStore("brain")
+    run(store.put("s1", turn_state()))
+    
+    state = run(store.get("s1"))
+    state["context"]["order_number"] = "changed"
+    
+    assert run(store.get("s1"))["context"] == {"order_number": "OD1234567"}
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStateStore("brain", max_sessions=2)
+    run(store.put("s1", {"session_id": "s1"}))
+    run(store.put("s2", {"session_id": "s2"}))
+    run(store.get("s1"))
+    
+    run(store.put("s3", {"session_id": "s3"}))
+    
+    assert "s2" not in store and "s1" in store and "s3" in store
+    assert store.stats()["evictions"] == 1
+
+
+def test_shared_tier_serves_other_workers():
+    redis = fakeredis.aioredis.FakeRedis()
+    run(SessionStateStore("brain", ttl=600, redis_client=redis).put("s1", turn_state()))
+    other_worker = SessionStateStore("brain", redis_client=redis)
+    
+    assert run(other_worker.get("s1"))["current_agent_id"] == "tracking"
+    assert run(other_worker.get("s1"))["current_agent_id"] == "tracking"
+    assert (other_worker.stats()["shared_hits"], other_worker.stats()["local_hits"]) == (1, 1)
+    assert 0 < run(redis.ttl("session:brain:s1")) <= 600
+    # Namespaces keep services apart
+    assert run(SessionStateStore("supervisor", redis_client=redis).get("s1")) is None
+
+
+def test_delete_drops_both_tiers():
+    redis = fakeredis.aioredis.FakeRedis()
+    store = SessionStateStore("brain", redis_client=redis)
+    run(store.put("s1", turn_state()))
+    
+    run(store.delete("s1"))
+    
+    assert run(store.get("s1")) is None
+    assert run(redis.exists("session:brain:s1")) == 0
@@ -0,0 +1,156 @@
+"""
+Tests for loading and flushing the conversation context of a turn.
+"""
+
+import asyncio
+
+from backend.memory import AsyncMem0, MemoryConfig
+from backend.memory.connection import RedisConnectionManager
+from backend.orchestration.state.turn_context import TurnContext
+
+
+def async_mem0(name):
+    """Build a Redis-only AsyncMem0 on fakeredis."""
+    config = MemoryConfig()
+    config.redis_url = f"fakeredis://{name}"
+    config.use_database_storage = False
+    config.session_cache_size = 0
+    return AsyncMem0(memory_config=config, connection_manager=RedisConnectionManager(config))
+
+
+class CountingMem0:
+    """Wrapper counting the calls made to an AsyncMem0."""
+    
+    def __init__(self, mem0):
+        self.mem0 = mem0
+        self.calls = []
+    
+    def __getattr__(self, name):
+        attribute = getattr(self.mem0, name)
+        if not callable(attribute):
+            return attribute
+        
+        async def call(*args, **kwargs):
+            self.calls.append(name)
+            return await attribute(*args, **kwargs)
+        return call
+
+
+class IndividualWritesMemory:
+    """Memory service without add_turn or search_memories."""
+    
+    def __init__(self, history=None, fail=False):
+        self.history = history or []
+        self.fail = fail
+        self.writes = []
+    
+    async def get_conversation_history(self, conversation_id):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.history
+    
+    async def add_entity(self, **entity):
+        self.writes.append(("entity", entity["entity_value"]))
+    
+    async def add_message(self, **message):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.writes.append(("message", message["content"]))
+
+
+def test_turn_writes_are_flushed_in_one_batch_and_loaded_next_turn():
+    async def scenario():
+        memory = CountingMem0(async_mem0("turn-flush"))
+        first = await TurnContext.load("s1", memory)
+        first.add_message("user", "Where is order OD1234567?")
+        first.add_entity("order_number", "OD1234567")
+        first.add_message("assistant", "It ships tomorrow.", agent_id="tracking")
+        written = await first.flush()
+        writes = [name for name in memory.calls if name.startswith("add")]
+        
+        second = await TurnContext.load("s1", memory)
+        return first, written, writes, second
+    
+    first, written, writes, second = asyncio.run(scenario())
+    
+    assert written == 3 and first.pending_writes == 0
+    assert writes == ["add_turn"]
+    assert second.history == [
+        {"role": "user", "content": "Where is order OD1234567?"},
+        {"role": "assistant", "content": "It ships tomorrow."},
+    ]
+    assert second.entity("order_number") == "OD1234567"
+
+
+def test_history_is_limited_to_the_most_recent_messages():
+    async def scenario():
+        mem0 = async_mem0("turn-limit")
+        turn = TurnContext("s1", mem0)
+        for i in range(6):
+            turn.add_message("user", f"m{i}")
+        await turn.flush()
+        return await TurnContext.load("s1", mem0, history_limit=3)
+    
+    turn = asyncio.run(scenario())
+    
+    assert [message["content"] for message in turn.history] == ["m3", "m4", "m5"]
+
+
+def test_reads_are_a_snapshot_plus_buffered_entities():
+    turn = TurnContext(
+        "s1",
+        history=[{"role": "user", "content": "hi"}],
+        entities=[
+            {"entity_type": "email", "entity_value": "new@example.com", "session_id": "s1"},
+            {"entity_type": "email", "entity_value": "old@example.com", "session_id": "s0"},
+        ],
+    )
+    
+    assert turn.entity("email") == "new@example.com"
+    assert turn.entity("email", session_id="s0") == "old@example.com"
+    
+    turn.add_entity("email", "typed@example.com")
+    turn.add_message("user", "not history until the next turn")
+    
+    assert turn.entity("email") == "typed@example.com"
+    assert turn.history == [{"role": "user", "content": "hi"}]
+    assert turn.entity("phone") is None
+
+
+def test_services_without_add_turn_get_individual_writes():
+    memory = IndividualWritesMemory(history=[{"role": "user", "content": "hi"}])
+    
+    async def scenario():
+        turn = await TurnContext.load("s1", memory)
+        turn.add_message("user", "hello")
+        turn.add_entity("email", "a@example.com")
+        return turn, await turn.flush()
+    
+    turn, written = asyncio.run(scenario())
+    
+    assert turn.history == [{"role": "user", "content": "hi"}]
+    assert written == 2
+    assert memory.writes == [("entity", "a@example.com"), ("message", "hello")]
+
+
+def test_failed_load_and_flush_leave_an_empty_context():
+    memory = IndividualWritesMemory(fail=True)
+    
+    async def scenario():
+        turn = await TurnContext.load("s1", memory)
+        turn.add_message("user", "hello")
+        return turn, await turn.flush()
+    
+    turn, written = asyncio.run(scenario())
+    
+    assert turn.history == []
+    # Writes are attempted at most once
+    assert written == 0 and turn.pending_writes == 0
+
+
+def test_nothing_to_flush_makes_no_writes():
+    memory = IndividualWritesMemory()
+    
+    assert asyncio.run(TurnContext("s1", memory).flush()) == 0
+    assert asyncio.run(TurnContext("s1").flush()) == 0
+    assert memory.writes == []
@@ -0,0 +1,231 @@
+"""
+Request-scoped conversation context for the Staples Brain services.
+
+Routing nodes, agents and workflows of a single turn all need the
+conversation history and the entities extracted so far, and each used to
+fetch them from memory on its own, costing several Redis round trips per
+turn. A TurnContext loads the conversation once when the turn starts,
+serves every read of the turn from that snapshot and buffers the turn's
+memory writes, which are flushed together in one round trip when the
+turn ends.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from backend.memory.mem0 import MemoryType
+
+logger = logging.getLogger(__name__)
+
+# Key under which the turn context is passed to agents and workflows in their context
+TURN_CONTEXT_KEY = "turn_context"
+
+
+class TurnContext:
+    """
+    Conversation snapshot and write buffer for one conversation turn.
+    
+    Reads reflect the conversation as it was when the turn started plus
+    the entities buffered during the turn. Messages buffered during the
+    turn are not part of the history until the next turn.
+    """
+    
+    def __init__(
+        self,
+        session_id: str,
+        memory_service: Optional[Any] = None,
+        conversation_id: Optional[str] = None,
+        history: Optional[List[Dict[str, Any]]] = None,
+        entities: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Initialize a turn context.
+        
+        Args:
+            session_id: Session identifier
+            memory_service: Memory service the buffered writes are flushed to
+            conversation_id: Conversation identifier (uses session_id if not provided)
+            history: Role/content messages in chronological order
+            entities: Known entities, newest first, as dictionaries with
+                entity_type, entity_value and session_id
+        """
+        self.session_id = session_id
+        self.conversation_id = conversation_id or session_id
+        self.memory_service = memory_service
+        self._history = history or []
+        self._entities = entities or []
+        self._pending_messages: List[Dict[str, Any]] = []
+        self._pending_entities: List[Dict[str, Any]] = []
+    
+    @classmethod
+    async def load(
+        cls,
+        session_id: str,
+        memory_service: Optional[Any] = None,
+        conversation_id: Optional[str] = None,
+        history_limit: int = 10,
+        entity_limit: int = 100
+    ) -> "TurnContext":
+        """
+        Load the conversation snapshot of a turn.
+        
+        The history and the entities are read with separate queries issued
+        together, so entities extracted early in a long conversation are
+        still found.
+        
+        Args:
+            session_id: Session identifier
+            memory_service: Memory service to read from and flush to
+            conversation_id: Conversation identifier (uses session_id if not provided)
+            history_limit: Number of most recent messages kept in the history
+            entity_limit: Number of most recent entities read
+        
+        Returns:
+            TurnContext; empty if the conversation could not be read
+        """
+        turn = cls(session_id, memory_service, conversation_id)
+        if memory_service is None or not turn.conversation_id:
+            return turn
+        
+        try:
+            if hasattr(memory_service, "search_memories"):
+                messages, entities = await asyncio.gather(
+                    memory_service.get_conversation_messages(conversation_id=turn.conversation_id, limit=history_limit),
+                    memory_service.search_memories(
+                        {"conversation_id": turn.conversation_id, "memory_type": MemoryType.ENTITY.value},
+                        limit=entity_limit
+                    )
+                )
+                # Messages are read newest first
+                turn._history = messages[::-1]
+                turn._entities = [
+                    {
+                        "entity_type": (memory.metadata or {}).get("entity_type"),
+                        "entity_value": memory.content,
+                        "session_id": memory.session_id
+                    }
+                    for memory in entities
+                ]
+            else:
+                turn._history = await memory_service.get_conversation_history(turn.conversation_id)
+        except Exception as e:
+            logger.error(f"Error loading turn context for session {session_id}: {str(e)}")
+        return turn
+    
+    @property
+    def history(self) -> List[Dict[str, Any]]:
+        """Role/content messages of the conversation before this turn, in chronological order."""
+        return self._history
+    
+    def entity(self, entity_type: str, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        Get the most recent value of an entity type.
+        
+        Args:
+            entity_type: Type of entity (e.g., 'email')
+            session_id: Optional session the entity must have been extracted in
+        
+        Returns:
+            Entity value, or None if no entity of the type is known
+        """
+        for entity in reversed(self._pending_entities):
+            if entity["entity_type"] == entity_type and (session_id is None or entity.get("session_id") == session_id):
+                return entity["entity_value"]
+        for entity in self._entities:
+            if entity["entity_type"] == entity_type and (session_id is None or entity.get("session_id") == session_id):
+                return entity["entity_value"]
+        return None
+    
+    def add_message(
+        self,
+        role: str,
+        content: str,
+        agent_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Buffer a message of this turn.
+        
+        Args:
+            role: Message role (user, assistant, system)
+            content: Message content
+            agent_id: Optional agent ID
+            metadata: Optional message metadata
+        """
+        self._pending_messages.append({
+            "session_id": self.session_id,
+            "conversation_id": self.conversation_id,
+            "role": role,
+            "content": content,
+            "agent_id": agent_id,
+            "metadata": metadata
+        })
+    
+    def add_entity(
+        self,
+        entity_type: str,
+        entity_value: str,
+        confidence: float = 1.0,
+        metadata: Optional[Dict[str, Any]] = None,
+        agent_id: Optional[str] = None
+    ) -> None:
+        """
+        Buffer an entity extracted during this turn.
+        
+        Args:
+            entity_type: Type of entity (e.g., 'email', 'tracking_number')
+            entity_value: Value of the entity
+            confidence: Confidence score for the extraction
+            metadata: Optional entity metadata
+            agent_id: Optional agent ID
+        """
+        self._pending_entities.append({
+            "conversation_id": self.conversation_id,
+            "session_id": self.session_id,
+            "entity_type": entity_type,
+            "entity_value": entity_value,
+            "confidence": confidence,
+            "metadata": metadata,
+            "agent_id": agent_id
+        })
+    
+    @property
+    def pending_writes(self) -> int:
+        """Number of buffered memory writes."""
+        return len(self._pending_messages) + len(self._pending_entities)
+    
+    async def flush(self) -> int:
+        """
+        Write the buffered messages and entities to the memory service.
+        
+        Uses a single batched write when the memory service supports it and
+        individual writes otherwise. The buffers are emptied even if the
+        write fails, so a turn's writes are attempted at most once.
+        
+        Returns:
+            Number of memory entries written
+        """
+        messages, self._pending_messages = self._pending_messages, []
+        entities, self._pending_entities = self._pending_entities, []
+        if self.memory_service is None or not (messages or entities):
+            return 0
+        
+        try:
+            if hasattr(self.memory_service, "add_turn"):
+                return len(await self.memory_service.add_turn(messages=messages, entities=entities))
+            
+            for entity in entities:
+                await self.memory_service.add_entity(**entity)
+            for message in messages:
+                await self.memory_service.add_message(**message)
+            return len(entities) + len(messages)
+        except Exception as e:
+            logger.error(f"Error flushing turn context for session {self.session_id}: {str(e)}", exc_info=True)
+            return 0
+    
+    def __repr__(self) -> str:
+        return (
+            f"TurnContext(session_id={self.session_id!r}, history={len(self._history)}, "
+            f"entities={len(self._entities)}, pending_writes={self.pending_writes})"
+        )
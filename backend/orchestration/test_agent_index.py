@@ -0,0 +1,141 @@
+"""
+Tests for the agent embedding index used by the pre-router.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.orchestration.agent_index import AgentEmbeddingIndex
+
+MODEL = "test-model"
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+def unit(*values):
+    """Normalized vector."""
+    vector = np.asarray(values, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def similar(base, similarity):
+    """Unit vector in the plane of base and the z axis with the given cosine to base (base in the x/y plane)."""
+    x, y, _ = base
+    return [similarity * x, similarity * y, float(np.sqrt(1 - similarity ** 2))]
+
+
+class FakeEmbeddingService:
+    """Embedding service returning fixed vectors and recording what it embeds."""
+    
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.embedded = []
+        self.cache = SimpleNamespace(model=MODEL)
+        self.config = SimpleNamespace(dimensions=3)
+    
+    async def get_embeddings(self, texts):
+        self.embedded.extend(texts)
+        return [self.vectors.get(text, [0.0, 0.0, 0.0]) for text in texts]
+    
+    async def get_embedding(self, text):
+        return (await self.get_embeddings([text]))[0]
+
+
+def agent(agent_id, description, patterns=None):
+    """Build a minimal routable agent."""
+    return SimpleNamespace(id=agent_id, name=agent_id.title(), description=description, patterns=patterns or [])
+
+
+TRACKING = unit(1, 0, 0)
+STORE = unit(0, 1, 0)
+VECTORS = {"Tracking: Tracks orders": TRACKING, "Store: Store information": STORE}
+AGENTS = [agent("tracking", "Tracks orders"), agent("store", "Store information")]
+
+
+def index(vectors=None, agents=AGENTS, **options):
+    """Build an index over the given agents."""
+    agent_index = AgentEmbeddingIndex(FakeEmbeddingService({**VECTORS, **(vectors or {})}), **options)
+    run(agent_index.build(agents))
+    return agent_index
+
+
+def test_clear_match_is_returned():
+    agent_index = index({"where is my parcel": similar(TRACKING, 0.95)})
+    
+    agent_id, score = run(agent_index.match("where is my parcel"))
+    
+    assert agent_id == "tracking" and score == pytest.approx(0.95, abs=1e-5)
+    assert agent_index.stats()["matches"] == 1
+
+
+@pytest.mark.parametrize("similarity, matched", [(0.84, False), (0.85, True), (0.9, True)])
+def test_best_agent_must_clear_the_threshold(similarity, matched):
+    agent_index = index({"query": similar(TRACKING, similarity)}, min_similarity=0.85, margin=0.05)
+    
+    assert (run(agent_index.match("query")) is not None) == matched
+
+
+def test_best_agent_must_lead_the_runner_up_by_the_margin():
+    # Halfway between the two agents, so both score the same
+    between = unit(1, 1, 0)
+    agent_index = index({"close call": between, "clear lead": unit(1, 0.3, 0)}, min_similarity=0.5, margin=0.1)
+    
+    assert run(agent_index.match("close call")) is None
+    assert run(agent_index.match("clear lead"))[0] == "tracking"
+    assert agent_index.stats() == {"vectors": 2, "agents": 2, "lookups": 2, "matches": 1, "match_rate": 0.5}
+
+
+def test_single_agent_needs_only_the_threshold():
+    agent_index = index({"query": similar(TRACKING, 0.9)}, agents=AGENTS[:1])
+    
+    assert run(agent_index.match("query"))[0] == "tracking"
+
+
+def test_agent_scores_are_the_best_of_its_patterns():
+    returns = agent("returns", "Handles returns", [
+        {"pattern_type": "semantic", "pattern_value": "I want a refund"},
+        {"pattern_type": "keyword", "pattern_value": "return"},
+    ])
+    refund = unit(0, 0, 1)
+    agent_index = index({"Returns: Handles returns": unit(1, 1, 1), "I want a refund": refund, "refund please": refund},
+                        agents=AGENTS + [returns])
+    
+    scores = dict(run(agent_index.score("refund please")))
+    
+    assert scores["returns"] == pytest.approx(1.0)
+    assert agent_index.size == 4
+    # Keyword patterns are not embedded
+    assert "return" not in agent_index.embedding_service.embedded
+
+
+def test_stored_pattern_embeddings_of_the_active_model_are_reused():
+    tracking = agent("tracking", "Tracks orders", [
+        {"pattern_type": "semantic", "pattern_value": "where is my package", "embedding": TRACKING, "embedding_model": MODEL},
+        {"pattern_type": "semantic", "pattern_value": "parcel status", "embedding": TRACKING, "embedding_model": "old-model"},
+    ])
+    agent_index = index(agents=[tracking, AGENTS[1]])
+    
+    embedded = agent_index.embedding_service.embedded
+    assert "where is my package" not in embedded
+    assert "parcel status" in embedded
+
+
+def test_failed_embeddings_never_match():
+    # "parcel status" has no vector, so the fake service returns zeros for it
+    tracking = agent("tracking", "Tracks orders", [{"pattern_type": "semantic", "pattern_value": "parcel status"}])
+    agent_index = index(agents=[tracking, agent("unknown", "Not embeddable")])
+    
+    assert agent_index.agent_ids == ["tracking"] and agent_index.size == 1
+
+
+def test_unusable_query_or_empty_index_is_inconclusive():
+    empty = index(agents=[])
+    
+    assert run(empty.match("anything")) is None
+    assert run(index().match("no vector for this query")) is None
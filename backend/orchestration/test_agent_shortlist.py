@@ -0,0 +1,128 @@
+"""
+Tests for local shortlisting of agents before LLM routing.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.orchestration.agent_shortlist import (
+    SHORTLIST_FALLBACK_ALL, SHORTLIST_FALLBACK_PINNED, AgentShortlist
+)
+
+AGENT_IDS = ["tracking", "returns", "store", "password", "general", "ink"]
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+class FakeAgentIndex:
+    """Agent index returning fixed scores, or failing."""
+    
+    def __init__(self, scores=None, error=None):
+        self.scores = scores or []
+        self.error = error
+    
+    async def score(self, query):
+        if self.error is not None:
+            raise self.error
+        return self.scores
+
+
+def agent(agent_id, keywords=()):
+    """Build a minimal agent with keyword patterns."""
+    patterns = [{"pattern_type": "keyword", "pattern_value": keyword, "priority": 1} for keyword in keywords]
+    return SimpleNamespace(id=agent_id, name=agent_id.title(), patterns=patterns)
+
+
+def ranked(*agent_ids):
+    """Scores in the given order, best first."""
+    return [(agent_id, 0.9 - i * 0.1) for i, agent_id in enumerate(agent_ids)]
+
+
+ROSTER = {agent_id: agent(agent_id) for agent_id in AGENT_IDS}
+
+
+def test_top_ranked_agents_are_kept():
+    shortlist = AgentShortlist(FakeAgentIndex(ranked(*AGENT_IDS)), size=3)
+    
+    assert run(shortlist.select("where is my order")) == ["tracking", "returns", "store"]
+
+
+def test_keyword_hits_come_first():
+    agents = [agent("ink", ["toner"]), agent("tracking")]
+    shortlist = AgentShortlist(FakeAgentIndex(ranked(*AGENT_IDS)), size=2, agents=agents)
+    
+    assert run(shortlist.select("do you have toner")) == ["ink", "tracking"]
+
+
+def test_pinned_agents_are_added_on_top_of_the_size():
+    shortlist = AgentShortlist(FakeAgentIndex(ranked(*AGENT_IDS)), size=2)
+    
+    selected = run(shortlist.select("where is my order", pinned=["general", "tracking", None, ""]))
+    
+    assert selected == ["tracking", "returns", "general"]
+
+
+@pytest.mark.parametrize("index", [FakeAgentIndex([]), FakeAgentIndex(error=ConnectionError("embeddings down"))])
+def test_unrankable_query_returns_none(index):
+    shortlist = AgentShortlist(index, size=2)
+    
+    assert run(shortlist.select("where is my order", pinned=["general"])) is None
+    assert shortlist.stats()["fallbacks"] == 1
+
+
+def test_small_roster_is_never_shortlisted():
+    index = FakeAgentIndex(error=AssertionError("must not score"))
+    shortlist = AgentShortlist(index, size=len(ROSTER))
+    
+    assert run(shortlist.candidates("anything", ROSTER)) == list(ROSTER.values())
+    assert shortlist.stats()["lookups"] == 0
+
+
+def test_candidates_follow_the_shortlist():
+    shortlist = AgentShortlist(FakeAgentIndex(ranked("store", "tracking", "ink")), size=2)
+    
+    candidates = run(shortlist.candidates("store hours", ROSTER, pinned=["general", "retired"]))
+    
+    assert [candidate.id for candidate in candidates] == ["store", "tracking", "general"]
+
+
+def test_fallback_all_describes_the_full_roster():
+    shortlist = AgentShortlist(FakeAgentIndex([]), size=2)
+    
+    candidates = run(shortlist.candidates("anything", ROSTER, pinned=["general"], fallback=SHORTLIST_FALLBACK_ALL))
+    
+    assert candidates == list(ROSTER.values())
+
+
+def test_fallback_pinned_describes_only_the_pinned_agents():
+    shortlist = AgentShortlist(FakeAgentIndex([]), size=2)
+    
+    candidates = run(shortlist.candidates(
+        "anything", ROSTER, pinned=["returns", "retired", "general"], fallback=SHORTLIST_FALLBACK_PINNED
+    ))
+    
+    # Pinned IDs that are not in the roster are dropped
+    assert [candidate.id for candidate in candidates] == ["returns", "general"]
+
+
+def test_fallback_pinned_without_pinned_agents_describes_the_full_roster():
+    shortlist = AgentShortlist(FakeAgentIndex([]), size=2)
+    
+    candidates = run(shortlist.candidates("anything", ROSTER, pinned=["retired"], fallback=SHORTLIST_FALLBACK_PINNED))
+    
+    assert candidates == list(ROSTER.values())
+
+
+def test_stats_average_only_ranked_lookups():
+    shortlist = AgentShortlist(FakeAgentIndex(ranked(*AGENT_IDS)), size=2)
+    run(shortlist.select("first", pinned=["general"]))
+    run(shortlist.select("second"))
+    shortlist.agent_index = FakeAgentIndex([])
+    run(shortlist.select("third"))
+    
+    assert shortlist.stats() == {"size": 2, "lookups": 3, "fallbacks": 1, "avg_candidates": 2.5}
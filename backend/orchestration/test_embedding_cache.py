@@ -0,0 +1,143 @@
+"""
+Tests for the tiered embedding cache.
+"""
+
+import asyncio
+
+import fakeredis.aioredis
+import numpy as np
+
+from backend.orchestration.embedding_cache import (
+    ENTRY_OVERHEAD_BYTES, EmbeddingLRU, TieredEmbeddingCache, embedding_cache_key
+)
+
+DIMENSIONS = 4
+
+# Values exactly representable as float32, so round trips compare equal
+EMBEDDINGS = {"store hours": [0.5, -0.25, 1.0, 0.0], "return policy": [0.125, 2.0, -1.5, 0.75]}
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+def vector_cost():
+    """Bytes charged to the LRU for one cached vector."""
+    return DIMENSIONS * 4 + ENTRY_OVERHEAD_BYTES
+
+
+class FailingRedis:
+    """Redis client whose every command fails."""
+    
+    async def execute_command(self, *args, **options):
+        raise ConnectionError("redis down")
+    
+    def pipeline(self, transaction=True):
+        return self
+    
+    def set(self, key, value, ex=None):
+        pass
+    
+    async def execute(self):
+        raise ConnectionError("redis down")
+
+
+def test_lru_stays_within_its_byte_budget():
+    lru = EmbeddingLRU(max_bytes=2 * vector_cost())
+    for i in range(3):
+        lru.put(f"k{i}", np.full(DIMENSIONS, i, dtype=np.float32))
+    
+    assert len(lru) == 2 and lru.size_bytes == 2 * vector_cost()
+    assert lru.get("k0") is None
+    assert lru.evictions == 1
+
+
+def test_lru_evicts_the_least_recently_used():
+    lru = EmbeddingLRU(max_bytes=2 * vector_cost())
+    lru.put("k0", np.zeros(DIMENSIONS, dtype=np.float32))
+    lru.put("k1", np.zeros(DIMENSIONS, dtype=np.float32))
+    lru.get("k0")
+    
+    lru.put("k2", np.zeros(DIMENSIONS, dtype=np.float32))
+    
+    assert lru.get("k1") is None
+    assert lru.get("k0") is not None and lru.get("k2") is not None
+
+
+def test_lru_replacing_a_key_does_not_double_count():
+    lru = EmbeddingLRU(max_bytes=10 * vector_cost())
+    lru.put("k0", np.zeros(DIMENSIONS, dtype=np.float32))
+    lru.put("k0", np.ones(DIMENSIONS, dtype=np.float32))
+    
+    assert len(lru) == 1 and lru.size_bytes == vector_cost()
+
+
+def test_lru_skips_vectors_larger_than_the_budget():
+    lru = EmbeddingLRU(max_bytes=vector_cost() - 1)
+    lru.put("k0", np.zeros(DIMENSIONS, dtype=np.float32))
+    
+    assert len(lru) == 0 and lru.size_bytes == 0
+
+
+def test_keys_separate_models_and_dimensions():
+    keys = {
+        embedding_cache_key("ada", 4, "store hours"),
+        embedding_cache_key("ada", 8, "store hours"),
+        embedding_cache_key("hashing-v1-s0", 4, "store hours"),
+        embedding_cache_key("ada", 4, "return policy"),
+    }
+    
+    assert len(keys) == 4
+
+
+def test_shared_hits_are_promoted_to_the_local_tier():
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    run(TieredEmbeddingCache("ada", DIMENSIONS, redis_client=redis).put_many(EMBEDDINGS))
+    cache = TieredEmbeddingCache("ada", DIMENSIONS, redis_client=redis)
+    
+    assert run(cache.get_many(list(EMBEDDINGS))) == EMBEDDINGS
+    assert run(cache.get_many(list(EMBEDDINGS))) == EMBEDDINGS
+    
+    stats = cache.stats()
+    assert (stats["shared_hits"], stats["local_hits"], stats["misses"]) == (2, 2, 0)
+    assert stats["entries"] == 2
+
+
+def test_shared_entries_are_float32_bytes_with_a_ttl():
+    redis = fakeredis.aioredis.FakeRedis()
+    cache = TieredEmbeddingCache("ada", DIMENSIONS, redis_client=redis, ttl=60)
+    
+    run(cache.put_many({"store hours": EMBEDDINGS["store hours"]}))
+    
+    key = cache.key("store hours")
+    assert run(redis.get(key)) == np.asarray(EMBEDDINGS["store hours"], dtype=np.float32).tobytes()
+    assert 0 < run(redis.ttl(key)) <= 60
+
+
+def test_shared_entries_of_the_wrong_size_are_misses():
+    redis = fakeredis.aioredis.FakeRedis()
+    cache = TieredEmbeddingCache("ada", DIMENSIONS, redis_client=redis)
+    run(redis.set(cache.key("store hours"), b"\x00" * (DIMENSIONS * 4 - 1)))
+    
+    assert run(cache.get_many(["store hours"])) == {}
+    assert cache.stats()["misses"] == 1
+
+
+def test_redis_errors_are_treated_as_misses():
+    cache = TieredEmbeddingCache("ada", DIMENSIONS, redis_client=FailingRedis())
+    
+    run(cache.put_many(EMBEDDINGS))
+    
+    # The local tier still serves while Redis is down
+    assert run(cache.get_many(["store hours", "ink"])) == {"store hours": EMBEDDINGS["store hours"]}
+    assert cache.stats()["shared_errors"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_repeated_texts_are_looked_up_once():
+    cache = TieredEmbeddingCache("ada", DIMENSIONS)
+    run(cache.put_many({"store hours": EMBEDDINGS["store hours"]}))
+    
+    assert run(cache.get_many(["store hours", "store hours", "ink", "ink"])) == {"store hours": EMBEDDINGS["store hours"]}
+    assert (cache.stats()["local_hits"], cache.stats()["misses"]) == (1, 1)
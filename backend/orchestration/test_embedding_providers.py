@@ -0,0 +1,88 @@
+"""
+Tests for the embedding providers.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from backend.orchestration.embedding_providers import (
+    HASHING_PROVIDER, HashingEmbeddingProvider, create_embedding_provider
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEXTS = ["Where is my order?", "What are your store hours?", "Do you sell HP 67 ink?"]
+
+
+def cosine(a, b):
+    """Cosine similarity of two vectors."""
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def test_embeddings_are_deterministic():
+    first = asyncio.run(HashingEmbeddingProvider(dimensions=64).embed_documents(TEXTS))
+    second = asyncio.run(HashingEmbeddingProvider(dimensions=64).embed_documents(TEXTS))
+    
+    assert first == second
+
+
+def test_embeddings_are_stable_across_processes():
+    # Python's str hash is salted per process; the provider must not depend on it
+    script = (
+        "from backend.orchestration.embedding_providers import HashingEmbeddingProvider;"
+        "print(HashingEmbeddingProvider(dimensions=16).embed('track my order'))"
+    )
+    outputs = {
+        subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                       env={**os.environ, "PYTHONHASHSEED": seed, "PYTHONPATH": REPO_ROOT}).stdout
+        for seed in ("1", "2")
+    }
+    
+    assert len(outputs) == 1
+    assert outputs.pop().strip() == str(HashingEmbeddingProvider(dimensions=16).embed("track my order"))
+
+
+def test_seed_changes_the_embedding_space():
+    default = HashingEmbeddingProvider(dimensions=64)
+    reseeded = HashingEmbeddingProvider(dimensions=64, seed=1)
+    
+    assert default.embed(TEXTS[0]) != reseeded.embed(TEXTS[0])
+    assert default.model != reseeded.model
+
+
+@pytest.mark.parametrize("dimensions", [8, 64, 1536])
+def test_embeddings_are_normalized_to_the_configured_dimensions(dimensions):
+    embedding = HashingEmbeddingProvider(dimensions=dimensions).embed(TEXTS[1])
+    
+    assert len(embedding) == dimensions
+    assert np.linalg.norm(embedding) == pytest.approx(1.0, abs=1e-6)
+
+
+def test_text_without_tokens_is_a_zero_vector():
+    assert HashingEmbeddingProvider(dimensions=8).embed("?!  ...") == [0.0] * 8
+
+
+def test_case_and_punctuation_do_not_matter():
+    provider = HashingEmbeddingProvider(dimensions=256)
+    
+    assert provider.embed("Track my order!") == provider.embed("track MY order")
+
+
+def test_shared_vocabulary_is_more_similar():
+    provider = HashingEmbeddingProvider(dimensions=256)
+    query = provider.embed("track my order status")
+    
+    assert cosine(query, provider.embed("where is my order")) > cosine(query, provider.embed("store opening hours"))
+
+
+def test_create_provider_by_name():
+    provider = create_embedding_provider("HASHING", "text-embedding-ada-002", 32)
+    
+    assert provider.name == HASHING_PROVIDER and provider.dimensions == 32
+    with pytest.raises(ValueError):
+        create_embedding_provider("word2vec", "text-embedding-ada-002", 32)
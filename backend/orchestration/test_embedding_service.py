@@ -0,0 +1,139 @@
+"""
+Tests for batching and coalescing in the embedding service.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.orchestration.embedding_service import EmbeddingConfig, EmbeddingService
+
+DIMENSIONS = 8
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+class RecordingProvider:
+    """Stand-in for the provider call that records every batch it is sent."""
+    
+    def __init__(self, delay=0.0, fail_on=None):
+        self.batches = []
+        self.delay = delay
+        self.fail_on = fail_on
+    
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        await asyncio.sleep(self.delay)
+        if self.fail_on is not None and self.fail_on in texts:
+            raise ConnectionError("provider down")
+        return [vector(text) for text in texts]
+
+
+def vector(text):
+    """Distinct deterministic embedding of a text."""
+    return [float(len(text))] + [float(ord(text[0]) if text else 0)] * (DIMENSIONS - 1)
+
+
+def embedding_service(provider, **config):
+    """Build a service on the hashing provider with its provider call replaced."""
+    config.setdefault("cache_embeddings", False)
+    service = EmbeddingService(EmbeddingConfig(provider="hashing", dimensions=DIMENSIONS, **config))
+    service._embed_documents = provider
+    return service
+
+
+def test_concurrent_requests_are_coalesced_into_one_batch():
+    provider = RecordingProvider()
+    service = embedding_service(provider, batch_window_ms=20)
+    
+    async def scenario():
+        return await asyncio.gather(
+            service.get_embedding("store hours"),
+            service.get_embeddings(["return policy", "store hours"]),
+            service.get_embedding("ink"),
+        )
+    
+    single, pair, ink = run(scenario())
+    
+    assert len(provider.batches) == 1
+    assert sorted(provider.batches[0]) == ["ink", "return policy", "store hours"]
+    assert single == vector("store hours") and pair == [vector("return policy"), vector("store hours")]
+    assert ink == vector("ink")
+
+
+def test_full_batch_is_sent_before_the_window_closes():
+    provider = RecordingProvider()
+    service = embedding_service(provider, batch_size=2, batch_window_ms=60000)
+    
+    async def scenario():
+        return await asyncio.wait_for(service.get_embeddings(["a", "b"]), timeout=1)
+    
+    assert run(scenario()) == [vector("a"), vector("b")]
+    assert provider.batches == [["a", "b"]]
+
+
+def test_unbatched_requests_are_chunked_to_the_batch_size():
+    provider = RecordingProvider()
+    service = embedding_service(provider, batch_size=2, batch_window_ms=0)
+    
+    embeddings = run(service.get_embeddings(["a", "b", "c", "a", "d", "e"]))
+    
+    # Repeated texts are embedded once
+    assert provider.batches == [["a", "b"], ["c", "d"], ["e"]]
+    assert embeddings == [vector(text) for text in ["a", "b", "c", "a", "d", "e"]]
+    assert service.stats()["requests"] == 3
+
+
+def test_text_in_flight_is_not_requested_again():
+    provider = RecordingProvider(delay=0.05)
+    service = embedding_service(provider, batch_window_ms=1)
+    
+    async def scenario():
+        first = asyncio.ensure_future(service.get_embedding("store hours"))
+        await asyncio.sleep(0.02)
+        # The first batch was sent and is still waiting on the provider
+        second = await service.get_embedding("store hours")
+        return await first, second
+    
+    first, second = run(scenario())
+    
+    assert first == second == vector("store hours")
+    assert provider.batches == [["store hours"]]
+
+
+def test_cancelled_caller_does_not_cancel_a_shared_batch():
+    provider = RecordingProvider(delay=0.02)
+    service = embedding_service(provider, batch_window_ms=5)
+    
+    async def scenario():
+        cancelled = asyncio.ensure_future(service.get_embedding("store hours"))
+        kept = asyncio.ensure_future(service.get_embedding("store hours"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await kept
+    
+    assert run(scenario()) == vector("store hours")
+    assert provider.batches == [["store hours"]]
+
+
+@pytest.mark.parametrize("batch_window_ms", [0, 5])
+def test_failed_chunk_gets_zero_vectors_or_none(batch_window_ms):
+    provider = RecordingProvider(fail_on="b")
+    service = embedding_service(provider, batch_size=2, batch_window_ms=batch_window_ms)
+    
+    assert run(service.get_embeddings(["a", "b", "c"])) == [[0.0] * DIMENSIONS, [0.0] * DIMENSIONS, vector("c")]
+    assert run(service.get_embeddings(["a", "b", "c"], primary_only=True)) == [None, None, vector("c")]
+
+
+def test_cached_texts_are_not_sent_to_the_provider():
+    provider = RecordingProvider()
+    service = embedding_service(provider, cache_embeddings=True, batch_window_ms=0)
+    run(service.get_embeddings(["a", "b"]))
+    
+    embeddings = run(service.get_embeddings(["b", "c"]))
+    
+    assert provider.batches == [["a", "b"], ["c"]]
+    assert embeddings == [vector("b"), vector("c")]
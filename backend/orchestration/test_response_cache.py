@@ -0,0 +1,133 @@
+"""
+Tests for the LLM response cache.
+"""
+
+import asyncio
+import json
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from backend.orchestration.response_cache import LLMResponseCache, contains_pii
+
+PROMPT = "You are a helpful Staples assistant."
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+def request(cache, message, history=None, ttl=None):
+    """Build the cache identity of a turn to the store agent."""
+    return cache.request("store", "gpt-4o", 0.2, PROMPT, history or [], message, ttl=ttl)
+
+
+@pytest.mark.parametrize("message", [
+    "What are your store hours on Sunday?",
+    "What is the return policy for printers?",
+    "Do you sell HP 67 ink, SKU 24310841?",
+    "Is the store open on 2024-12-24?",
+])
+def test_general_questions_are_cacheable(message):
+    assert request(LLMResponseCache(), message) is not None
+
+
+@pytest.mark.parametrize("message, pattern", [
+    ("Email me at jane.doe@example.com", "email"),
+    ("Call me on 555-123-4567", "phone"),
+    ("Charge 4111 1111 1111 1111", "credit_card"),
+    ("Where is OD1234567?", "reference_number"),
+    ("Status of order number 12345678", "reference_number"),
+    ("Tracking 1Z999AA1AB23456784 please", "reference_number"),
+    ("The password is hunter2", "password"),
+])
+def test_turns_with_personal_data_are_skipped(message, pattern):
+    cache = LLMResponseCache()
+    
+    assert contains_pii(message) == pattern
+    assert request(cache, message) is None
+    assert cache.stats()["skipped"] == 1
+
+
+def test_personal_data_in_history_skips_the_turn():
+    cache = LLMResponseCache()
+    history = [{"role": "user", "content": "I am jane.doe@example.com"}, {"role": "assistant", "content": "Thanks!"}]
+    
+    assert request(cache, "What are your store hours?", history) is None
+
+
+@pytest.mark.parametrize("message", [
+    "Where is my order?",
+    "Can you reset MY PASSWORD",
+    "I want to cancel our subscription",
+    "when will my packages arrive",
+])
+def test_session_specific_turns_are_skipped(message):
+    cache = LLMResponseCache()
+    
+    assert request(cache, message) is None
+    assert cache.stats()["skipped"] == 1
+
+
+def test_long_conversations_are_skipped():
+    cache = LLMResponseCache(max_history=2)
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    
+    assert request(cache, "What are your store hours?", history) is not None
+    assert request(cache, "What are your store hours?", history + history[:1]) is None
+
+
+def test_agent_ttl_of_zero_opts_out():
+    cache = LLMResponseCache(ttl=600)
+    
+    assert request(cache, "What are your store hours?", ttl=0) is None
+    assert request(cache, "What are your store hours?", ttl=30).ttl == 30
+    assert request(cache, "What are your store hours?").ttl == 600
+    # Opting out is not a skipped turn
+    assert cache.stats()["skipped"] == 0
+
+
+def test_responses_with_personal_data_are_not_stored():
+    cache = LLMResponseCache()
+    turn = request(cache, "How do I contact support?")
+    
+    assert not run(cache.put(turn, "Write to jane.doe@example.com"))
+    assert run(cache.get(turn)) is None
+
+
+def test_equivalent_messages_share_an_exact_entry():
+    cache = LLMResponseCache()
+    run(cache.put(request(cache, "What are your store hours?"), "9 to 9."))
+    
+    assert run(cache.get(request(cache, "  what are your STORE hours "))) == ("9 to 9.", "exact")
+    assert run(cache.get(request(cache, "What are your store hours?", ttl=60))) == ("9 to 9.", "exact")
+
+
+def test_shared_tier_fills_the_in_process_tier():
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    writer = LLMResponseCache(redis_client=redis)
+    run(writer.put(request(writer, "What are your store hours?"), "9 to 9."))
+    cache = LLMResponseCache(redis_client=redis)
+    
+    assert run(cache.get(request(cache, "What are your store hours?"))) == ("9 to 9.", "exact")
+    assert run(cache.get(request(cache, "What are your store hours?"))) == ("9 to 9.", "exact")
+    assert cache.stats()["shared_hits"] == 1
+
+
+@pytest.mark.parametrize("value", [
+    "{not json",
+    json.dumps({"expires_at": time.time() + 600}),
+    json.dumps(["9 to 9."]),
+    json.dumps("9 to 9."),
+    json.dumps({"response": "9 to 9.", "expires_at": "tomorrow"}),
+])
+def test_corrupt_shared_entry_is_a_miss(value):
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    cache = LLMResponseCache(redis_client=redis)
+    turn = request(cache, "What are your store hours?")
+    run(redis.set(turn.key, value))
+    
+    assert run(cache.get(turn)) is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,190 @@
+"""
+Tests for the routing decision cache.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import fakeredis.aioredis
+import pytest
+
+from backend.orchestration import routing_cache
+from backend.orchestration.routing_cache import RoutingCache, normalize_message, roster_hash
+
+DECISION = {"agent_id": "tracking", "confidence": 0.92}
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+def agent(agent_id, name, description="", version=1, patterns=None):
+    """Build a minimal agent for roster hashing."""
+    return SimpleNamespace(id=agent_id, name=name, description=description, version=version, patterns=patterns)
+
+
+class FailingRedis:
+    """Redis client whose every command fails."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def get(self, key):
+        self.calls += 1
+        raise ConnectionError("redis down")
+    
+    async def set(self, key, value, ex=None):
+        self.calls += 1
+        raise ConnectionError("redis down")
+
+
+class FakeClock:
+    """Replacement for time.monotonic that only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(routing_cache.time, "monotonic", fake)
+    return fake
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Track my order!", "track my order"),
+    ("  track   my\torder  ", "track my order"),
+    ("¿Where is my ORDER?", "where is my order"),
+    ("ｔｒａｃｋ my order", "track my order"),
+    ("order #123", "order #123"),
+    ("...", ""),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_message(message, expected):
+    assert normalize_message(message) == expected
+
+
+def test_equivalent_messages_share_an_entry():
+    cache = RoutingCache()
+    run(cache.put("r1", "selection", "Track my order!", DECISION))
+    
+    assert run(cache.get("r1", "selection", "  TRACK my   order ")) == DECISION
+    assert run(cache.get("r1", "unified", "track my order")) is None
+
+
+def test_roster_hash_changes_with_any_routing_attribute():
+    base = [agent("a", "Tracker", "Tracks orders"), agent("b", "Returns")]
+    
+    assert roster_hash(base) == roster_hash(list(reversed(base)))
+    assert roster_hash(base) != roster_hash(base[:1])
+    assert roster_hash(base) != roster_hash([agent("a", "Tracker", "Tracks parcels"), base[1]])
+    assert roster_hash(base) != roster_hash([agent("a", "Tracker", "Tracks orders", version=2), base[1]])
+    assert roster_hash(base) != roster_hash([agent("a", "Package Tracker", "Tracks orders"), base[1]])
+
+
+def test_roster_hash_changes_with_agent_patterns():
+    track = {"pattern_type": "keyword", "pattern_value": "track", "priority": 1}
+    parcel = {"pattern_type": "keyword", "pattern_value": "parcel", "priority": 1}
+    base = [agent("a", "Tracker", patterns=[track]), agent("b", "Returns", patterns=["return"])]
+    
+    assert roster_hash(base) == roster_hash([agent("a", "Tracker", patterns=[dict(track)]), base[1]])
+    assert roster_hash(base) != roster_hash([agent("a", "Tracker", patterns=[track, parcel]), base[1]])
+    assert roster_hash(base) != roster_hash([agent("a", "Tracker", patterns=[dict(track, priority=5)]), base[1]])
+    assert roster_hash(base) != roster_hash([base[0], agent("b", "Returns", patterns=["refund"])])
+    assert roster_hash([agent("a", "Tracker", patterns=[track, parcel])]) != roster_hash(
+        [agent("a", "Tracker", patterns=[parcel, track])]
+    )
+    # Agents without patterns hash the same whether the attribute is missing or empty
+    assert roster_hash([agent("c", "Store")]) == roster_hash([SimpleNamespace(id="c", name="Store", description="", version=1)])
+
+
+def test_roster_change_never_serves_stale_decisions():
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    old_roster = roster_hash([agent("a", "Tracker")])
+    new_roster = roster_hash([agent("a", "Tracker"), agent("b", "Returns")])
+    writer = RoutingCache(redis_client=redis)
+    run(writer.put(old_roster, "selection", "return my order", DECISION))
+    
+    # Neither this worker nor another one sharing Redis serves the old decision
+    other_worker = RoutingCache(redis_client=redis)
+    assert run(writer.get(new_roster, "selection", "return my order")) is None
+    assert run(other_worker.get(new_roster, "selection", "return my order")) is None
+    assert run(other_worker.get(old_roster, "selection", "return my order")) == DECISION
+
+
+def test_invalidate_clears_the_in_process_tier():
+    cache = RoutingCache()
+    run(cache.put("r1", "selection", "track my order", DECISION))
+    
+    cache.invalidate()
+    
+    assert run(cache.get("r1", "selection", "track my order")) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = RoutingCache(ttl=60)
+    run(cache.put("r1", "selection", "track my order", DECISION))
+    
+    clock.now += 59
+    assert run(cache.get("r1", "selection", "track my order")) == DECISION
+    clock.now += 2
+    assert run(cache.get("r1", "selection", "track my order")) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = RoutingCache(max_entries=2)
+    run(cache.put("r1", "selection", "first", {"agent_id": "a"}))
+    run(cache.put("r1", "selection", "second", {"agent_id": "b"}))
+    run(cache.get("r1", "selection", "first"))
+    
+    run(cache.put("r1", "selection", "third", {"agent_id": "c"}))
+    
+    assert run(cache.get("r1", "selection", "second")) is None
+    assert run(cache.get("r1", "selection", "first")) == {"agent_id": "a"}
+    assert run(cache.get("r1", "selection", "third")) == {"agent_id": "c"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_shared_tier_fills_the_in_process_tier():
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    run(RoutingCache(ttl=120, redis_client=redis).put("r1", "selection", "track my order", DECISION))
+    cache = RoutingCache(redis_client=redis)
+    
+    assert run(cache.get("r1", "selection", "track my order")) == DECISION
+    assert run(cache.get("r1", "selection", "track my order")) == DECISION
+    assert cache.stats()["shared_hits"] == 1
+    
+    key = cache._key("r1", "selection", "track my order")
+    assert json.loads(run(redis.get(key))) == DECISION
+    assert 0 < run(redis.ttl(key)) <= 120
+
+
+def test_redis_errors_are_treated_as_misses():
+    redis = FailingRedis()
+    cache = RoutingCache(redis_client=redis)
+    
+    assert run(cache.get("r1", "selection", "track my order")) is None
+    run(cache.put("r1", "selection", "track my order", DECISION))
+    
+    # The in-process tier still works while Redis is down
+    assert run(cache.get("r1", "selection", "track my order")) == DECISION
+    assert redis.calls == 2
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+
+
+def test_corrupt_shared_entry_is_a_miss():
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    cache = RoutingCache(redis_client=redis)
+    run(redis.set(cache._key("r1", "selection", "track my order"), "{not json"))
+    
+    assert run(cache.get("r1", "selection", "track my order")) is None
+    assert cache.stats()["misses"] == 1
@@ -952,6 +952,8 @@ class AgentBuilderService:
             agent_dict["confidence_threshold"] = llm_config.confidence_threshold
             agent_dict["system_prompt"] = llm_config.system_prompt
             agent_dict["few_shot_examples"] = llm_config.few_shot_examples
+            agent_dict["response_cache_ttl"] = llm_config.response_cache_ttl
+            agent_dict["response_cache_semantic"] = llm_config.response_cache_semantic
         
         # Add patterns
         patterns = []
@@ -1010,7 +1012,9 @@ class AgentBuilderService:
                 confidence_threshold=config.confidence_threshold,
                 system_prompt=config.system_prompt,
                 few_shot_examples=config.few_shot_examples,
-                output_parser=config.output_parser
+                output_parser=config.output_parser,
+                response_cache_ttl=config.response_cache_ttl,
+                response_cache_semantic=config.response_cache_semantic
             )
             self.db_session.add(new_config)
         
@@ -1086,7 +1090,9 @@ class AgentBuilderService:
             timeout_seconds=config_data.timeout_seconds,
             confidence_threshold=config_data.confidence_threshold,
             few_shot_examples=config_data.few_shot_examples,
-            output_parser=config_data.output_parser
+            output_parser=config_data.output_parser,
+            response_cache_ttl=config_data.response_cache_ttl,
+            response_cache_semantic=config_data.response_cache_semantic
         )
         
         self.db_session.add(llm_config)
@@ -1139,7 +1145,9 @@ class AgentBuilderService:
             timeout_seconds=config.timeout_seconds,
             confidence_threshold=config.confidence_threshold,
             few_shot_examples=config.few_shot_examples,
-            output_parser=config.output_parser
+            output_parser=config.output_parser,
+            response_cache_ttl=config.response_cache_ttl,
+            response_cache_semantic=config.response_cache_semantic
         )
     
     async def _create_pattern(self, agent_id: str, pattern_data: AgentPatternModel) -> None:
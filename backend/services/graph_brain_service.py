@@ -4,22 +4,36 @@ Graph-based Brain Service for Staples Brain.
 This service implements the core orchestration logic using LangGraph for agent coordination
 and state management.
 """
+import asyncio
 import logging
 import time
 import json
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple, Union
 from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
 
 from backend.config.config import Config
 from backend.agents.framework.langgraph.langgraph_agent import LangGraphAgent
-from backend.agents.framework.langgraph.langgraph_factory import LangGraphAgentFactory
+from backend.agents.framework.guardrails import (
+    LLM_REVIEW_ALWAYS,
+    LLM_REVIEW_INCONCLUSIVE,
+    StreamingGuardrails
+)
+from backend.agents.framework.langgraph.langgraph_factory import LangGraphAgentFactory, add_agent_change_listener
+from backend.orchestration.agent_index import AgentEmbeddingIndex
+from backend.orchestration.agent_shortlist import AgentShortlist
+from backend.orchestration.routing_cache import get_routing_cache, roster_hash
+from backend.orchestration.state.session_state_store import get_session_state_store
+from backend.orchestration.state.turn_context import TURN_CONTEXT_KEY, TurnContext
+from backend.services.llm_service import get_chat_model
+from backend.orchestration.routing import (
+    CONCURRENT_ROUTING, LEGACY_ROUTING, RESET_PASSWORD_INTENTS, UNIFIED_ROUTING, RoutingDecision, create_router_chain, format_history
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +55,8 @@ class GraphBrainService:
         db_session: AsyncSession,
         config: Optional[Config] = None,
         memory_service: Optional[Any] = None,
-        agent_factory: Optional[LangGraphAgentFactory] = None
+        agent_factory: Optional[LangGraphAgentFactory] = None,
+        embedding_service: Optional[Any] = None
     ):
         """
         Initialize the Graph Brain Service.
@@ -51,24 +66,40 @@ class GraphBrainService:
             config: Application configuration
             memory_service: Optional memory service for persistence
             agent_factory: Factory for creating agents from database
+            embedding_service: Optional embedding service for the routing pre-router
         """
         self.db_session = db_session
         self.config = config or Config()
         self.memory_service = memory_service
         self.agent_factory = agent_factory
+        self.embedding_service = embedding_service
         
         # LLM for orchestration tasks
-        self.llm = ChatOpenAI(
+        self.llm = get_chat_model(
             model="gpt-4o",  # Default to the most capable model
             temperature=0.2  # Lower temperature for more predictable orchestration
         )
         
-        # Conversation state management
-        self.conversation_states: Dict[str, Dict[str, Any]] = {}
+        # Structured routing chain for the unified routing mode - created on first use
+        self._router_chain = None
+        
+        # Conversation state management - bounded, optionally shared between workers
+        self.conversation_states = get_session_state_store("graph_brain", self.config)
         
         # Agent registry - populated during initialization
         self.agents: Dict[str, LangGraphAgent] = {}
         
+        # Embedding index of agents for the routing pre-router and shortlist - built during initialization
+        self.agent_index: Optional[AgentEmbeddingIndex] = None
+        self.agent_shortlist: Optional[AgentShortlist] = None
+        
+        # Cache of routing decisions, keyed by message and a hash of the agent roster
+        self.routing_cache = get_routing_cache(self.config)
+        self._routing_roster = ""
+        
+        # Counters for monitoring agent selection
+        self.llm_selection_count = 0
+        
         # Graph definition - set up in initialize()
         self.graph = None
         
@@ -97,6 +128,13 @@ class GraphBrainService:
                 self.agents[agent.id] = agent
                 logger.info(f"Registered agent: {agent.name} (ID: {agent.id})")
             
+            # Build the embedding index used to skip LLM selection for clear-cut requests
+            await self._build_agent_index()
+            
+            # Track agent changes so cached routing decisions never outlive the roster they were made for
+            self._routing_roster = roster_hash(self.agents.values())
+            add_agent_change_listener(self._on_agent_changed)
+            
             # Create the agent workflow graph
             self.create_workflow_graph()
             
@@ -115,6 +153,65 @@ class GraphBrainService:
             logger.error(f"Error initializing graph brain service: {str(e)}", exc_info=True)
             return False
     
+    async def _build_agent_index(self) -> None:
+        """
+        Build the embedding index of routable agents for the pre-router and shortlist.
+        
+        Failures leave both disabled; selection then always uses the LLM with the full roster.
+        """
+        shortlist_size = getattr(self.config, "ROUTING_SHORTLIST_SIZE", 8)
+        if not getattr(self.config, "ROUTING_PREROUTER_ENABLED", True) and shortlist_size <= 0:
+            return
+        
+        try:
+            if self.embedding_service is None:
+                from backend.orchestration.embedding_service import EmbeddingService
+                self.embedding_service = EmbeddingService()
+            
+            guardrails_agent = self._get_guardrails_agent()
+            routable_agents = [agent for agent in self.agents.values() if agent is not guardrails_agent]
+            index = AgentEmbeddingIndex(
+                self.embedding_service,
+                min_similarity=getattr(self.config, "ROUTING_PREROUTER_MIN_SIMILARITY", 0.85),
+                margin=getattr(self.config, "ROUTING_PREROUTER_MARGIN", 0.05)
+            )
+            await index.build(routable_agents)
+            self.agent_index = index if index.size else None
+            self.agent_shortlist = (
+                AgentShortlist(index, size=shortlist_size, agents=routable_agents)
+                if index.size and shortlist_size > 0 else None
+            )
+        except Exception as e:
+            logger.error(f"Error building agent embedding index, pre-router disabled: {str(e)}", exc_info=True)
+            self.agent_index = None
+            self.agent_shortlist = None
+    
+    def _on_agent_changed(self, agent_id: str, agent: Optional[LangGraphAgent]) -> None:
+        """
+        Apply an agent change to the registry and the routing caches.
+        
+        Args:
+            agent_id: The changed agent ID
+            agent: New agent instance, or None if the agent was deleted
+        """
+        if agent is None or getattr(agent, "status", "active") != "active":
+            self.agents.pop(agent_id, None)
+        else:
+            self.agents[agent_id] = agent
+        
+        self._routing_roster = roster_hash(self.agents.values())
+        if self.routing_cache is not None:
+            self.routing_cache.invalidate()
+        logger.info(f"Agent {agent_id} changed, routing caches invalidated")
+        
+        # Rebuild the pre-router index and shortlist in the background when an event loop is running
+        if self.agent_index is not None:
+            try:
+                asyncio.get_running_loop().create_task(self._build_agent_index())
+            except RuntimeError:
+                self.agent_index = None
+                self.agent_shortlist = None
+    
     def create_workflow_graph(self):
         """
         Create the LangGraph workflow graph for agent orchestration.
@@ -138,6 +235,7 @@ class GraphBrainService:
         # - response: Final response
         # - trace: Execution trace for observability
         # - completed: Whether processing is complete
+        # - turn_context: TurnContext with the conversation snapshot of the turn
         
         # Define the expected state keys for documentation
         # This state schema represents the conversation state that flows through the graph
@@ -200,248 +298,415 @@ class GraphBrainService:
         # Track execution
         state["trace"].append({"step": "router", "timestamp": start_time})
         
-        # Get conversation history if available (we'll need it multiple times)
-        conversation_history = []
-        if self.memory_service and session_id:
-            try:
-                conversation_history = await self.memory_service.get_conversation_history(session_id)
-            except Exception as e:
-                logger.error(f"Error retrieving conversation history: {str(e)}")
+        # Conversation history loaded once for the turn (we'll need it multiple times)
+        turn = state.get("turn_context")
+        conversation_history = turn.history if turn else []
         
-        # Use LLM to detect if this is a reset password request or context-specific response
-        if session_id and conversation_history:
-            try:
-                # Get last few messages for context
-                recent_history = conversation_history[-4:] if len(conversation_history) >= 4 else conversation_history
-                
-                # Format the conversation for the prompt
-                formatted_history = ""
-                for item in recent_history:
-                    role = item.get("role", "")
-                    content = item.get("content", "")
-                    if role and content:
-                        formatted_history += f"{role.upper()}: {content}\n"
-                
-                # Use LLM to analyze if the message is:
-                # 1. A reset password intent
-                # 2. A response to a previous reset password prompt
-                # 3. Contains email information in response to a request
-                
-                password_reset_intent_prompt = PromptTemplate.from_template("""
-                Analyze the following conversation and the latest user message:
-                
-                CONVERSATION HISTORY:
-                {history}
-                
-                LATEST USER MESSAGE: {message}
-                
-                Determine if:
-                1. The user is requesting a password reset
-                2. The user is responding affirmatively to a password reset offer
-                3. The user is providing an email address in response to a request for it
-                4. None of the above
-                
-                In your analysis, consider if:
-                - The user explicitly or implicitly mentions resetting, changing, recovering a password
-                - The latest message contains an affirmative response (yes, please, sure, etc.) to a reset password offer
-                - The latest message contains an email address in response to a request for it
-                
-                Output a JSON object with:
-                - intent: string (one of: "reset_password", "reset_affirmative", "email_provided", "other")
-                - confidence: number between 0.0 and 1.0
-                - extracted_email: string or null (if an email is detected)
-                - explanation: brief explanation of your decision
-                
-                JSON Output:
-                """)
-                
-                # Create and run the intent detection chain
-                intent_chain = password_reset_intent_prompt | self.llm | StrOutputParser()
-                
-                result = await intent_chain.ainvoke({
-                    "history": formatted_history,
-                    "message": user_input
-                })
-                
-                # Parse the result with proper error handling
-                try:
-                    # Clean up the result to ensure valid JSON
-                    result = result.strip()
-                    # Handle potential code blocks
-                    if result.startswith('```'):
-                        end_backticks = result.rfind('```')
-                        if end_backticks > 3:
-                            start_content = result.find('\n', 3)
-                            if start_content != -1 and start_content < end_backticks:
-                                result = result[start_content:end_backticks].strip()
-                            else:
-                                result = result.replace('```', '').strip()
-                    
-                    # Parse the JSON
-                    intent_data = json.loads(result)
-                    
-                    intent_type = intent_data.get("intent", "other")
-                    confidence = float(intent_data.get("confidence", 0.0))
-                    
-                    # If high confidence in reset password intent, find the reset password agent
-                    if (intent_type in ["reset_password", "reset_affirmative", "email_provided"]) and confidence > 0.7:
-                        reset_password_agent_id = None
-                        reset_password_agent = None
-                        
-                        # Find the Reset Password Agent
-                        for agent_id, agent in self.agents.items():
-                            if "reset password" in agent.name.lower():
-                                reset_password_agent_id = agent_id
-                                reset_password_agent = agent
-                                break
-                        
-                        if reset_password_agent:
-                            logger.info(f"LLM-based intent detection: routing to {reset_password_agent.name} with intent {intent_type}")
-                            state["selected_agent"] = reset_password_agent
-                            state["current_agent_id"] = reset_password_agent_id
-                            state["confidence"] = confidence
-                            
-                            # Add extracted email to context if available
-                            extracted_email = intent_data.get("extracted_email")
-                            if extracted_email:
-                                context["extracted_email"] = extracted_email
-                            
-                            # Set intent in context
-                            context["intent"] = intent_type
-                            
-                            state["trace"].append({
-                                "step": "llm_intent_detection",
-                                "intent": intent_type,
-                                "confidence": confidence,
-                                "agent": reset_password_agent.name
-                            })
-                            return state
-                
-                except Exception as e:
-                    logger.error(f"Error parsing reset password intent result: {str(e)}", exc_info=True)
-            
-            except Exception as e:
-                logger.error(f"Error in LLM-based reset password intent detection: {str(e)}", exc_info=True)
+        routing_mode = getattr(self.config, "ROUTING_MODE", LEGACY_ROUTING)
         
-        # Get conversation history if available
-        conversation_history = []
-        if self.memory_service and session_id:
+        # One structured call replaces the intent, continuity and selection chains below
+        if routing_mode == UNIFIED_ROUTING:
             try:
-                history = await self.memory_service.get_conversation_history(session_id)
-                if history:
-                    conversation_history = history
+                return await self._route_unified(state, conversation_history, start_time)
             except Exception as e:
-                logger.error(f"Error retrieving conversation history: {str(e)}")
+                logger.error(f"Error in unified routing, falling back to legacy routing: {str(e)}", exc_info=True)
         
-        # Check for conversation continuity with previous agent
+        # Routing branches in priority order; the first one that decides wins
         prev_agent_id = state.get("current_agent_id")
+        branches = []
+        if session_id and conversation_history:
+            branches.append(("reset_intent", lambda: self._detect_reset_intent(user_input, conversation_history)))
         if prev_agent_id and prev_agent_id in self.agents:
-            prev_agent_name = self.agents[prev_agent_id].name
-            
             # Special case for Reset Password Agent: use LLM to detect email response
-            if prev_agent_name == "Reset Password Agent":
-                # Check if there was a previous request for email
-                if conversation_history and len(conversation_history) >= 2:
-                    try:
-                        # Format recent conversation for the prompt
-                        recent_history = conversation_history[-4:] if len(conversation_history) >= 4 else conversation_history
-                        formatted_history = ""
-                        for item in recent_history:
-                            role = item.get("role", "")
-                            content = item.get("content", "")
-                            if role and content:
-                                formatted_history += f"{role.upper()}: {content}\n"
-                        
-                        # Use LLM to determine if this is an email response
-                        email_response_prompt = PromptTemplate.from_template("""
-                        Analyze this conversation and determine if the latest user message is providing an email address 
-                        in response to a previous request for it:
-                        
-                        CONVERSATION HISTORY:
-                        {history}
-                        
-                        LATEST USER MESSAGE: {message}
-                        
-                        Determine:
-                        1. If the assistant previously asked for an email address
-                        2. If the user is now providing an email address
-                        
-                        Output a JSON object with:
-                        - is_email_response: boolean (true if the user is responding with an email)
-                        - extracted_email: string or null (the email address if detected)
-                        - confidence: number between 0.0 and 1.0
-                        
-                        JSON Output:
-                        """)
-                        
-                        # Create and run the email detection chain
-                        email_chain = email_response_prompt | self.llm | StrOutputParser()
-                        
-                        result = await email_chain.ainvoke({
-                            "history": formatted_history,
-                            "message": user_input
-                        })
-                        
-                        # Parse the result
-                        result = result.strip()
-                        if result.startswith('```'):
-                            end_backticks = result.rfind('```')
-                            if end_backticks > 3:
-                                start_content = result.find('\n', 3)
-                                if start_content != -1 and start_content < end_backticks:
-                                    result = result[start_content:end_backticks].strip()
-                                else:
-                                    result = result.replace('```', '').strip()
-                        
-                        email_data = json.loads(result)
-                        
-                        is_email_response = email_data.get("is_email_response", False)
-                        confidence = float(email_data.get("confidence", 0.0))
-                        
-                        if is_email_response and confidence > 0.7:
-                            logger.info(f"LLM detected email response to Reset Password Agent request")
-                            state["selected_agent"] = self.agents[prev_agent_id]
-                            state["current_agent_id"] = prev_agent_id
-                            state["confidence"] = confidence
-                            
-                            # Add extracted email to context if available
-                            extracted_email = email_data.get("extracted_email")
-                            if extracted_email:
-                                context["extracted_email"] = extracted_email
-                            
-                            state["trace"].append({
-                                "step": "agent_selection",
-                                "method": "llm_email_detection",
-                                "selected": prev_agent_id,
-                                "confidence": confidence
-                            })
-                            return state
-                    except Exception as e:
-                        logger.error(f"Error in LLM-based email detection: {str(e)}", exc_info=True)
-            
-            # If not a special case, use the standard continuity check
+            if self.agents[prev_agent_id].name == "Reset Password Agent" and len(conversation_history) >= 2:
+                branches.append(("email_response", lambda: self._detect_email_response(user_input, prev_agent_id, conversation_history)))
+            branches.append(("continuity", lambda: self._detect_continuity(user_input, prev_agent_id, conversation_history)))
+        branches.append(("agent_selection", lambda: self._select_agent_outcome(user_input, session_id, context, conversation_history)))
+        
+        if routing_mode == CONCURRENT_ROUTING:
+            outcome = await self._run_branches_concurrently(state, branches)
+        else:
+            outcome = None
+            for name, branch in branches:
+                outcome = await branch()
+                if outcome:
+                    break
+        
+        self._apply_routing_outcome(state, outcome or self._fallback_outcome(0.0))
+        
+        state["trace"].append({
+            "step": "router_complete", 
+            "duration": time.time() - start_time
+        })
+        
+        return state
+    
+    async def _run_branches_concurrently(
+        self,
+        state: Dict[str, Any],
+        branches: List[Tuple[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run routing branches concurrently and resolve them in priority order.
+        
+        All branches start at once. Results are taken in priority order, so a
+        lower-priority result is only used once every higher-priority branch
+        has finished without deciding; as soon as a branch decides, the
+        lower-priority branches still running are cancelled.
+        
+        Args:
+            state: Current workflow state (per-branch timings go into its trace)
+            branches: (name, coroutine factory) pairs in priority order
+            
+        Returns:
+            Routing outcome of the winning branch, or None if no branch decided
+        """
+        timings: Dict[str, Dict[str, Any]] = {}
+        
+        async def timed(name: str, branch: Any) -> Optional[Dict[str, Any]]:
+            started = time.time()
+            timings[name] = {"step": "routing_branch", "branch": name, "status": "running"}
             try:
-                # If we have a previous agent, check if we should continue with it
-                continuity_check = await self._check_conversation_continuity(
-                    user_input, 
-                    prev_agent_id,
-                    conversation_history
-                )
-                
-                if continuity_check["continue"] and continuity_check["confidence"] > 0.6:
-                    state["selected_agent"] = self.agents[prev_agent_id]
-                    state["confidence"] = continuity_check["confidence"]
-                    state["trace"].append({
-                        "step": "agent_selection",
-                        "method": "continuity",
-                        "selected": prev_agent_id,
-                        "confidence": continuity_check["confidence"]
-                    })
-                    return state
+                outcome = await branch()
+                timings[name]["status"] = "decided" if outcome else "undecided"
+                return outcome
+            except asyncio.CancelledError:
+                timings[name]["status"] = "cancelled"
+                raise
             except Exception as e:
-                logger.error(f"Error in standard continuity check: {str(e)}")
-                # Continue with regular agent selection if continuity check fails
+                logger.error(f"Error in routing branch {name}: {str(e)}", exc_info=True)
+                timings[name]["status"] = "failed"
+                return None
+            finally:
+                timings[name]["duration"] = time.time() - started
         
+        tasks = [(name, asyncio.create_task(timed(name, branch))) for name, branch in branches]
+        outcome = None
+        try:
+            for index, (name, task) in enumerate(tasks):
+                outcome = await task
+                if outcome:
+                    # A higher-priority branch decided; lower-priority results are not needed
+                    for _, loser in tasks[index + 1:]:
+                        loser.cancel()
+                    break
+        finally:
+            for _, task in tasks:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+            state["trace"].extend(timings[name] for name, _ in tasks if name in timings)
+        
+        return outcome
+    
+    def _apply_routing_outcome(self, state: Dict[str, Any], outcome: Dict[str, Any]) -> None:
+        """
+        Record a routing outcome in the workflow state.
+        
+        Args:
+            state: Current workflow state
+            outcome: Outcome with agent, confidence, context updates and trace entries
+        """
+        agent = outcome.get("agent")
+        state["selected_agent"] = agent
+        state["confidence"] = outcome.get("confidence", 0.0)
+        if agent:
+            state["current_agent_id"] = agent.id
+        state.get("context", {}).update(outcome.get("context", {}))
+        state["trace"].extend(outcome.get("trace", []))
+    
+    def _fallback_outcome(self, confidence: float) -> Dict[str, Any]:
+        """
+        Build the outcome used when no agent was selected.
+        
+        Args:
+            confidence: Best confidence reached by the selection
+            
+        Returns:
+            Outcome selecting the general conversation agent, or a failed outcome
+        """
+        # If no agent was selected, try to use a general conversation agent
+        general_agent = self._get_general_agent()
+        if general_agent:
+            return {
+                "agent": general_agent,
+                "confidence": 0.6,  # Default confidence for fallback
+                "trace": [{
+                    "step": "agent_selection",
+                    "method": "fallback",
+                    "selected": general_agent.id,
+                    "confidence": 0.6
+                }]
+            }
+        
+        logger.error("No suitable agent found and no general fallback available")
+        return {
+            "agent": None,
+            "confidence": confidence,
+            "trace": [{
+                "step": "agent_selection",
+                "method": "failed",
+                "error": "No suitable agent found"
+            }]
+        }
+    
+    def _parse_llm_json(self, result: str) -> Dict[str, Any]:
+        """
+        Parse a JSON object from an LLM reply, removing markdown code fences.
+        
+        Args:
+            result: Raw LLM output
+            
+        Returns:
+            Parsed JSON object
+        """
+        # Clean up the result to ensure valid JSON
+        result = result.strip()
+        # Handle potential code blocks
+        if result.startswith('```'):
+            end_backticks = result.rfind('```')
+            if end_backticks > 3:
+                start_content = result.find('\n', 3)
+                if start_content != -1 and start_content < end_backticks:
+                    result = result[start_content:end_backticks].strip()
+                else:
+                    result = result.replace('```', '').strip()
+        return json.loads(result)
+    
+    async def _detect_reset_intent(
+        self,
+        user_input: str,
+        conversation_history: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Use the LLM to detect a reset password request or a reply to a reset prompt.
+        
+        Args:
+            user_input: Current user message
+            conversation_history: Previous conversation messages
+            
+        Returns:
+            Outcome routing to the Reset Password Agent, or None
+        """
+        try:
+            # Use LLM to analyze if the message is:
+            # 1. A reset password intent
+            # 2. A response to a previous reset password prompt
+            # 3. Contains email information in response to a request
+            
+            password_reset_intent_prompt = PromptTemplate.from_template("""
+            Analyze the following conversation and the latest user message:
+            
+            CONVERSATION HISTORY:
+            {history}
+            
+            LATEST USER MESSAGE: {message}
+            
+            Determine if:
+            1. The user is requesting a password reset
+            2. The user is responding affirmatively to a password reset offer
+            3. The user is providing an email address in response to a request for it
+            4. None of the above
+            
+            In your analysis, consider if:
+            - The user explicitly or implicitly mentions resetting, changing, recovering a password
+            - The latest message contains an affirmative response (yes, please, sure, etc.) to a reset password offer
+            - The latest message contains an email address in response to a request for it
+            
+            Output a JSON object with:
+            - intent: string (one of: "reset_password", "reset_affirmative", "email_provided", "other")
+            - confidence: number between 0.0 and 1.0
+            - extracted_email: string or null (if an email is detected)
+            - explanation: brief explanation of your decision
+            
+            JSON Output:
+            """)
+            
+            # Create and run the intent detection chain
+            intent_chain = password_reset_intent_prompt | self.llm | StrOutputParser()
+            
+            result = await intent_chain.ainvoke({
+                "history": format_history(conversation_history) + "\n",
+                "message": user_input
+            })
+            
+            intent_data = self._parse_llm_json(result)
+            intent_type = intent_data.get("intent", "other")
+            confidence = float(intent_data.get("confidence", 0.0))
+        except Exception as e:
+            logger.error(f"Error in LLM-based reset password intent detection: {str(e)}", exc_info=True)
+            return None
+        
+        # If high confidence in reset password intent, find the reset password agent
+        if intent_type not in RESET_PASSWORD_INTENTS or confidence <= 0.7:
+            return None
+        
+        reset_password_agent = next(
+            (agent for agent in self.agents.values() if "reset password" in agent.name.lower()),
+            None
+        )
+        if not reset_password_agent:
+            return None
+        
+        logger.info(f"LLM-based intent detection: routing to {reset_password_agent.name} with intent {intent_type}")
+        
+        # Set intent in context, with the extracted email if available
+        context_updates = {"intent": intent_type}
+        extracted_email = intent_data.get("extracted_email")
+        if extracted_email:
+            context_updates["extracted_email"] = extracted_email
+        
+        return {
+            "agent": reset_password_agent,
+            "confidence": confidence,
+            "context": context_updates,
+            "trace": [{
+                "step": "llm_intent_detection",
+                "intent": intent_type,
+                "confidence": confidence,
+                "agent": reset_password_agent.name
+            }]
+        }
+    
+    async def _detect_email_response(
+        self,
+        user_input: str,
+        prev_agent_id: str,
+        conversation_history: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Use the LLM to detect an email address given in reply to the Reset Password Agent.
+        
+        Args:
+            user_input: Current user message
+            prev_agent_id: ID of the previous agent
+            conversation_history: Previous conversation messages
+            
+        Returns:
+            Outcome continuing with the previous agent, or None
+        """
+        try:
+            # Use LLM to determine if this is an email response
+            email_response_prompt = PromptTemplate.from_template("""
+            Analyze this conversation and determine if the latest user message is providing an email address 
+            in response to a previous request for it:
+            
+            CONVERSATION HISTORY:
+            {history}
+            
+            LATEST USER MESSAGE: {message}
+            
+            Determine:
+            1. If the assistant previously asked for an email address
+            2. If the user is now providing an email address
+            
+            Output a JSON object with:
+            - is_email_response: boolean (true if the user is responding with an email)
+            - extracted_email: string or null (the email address if detected)
+            - confidence: number between 0.0 and 1.0
+            
+            JSON Output:
+            """)
+            
+            # Create and run the email detection chain
+            email_chain = email_response_prompt | self.llm | StrOutputParser()
+            
+            result = await email_chain.ainvoke({
+                "history": format_history(conversation_history) + "\n",
+                "message": user_input
+            })
+            
+            email_data = self._parse_llm_json(result)
+            is_email_response = email_data.get("is_email_response", False)
+            confidence = float(email_data.get("confidence", 0.0))
+        except Exception as e:
+            logger.error(f"Error in LLM-based email detection: {str(e)}", exc_info=True)
+            return None
+        
+        if not is_email_response or confidence <= 0.7:
+            return None
+        
+        logger.info(f"LLM detected email response to Reset Password Agent request")
+        
+        # Add extracted email to context if available
+        context_updates = {}
+        extracted_email = email_data.get("extracted_email")
+        if extracted_email:
+            context_updates["extracted_email"] = extracted_email
+        
+        return {
+            "agent": self.agents[prev_agent_id],
+            "confidence": confidence,
+            "context": context_updates,
+            "trace": [{
+                "step": "agent_selection",
+                "method": "llm_email_detection",
+                "selected": prev_agent_id,
+                "confidence": confidence
+            }]
+        }
+    
+    async def _detect_continuity(
+        self,
+        user_input: str,
+        prev_agent_id: str,
+        conversation_history: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Check whether the conversation should continue with the previous agent.
+        
+        Args:
+            user_input: Current user message
+            prev_agent_id: ID of the previous agent
+            conversation_history: Previous conversation messages
+            
+        Returns:
+            Outcome continuing with the previous agent, or None
+        """
+        try:
+            # If we have a previous agent, check if we should continue with it
+            continuity_check = await self._check_conversation_continuity(
+                user_input, 
+                prev_agent_id,
+                conversation_history
+            )
+        except Exception as e:
+            logger.error(f"Error in standard continuity check: {str(e)}")
+            # Continue with regular agent selection if continuity check fails
+            return None
+        
+        if not continuity_check["continue"] or continuity_check["confidence"] <= 0.6:
+            return None
+        
+        return {
+            "agent": self.agents[prev_agent_id],
+            "confidence": continuity_check["confidence"],
+            "trace": [{
+                "step": "agent_selection",
+                "method": "continuity",
+                "selected": prev_agent_id,
+                "confidence": continuity_check["confidence"]
+            }]
+        }
+    
+    async def _select_agent_outcome(
+        self,
+        user_input: str,
+        session_id: str,
+        context: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Select an agent by intent matching, falling back to the general agent.
+        
+        Args:
+            user_input: Current user message
+            session_id: Session identifier
+            context: Additional context information
+            conversation_history: Previous conversation messages
+            
+        Returns:
+            Outcome with the selected agent (always decides)
+        """
         # Perform agent selection using intent matching and semantic similarity
         selected_agent, confidence = await self._select_agent(
             user_input, 
@@ -450,43 +715,209 @@ class GraphBrainService:
             conversation_history
         )
         
-        state["selected_agent"] = selected_agent
-        state["confidence"] = confidence
+        if not selected_agent:
+            return self._fallback_outcome(confidence)
         
-        if selected_agent:
-            state["current_agent_id"] = selected_agent.id
-            state["trace"].append({
+        return {
+            "agent": selected_agent,
+            "confidence": confidence,
+            "trace": [{
                 "step": "agent_selection",
                 "method": "intent_matching",
                 "selected": selected_agent.id,
                 "confidence": confidence
-            })
-        else:
-            # If no agent was selected, try to use a general conversation agent
-            general_agent = self._get_general_agent()
-            if general_agent:
-                state["selected_agent"] = general_agent
-                state["current_agent_id"] = general_agent.id
-                state["confidence"] = 0.6  # Default confidence for fallback
-                state["trace"].append({
-                    "step": "agent_selection",
-                    "method": "fallback",
-                    "selected": general_agent.id,
-                    "confidence": 0.6
-                })
-            else:
-                logger.error("No suitable agent found and no general fallback available")
+            }]
+        }
+    
+    async def _route_unified(
+        self,
+        state: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        start_time: float
+    ) -> Dict[str, Any]:
+        """
+        Route a request with a single structured routing call.
+        
+        Args:
+            state: Current workflow state
+            conversation_history: Previous conversation messages
+            start_time: Router start timestamp
+            
+        Returns:
+            Updated workflow state with selected agent
+        """
+        user_input = state["user_input"]
+        prev_agent_id = state.get("current_agent_id")
+        prev_agent = self.agents.get(prev_agent_id) if prev_agent_id else None
+        
+        # Without a conversation to continue, the decision depends on the message alone
+        first_turn = prev_agent is None and not conversation_history
+        
+        if first_turn and self.routing_cache is not None:
+            cached = await self.routing_cache.get(self._routing_roster, "unified", user_input)
+            if cached is not None:
+                decision = RoutingDecision.model_validate(cached)
+                state["routing_decision"] = cached
+                state["trace"].append({"step": "routing_cache", "status": "hit"})
+                return self._apply_routing_decision(state, decision, start_time)
+        
+        # Clear-cut requests need no LLM call at all
+        if first_turn and self.agent_index is not None and getattr(self.config, "ROUTING_PREROUTER_ENABLED", True):
+            match = await self.agent_index.match(user_input)
+            if match and match[0] in self.agents:
+                return self._finish_routing(state, self.agents[match[0]], match[1], "embedding", start_time)
+        
+        if self._router_chain is None:
+            self._router_chain = create_router_chain(self.llm)
+        
+        # The previous and reset password agents stay candidates so continuity and reset intents can be decided
+        reset_password_agent = next(
+            (agent for agent in self.agents.values() if "reset password" in agent.name.lower()),
+            None
+        )
+        candidates = await self._routing_candidates(
+            user_input,
+            [prev_agent_id, reset_password_agent.id if reset_password_agent else None]
+        )
+        agent_descriptions = "\n".join([
+            f"- {agent.name}: {agent.description}"
+            for agent in candidates
+        ])
+        
+        self.llm_selection_count += 1
+        decision = await self._router_chain.ainvoke({
+            "agent_descriptions": agent_descriptions,
+            "history": format_history(conversation_history),
+            "previous_agent": prev_agent.name if prev_agent else "(none)",
+            "message": user_input
+        })
+        logger.info(f"Routing decision: intent={decision.intent}, continue={decision.continue_previous}, "
+                   f"best={decision.best_agent()}")
+        
+        state["routing_decision"] = decision.model_dump()
+        
+        # Entity values keep the user's exact spelling, so only entity-free decisions are reusable
+        if first_turn and not decision.entities and self.routing_cache is not None:
+            await self.routing_cache.put(self._routing_roster, "unified", user_input, state["routing_decision"])
+        
+        return self._apply_routing_decision(state, decision, start_time)
+    
+    def _apply_routing_decision(
+        self,
+        state: Dict[str, Any],
+        decision: RoutingDecision,
+        start_time: float
+    ) -> Dict[str, Any]:
+        """
+        Select an agent from a structured routing decision.
+        
+        Rules are applied in the order of the legacy routing path: password
+        reset intent, then continuity with the previous agent, then the best
+        scoring agent, then the general conversation agent.
+        
+        Args:
+            state: Current workflow state
+            decision: Routing decision for this turn
+            start_time: Router start timestamp
+            
+        Returns:
+            Updated workflow state with selected agent
+        """
+        context = state.get("context", {})
+        prev_agent_id = state.get("current_agent_id")
+        
+        # Entities extracted by the router are available to the selected agent
+        if decision.entities:
+            context["entities"] = {entity.name.lower(): entity.value for entity in decision.entities}
+        
+        # Password reset requests and their follow-ups go to the Reset Password Agent
+        if decision.intent in RESET_PASSWORD_INTENTS and decision.intent_confidence > 0.7:
+            reset_password_agent = next(
+                (agent for agent in self.agents.values() if "reset password" in agent.name.lower()),
+                None
+            )
+            if reset_password_agent:
+                extracted_email = decision.entity("email")
+                if extracted_email:
+                    context["extracted_email"] = extracted_email
+                context["intent"] = decision.intent
                 state["trace"].append({
-                    "step": "agent_selection",
-                    "method": "failed",
-                    "error": "No suitable agent found"
+                    "step": "llm_intent_detection",
+                    "intent": decision.intent,
+                    "confidence": decision.intent_confidence,
+                    "agent": reset_password_agent.name
                 })
+                return self._finish_routing(state, reset_password_agent, decision.intent_confidence, "unified_intent", start_time)
         
+        # Continue with the previous agent when the topic has not changed
+        if prev_agent_id in self.agents and decision.continue_previous and decision.continuity_confidence > 0.6:
+            return self._finish_routing(state, self.agents[prev_agent_id], decision.continuity_confidence, "continuity", start_time)
+        
+        # Otherwise take the best scoring agent above the selection threshold
+        agents_by_name = {agent.name: agent for agent in self.agents.values()}
+        best_agent = None
+        best_score = 0.0
+        for agent_score in decision.agent_scores:
+            agent = agents_by_name.get(agent_score.agent)
+            if agent and agent_score.score > best_score:
+                best_agent = agent
+                best_score = agent_score.score
+        
+        if best_agent and best_score >= 0.6:
+            return self._finish_routing(state, best_agent, best_score, "unified", start_time)
+        
+        general_agent = self._get_general_agent()
+        if general_agent:
+            return self._finish_routing(state, general_agent, 0.6, "fallback", start_time)
+        
+        logger.error("No suitable agent found and no general fallback available")
+        state["selected_agent"] = None
+        state["confidence"] = best_score
         state["trace"].append({
-            "step": "router_complete", 
+            "step": "agent_selection",
+            "method": "failed",
+            "error": "No suitable agent found"
+        })
+        state["trace"].append({
+            "step": "router_complete",
             "duration": time.time() - start_time
         })
+        return state
+    
+    def _finish_routing(
+        self,
+        state: Dict[str, Any],
+        agent: LangGraphAgent,
+        confidence: float,
+        method: str,
+        start_time: float
+    ) -> Dict[str, Any]:
+        """
+        Record the selected agent in the workflow state.
         
+        Args:
+            state: Current workflow state
+            agent: Selected agent
+            confidence: Confidence in the selection
+            method: How the agent was selected
+            start_time: Router start timestamp
+            
+        Returns:
+            Updated workflow state
+        """
+        state["selected_agent"] = agent
+        state["current_agent_id"] = agent.id
+        state["confidence"] = confidence
+        state["trace"].append({
+            "step": "agent_selection",
+            "method": method,
+            "selected": agent.id,
+            "confidence": confidence
+        })
+        state["trace"].append({
+            "step": "router_complete",
+            "duration": time.time() - start_time
+        })
         return state
     
     async def _execute_agent(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -523,10 +954,12 @@ class GraphBrainService:
         
         try:
             # Execute the agent with the user input
+            # Agents read the conversation from the turn context; the copy keeps it out of persisted state
+            agent_context = {**context, TURN_CONTEXT_KEY: state.get("turn_context")}
             response = await selected_agent.process_message(
                 message=user_input,
                 session_id=session_id,
-                context=context
+                context=agent_context
             )
             
             # Log the response structure to help with debugging
@@ -599,7 +1032,34 @@ class GraphBrainService:
             logger.info("Skipping guardrails for Reset Password Agent response")
             return state
             
-        if guardrails_agent and response:
+        # Local rules first; streamed responses were already checked chunk by chunk
+        local_guardrails = state.get("stream_guardrails")
+        if local_guardrails is None and isinstance(response, dict) and response.get("message"):
+            local_guardrails = StreamingGuardrails()
+            checked_message = local_guardrails.check(response["message"])
+            if local_guardrails.modified:
+                response["message"] = checked_message
+                state["response"] = response
+        if local_guardrails is not None:
+            state["trace"].append({
+                "step": "guardrails",
+                "status": "local",
+                "violations": len(local_guardrails.violations),
+                "modified": local_guardrails.modified,
+                "cut": local_guardrails.cut,
+                "review": local_guardrails.needs_review
+            })
+        
+        # The LLM guardrail pass runs only when the local rules are inconclusive
+        review_mode = getattr(self.config, "GUARDRAILS_LLM_REVIEW", LLM_REVIEW_INCONCLUSIVE)
+        needs_review = review_mode == LLM_REVIEW_ALWAYS or (
+            review_mode == LLM_REVIEW_INCONCLUSIVE
+            and local_guardrails is not None
+            and local_guardrails.needs_review
+            and not local_guardrails.cut
+        )
+        
+        if guardrails_agent and response and needs_review:
             try:
                 # Apply guardrails to the response
                 message_content = response.get("message", "")
@@ -744,10 +1204,46 @@ class GraphBrainService:
             logger.warning("No agents available for selection")
             return None, 0.0
         
+        # Selection depends on the message alone, so earlier decisions can be reused
+        if self.routing_cache is not None:
+            cached = await self.routing_cache.get(self._routing_roster, "selection", query)
+            if cached is not None and cached["agent_id"] in self.agents:
+                return self.agents[cached["agent_id"]], cached["confidence"]
+        
+        agent, confidence = await self._select_agent_uncached(query)
+        if agent is not None and self.routing_cache is not None:
+            await self.routing_cache.put(
+                self._routing_roster, "selection", query, {"agent_id": agent.id, "confidence": confidence}
+            )
+        return agent, confidence
+    
+    async def _select_agent_uncached(self, query: str) -> Tuple[Optional[LangGraphAgent], float]:
+        """
+        Select the best agent for a query by embedding similarity or LLM scoring.
+        
+        Args:
+            query: User query
+            
+        Returns:
+            Tuple of (selected agent, confidence)
+        """
+        # Clear-cut requests are resolved by embedding similarity without an LLM call
+        if self.agent_index is not None and getattr(self.config, "ROUTING_PREROUTER_ENABLED", True):
+            try:
+                match = await self.agent_index.match(query)
+                if match and match[0] in self.agents:
+                    agent_id, similarity = match
+                    logger.info(f"Embedding pre-router selected {self.agents[agent_id].name} (similarity {similarity:.3f})")
+                    return self.agents[agent_id], similarity
+            except Exception as e:
+                logger.error(f"Error in embedding pre-router: {str(e)}")
+        
+        self.llm_selection_count += 1
+        
         # Format agent descriptions for the selection prompt
         agent_descriptions = "\n".join([
             f"- {agent.name}: {agent.description}" 
-            for agent in self.agents.values()
+            for agent in await self._routing_candidates(query)
         ])
         
         # Define the agent selection prompt
@@ -840,6 +1336,28 @@ class GraphBrainService:
             logger.error(f"Error selecting agent: {str(e)}", exc_info=True)
             return None, 0.0
     
+    async def _routing_candidates(self, query: str, pinned: List[Optional[str]] = None) -> List[LangGraphAgent]:
+        """
+        Get the agents to describe in an LLM routing prompt.
+        
+        Args:
+            query: User query
+            pinned: Agent IDs to keep regardless of their rank
+            
+        Returns:
+            Shortlisted agents, or all agents when shortlisting is disabled or the roster is small
+        """
+        if self.agent_shortlist is None:
+            return list(self.agents.values())
+        
+        general_agent = self._get_general_agent()
+        return await self.agent_shortlist.candidates(
+            query,
+            self.agents,
+            pinned=[*(pinned or []), general_agent.id if general_agent else None],
+            fallback=getattr(self.config, "ROUTING_SHORTLIST_FALLBACK", "all")
+        )
+    
     def _get_general_agent(self) -> Optional[LangGraphAgent]:
         """
         Get the general conversation agent.
@@ -898,81 +1416,324 @@ class GraphBrainService:
                 }
         
         try:
-            # Initialize workflow state
-            initial_state = {
-                "messages": [],
-                "current_agent_id": None,
-                "context": context or {},
-                "session_id": session_id,
-                "user_input": message,
-                "selected_agent": None,
-                "confidence": 0.0,
-                "processing_start": time.time(),
-                "response": None,
-                "trace": [],
-                "completed": False
-            }
-            
-            # Get any existing state for this session
-            existing_state = self.conversation_states.get(session_id)
-            if existing_state:
-                # Transfer continuous values from existing state
-                initial_state["current_agent_id"] = existing_state.get("current_agent_id")
-                if "messages" in existing_state and existing_state["messages"]:
-                    initial_state["messages"] = existing_state["messages"]
+            initial_state = await self._start_turn(message, session_id, context)
             
             # Run the workflow graph
             final_state = await self.graph.ainvoke(initial_state)
             
-            # Save state for future interactions
-            self.conversation_states[session_id] = final_state
+            return await self._finish_turn(final_state)
             
-            # Generate response from state
-            response = final_state.get("response", {})
-            message_content = response.get("message", "I'm not sure how to help with that.")
+        except Exception as e:
+            logger.error(f"Error processing message: {str(e)}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e),
+                "response": "I encountered an unexpected error. Please try again."
+            }
+    
+    async def _start_turn(
+        self,
+        message: str,
+        session_id: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the initial workflow state of a turn.
+        
+        Args:
+            message: User message
+            session_id: Session ID
+            context: Optional context
             
-            # Update conversation history
-            if self.memory_service:
-                try:
-                    await self.memory_service.add_message(
-                        session_id=session_id,
-                        role="user",
-                        content=message
-                    )
-                    
-                    await self.memory_service.add_message(
-                        session_id=session_id,
-                        role="assistant",
-                        content=message_content,
-                        metadata={
-                            "agent_id": final_state.get("current_agent_id"),
-                            "confidence": final_state.get("confidence", 0.0)
-                        }
-                    )
-                except Exception as e:
-                    logger.error(f"Error updating memory: {str(e)}", exc_info=True)
+        Returns:
+            Initial workflow state, carrying over the session state of previous turns
+        """
+        # Load the conversation once for every node and agent of this turn
+        turn = await TurnContext.load(session_id, self.memory_service)
+        
+        # Initialize workflow state
+        initial_state = {
+            "messages": [],
+            "current_agent_id": None,
+            "context": context or {},
+            "session_id": session_id,
+            "user_input": message,
+            "selected_agent": None,
+            "confidence": 0.0,
+            "processing_start": time.time(),
+            "response": None,
+            "trace": [],
+            "completed": False,
+            "turn_context": turn
+        }
+        
+        # Get any existing state for this session
+        existing_state = await self.conversation_states.get(session_id)
+        if existing_state:
+            # Transfer continuous values from existing state
+            initial_state["current_agent_id"] = existing_state.get("current_agent_id")
+            if "messages" in existing_state and existing_state["messages"]:
+                initial_state["messages"] = existing_state["messages"]
+        
+        return initial_state
+    
+    async def _finish_turn(self, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persist the outcome of a turn and build the response object.
+        
+        Args:
+            final_state: Workflow state after post-processing
             
-            # Prepare final response object
-            selected_agent = final_state.get("selected_agent")
-            result = {
-                "success": True,
-                "response": message_content,
-                "agent": selected_agent.name if selected_agent else "unknown",
-                "agent_id": final_state.get("current_agent_id", ""),
-                "confidence": final_state.get("confidence", 0.0),
-                "processing_time": time.time() - final_state.get("processing_start", time.time()),
-                "trace_id": session_id  # Use session ID as trace ID for observability
+        Returns:
+            Response dictionary
+        """
+        session_id = final_state["session_id"]
+        
+        # Save state for future interactions
+        await self.conversation_states.put(session_id, final_state)
+        
+        # Generate response from state
+        response = final_state.get("response") or {}
+        message_content = response.get("message", "I'm not sure how to help with that.")
+        
+        # Update conversation history together with the writes buffered during the turn
+        turn = final_state["turn_context"]
+        turn.add_message("user", final_state["user_input"])
+        interrupted = response.get("interrupted", False)
+        if message_content or not interrupted:
+            metadata = {
+                "agent_id": final_state.get("current_agent_id"),
+                "confidence": final_state.get("confidence", 0.0)
             }
+            if interrupted:
+                metadata["interrupted"] = True
+            turn.add_message("assistant", message_content, metadata=metadata)
+        await turn.flush()
+        
+        # Prepare final response object
+        selected_agent = final_state.get("selected_agent")
+        return {
+            "success": True,
+            "response": message_content,
+            "agent": selected_agent.name if selected_agent else "unknown",
+            "agent_id": final_state.get("current_agent_id", ""),
+            "confidence": final_state.get("confidence", 0.0),
+            "processing_time": time.time() - final_state.get("processing_start", time.time()),
+            "trace_id": session_id  # Use session ID as trace ID for observability
+        }
+    
+    async def stream_message(
+        self,
+        message: str,
+        session_id: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message, streaming the response as it is generated.
+        
+        Runs the same steps as the workflow graph, but streams the agent
+        output. The routing decision is sent as soon as it is made, so
+        clients can show the agent before the first token. Guardrails,
+        state and memory writes run after the stream completes.
+        
+        Args:
+            message: User message
+            session_id: Session ID
+            context: Optional context
+            
+        Yields:
+            Events with "event" and "data" keys:
+            - routing: selected agent and confidence
+            - token: chunk of the response text
+            - done: final response object, as returned by process_message; its
+              response replaces the streamed text if post-processing changed it
+            - error: error details; no further events follow
+        
+        If the client disconnects mid-stream, the turn is still persisted
+        with the text generated so far and flagged as interrupted.
+        """
+        if not message:
+            yield {"event": "error", "data": {
+                "success": False,
+                "error": "Empty message",
+                "response": "I couldn't understand your message. Please try again."
+            }}
+            return
+        
+        if not self.graph:
+            success = await self.initialize()
+            if not success:
+                yield {"event": "error", "data": {
+                    "success": False,
+                    "error": "Initialization failed",
+                    "response": "I'm having trouble processing your request. Please try again later."
+                }}
+                return
+        
+        state = None
+        streamed: List[str] = []
+        agent_stream = None
+        finished = False
+        try:
+            state = await self._start_turn(message, session_id, context)
+            state = await self._route_request(state)
+            
+            selected_agent = state.get("selected_agent")
+            yield {"event": "routing", "data": {
+                "agent": selected_agent.name if selected_agent else None,
+                "agent_id": state.get("current_agent_id"),
+                "confidence": state.get("confidence", 0.0),
+                "trace_id": session_id
+            }}
             
-            return result
+            # Local guardrails check the stream as it is generated; Reset Password Agent responses are exempt
+            if selected_agent is None or selected_agent.name != "Reset Password Agent":
+                state["stream_guardrails"] = StreamingGuardrails()
+            
+            agent_stream = self._stream_agent(state)
+            async for chunk in agent_stream:
+                streamed.append(chunk)
+                yield {"event": "token", "data": {"text": chunk}}
+            
+            state = await self._apply_post_processing(state)
+            result = await self._finish_turn(state)
+            finished = True
+            yield {"event": "done", "data": result}
             
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}", exc_info=True)
-            return {
+            logger.error(f"Error streaming message: {str(e)}", exc_info=True)
+            yield {"event": "error", "data": {
                 "success": False,
                 "error": str(e),
                 "response": "I encountered an unexpected error. Please try again."
+            }}
+        
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client disconnected; stop generation and keep what was produced
+            if state is not None and not finished:
+                if agent_stream is not None:
+                    await agent_stream.aclose()
+                persist = asyncio.ensure_future(self._finish_interrupted_turn(state, "".join(streamed)))
+                try:
+                    # Shielded, so a repeated cancellation cannot abort the writes
+                    await asyncio.shield(persist)
+                except asyncio.CancelledError:
+                    pass
+            raise
+    
+    async def _finish_interrupted_turn(self, state: Dict[str, Any], text: str) -> None:
+        """
+        Persist a turn whose stream was closed by the client.
+        
+        Args:
+            state: Workflow state of the turn
+            text: Response text streamed before the interruption
+        """
+        logger.info(f"Response stream for session {state['session_id']} interrupted after {len(text)} characters")
+        state["response"] = {**(state.get("response") or {}), "message": text, "success": False, "interrupted": True}
+        state["trace"].append({"step": "stream_interrupted", "timestamp": time.time()})
+        try:
+            await self._finish_turn(state)
+        except Exception as e:
+            logger.error(f"Error persisting interrupted turn: {str(e)}", exc_info=True)
+    
+    async def _stream_agent(self, state: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Execute the selected agent, streaming its response.
+        
+        Streaming counterpart of the agent executor node; the complete
+        response is stored in the state once the stream ends. Chunks pass
+        through the streaming guardrails of the state, if any, which may hold
+        text back, redact it or cut the stream.
+        
+        Args:
+            state: Workflow state after routing
+            
+        Yields:
+            Chunks of the response text
+        """
+        start_time = time.time()
+        selected_agent = state["selected_agent"]
+        
+        state["trace"].append({"step": "agent_executor", "timestamp": start_time})
+        
+        if not selected_agent:
+            logger.error("No agent selected for execution")
+            state["response"] = {
+                "message": "I'm sorry, I couldn't find the right specialist to help with your request.",
+                "success": False,
+                "error": "No agent selected"
             }
+            state["trace"].append({
+                "step": "agent_execution",
+                "status": "failed",
+                "error": "No agent selected"
+            })
+            yield state["response"]["message"]
+            return
+        
+        guardrails = state.get("stream_guardrails")
+        chunks = []
+        try:
+            # Agents read the conversation from the turn context; the copy keeps it out of persisted state
+            agent_context = {**state.get("context", {}), TURN_CONTEXT_KEY: state.get("turn_context")}
+            stream = selected_agent.stream_message(
+                message=state["user_input"],
+                session_id=state["session_id"],
+                context=agent_context
+            )
+            try:
+                async for chunk in stream:
+                    if guardrails is not None:
+                        chunk = guardrails.feed(chunk)
+                    if chunk:
+                        chunks.append(chunk)
+                        yield chunk
+                    if guardrails is not None and guardrails.cut:
+                        logger.warning(f"Guardrails cut the response stream of agent {selected_agent.name}")
+                        break
+                
+                if guardrails is not None:
+                    tail = guardrails.finish()
+                    if tail:
+                        chunks.append(tail)
+                        yield tail
+            finally:
+                # Stops generation when the stream was cut
+                await stream.aclose()
+            
+            state["response"] = {
+                "message": "".join(chunks),
+                "success": True,
+                "agent_id": selected_agent.id,
+                "agent_name": selected_agent.name
+            }
+            state["trace"].append({
+                "step": "agent_execution",
+                "status": "success",
+                "agent_id": selected_agent.id,
+                "agent_name": selected_agent.name,
+                "streamed": True,
+                "duration": time.time() - start_time
+            })
+            
+        except Exception as e:
+            logger.error(f"Error streaming agent {selected_agent.name}: {str(e)}", exc_info=True)
+            state["response"] = {
+                "message": "".join(chunks) or "I encountered an error while processing your request.",
+                "success": False,
+                "error": str(e)
+            }
+            state["trace"].append({
+                "step": "agent_execution",
+                "status": "failed",
+                "agent_id": selected_agent.id,
+                "agent_name": selected_agent.name,
+                "error": str(e),
+                "duration": time.time() - start_time
+            })
+            if not chunks:
+                yield state["response"]["message"]
     
     # Alias for API compatibility with existing OptimizedBrainService
     async def process_request(
@@ -1058,6 +1819,12 @@ class GraphBrainService:
                 "general_agent": bool(self._get_general_agent()),
                 "guardrails_agent": bool(self._get_guardrails_agent()),
                 "graph_nodes": 3 if self.graph else 0,  # Router, Executor, PostProcessor
+                "routing": {
+                    "llm_selections": self.llm_selection_count,
+                    "pre_router": self.agent_index.stats() if self.agent_index else None,
+                    "shortlist": self.agent_shortlist.stats() if self.agent_shortlist else None,
+                    "cache": self.routing_cache.stats() if self.routing_cache else None
+                },
                 "days_analyzed": days,
                 "timestamp": datetime.now().isoformat()
             }
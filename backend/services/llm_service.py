@@ -3,6 +3,11 @@ LLM Service with circuit breaker integration.
 
 This module provides services for interacting with LLMs (e.g., OpenAI)
 with built-in circuit breaker pattern to handle failures gracefully.
+
+It also holds the process-wide LLM client registry. All OpenAI clients
+and LangChain chat models share one pooled async HTTP client with
+keep-alive connections (and HTTP/2 when the h2 package is installed),
+so requests reuse warm TLS connections instead of opening new ones.
 """
 
 import json
@@ -12,10 +17,24 @@ import asyncio
 import logging
 from typing import List, Dict, Any, Union, Optional, Tuple
 
+import httpx
 import openai
-from openai import OpenAI, APIError, RateLimitError, APIConnectionError, APITimeoutError
+from openai import AsyncOpenAI, APIError, RateLimitError, APIConnectionError, APITimeoutError
 from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 
+# HTTP/2 is optional; it needs the h2 package
+try:
+    import h2  # noqa: F401
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+from backend.config.config import (
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_REQUEST_TIMEOUT
+)
 from backend.utils.circuit_breaker import get_or_create_circuit
 from backend.utils.retry import retry_async
 
@@ -46,13 +65,69 @@ class LLMServiceUnavailableError(LLMServiceError):
     """Exception raised when the LLM service is unavailable (circuit open)."""
     pass
 
-# Function to create OpenAI client
-def create_openai_client() -> OpenAI:
+class _SharedAsyncClient(httpx.AsyncClient):
+    """
+    Pooled HTTP client that only close_llm_clients() can close.
+    
+    Registered clients and the chat models held by agents keep a reference
+    to this client for the life of the process, so closing it through one
+    of them (AsyncOpenAI.close() or a context manager) is ignored.
+    """
+    
+    async def aclose(self) -> None:
+        """Keep the pool open; see close_llm_clients()."""
+        logger.debug("Ignoring close of the shared LLM HTTP client; use close_llm_clients()")
+    
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+    
+    async def shutdown(self) -> None:
+        """Close the connection pool."""
+        await super().aclose()
+
+
+# Process-wide pooled HTTP client and LLM clients, created on first use
+_http_client: Optional[_SharedAsyncClient] = None
+_openai_clients: Dict[float, AsyncOpenAI] = {}
+_chat_models: Dict[Tuple[Any, ...], Any] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
     """
-    Create an authenticated OpenAI client.
+    Get the pooled async HTTP client shared by all LLM clients.
+    
+    The client is created once and stays open until close_llm_clients()
+    at shutdown, so chat models held by callers never end up bound to a
+    closed client.
+    
+    Returns:
+        httpx.AsyncClient with keep-alive connections, using HTTP/2 when available
+    """
+    global _http_client
+    
+    if _http_client is None:
+        _http_client = _SharedAsyncClient(
+            http2=HAS_HTTP2,
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT, connect=10.0)
+        )
+        logger.info(f"Created pooled LLM HTTP client (http2={HAS_HTTP2})")
+    return _http_client
+
+
+def create_openai_client(timeout: Optional[float] = None) -> AsyncOpenAI:
+    """
+    Get the shared authenticated async OpenAI client.
+    
+    Args:
+        timeout: Request timeout in seconds (defaults to LLM_REQUEST_TIMEOUT)
     
     Returns:
-        OpenAI: Authenticated OpenAI client
+        AsyncOpenAI: Authenticated OpenAI client on the pooled HTTP client
         
     Raises:
         LLMAuthenticationError: If API key is not available or invalid
@@ -61,13 +136,90 @@ def create_openai_client() -> OpenAI:
     if not api_key:
         raise LLMAuthenticationError("OpenAI API key not found in environment")
     
-    try:
-        # Set up the client with the API key
-        client = OpenAI(api_key=api_key)
-        return client
-    except Exception as e:
-        logger.error(f"Error initializing OpenAI client: {e}")
-        raise LLMAuthenticationError(f"Failed to initialize OpenAI client: {str(e)}")
+    timeout = timeout or LLM_REQUEST_TIMEOUT
+    http_client = get_http_client()
+    client = _openai_clients.get(timeout)
+    if client is None:
+        try:
+            client = AsyncOpenAI(api_key=api_key, timeout=timeout, http_client=http_client)
+        except Exception as e:
+            logger.error(f"Error initializing OpenAI client: {e}")
+            raise LLMAuthenticationError(f"Failed to initialize OpenAI client: {str(e)}")
+        _openai_clients[timeout] = client
+    return client
+
+
+def get_chat_model(
+    model: str = "gpt-4o",
+    temperature: float = 0.2,
+    timeout: Optional[float] = None,
+    **kwargs: Any
+) -> Any:
+    """
+    Get the shared LangChain chat model for a configuration.
+    
+    Chat models are registered by (model, temperature, timeout) and any
+    extra settings, and all use the pooled HTTP client. Callers must not
+    mutate the returned model; use bind() or with_structured_output() to
+    derive a variant.
+    
+    Args:
+        model: OpenAI model to use
+        temperature: Sampling temperature
+        timeout: Request timeout in seconds (defaults to LLM_REQUEST_TIMEOUT)
+        **kwargs: Further hashable ChatOpenAI settings, e.g. max_tokens
+    
+    Returns:
+        ChatOpenAI instance
+    """
+    from langchain_openai import ChatOpenAI
+    
+    timeout = timeout or LLM_REQUEST_TIMEOUT
+    http_client = get_http_client()
+    key = (model, temperature, timeout, tuple(sorted(kwargs.items())))
+    llm = _chat_models.get(key)
+    if llm is None:
+        llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            timeout=timeout,
+            http_async_client=http_client,
+            **kwargs
+        )
+        _chat_models[key] = llm
+    return llm
+
+
+async def close_llm_clients() -> None:
+    """
+    Close the pooled HTTP client and drop the registered LLM clients.
+    
+    Only call this at shutdown: chat models still held by callers cannot
+    send requests afterwards.
+    """
+    global _http_client
+    
+    _openai_clients.clear()
+    _chat_models.clear()
+    if _http_client is not None:
+        await _http_client.shutdown()
+        _http_client = None
+
+
+def get_llm_client_stats() -> Dict[str, Any]:
+    """
+    Get the state of the LLM client registry.
+    
+    Returns:
+        Dictionary with registered clients and HTTP settings
+    """
+    return {
+        "chat_models": len(_chat_models),
+        "openai_clients": len(_openai_clients),
+        "http2": HAS_HTTP2,
+        "max_connections": LLM_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    }
 
 
 # Apply circuit breaker to OpenAI API calls
@@ -135,8 +287,8 @@ async def generate_openai_response(
         start_time = time.time()
         
         try:
-            # Create a client
-            client = create_openai_client()
+            # Get the shared client
+            client = create_openai_client(timeout)
             
             # Call the OpenAI API
             completion_args = {
@@ -15,13 +15,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
 
 from backend.config.config import Config
 from backend.agents.framework.langgraph.langgraph_agent import LangGraphAgent
 from backend.agents.framework.langgraph.langgraph_factory import LangGraphAgentFactory
 from backend.agents.framework.langgraph.langgraph_supervisor_factory import LangGraphSupervisorFactory
+from backend.orchestration.state.session_state_store import get_session_state_store
+from backend.services.llm_service import get_chat_model
 
 logger = logging.getLogger(__name__)
 
@@ -63,13 +64,13 @@ class SupervisorBrainService:
         self.supervisor_factory = supervisor_factory
         
         # LLM for orchestration tasks
-        self.llm = ChatOpenAI(
+        self.llm = get_chat_model(
             model="gpt-4o",  # Default to the most capable model
             temperature=0.2  # Lower temperature for more predictable orchestration
         )
         
-        # Conversation state management
-        self.conversation_states: Dict[str, Dict[str, Any]] = {}
+        # Conversation state management - bounded, optionally shared between workers
+        self.conversation_states = get_session_state_store("supervisor_brain", self.config)
         
         # Agent registry - populated during initialization
         self.agents: Dict[str, LangGraphAgent] = {}
@@ -535,18 +536,21 @@ class SupervisorBrainService:
             Conversation state dictionary
         """
         # Check if we have a state for this session
-        if session_id in self.conversation_states:
-            return self.conversation_states[session_id]
-        
-        # Create a new state
-        state = {
-            "session_id": session_id,
-            "messages": [],
-            "context": {"session_id": session_id},
-            "agents": self.agents,
-            "trace": [],
-            "created_at": time.time()
-        }
+        state = await self.conversation_states.get(session_id)
+        if state is None:
+            # Create a new state
+            state = {
+                "session_id": session_id,
+                "messages": [],
+                "context": {"session_id": session_id},
+                "created_at": time.time()
+            }
+        
+        # Per-turn fields are not stored with the session
+        state.setdefault("messages", [])
+        state.setdefault("context", {"session_id": session_id})
+        state["agents"] = self.agents
+        state["trace"] = []
         
         # Add agent patterns if available
         agent_patterns = {}
@@ -557,9 +561,6 @@ class SupervisorBrainService:
         if agent_patterns:
             state["agent_patterns"] = agent_patterns
         
-        # Store the state
-        self.conversation_states[session_id] = state
-        
         return state
     
     async def _persist_conversation_state(self, session_id: str, state: Dict[str, Any]) -> None:
@@ -570,8 +571,8 @@ class SupervisorBrainService:
             session_id: Session identifier
             state: Updated state to persist
         """
-        # Update the in-memory state
-        self.conversation_states[session_id] = state
+        # Update the stored state
+        await self.conversation_states.put(session_id, state)
         
         # If we have a memory service, store the conversation
         if self.memory_service and session_id:
@@ -0,0 +1,177 @@
+"""
+Tests for persisting streamed turns when the client disconnects.
+"""
+
+import asyncio
+from contextlib import aclosing
+from types import SimpleNamespace
+
+import pytest
+
+from backend.orchestration.state.session_state_store import SessionStateStore
+from backend.orchestration.state.turn_context import TurnContext
+from backend.services.graph_brain_service import GraphBrainService
+
+CHUNKS = ["Your order ", "ships ", "tomorrow."]
+
+
+class RecordingMemory:
+    """Memory service recording the turns written to it."""
+    
+    def __init__(self):
+        self.turns = []
+    
+    async def add_turn(self, messages=None, entities=None):
+        self.turns.append(messages or [])
+        return [None] * len(messages or [])
+
+
+class FakeAgentStream:
+    """Agent response stream that pauses after each chunk and records being closed."""
+    
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+    
+    async def __call__(self, state):
+        try:
+            for chunk in self.chunks:
+                await asyncio.sleep(0)
+                yield chunk
+            state["response"] = {"message": "".join(self.chunks), "success": True}
+        finally:
+            self.closed = True
+
+
+def brain_service(agent_stream, memory):
+    """Build a service whose routing and agent execution are replaced by fakes."""
+    service = GraphBrainService.__new__(GraphBrainService)
+    service.graph = object()
+    service.conversation_states = SessionStateStore("test")
+    agent = SimpleNamespace(id="tracking", name="Tracking Agent")
+    
+    async def start_turn(message, session_id, context):
+        return {
+            "session_id": session_id,
+            "user_input": message,
+            "context": {},
+            "trace": [],
+            "turn_context": TurnContext(session_id, memory),
+        }
+    
+    async def route_request(state):
+        return {**state, "selected_agent": agent, "current_agent_id": agent.id, "confidence": 0.9}
+    
+    async def apply_post_processing(state):
+        return state
+    
+    service._start_turn = start_turn
+    service._route_request = route_request
+    service._stream_agent = agent_stream
+    service._apply_post_processing = apply_post_processing
+    return service
+
+
+def assistant_messages(memory):
+    """Assistant messages of every persisted turn."""
+    return [message for turn in memory.turns for message in turn if message["role"] == "assistant"]
+
+
+def test_completed_stream_persists_the_full_turn():
+    memory = RecordingMemory()
+    service = brain_service(FakeAgentStream(CHUNKS), memory)
+    
+    async def scenario():
+        return [event async for event in service.stream_message("Where is my order?", "s1")]
+    
+    events = asyncio.run(scenario())
+    
+    assert [event["event"] for event in events] == ["routing", "token", "token", "token", "done"]
+    assert events[-1]["data"]["response"] == "".join(CHUNKS)
+    assert len(memory.turns) == 1
+    assert "interrupted" not in assistant_messages(memory)[0]["metadata"]
+
+
+def test_closed_stream_persists_the_text_sent_so_far():
+    memory = RecordingMemory()
+    agent_stream = FakeAgentStream(CHUNKS)
+    service = brain_service(agent_stream, memory)
+    
+    async def scenario():
+        stream = service.stream_message("Where is my order?", "s1")
+        assert (await stream.__anext__())["event"] == "routing"
+        assert (await stream.__anext__())["data"]["text"] == CHUNKS[0]
+        await stream.aclose()
+        return await service.conversation_states.get("s1")
+    
+    saved_state = asyncio.run(scenario())
+    
+    assert agent_stream.closed
+    [turn] = memory.turns
+    assert [message["role"] for message in turn] == ["user", "assistant"]
+    assert turn[1]["content"] == CHUNKS[0]
+    assert turn[1]["metadata"]["interrupted"] is True
+    assert saved_state["current_agent_id"] == "tracking"
+
+
+def test_cancelled_request_persists_the_text_sent_so_far():
+    memory = RecordingMemory()
+    agent_stream = FakeAgentStream(CHUNKS)
+    service = brain_service(agent_stream, memory)
+    received = []
+    
+    async def consume():
+        # Consumed like the SSE and WebSocket endpoints do
+        stream = service.stream_message("Where is my order?", "s1")
+        async with aclosing(stream):
+            async for event in stream:
+                received.append(event)
+                if len(received) == 3:
+                    # The request is cancelled while sending, as when the client drops the connection
+                    await asyncio.sleep(10)
+    
+    async def scenario():
+        task = asyncio.ensure_future(consume())
+        while len(received) < 3:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    asyncio.run(scenario())
+    
+    assert agent_stream.closed
+    assert [message["content"] for message in assistant_messages(memory)] == ["".join(CHUNKS[:2])]
+
+
+def test_disconnect_before_any_text_persists_only_the_user_message():
+    memory = RecordingMemory()
+    service = brain_service(FakeAgentStream(CHUNKS), memory)
+    
+    async def scenario():
+        stream = service.stream_message("Where is my order?", "s1")
+        await stream.__anext__()
+        await stream.aclose()
+    
+    asyncio.run(scenario())
+    
+    [turn] = memory.turns
+    assert [message["role"] for message in turn] == ["user"]
+
+
+def test_failed_send_persists_the_text_sent_so_far():
+    memory = RecordingMemory()
+    service = brain_service(FakeAgentStream(CHUNKS), memory)
+    
+    async def scenario():
+        # A WebSocket send to a closed connection raises in the consumer, not in the stream
+        stream = service.stream_message("Where is my order?", "s1")
+        async with aclosing(stream):
+            async for event in stream:
+                if event["event"] == "token":
+                    raise ConnectionError("client disconnected")
+    
+    with pytest.raises(ConnectionError):
+        asyncio.run(scenario())
+    
+    assert [message["content"] for message in assistant_messages(memory)] == [CHUNKS[0]]
@@ -0,0 +1,184 @@
+"""
+Multi-pattern matching utilities for Staples Brain.
+
+This module provides an Aho-Corasick automaton that finds every
+occurrence of a set of literal patterns in a single pass over a message,
+independently of the number of patterns. It is used for keyword routing,
+where pattern tables can grow into the thousands.
+"""
+
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pattern types that are matched as regular expressions rather than literal text
+REGEX_PATTERN_TYPES = ("regex",)
+
+
+class PatternMatch(NamedTuple):
+    """Occurrence of a pattern in a message; start and end index the original message."""
+    agent_id: str
+    pattern: str
+    start: int
+    end: int
+    priority: int
+
+
+class AhoCorasickMatcher:
+    """
+    Case-insensitive Aho-Corasick automaton over literal patterns.
+    
+    Patterns and messages are compared after Unicode case folding, so
+    "STRASSE" matches "straße".
+    
+    Each pattern belongs to an agent and carries a priority. When several
+    patterns occur in a message, the best match is the one with the highest
+    priority, then the longest one, then the earliest one, then the one
+    registered first.
+    """
+    
+    def __init__(self):
+        """Initialize an empty matcher."""
+        # Trie transitions, failure links and (pattern index) outputs per state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        # (agent_id, pattern, priority, matched length) per pattern index
+        self._patterns: List[Tuple[str, str, int, int]] = []
+        self._compiled = True
+    
+    def __len__(self) -> int:
+        return len(self._patterns)
+    
+    @classmethod
+    def from_agent_patterns(cls, agent_patterns: Dict[str, Iterable[Any]]) -> "AhoCorasickMatcher":
+        """
+        Build a matcher from the patterns of several agents.
+        
+        Args:
+            agent_patterns: Agent ID to patterns, given either as strings or as
+                pattern dictionaries with pattern_type, pattern_value and priority.
+                Regex patterns are skipped.
+        
+        Returns:
+            Compiled matcher
+        """
+        matcher = cls()
+        for agent_id, patterns in agent_patterns.items():
+            for pattern in patterns or []:
+                if isinstance(pattern, dict):
+                    if pattern.get("pattern_type") in REGEX_PATTERN_TYPES:
+                        continue
+                    matcher.add(agent_id, pattern.get("pattern_value", ""), pattern.get("priority", 0) or 0)
+                elif isinstance(pattern, str):
+                    matcher.add(agent_id, pattern)
+        matcher.compile()
+        return matcher
+    
+    def add(self, agent_id: str, pattern: str, priority: int = 0) -> None:
+        """
+        Add a pattern. The matcher must be compiled before the next search.
+        
+        Args:
+            agent_id: Agent the pattern routes to
+            pattern: Literal text to find
+            priority: Higher priorities win over longer matches
+        """
+        text = pattern.casefold()
+        if not text:
+            return
+        
+        state = 0
+        for char in text:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        
+        self._output[state].append(len(self._patterns))
+        self._patterns.append((agent_id, pattern, priority, len(text)))
+        self._compiled = False
+    
+    def compile(self) -> None:
+        """Compute the failure links of the automaton."""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Patterns ending at the failure state also end here
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        
+        self._compiled = True
+    
+    def find_all(self, text: str) -> List[PatternMatch]:
+        """
+        Find all pattern occurrences in a text.
+        
+        Args:
+            text: Text to search
+        
+        Returns:
+            Matches in order of their end position
+        """
+        if not self._compiled:
+            self.compile()
+        
+        # Case folding can expand a character ("ß" -> "ss"); map folded positions back to the original text
+        folded = text.casefold()
+        origin = None
+        if len(folded) != len(text):
+            origin = [i for i, char in enumerate(text) for _ in char.casefold()]
+        
+        matches = []
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        for position, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in self._output[state]:
+                agent_id, pattern, priority, length = self._patterns[index]
+                start, end = position + 1 - length, position + 1
+                if origin is not None:
+                    start, end = origin[start], origin[position] + 1
+                matches.append(PatternMatch(agent_id, pattern, start, end, priority))
+        return matches
+    
+    def best_match(self, text: str, agent_ids: Optional[Iterable[str]] = None) -> Optional[PatternMatch]:
+        """
+        Find the best pattern occurrence in a text.
+        
+        Args:
+            text: Text to search
+            agent_ids: Optional agents to restrict the result to
+        
+        Returns:
+            Highest priority, then longest, then earliest match, or None
+        """
+        allowed = set(agent_ids) if agent_ids is not None else None
+        best = None
+        best_rank = None
+        for match in self.find_all(text):
+            if allowed is not None and match.agent_id not in allowed:
+                continue
+            rank = (-match.priority, -(match.end - match.start), match.start)
+            if best_rank is None or rank < best_rank:
+                best = match
+                best_rank = rank
+        return best
@@ -0,0 +1,116 @@
+"""
+Tests for the Aho-Corasick pattern matcher used for keyword routing.
+"""
+
+from backend.utils.pattern_matcher import AhoCorasickMatcher, PatternMatch
+
+
+def build_matcher(*patterns):
+    """Build a compiled matcher from (agent_id, pattern, priority) tuples."""
+    matcher = AhoCorasickMatcher()
+    for agent_id, pattern, priority in patterns:
+        matcher.add(agent_id, pattern, priority)
+    matcher.compile()
+    return matcher
+
+
+def test_find_all_reports_overlapping_matches():
+    matcher = build_matcher(("a", "he", 0), ("b", "she", 0), ("c", "hers", 0))
+    
+    matches = matcher.find_all("ushers")
+    
+    assert matches == [
+        PatternMatch("b", "she", 1, 4, 0),
+        PatternMatch("a", "he", 2, 4, 0),
+        PatternMatch("c", "hers", 2, 6, 0),
+    ]
+
+
+def test_matching_is_case_insensitive():
+    matcher = build_matcher(("tracking", "Track Order", 0))
+    
+    match = matcher.best_match("please TRACK ORDER 123")
+    
+    assert match == PatternMatch("tracking", "Track Order", 7, 18, 0)
+
+
+def test_higher_priority_wins_over_longer_match():
+    matcher = build_matcher(("returns", "return my order", 1), ("tracking", "order", 5))
+    
+    assert matcher.best_match("I want to return my order").agent_id == "tracking"
+
+
+def test_longest_match_wins_at_equal_priority():
+    matcher = build_matcher(("tracking", "order", 0), ("returns", "return my order", 0))
+    
+    assert matcher.best_match("I want to return my order").agent_id == "returns"
+
+
+def test_leftmost_match_wins_at_equal_priority_and_length():
+    matcher = build_matcher(("store", "hours", 0), ("tracking", "order", 0))
+    
+    match = matcher.best_match("order status and store hours")
+    
+    assert (match.agent_id, match.start) == ("tracking", 0)
+
+
+def test_first_registered_pattern_wins_full_tie():
+    matcher = build_matcher(("first", "order", 0), ("second", "order", 0))
+    
+    assert matcher.best_match("order").agent_id == "first"
+
+
+def test_best_match_restricted_to_agents():
+    matcher = build_matcher(("tracking", "order", 5), ("returns", "return", 0))
+    
+    assert matcher.best_match("return order", agent_ids=["returns"]).agent_id == "returns"
+    assert matcher.best_match("return order", agent_ids=["store"]) is None
+
+
+def test_no_match_returns_none():
+    matcher = build_matcher(("tracking", "order", 0))
+    
+    assert matcher.best_match("hello there") is None
+    assert AhoCorasickMatcher().best_match("anything") is None
+
+
+def test_from_agent_patterns_skips_regex_patterns():
+    matcher = AhoCorasickMatcher.from_agent_patterns({
+        "tracking": [
+            {"pattern_type": "keyword", "pattern_value": "track", "priority": 2},
+            {"pattern_type": "regex", "pattern_value": r"order\s+\d+", "priority": 9},
+        ],
+        "returns": ["return", ""],
+        "store": None,
+    })
+    
+    assert len(matcher) == 2
+    assert matcher.best_match(r"order\s+\d+") is None
+    assert matcher.best_match("track my return") == PatternMatch("tracking", "track", 0, 5, 2)
+
+
+def test_patterns_added_after_compile_are_found():
+    matcher = build_matcher(("tracking", "order", 0))
+    matcher.add("returns", "refund", 0)
+    
+    assert matcher.best_match("refund please").agent_id == "returns"
+
+
+def test_offsets_index_original_text_when_case_folding_expands():
+    # "İ" folds to two characters and "ß" to "ss", so folded offsets drift from the message
+    matcher = build_matcher(("store", "istanbul", 0), ("tracking", "order", 0), ("store", "strasse", 0))
+    message = "İİ straße order ISTANBUL"
+    
+    matches = {match.pattern: match for match in matcher.find_all(message)}
+    
+    assert message[matches["order"].start:matches["order"].end] == "order"
+    assert message[matches["strasse"].start:matches["strasse"].end] == "straße"
+    assert message[matches["istanbul"].start:matches["istanbul"].end] == "ISTANBUL"
+
+
+def test_case_folded_pattern_matches_folded_message():
+    matcher = build_matcher(("store", "Straße", 0))
+    
+    match = matcher.best_match("Which STRASSE is the store on?")
+    
+    assert (match.start, match.end) == (6, 13)